@@ -0,0 +1,41 @@
+"""add call_id to agora channels
+
+Revision ID: add_agora_channel_call_id
+Revises: add_unread_counters
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_agora_channel_call_id'
+down_revision: Union[str, Sequence[str], None] = 'add_unread_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add call_id to agora_channels so call events can be routed to the room's participants"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    
+    if 'agora_channels' not in inspector.get_table_names():
+        print("agora_channels table does not exist, skipping migration")
+        return
+    
+    columns = [col['name'] for col in inspector.get_columns('agora_channels')]
+    if 'call_id' not in columns:
+        op.add_column('agora_channels', sa.Column('call_id', sa.String(length=64), nullable=True))
+    
+    existing = [index['name'] for index in inspector.get_indexes('agora_channels')]
+    if 'ix_agora_channels_call_id' not in existing:
+        op.create_index('ix_agora_channels_call_id', 'agora_channels', ['call_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Drop call_id from agora_channels"""
+    op.drop_index('ix_agora_channels_call_id', table_name='agora_channels')
+    op.drop_column('agora_channels', 'call_id')
@@ -0,0 +1,40 @@
+"""add chat inbox indexes
+
+Revision ID: add_chat_inbox_indexes
+Revises: 2dcd2083375d
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_chat_inbox_indexes'
+down_revision: Union[str, Sequence[str], None] = '2dcd2083375d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add indexes backing the keyset-paginated chat room list"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    tables = inspector.get_table_names()
+    
+    if 'chat_participants' in tables:
+        existing = [index['name'] for index in inspector.get_indexes('chat_participants')]
+        if 'ix_chat_participants_user_room' not in existing:
+            op.create_index('ix_chat_participants_user_room', 'chat_participants', ['user_id', 'room_id'])
+    
+    if 'chat_rooms' in tables:
+        existing = [index['name'] for index in inspector.get_indexes('chat_rooms')]
+        if 'ix_chat_rooms_updated_at_id' not in existing:
+            op.create_index('ix_chat_rooms_updated_at_id', 'chat_rooms', ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    """Drop chat room list indexes"""
+    op.drop_index('ix_chat_rooms_updated_at_id', table_name='chat_rooms')
+    op.drop_index('ix_chat_participants_user_room', table_name='chat_participants')
@@ -0,0 +1,36 @@
+"""add chat messages keyset index
+
+Revision ID: add_chat_messages_keyset_index
+Revises: add_chat_inbox_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_chat_messages_keyset_index'
+down_revision: Union[str, Sequence[str], None] = 'add_chat_inbox_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add (room_id, created_at, id) index for cursor-paginated chat history"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    
+    if 'chat_messages' not in inspector.get_table_names():
+        print("chat_messages table does not exist, skipping migration")
+        return
+    
+    existing = [index['name'] for index in inspector.get_indexes('chat_messages')]
+    if 'ix_chat_messages_room_created_id' not in existing:
+        op.create_index('ix_chat_messages_room_created_id', 'chat_messages', ['room_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Drop chat history keyset index"""
+    op.drop_index('ix_chat_messages_room_created_id', table_name='chat_messages')
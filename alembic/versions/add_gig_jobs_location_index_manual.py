@@ -0,0 +1,33 @@
+"""add gig_jobs location index
+
+Revision ID: add_gig_jobs_location_index
+Revises: switch_job_search_to_simple
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_gig_jobs_location_index'
+down_revision: Union[str, Sequence[str], None] = 'switch_job_search_to_simple'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index gig_jobs.location_id, the column gig job location filters use"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if 'ix_gig_jobs_location_id' in [index['name'] for index in inspector.get_indexes('gig_jobs')]:
+        print("ix_gig_jobs_location_id already exists, skipping")
+        return
+    op.create_index('ix_gig_jobs_location_id', 'gig_jobs', ['location_id'])
+
+
+def downgrade() -> None:
+    """Drop the gig_jobs location index"""
+    op.drop_index('ix_gig_jobs_location_id', table_name='gig_jobs')
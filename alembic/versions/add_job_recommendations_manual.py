@@ -0,0 +1,58 @@
+"""add job recommendations
+
+Revision ID: add_job_recommendations
+Revises: add_job_skill_match_indexes
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_job_recommendations'
+down_revision: Union[str, Sequence[str], None] = 'add_job_skill_match_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create job_recommendations and index user_skills by skill"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if 'ix_user_skills_skill_user' not in [index['name'] for index in inspector.get_indexes('user_skills')]:
+        op.create_index('ix_user_skills_skill_user', 'user_skills', ['skill_id', 'user_id'])
+
+    if 'job_recommendations' in inspector.get_table_names():
+        print("job_recommendations table already exists, skipping migration")
+        return
+
+    op.create_table(
+        'job_recommendations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('gig_job_id', sa.Integer(), nullable=True),
+        sa.Column('full_time_job_id', sa.Integer(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['gig_job_id'], ['gig_jobs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['full_time_job_id'], ['full_time_jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_recommendations_id', 'job_recommendations', ['id'])
+    op.create_index('ix_job_recommendations_user_score', 'job_recommendations', ['user_id', 'score'])
+    op.create_index('ix_job_recommendations_gig_job_id', 'job_recommendations', ['gig_job_id'])
+    op.create_index('ix_job_recommendations_full_time_job_id', 'job_recommendations', ['full_time_job_id'])
+
+
+def downgrade() -> None:
+    """Drop job_recommendations and the user_skills index"""
+    op.drop_index('ix_job_recommendations_full_time_job_id', table_name='job_recommendations')
+    op.drop_index('ix_job_recommendations_gig_job_id', table_name='job_recommendations')
+    op.drop_index('ix_job_recommendations_user_score', table_name='job_recommendations')
+    op.drop_index('ix_job_recommendations_id', table_name='job_recommendations')
+    op.drop_table('job_recommendations')
+    op.drop_index('ix_user_skills_skill_user', table_name='user_skills')
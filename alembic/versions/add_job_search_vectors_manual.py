@@ -0,0 +1,60 @@
+"""add job search vectors
+
+Revision ID: add_job_search_vectors
+Revises: add_notification_outbox
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_job_search_vectors'
+down_revision: Union[str, Sequence[str], None] = 'add_notification_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expression as first shipped; switch_job_search_to_simple rebuilds it with
+# app.utils.full_text_search.job_search_vector_sql()
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Add generated tsvector columns with GIN indexes to gig_jobs and full_time_jobs"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    for table in ('gig_jobs', 'full_time_jobs'):
+        columns = [col['name'] for col in inspector.get_columns(table)]
+        if 'search_vector' in columns:
+            print(f"{table}.search_vector already exists, skipping")
+            continue
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+        )
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+    indexes = [index['name'] for index in inspector.get_indexes('full_time_jobs')]
+    if 'ix_full_time_jobs_location_trgm' not in indexes:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            'ix_full_time_jobs_location_trgm',
+            'full_time_jobs',
+            ['location'],
+            postgresql_using='gin',
+            postgresql_ops={'location': 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Drop the search indexes and columns"""
+    op.drop_index('ix_full_time_jobs_location_trgm', table_name='full_time_jobs')
+    for table in ('gig_jobs', 'full_time_jobs'):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,43 @@
+"""add job skill match indexes
+
+Revision ID: add_job_skill_match_indexes
+Revises: add_job_search_vectors
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_job_skill_match_indexes'
+down_revision: Union[str, Sequence[str], None] = 'add_job_search_vectors'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('gig_job_skills', 'ix_gig_job_skills_job_skill', ['gig_job_id', 'skill_id']),
+    ('gig_job_skills', 'ix_gig_job_skills_skill_job', ['skill_id', 'gig_job_id']),
+    ('full_time_job_skills', 'ix_full_time_job_skills_job_skill', ['full_time_job_id', 'skill_id']),
+    ('full_time_job_skills', 'ix_full_time_job_skills_skill_job', ['skill_id', 'full_time_job_id']),
+]
+
+
+def upgrade() -> None:
+    """Index job/skill link tables in both directions for SQL relevance scoring"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    for table, name, columns in INDEXES:
+        existing = [index['name'] for index in inspector.get_indexes(table)]
+        if name in existing:
+            print(f"{name} already exists, skipping")
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Drop the link table indexes"""
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,58 @@
+"""add notification outbox
+
+Revision ID: add_notification_outbox
+Revises: add_agora_channel_call_id
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_notification_outbox'
+down_revision: Union[str, Sequence[str], None] = 'add_agora_channel_call_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create notification_outbox for push notifications written alongside chat messages"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    
+    if 'notification_outbox' in inspector.get_table_names():
+        print("notification_outbox table already exists, skipping migration")
+        return
+    
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('notification_id', sa.Integer(), nullable=True),
+        sa.Column('recipient_user_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['recipient_user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_outbox_id', 'notification_outbox', ['id'])
+    op.create_index(
+        'ix_notification_outbox_pending',
+        'notification_outbox',
+        ['id'],
+        postgresql_where=sa.text('processed_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    """Drop notification_outbox"""
+    op.drop_index('ix_notification_outbox_pending', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_id', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
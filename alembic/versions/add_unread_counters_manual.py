@@ -0,0 +1,64 @@
+"""add unread counters
+
+Revision ID: add_unread_counters
+Revises: add_chat_messages_keyset_index
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_unread_counters'
+down_revision: Union[str, Sequence[str], None] = 'add_chat_messages_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add incrementally maintained unread counters and backfill them"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    tables = inspector.get_table_names()
+    
+    if 'chat_participants' in tables:
+        columns = [col['name'] for col in inspector.get_columns('chat_participants')]
+        if 'unread_count' not in columns:
+            op.add_column('chat_participants', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+        
+        op.execute("""
+            UPDATE chat_participants p
+            SET unread_count = sub.unread
+            FROM (
+                SELECT room_id, receiver_id, COUNT(*) AS unread
+                FROM chat_messages
+                WHERE is_read = false AND is_deleted = false
+                GROUP BY room_id, receiver_id
+            ) sub
+            WHERE p.room_id = sub.room_id AND p.user_id = sub.receiver_id
+        """)
+    
+    if 'notification_unread_counters' not in tables:
+        op.create_table(
+            'notification_unread_counters',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('type', sa.String(length=50), primary_key=True),
+            sa.Column('count', sa.Integer(), server_default='0', nullable=False)
+        )
+        
+        if 'notifications' in tables:
+            op.execute("""
+                INSERT INTO notification_unread_counters (user_id, type, count)
+                SELECT recipient_user_id, type::text, COUNT(*)
+                FROM notifications
+                WHERE is_read = false
+                GROUP BY recipient_user_id, type
+            """)
+
+
+def downgrade() -> None:
+    """Drop unread counters"""
+    op.drop_table('notification_unread_counters')
+    op.drop_column('chat_participants', 'unread_count')
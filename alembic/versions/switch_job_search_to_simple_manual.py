@@ -0,0 +1,56 @@
+"""switch job search vectors to the simple text search config
+
+Revision ID: switch_job_search_to_simple
+Revises: add_job_recommendations
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'switch_job_search_to_simple'
+down_revision: Union[str, Sequence[str], None] = 'add_job_recommendations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.utils.full_text_search.job_search_vector_sql()
+SIMPLE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+ENGLISH_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def _rebuild_search_vectors(expression: str) -> None:
+    """Recreate the generated search_vector columns and their GIN indexes with the given expression"""
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    for table in ('gig_jobs', 'full_time_jobs'):
+        indexes = [index['name'] for index in inspector.get_indexes(table)]
+        if f'ix_{table}_search_vector' in indexes:
+            op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        if 'search_vector' in [col['name'] for col in inspector.get_columns(table)]:
+            op.drop_column(table, 'search_vector')
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+
+def upgrade() -> None:
+    """Index job text unstemmed so prefix queries match partially typed words"""
+    _rebuild_search_vectors(SIMPLE_SEARCH_VECTOR_SQL)
+
+
+def downgrade() -> None:
+    """Go back to the stemmed english vectors"""
+    _rebuild_search_vectors(ENGLISH_SEARCH_VECTOR_SQL)
@@ -58,7 +58,7 @@ class UserAdminResponse(UserFullResponse):
 
 @router.get("/users", response_model=SuccessResponse, tags=["Admin"])
 @handle_errors
-async def get_all_users(
+def get_all_users(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     role: Optional[str] = Query(None, description="Filter by role (employer/worker)"),
@@ -199,7 +199,7 @@ async def get_all_users(
 
 @router.patch("/users/{user_id}/block", response_model=SuccessResponse, tags=["Admin"])
 @handle_errors
-async def block_user(
+def block_user(
     user_id: int,
     request: Optional[BlockUserRequest] = Body(None),
     current_user: User = Depends(check_admin_role),
@@ -251,7 +251,7 @@ async def block_user(
 
 @router.patch("/users/{user_id}/unblock", response_model=SuccessResponse, tags=["Admin"])
 @handle_errors
-async def unblock_user(
+def unblock_user(
     user_id: int,
     current_user: User = Depends(check_admin_role),
     db: Session = Depends(get_db)
@@ -288,3 +288,30 @@ async def unblock_user(
         },
         message="User unblocked successfully"
     )
+
+
+@router.get("/websocket/queues", response_model=SuccessResponse, tags=["Admin"])
+@handle_errors
+async def get_websocket_queue_metrics(
+    current_user: User = Depends(check_admin_role)
+):
+    """
+    Get outbound WebSocket queue metrics for the connections held by this server node, keyed by connection ID
+    
+    - **depth**: messages waiting to be written
+    - **max_depth**: highest depth seen since the client connected
+    - **coalesced** / **dropped**: typing/presence events merged or dropped under backpressure
+    """
+    from ..utils.websocket_manager import manager
+    
+    queues = manager.get_queue_metrics()
+    return success_response(
+        data={
+            "node_id": manager.node_id,
+            "connections": len(queues),
+            "total_depth": sum(queue["depth"] for queue in queues.values()),
+            "users": len({metrics["user_id"] for metrics in queues.values()}),
+            "queues": queues
+        },
+        message="WebSocket queue metrics retrieved successfully"
+    )
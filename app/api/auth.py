@@ -3,6 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Optional
 from ..db.database import get_db
+from ..db.offload import run_db, AsyncRepository
 from ..schemas.auth import (
     UserRegister, UserLogin, SocialLogin, OTPRequest, 
     OTPVerify, PasswordResetVerified, LoginResponse, UserResponse, 
@@ -10,7 +11,7 @@ from ..schemas.auth import (
     RegisterOTPVerify, RegisterResponse, RefreshTokenRequest, 
     RefreshTokenResponse, UserRestore
 )
-from ..schemas.profile import UserFullResponse, RoleResponse
+from ..schemas.profile import RoleResponse
 from ..schemas.common import SuccessResponse, ErrorResponse
 from ..repositories.user_repository import UserRepository, OTPRepository
 from ..repositories.role_repository import RoleRepository
@@ -21,6 +22,8 @@ from ..utils.email import generate_otp, send_otp_email, send_registration_otp_em
 from ..utils.social_auth import verify_social_token
 from ..utils.device_token_logger import create_user_device_token
 from ..utils.admin_setup import create_admin_user
+from ..utils.auth_cache import invalidate_auth_user
+from ..utils.profile_cache import get_full_profile, invalidate_profile
 from ..models.user import User
 from ..models.role import Role
 from ..models.otp import OTP
@@ -69,7 +72,7 @@ def get_current_user(
         )
     
     user_repo = UserRepository(db)
-    user = user_repo.get_user_by_id(int(user_id))
+    user = user_repo.get_auth_user(int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -144,7 +147,7 @@ def get_current_user_oauth2(
         )
     
     user_repo = UserRepository(db)
-    user = user_repo.get_user_by_id(int(user_id))
+    user = user_repo.get_auth_user(int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -153,39 +156,42 @@ def get_current_user_oauth2(
     
     return user
 
-@router.post("/register", response_model=SuccessResponse, tags=["Authentication"])
-async def register(user_data: RegisterOTPRequest, db: Session = Depends(get_db)):
-    """Register new user - send OTP for email verification"""
-    try:
-        user_repo = UserRepository(db)
-        otp_repo = OTPRepository(db)
-
-        existing_user = user_repo.db.query(User).filter(User.email == user_data.email).first()
-        if existing_user:
-            if existing_user.is_deleted:
+def _check_registration_available(db: Session, email: str, phone: Optional[str]):
+    """Reject a registration whose email or phone already belongs to a user (runs on the DB threadpool)"""
+    existing_user = db.query(User).filter(User.email == email).first()
+    if existing_user:
+        if existing_user.is_deleted:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email was deleted and cannot be registered again"
+            )
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exists"
+            )
+    
+    if phone:
+        existing_phone_user = db.query(User).filter(User.phone == phone).first()
+        if existing_phone_user:
+            if existing_phone_user.is_deleted:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="User with this email was deleted and cannot be registered again"
+                    detail="User with this phone number was deleted and cannot be registered again"
                 )
             else:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="User with this email already exists"
+                    detail="User with this phone number already exists"
                 )
-        
-        if user_data.phone:
-            existing_phone_user = user_repo.db.query(User).filter(User.phone == user_data.phone).first()
-            if existing_phone_user:
-                if existing_phone_user.is_deleted:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="User with this phone number was deleted and cannot be registered again"
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="User with this phone number already exists"
-                    )
+
+@router.post("/register", response_model=SuccessResponse, tags=["Authentication"])
+async def register(user_data: RegisterOTPRequest, db: Session = Depends(get_db)):
+    """Register new user - send OTP for email verification"""
+    try:
+        otp_repo = AsyncRepository(OTPRepository(db))
+
+        await run_db(_check_registration_available, db, user_data.email, user_data.phone)
         
         otp_code = generate_otp(settings.OTP_LENGTH, email=user_data.email)
         
@@ -198,7 +204,7 @@ async def register(user_data: RegisterOTPRequest, db: Session = Depends(get_db))
             "device_type": user_data.device_type
         }
         
-        otp = otp_repo.create_otp_with_data(user_data.email, otp_code, "registration", registration_data)
+        otp = await otp_repo.create_otp_with_data(user_data.email, otp_code, "registration", registration_data)
         
         email_sent = await send_registration_otp_email(user_data.email, otp_code)
         
@@ -223,7 +229,7 @@ async def register(user_data: RegisterOTPRequest, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/register-code-check", response_model=SuccessResponse, tags=["Authentication"])
-async def verify_registration_otp(otp_verify: RegisterOTPVerify, db: Session = Depends(get_db)):
+def verify_registration_otp(otp_verify: RegisterOTPVerify, db: Session = Depends(get_db)):
     """Verify registration OTP and create user account"""
     try:
         user_repo = UserRepository(db)
@@ -323,7 +329,7 @@ async def verify_registration_otp(otp_verify: RegisterOTPVerify, db: Session = D
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/token", response_model=Token, tags=["Authentication"])
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """OAuth2 compatible token endpoint for Swagger UI"""
     try:
         user_repo = UserRepository(db)
@@ -367,7 +373,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login", response_model=SuccessResponse, tags=["Authentication"])
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login user with email and password"""
     try:
         user_repo = UserRepository(db)
@@ -429,7 +435,7 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/social-login", response_model=SuccessResponse, tags=["Authentication"])
-async def social_login(social_data: SocialLogin, db: Session = Depends(get_db)):
+def social_login(social_data: SocialLogin, db: Session = Depends(get_db)):
     """
     Login or register user via social login (Google, Facebook, Apple)
     
@@ -480,6 +486,8 @@ async def social_login(social_data: SocialLogin, db: Session = Depends(get_db)):
                 
                 user.is_verified = True
                 db.commit()
+                invalidate_auth_user(user.id)
+                invalidate_profile(user.id)
                 user_action = "linked"
             else:
                 # User not found at all - create new user
@@ -552,10 +560,10 @@ async def social_login(social_data: SocialLogin, db: Session = Depends(get_db)):
 async def forgot_password(otp_request: OTPRequest, db: Session = Depends(get_db)):
     """Send OTP code to user's email for password reset"""
     try:
-        user_repo = UserRepository(db)
-        otp_repo = OTPRepository(db)
+        user_repo = AsyncRepository(UserRepository(db))
+        otp_repo = AsyncRepository(OTPRepository(db))
          
-        user = user_repo.get_user_by_email(otp_request.email)
+        user = await user_repo.get_user_by_email(otp_request.email)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -564,7 +572,7 @@ async def forgot_password(otp_request: OTPRequest, db: Session = Depends(get_db)
         
         otp_code = generate_otp(settings.OTP_LENGTH, email=otp_request.email)
         
-        otp = otp_repo.create_otp(otp_request.email, otp_code)
+        otp = await otp_repo.create_otp(otp_request.email, otp_code)
         
         email_sent = await send_otp_email(otp_request.email, otp_code)
         
@@ -587,7 +595,7 @@ async def forgot_password(otp_request: OTPRequest, db: Session = Depends(get_db)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/verify-otp", response_model=SuccessResponse, tags=["Authentication"])
-async def verify_otp(otp_verify: OTPVerify, db: Session = Depends(get_db)):
+def verify_otp(otp_verify: OTPVerify, db: Session = Depends(get_db)):
     """Verify OTP code for password reset"""
     try:
         otp_repo = OTPRepository(db)
@@ -608,7 +616,7 @@ async def verify_otp(otp_verify: OTPVerify, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/reset-password", response_model=SuccessResponse, tags=["Authentication"])
-async def reset_password(password_reset: PasswordResetVerified, db: Session = Depends(get_db)):
+def reset_password(password_reset: PasswordResetVerified, db: Session = Depends(get_db)):
     """Reset password after OTP verification (no OTP required in request)"""
     try:
         user_repo = UserRepository(db)
@@ -641,14 +649,13 @@ async def reset_password(password_reset: PasswordResetVerified, db: Session = De
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/me", response_model=SuccessResponse, tags=["Account"])
-async def get_current_user_info(request: Request, current_user: User = Depends(get_current_user_oauth2), db: Session = Depends(get_db)):
+def get_current_user_info(request: Request, current_user: User = Depends(get_current_user_oauth2), db: Session = Depends(get_db)):
     """Get current user full profile, with full avatar_url, full image URLs for project images, and full flag_image URL for location. Only one location object should be returned."""
     try:
-        user_repo = UserRepository(db)
-        full_user = user_repo.get_user_full_profile(current_user.id)
-        if not full_user:
+        full_profile = get_full_profile(db, current_user.id)
+        if not full_profile:
             raise HTTPException(status_code=404, detail="User not found")
-        user_data = UserFullResponse.model_validate(full_user).dict()
+        user_data = full_profile.dict()
         base_url = str(request.base_url).rstrip("/")
         if user_data["avatar_url"]:
             user_data["avatar_url"] = f"{base_url}{user_data['avatar_url']}"
@@ -670,7 +677,7 @@ async def get_current_user_info(request: Request, current_user: User = Depends(g
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.patch("/me", response_model=SuccessResponse, tags=["Account"])
-async def update_profile(update: UserUpdate, request: Request, current_user: User = Depends(get_current_user_oauth2), db: Session = Depends(get_db)):
+def update_profile(update: UserUpdate, request: Request, current_user: User = Depends(get_current_user_oauth2), db: Session = Depends(get_db)):
     """Update user profile fields (text fields only). Use /profile/avatar for avatar uploads. Returns full avatar_url."""
     try:
         if hasattr(update, 'model_dump'):
@@ -720,7 +727,7 @@ async def update_profile(update: UserUpdate, request: Request, current_user: Use
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/me", response_model=SuccessResponse, tags=["Account"])
-async def delete_account(
+def delete_account(
     current_user: User = Depends(get_current_user_oauth2), 
     db: Session = Depends(get_db)
 ):
@@ -741,7 +748,7 @@ async def delete_account(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/test-token", response_model=SuccessResponse, tags=["Authentication"])
-async def test_token_generation(db: Session = Depends(get_db)):
+def test_token_generation(db: Session = Depends(get_db)):
     """Test endpoint to generate a valid token for testing"""
     try:
         from ..utils.auth import create_access_token
@@ -759,7 +766,7 @@ async def test_token_generation(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/refresh-token", response_model=SuccessResponse, tags=["Authentication"])
-async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
     """Refresh access token using refresh token"""
     from ..core.logging_config import logger
     
@@ -822,7 +829,7 @@ async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/test-login", response_model=SuccessResponse, tags=["Authentication"])
-async def test_login(db: Session = Depends(get_db)):
+def test_login(db: Session = Depends(get_db)):
     """Test login endpoint that returns a valid token"""
     try:
         from ..utils.auth import create_access_token
@@ -862,7 +869,7 @@ async def test_login(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/user-profiles", response_model=SuccessResponse, tags=["Account"])
-async def get_user_profiles(
+def get_user_profiles(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_oauth2)
 ):
@@ -945,7 +952,7 @@ async def get_user_profiles(
     )
 
 @router.post("/restore-user", response_model=SuccessResponse, tags=["Account"])
-async def restore_user(
+def restore_user(
     restore_data: UserRestore, 
     authorization: str = Header(None),
     db: Session = Depends(get_db)
@@ -990,7 +997,7 @@ async def restore_user(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login-admin", response_model=SuccessResponse, tags=["Authentication"])
-async def login_admin(admin_data: UserLogin, db: Session = Depends(get_db)):
+def login_admin(admin_data: UserLogin, db: Session = Depends(get_db)):
     """
     Admin login endpoint - No OTP required, returns token immediately
     Email: admin@admin.com
@@ -1061,7 +1068,7 @@ async def login_admin(admin_data: UserLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/create-admin", response_model=SuccessResponse, tags=["Authentication"])
-async def create_admin_endpoint(db: Session = Depends(get_db)):
+def create_admin_endpoint(db: Session = Depends(get_db)):
     """
     Create admin user endpoint
     Creates admin user if it doesn't exist
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
+from app.db.offload import run_db
 from app.repositories.category_repository import CategoryRepository
 from app.schemas.category import (
     CategoryCreate, 
@@ -20,14 +22,32 @@ from app.utils.response_helpers import (
     forbidden_error
 )
 from app.utils.permissions import is_admin_user
+from app.utils.reference_cache import cached_reference_response, invalidate_reference_data
 from app.models.user import User
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
+_category_list = TypeAdapter(List[CategoryResponse])
+
+
+async def _cached_category_list(request: Request, load, *params):
+    """
+    Serve a category listing from the reference data cache
+
+    The key is built from the route's declared parameters only, so unknown
+    query parameters cannot multiply the cached entries.
+    """
+    key = ("categories", *params)
+
+    def build() -> bytes:
+        return _category_list.dump_json(_category_list.validate_python(load(), from_attributes=True))
+
+    return await cached_reference_response(request, key, build)
+
 
 @router.post("/", response_model=CategoryResponse, summary="Create a new category")
 @handle_errors
-async def create_category(
+def create_category(
     category: CategoryCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -45,11 +65,14 @@ async def create_category(
     if category.parent_id and not repo.is_valid_parent(category.parent_id):
         raise bad_request_error("Invalid parent category")
     
-    return repo.create(category)
+    created = repo.create(category)
+    invalidate_reference_data("categories")
+    return created
 
 
 @router.get("/", response_model=List[CategoryResponse], summary="Get all categories with filters")
 async def get_categories(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     name: Optional[str] = Query(None, description="Search by category name"),
@@ -68,26 +91,32 @@ async def get_categories(
     repo = CategoryRepository(db)
     
     if name:
-        return repo.search_by_name(name, skip=skip, limit=limit)
-    
-    if is_main is not None:
-        if is_main:
-            if is_active is not None:
-                return repo.get_categories_only_with_filter(is_active, skip=skip, limit=limit)
-            return repo.get_categories_only(skip=skip, limit=limit)
-        else:
-            if is_active is not None:
-                return repo.get_all_subcategories_with_filter(is_active, skip=skip, limit=limit)
-            return repo.get_all_subcategories(skip=skip, limit=limit)
-    
-    if is_active is not None:
-        return repo.get_all_with_filter(is_active, skip=skip, limit=limit)
-    
-    return repo.get_all(skip=skip, limit=limit)
+        def search():
+            return _category_list.validate_python(repo.search_by_name(name, skip=skip, limit=limit), from_attributes=True)
+        return await run_db(search)
+
+    def load():
+        if is_main is not None:
+            if is_main:
+                if is_active is not None:
+                    return repo.get_categories_only_with_filter(is_active, skip=skip, limit=limit)
+                return repo.get_categories_only(skip=skip, limit=limit)
+            else:
+                if is_active is not None:
+                    return repo.get_all_subcategories_with_filter(is_active, skip=skip, limit=limit)
+                return repo.get_all_subcategories(skip=skip, limit=limit)
+
+        if is_active is not None:
+            return repo.get_all_with_filter(is_active, skip=skip, limit=limit)
+
+        return repo.get_all(skip=skip, limit=limit)
+
+    return await _cached_category_list(request, load, "all", skip, limit, is_main, is_active)
 
 
 @router.get("/main", response_model=List[CategoryResponse], summary="Get main categories only")
 async def get_main_categories(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     is_active: Optional[bool] = Query(None, description="Filter by active status (true/false)"),
@@ -99,13 +128,18 @@ async def get_main_categories(
     - **is_active**: Filter by active status (true for active, false for inactive, null for all)
     """
     repo = CategoryRepository(db)
-    if is_active is not None:
-        return repo.get_categories_only_with_filter(is_active, skip=skip, limit=limit)
-    return repo.get_categories_only(skip=skip, limit=limit)
+
+    def load():
+        if is_active is not None:
+            return repo.get_categories_only_with_filter(is_active, skip=skip, limit=limit)
+        return repo.get_categories_only(skip=skip, limit=limit)
+
+    return await _cached_category_list(request, load, "main", skip, limit, is_active)
 
 
 @router.get("/subcategories/{parent_id}", response_model=List[CategoryResponse], summary="Get subcategories by parent ID")
 async def get_subcategories_by_parent(
+    request: Request,
     parent_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
@@ -119,14 +153,18 @@ async def get_subcategories_by_parent(
     - **is_active**: Filter by active status (true for active, false for inactive, null for all)
     """
     repo = CategoryRepository(db)
-    if is_active is not None:
-        return repo.get_subcategories_with_filter(parent_id, is_active, skip=skip, limit=limit)
-    return repo.get_subcategories(parent_id, skip=skip, limit=limit)
+
+    def load():
+        if is_active is not None:
+            return repo.get_subcategories_with_filter(parent_id, is_active, skip=skip, limit=limit)
+        return repo.get_subcategories(parent_id, skip=skip, limit=limit)
+
+    return await _cached_category_list(request, load, "subcategories", parent_id, skip, limit, is_active)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse, summary="Get category by ID")
 @handle_errors
-async def get_category(
+def get_category(
     category_id: int,
     db: Session = Depends(get_db)
 ):
@@ -141,7 +179,7 @@ async def get_category(
 
 @router.put("/{category_id}", response_model=CategoryResponse, summary="Update category")
 @handle_errors
-async def update_category(
+def update_category(
     category_id: int,
     category_update: CategoryUpdate,
     db: Session = Depends(get_db),
@@ -159,12 +197,13 @@ async def update_category(
     
     category = repo.update(category_id, category_update)
     validate_entity_exists(category, "Category")
+    invalidate_reference_data("categories")
     return category
 
 
 @router.delete("/{category_id}", summary="Delete category")
 @handle_errors
-async def delete_category(
+def delete_category(
     category_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -178,5 +217,5 @@ async def delete_category(
     success = repo.delete(category_id)
     if not success:
         raise not_found_error("Category not found")
-    
+    invalidate_reference_data("categories")
     return {"message": "Category deleted successfully"}
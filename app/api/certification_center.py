@@ -25,7 +25,7 @@ router = APIRouter(prefix="/certification-centers", tags=["Certification centers
 
 @router.post("/", response_model=CertificationCenterResponse)
 @handle_errors
-async def create_certification_center(
+def create_certification_center(
     data: CertificationCenterCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -56,7 +56,7 @@ async def create_certification_center(
 
 @router.get("/", response_model=List[CertificationCenterListResponse])
 @handle_errors
-async def get_certification_centers(
+def get_certification_centers(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: str = Query(None, description="Search by name"),
@@ -78,7 +78,7 @@ async def get_certification_centers(
 
 @router.get("/{center_id}", response_model=CertificationCenterResponse)
 @handle_errors
-async def get_certification_center(
+def get_certification_center(
     center_id: int,
     db: Session = Depends(get_db)
 ):
@@ -94,7 +94,7 @@ async def get_certification_center(
 
 @router.put("/{center_id}", response_model=CertificationCenterResponse)
 @handle_errors
-async def update_certification_center(
+def update_certification_center(
     center_id: int,
     data: CertificationCenterUpdate,
     db: Session = Depends(get_db),
@@ -136,7 +136,7 @@ async def update_certification_center(
 
 @router.delete("/{center_id}")
 @handle_errors
-async def delete_certification_center(
+def delete_certification_center(
     center_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import json
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta, timezone
 
-from ..db.database import get_db
+from ..db.database import get_db, SessionLocal
+from ..db.offload import run_db, AsyncRepository
 from ..repositories.chat_repository import ChatRepository
 from ..schemas.chat import (
     UserSearchResponse, UserSearchListResponse,
@@ -14,117 +16,36 @@ from ..schemas.chat import (
     VideoCallTokenRequest, VideoCallTokenResponse, VideoCallRequest, VideoCallResponse, VideoCallStatus,
     MessageLikeRequest, MessageLikeResponse, RoomCheckResponse,
     OnlineUsersResponse, OnlineUserDetails,
-    ChatRoomDetailResponse, ChatParticipantResponse
+    ChatRoomDetailResponse, ChatParticipantResponse,
+    ChatUploadCreate, ChatUploadResponse
 )
 from ..utils.websocket_manager import manager
 from ..utils.file_upload import file_upload_manager
+from ..utils.lenient_json import loads_lenient
+from ..utils.chat_uploads import chat_upload_manager, CHAT_UPLOAD_MAX_SIZES, CHAT_UPLOAD_DIRS
 from ..utils.auth import get_current_user
 from ..utils.agora_tokens_standalone import generate_rtc_token
 from ..models.user import User
-from ..models.user_device_token import UserDeviceToken
-from ..utils.firebase_notifications import send_push_notification_multiple
+from ..models.notification import NotificationType
+from ..utils.notification_outbox import notification_relay
 import uuid
 
 router = APIRouter(tags=["Chat"])
 
-def get_user_device_tokens(db: Session, user_id: int) -> List[str]:
-    """Get all active device tokens for a user"""
-    from sqlalchemy import text
-    try:
-        result = db.execute(text("""
-            SELECT device_token 
-            FROM user_device_tokens 
-            WHERE user_id = :user_id 
-            AND is_active = true
-            AND LOWER(device_type::text) IN ('ios', 'android')
-        """), {"user_id": user_id})
-        return [row[0] for row in result if row[0]]
-    except Exception as e:
-        from ..core.logging_config import logger
-        logger.error(f"Chat notification error getting device tokens: {str(e)}", exc_info=True)
-        try:
-            device_tokens = db.query(UserDeviceToken).filter(
-                UserDeviceToken.user_id == user_id,
-                UserDeviceToken.is_active == True
-            ).all()
-            valid_tokens = []
-            for token in device_tokens:
-                try:
-                    if token.device_token:
-                        valid_tokens.append(token.device_token)
-                except (LookupError, KeyError, ValueError):
-                    continue
-            return valid_tokens
-        except Exception:
-            return []
-
-def send_chat_notification(
-    db: Session,
-    recipient_user_id: int,
-    sender_name: str,
-    message_content: str,
-    message_type: str,
-    room_id: int,
-    message_id: int,
-    sender_id: int
-):
-    """Send push notification for chat message"""
-    try:
-        device_tokens = get_user_device_tokens(db, recipient_user_id)
-        print(f"[Chat Notification] Found {len(device_tokens)} device token(s) for user_id={recipient_user_id}")
-
-        if device_tokens:
-            if message_type == "text":
-                title = f"New message from {sender_name}"
-                body = message_content[:100] if message_content else "New message"
-            elif message_type == "image":
-                title = f"New image from {sender_name}"
-                body = f"{sender_name} sent an image"
-            elif message_type == "voice":
-                title = f"New voice message from {sender_name}"
-                body = f"{sender_name} sent a voice message"
-            elif message_type == "file":
-                title = f"New file from {sender_name}"
-                body = f"{sender_name} sent a file"
-            else:
-                title = f"New message from {sender_name}"
-                body = f"{sender_name} sent a message"
-
-            print(f"[Chat Notification] Sending notification - Title: {title}, Body: {body}, Type: {message_type}")
-
-            try:
-                result = send_push_notification_multiple(
-                    device_tokens=device_tokens,
-                    title=title,
-                    body=body,
-                    data={
-                        "type": "chat_message",
-                        "room_id": str(room_id),
-                        "message_id": str(message_id),
-                        "sender_id": str(sender_id),
-                        "chat_message_type": message_type
-                    },
-                    sound="default"
-                )
-                skipped = result.get('skipped_count', 0)
-                failed = result.get('failure_count', 0)
-                success = result.get('success_count', 0)
-
-                print(f"[Chat Notification] Result - Success: {success}, Failed: {failed}, Skipped: {skipped}")
-
-                if failed > 0:
-                    for item in result.get("results", []):
-                        if not item.get("success"):
-                            print(f"[Chat Notification] Device token error: token={item.get('token')}, error={item.get('error')}")
-            except FileNotFoundError as fe:
-                print(f"[Chat Notification] WARNING: Firebase service account file not found. Push notification skipped, but notification is saved to database: {str(fe)}")
-            except Exception as fe:
-                print(f"[Chat Notification] WARNING: Failed to send push notification (notification saved to database): {str(fe)}")
-    except Exception as e:
-        print(f"[Chat Notification] WARNING: Failed to send notification to user_id={recipient_user_id}: {str(e)}")
+def chat_notification_text(sender_name: str, message_type: str, message_content: Optional[str]) -> Tuple[str, str]:
+    """Title and body of the notification for a chat message"""
+    if message_type == "text":
+        return f"New message from {sender_name}", message_content[:100] if message_content else "New message"
+    if message_type == "image":
+        return f"New image from {sender_name}", f"{sender_name} sent an image"
+    if message_type == "voice":
+        return f"New voice message from {sender_name}", f"{sender_name} sent a voice message"
+    if message_type == "file":
+        return f"New file from {sender_name}", f"{sender_name} sent a file"
+    return f"New message from {sender_name}", f"{sender_name} sent a message"
 
 @router.get("/search-users", response_model=UserSearchListResponse)
-async def search_users(
+def search_users(
     email: str = Query(..., min_length=1, description="Email to search for"),
     limit: int = Query(20, ge=1, le=50, description="Maximum number of results"),
     current_user: User = Depends(get_current_user),
@@ -150,81 +71,9 @@ async def search_users(
         total=len(user_responses)
     )
 
-@router.post("/rooms", response_model=ChatRoomResponse)
-async def create_room(
-    room_data: ChatRoomCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Create a direct chat room with another user"""
-    chat_repo = ChatRepository(db)
-    
-    if room_data.receiver_id == current_user.id:
-        raise HTTPException(
-            status_code=400, 
-            detail="You cannot create a room with yourself"
-        )
-    
-    receiver = db.query(User).filter(
-        User.id == room_data.receiver_id,
-        User.is_active == True
-    ).first()
-    if not receiver:
-        raise HTTPException(
-            status_code=404, 
-            detail="User not found or inactive"
-        )
-    
-    existing_room = chat_repo.get_direct_room(current_user.id, room_data.receiver_id)
-    if existing_room:
-        other_user = chat_repo.get_room_other_user(existing_room.id, current_user.id)
-        other_user_info = None
-        if other_user:
-            is_online = chat_repo.is_user_online(other_user.id)
-            other_user_info = {
-                "id": other_user.id,
-                "name": other_user.name,
-                "email": other_user.email,
-                "avatar_url": other_user.avatar_url,
-                "is_online": is_online
-            }
-        
-        last_message = chat_repo.get_last_message(existing_room.id)
-        last_message_info = None
-        if last_message:
-            last_message_info = {
-                "id": last_message.id,
-                "content": last_message.content,
-                "message_type": last_message.message_type,
-                "created_at": last_message.created_at,
-                "sender_name": last_message.sender.name
-            }
-        
-        unread_counts = chat_repo.get_unread_count(current_user.id)
-        unread_count = unread_counts.get(existing_room.id, 0)
-        
-        return ChatRoomResponse(
-            id=existing_room.id,
-            name=existing_room.name,
-            room_type=existing_room.room_type,
-            created_by=existing_room.created_by,
-            created_at=existing_room.created_at,
-            updated_at=existing_room.updated_at,
-            is_active=existing_room.is_active,
-            other_user=other_user_info,
-            last_message=last_message_info,
-            unread_count=unread_count
-        )
-    
-    try:
-        room = chat_repo.create_direct_room(current_user.id, room_data.receiver_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to create room: {str(e)}"
-        )
-    
-    other_user = chat_repo.get_room_other_user(room.id, current_user.id)
+def _direct_room_response(chat_repo: ChatRepository, room, user_id: int) -> ChatRoomResponse:
+    """Serialize a direct room for one of its participants"""
+    other_user = chat_repo.get_room_other_user(room.id, user_id)
     other_user_info = None
     if other_user:
         is_online = chat_repo.is_user_online(other_user.id)
@@ -247,7 +96,7 @@ async def create_room(
             "sender_name": last_message.sender.name
         }
     
-    unread_counts = chat_repo.get_unread_count(current_user.id)
+    unread_counts = chat_repo.get_unread_count(user_id)
     unread_count = unread_counts.get(room.id, 0)
     
     return ChatRoomResponse(
@@ -263,44 +112,93 @@ async def create_room(
         unread_count=unread_count
     )
 
-@router.get("/rooms", response_model=ChatRoomListResponse)
-async def get_user_rooms(
+def _get_or_create_direct_room(db: Session, user_id: int, receiver_id: int) -> Tuple[ChatRoomResponse, bool]:
+    """
+    Find or create the direct room between two users (runs on the DB threadpool).
+    Returns the room response and whether the room was created.
+    """
+    chat_repo = ChatRepository(db)
+    
+    receiver = db.query(User).filter(
+        User.id == receiver_id,
+        User.is_active == True
+    ).first()
+    if not receiver:
+        raise HTTPException(
+            status_code=404, 
+            detail="User not found or inactive"
+        )
+    
+    existing_room = chat_repo.get_direct_room(user_id, receiver_id)
+    if existing_room:
+        return _direct_room_response(chat_repo, existing_room, user_id), False
+    
+    try:
+        room = chat_repo.create_direct_room(user_id, receiver_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create room: {str(e)}"
+        )
+    
+    return _direct_room_response(chat_repo, room, user_id), True
+
+@router.post("/rooms", response_model=ChatRoomResponse)
+async def create_room(
+    room_data: ChatRoomCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all rooms for the current user"""
-    chat_repo = ChatRepository(db)
-    rooms = chat_repo.get_user_rooms(current_user.id)
+    """Create a direct chat room with another user"""
+    if room_data.receiver_id == current_user.id:
+        raise HTTPException(
+            status_code=400, 
+            detail="You cannot create a room with yourself"
+        )
     
-    unread_counts = chat_repo.get_unread_count(current_user.id)
+    room_response, created = await run_db(_get_or_create_direct_room, db, current_user.id, room_data.receiver_id)
+    if created:
+        await manager.invalidate_room(room_response.id, [current_user.id, room_data.receiver_id])
+    
+    return room_response
+
+_CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _encode_room_cursor(room) -> str:
+    """Encode a room's (updated_at, id) keyset position as '<epoch microseconds>_<room_id>'"""
+    updated_at = room.updated_at if room.updated_at.tzinfo else room.updated_at.replace(tzinfo=timezone.utc)
+    return f"{(updated_at - _CURSOR_EPOCH) // timedelta(microseconds=1)}_{room.id}"
+
+def _parse_room_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a cursor produced by _encode_room_cursor"""
+    if not cursor:
+        return None
+    try:
+        micros, room_id = cursor.split("_", 1)
+        return _CURSOR_EPOCH + timedelta(microseconds=int(micros)), int(room_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _build_user_rooms(db: Session, user_id: int, limit: Optional[int] = None,
+                      cursor: Optional[str] = None) -> ChatRoomListResponse:
+    """Build the room list for a user (runs on the DB threadpool)"""
+    chat_repo = ChatRepository(db)
+    summaries = chat_repo.get_user_room_summaries(user_id, limit=limit, before=_parse_room_cursor(cursor))
     
     room_responses = []
-    for room in rooms:
-        other_user = chat_repo.get_room_other_user(room.id, current_user.id)
+    for summary in summaries:
+        room = summary["room"]
+        other_user = summary["other_user"]
         other_user_info = None
         if other_user:
-            is_online = chat_repo.is_user_online(other_user.id)
             other_user_info = {
                 "id": other_user.id,
                 "name": other_user.name,
                 "email": other_user.email,
                 "avatar_url": other_user.avatar_url,
-                "is_online": is_online
-            }
-        
-        last_message = chat_repo.get_last_message(room.id)
-        last_message_info = None
-        if last_message:
-            last_message_info = {
-                "id": last_message.id,
-                "content": last_message.content,
-                "message_type": last_message.message_type,
-                "created_at": last_message.created_at,
-                "sender_name": last_message.sender.name
+                "is_online": summary["is_online"]
             }
         
-        unread_count = unread_counts.get(room.id, 0)
-        
         room_responses.append(ChatRoomResponse(
             id=room.id,
             name=room.name,
@@ -310,73 +208,68 @@ async def get_user_rooms(
             updated_at=room.updated_at,
             is_active=room.is_active,
             other_user=other_user_info,
-            last_message=last_message_info,
-            unread_count=unread_count
+            last_message=summary["last_message"],
+            unread_count=summary["unread_count"]
         ))
     
+    next_cursor = None
+    if limit and len(summaries) == limit:
+        next_cursor = _encode_room_cursor(summaries[-1]["room"])
+    
     return ChatRoomListResponse(
         rooms=room_responses,
-        total=len(room_responses)
+        total=len(room_responses),
+        next_cursor=next_cursor
     )
 
-@router.get("/rooms/{room_id}")
-async def get_room(
-    room_id: int,
+@router.get("/rooms", response_model=ChatRoomListResponse)
+async def get_user_rooms(
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Rooms per page (omit to get every room)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get a specific room with all messages"""
-    chat_repo = ChatRepository(db)
-    room = chat_repo.get_room(room_id, current_user.id)
-    
-    if not room:
-        raise HTTPException(status_code=404, detail="Room not found")
-    
-    other_user = chat_repo.get_room_other_user(room.id, current_user.id)
-    other_user_info = None
-    if other_user:
-        is_online = chat_repo.is_user_online(other_user.id)
-        other_user_info = {
-            "id": other_user.id,
-            "name": other_user.name,
-            "email": other_user.email,
-            "avatar_url": other_user.avatar_url,
-            "is_online": is_online
-        }
+    """Get rooms for the current user, newest activity first"""
+    return await run_db(_build_user_rooms, db, current_user.id, limit, cursor)
+
+def _user_details(user: Optional[User], online_status: dict) -> Optional[dict]:
+    """Serialize a message sender/receiver with their online status"""
+    if not user:
+        return None
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "avatar_url": user.avatar_url,
+        "is_online": online_status.get(user.id, False)
+    }
+
+def _build_message_responses(chat_repo: ChatRepository, messages: list, user_id: int) -> List[dict]:
+    """
+    Serialize a page of messages for a user.
     
-    last_message = chat_repo.get_last_message(room.id)
-    last_message_info = None
-    if last_message:
-        last_message_info = {
-            "id": last_message.id,
-            "content": last_message.content,
-            "message_type": last_message.message_type,
-            "created_at": last_message.created_at,
-            "sender_name": last_message.sender.name
-        }
+    Like state, like counts and sender/receiver presence are resolved with
+    one batch query each, so the cost does not grow with the page size.
+    """
+    from ..core.config import settings
     
-    unread_counts = chat_repo.get_unread_count(current_user.id)
-    unread_count = unread_counts.get(room.id, 0)
+    message_ids = [message.id for message in messages]
+    liked = chat_repo.batch_get_messages_liked_by_user(message_ids, user_id)
+    like_counts = chat_repo.batch_get_messages_like_counts(message_ids)
     
-    messages = chat_repo.get_room_messages(room_id, current_user.id, page=1, per_page=1000)
+    participant_ids = {message.sender_id for message in messages} | {message.receiver_id for message in messages}
+    online_status = chat_repo.batch_get_users_online_status(list(participant_ids))
     
     message_responses = []
     for message in messages:
-        is_sender = message.sender_id == current_user.id
-        
-        is_liked = chat_repo.is_message_liked_by_user(message.id, current_user.id)
-        like_count = chat_repo.get_message_like_count(message.id)
-        
         file_url = None
         files_data_with_urls = None
         
         if message.file_path:
-            from ..core.config import settings
             clean_path = message.file_path.replace("\\", "/")
             file_url = f"{settings.BASE_URL}/{clean_path}"
         
         if message.files_data:
-            from ..core.config import settings
             files_data_with_urls = []
             for file_data in message.files_data:
                 clean_path = file_data["file_path"].replace("\\", "/")
@@ -390,40 +283,18 @@ async def get_room(
                     file_data_with_url["duration"] = file_data["duration"]
                 files_data_with_urls.append(file_data_with_url)
         
-        sender_details = None
-        if message.sender:
-            is_online = chat_repo.is_user_online(message.sender.id)
-            sender_details = {
-                "id": message.sender.id,
-                "name": message.sender.name,
-                "email": message.sender.email,
-                "avatar_url": message.sender.avatar_url,
-                "is_online": is_online
-            }
-        
-        receiver_details = None
-        if message.receiver:
-            is_online = chat_repo.is_user_online(message.receiver.id)
-            receiver_details = {
-                "id": message.receiver.id,
-                "name": message.receiver.name,
-                "email": message.receiver.email,
-                "avatar_url": message.receiver.avatar_url,
-                "is_online": is_online
-            }
-        
         message_response = {
             "id": message.id,
             "content": message.content,
             "message_type": message.message_type,
-            "created_at": message.created_at.isoformat(),
+            "created_at": message.created_at,
             "is_read": message.is_read,
             "is_deleted": message.is_deleted,
-            "is_sender": is_sender,
-            "is_liked": is_liked,
-            "like_count": like_count,
-            "sender_details": sender_details,
-            "receiver_details": receiver_details,
+            "is_sender": message.sender_id == user_id,
+            "is_liked": liked.get(message.id, False),
+            "like_count": like_counts.get(message.id, 0),
+            "sender_details": _user_details(message.sender, online_status),
+            "receiver_details": _user_details(message.receiver, online_status),
             "local_temp_id": None,
             "files_data": files_data_with_urls if files_data_with_urls else None,
             "duration": message.duration if message.duration else None
@@ -435,125 +306,117 @@ async def get_room(
             message_response["file_path"] = file_url
         if message.file_size:
             message_response["file_size"] = message.file_size
-            
+        
         message_responses.append(message_response)
     
-    return {
-        "id": room.id,
-        "name": room.name,
-        "room_type": room.room_type,
-        "created_by": room.created_by,
-        "created_at": room.created_at,
-        "updated_at": room.updated_at,
-        "is_active": room.is_active,
-        "other_user": other_user_info,
-        "last_message": last_message_info,
-        "unread_count": unread_count,
-        "message_list": {
-            "messages": message_responses,
-            "total": len(message_responses)
-        }
-    }
-
+    return message_responses
 
-@router.get("/rooms/{room_id}/messages", response_model=MessageListResponse)
-async def get_room_messages(
-    room_id: int,
-    page: int = Query(1, ge=1, description="Page number (starts from 1)"),
-    per_page: int = Query(50, ge=1, le=100, description="Number of messages per page (max 100)"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get messages for a room with pagination"""
+def _build_room_detail(db: Session, room_id: int, user_id: int) -> dict:
+    """Build a room with its messages for a user (runs on the DB threadpool)"""
     chat_repo = ChatRepository(db)
+    room = chat_repo.get_room(room_id, user_id)
     
-    room = chat_repo.get_room(room_id, current_user.id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    total_count = chat_repo.get_room_messages_count(room_id, current_user.id)
+    other_user = chat_repo.get_room_other_user(room.id, user_id)
+    other_user_info = None
+    if other_user:
+        other_user_info = {
+            "id": other_user.id,
+            "name": other_user.name,
+            "email": other_user.email,
+            "avatar_url": other_user.avatar_url,
+            "is_online": chat_repo.is_user_online(other_user.id)
+        }
     
-    messages = chat_repo.get_room_messages(room_id, current_user.id, page, per_page)
+    unread_count = chat_repo.get_room_unread_count(room.id, user_id)
     
-    message_responses = []
-    for message in messages:
-        is_sender = message.sender_id == current_user.id
-        
-        is_liked = chat_repo.is_message_liked_by_user(message.id, current_user.id)
-        like_count = chat_repo.get_message_like_count(message.id)
-        
-        file_url = None
-        files_data_with_urls = None
-        
-        if message.file_path:
-            from ..core.config import settings
-            clean_path = message.file_path.replace("\\", "/")
-            file_url = f"{settings.BASE_URL}/{clean_path}"
-        
-        if message.files_data:
-            from ..core.config import settings
-            files_data_with_urls = []
-            for file_data in message.files_data:
-                clean_path = file_data["file_path"].replace("\\", "/")
-                file_data_with_url = {
-                    "file_name": file_data["file_name"],
-                    "file_path": f"{settings.BASE_URL}/{clean_path}",
-                    "file_size": file_data["file_size"],
-                    "mime_type": file_data["mime_type"]
-                }
-                if "duration" in file_data and file_data["duration"] is not None:
-                    file_data_with_url["duration"] = file_data["duration"]
-                files_data_with_urls.append(file_data_with_url)
-        
-        sender_details = None
-        if message.sender:
-            is_online = chat_repo.is_user_online(message.sender.id)
-            sender_details = {
-                "id": message.sender.id,
-                "name": message.sender.name,
-                "email": message.sender.email,
-                "avatar_url": message.sender.avatar_url,
-                "is_online": is_online
-            }
-        
-        receiver_details = None
-        if message.receiver:
-            is_online = chat_repo.is_user_online(message.receiver.id)
-            receiver_details = {
-                "id": message.receiver.id,
-                "name": message.receiver.name,
-                "email": message.receiver.email,
-                "avatar_url": message.receiver.avatar_url,
-                "is_online": is_online
-            }
-        
-        message_data = {
-            "id": message.id,
-            "content": message.content,
-            "message_type": message.message_type,
-            "created_at": message.created_at,
-            "is_read": message.is_read,
-            "is_deleted": message.is_deleted,
-            "is_sender": is_sender,
-            "is_liked": is_liked,
-            "like_count": like_count,
-            "sender_details": sender_details,
-            "receiver_details": receiver_details,
-            "local_temp_id": None,
-            "files_data": files_data_with_urls if files_data_with_urls else None
+    messages = chat_repo.get_room_messages_page(room_id, limit=1000)
+    message_responses = _build_message_responses(chat_repo, messages, user_id)
+    for message_response in message_responses:
+        message_response["created_at"] = message_response["created_at"].isoformat()
+    
+    last_message_info = None
+    if messages:
+        last_message = messages[0]
+        last_message_info = {
+            "id": last_message.id,
+            "content": last_message.content,
+            "message_type": last_message.message_type,
+            "created_at": last_message.created_at,
+            "sender_name": last_message.sender.name
+        }
+    
+    return {
+        "id": room.id,
+        "name": room.name,
+        "room_type": room.room_type,
+        "created_by": room.created_by,
+        "created_at": room.created_at,
+        "updated_at": room.updated_at,
+        "is_active": room.is_active,
+        "other_user": other_user_info,
+        "last_message": last_message_info,
+        "unread_count": unread_count,
+        "message_list": {
+            "messages": message_responses,
+            "total": len(message_responses)
         }
-        
-        if message.file_name:
-            message_data["file_name"] = message.file_name
-        if file_url:
-            message_data["file_path"] = file_url
-        if message.file_size:
-            message_data["file_size"] = message.file_size
-            
-        message_responses.append(ChatMessageResponse(**message_data))
+    }
+
+@router.get("/rooms/{room_id}")
+async def get_room(
+    room_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a specific room with all messages"""
+    return await run_db(_build_room_detail, db, room_id, current_user.id)
+
+def _build_room_messages(db: Session, room_id: int, user_id: int, page: int, per_page: int,
+                         before_id: Optional[int] = None, after_id: Optional[int] = None,
+                         include_total: Optional[bool] = None) -> MessageListResponse:
+    """
+    Build one page of room messages for a user (runs on the DB threadpool)
+
+    Membership is checked inside the page query; the room is only looked up
+    separately when the page is empty, to tell an empty page from a 404.
+    include_total=None counts messages for page-number requests only.
+    """
+    chat_repo = ChatRepository(db)
+    
+    cursor_mode = bool(before_id or after_id)
+    offset = 0 if cursor_mode else (page - 1) * per_page
+    if include_total is None:
+        include_total = not cursor_mode
+    
+    messages = chat_repo.get_room_messages_page(
+        room_id,
+        limit=per_page + 1,
+        before_id=before_id,
+        after_id=after_id,
+        offset=offset,
+        user_id=user_id
+    )
+    if not messages and not chat_repo.get_room(room_id, user_id):
+        raise HTTPException(status_code=404, detail="Room not found")
+    
+    has_more = len(messages) > per_page
+    if has_more:
+        # after_id pages are newest first too, so the extra row is the newest one
+        messages = messages[1:] if after_id and not before_id else messages[:per_page]
+    
+    total_count = None
+    total_pages = None
+    if include_total:
+        total_count = chat_repo.count_room_messages(room_id)
+        total_pages = (total_count + per_page - 1) // per_page
     
-    total_pages = (total_count + per_page - 1) // per_page
-    has_more = page < total_pages
+    message_responses = [
+        ChatMessageResponse(**message_data)
+        for message_data in _build_message_responses(chat_repo, messages, user_id)
+    ]
     
     return MessageListResponse(
         messages=message_responses,
@@ -561,7 +424,25 @@ async def get_room_messages(
         has_more=has_more,
         page=page,
         per_page=per_page,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_before_id=messages[-1].id if messages else None
+    )
+
+@router.get("/rooms/{room_id}/messages", response_model=MessageListResponse)
+async def get_room_messages(
+    room_id: int,
+    page: int = Query(1, ge=1, description="Page number (starts from 1), ignored when a cursor is given"),
+    per_page: int = Query(50, ge=1, le=100, description="Number of messages per page (max 100)"),
+    before_id: Optional[int] = Query(None, description="Return messages older than this message (use next_before_id)"),
+    after_id: Optional[int] = Query(None, description="Return messages newer than this message"),
+    include_total: Optional[bool] = Query(None, description="Count all messages in the room; by default only for page-number requests, not for cursor scrollback"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get messages for a room, newest first, by page number or by cursor"""
+    return await run_db(
+        _build_room_messages, db, room_id, current_user.id, page, per_page,
+        before_id, after_id, include_total
     )
 
 @router.post("/rooms/{room_id}/read")
@@ -571,43 +452,43 @@ async def mark_room_read(
     db: Session = Depends(get_db)
 ):
     """Mark all messages in a room as read"""
-    chat_repo = ChatRepository(db)
-    success = chat_repo.mark_messages_as_read(room_id, current_user.id)
+    chat_repo = AsyncRepository(ChatRepository(db))
+    previous_unread = await chat_repo.get_room_unread_count(room_id, current_user.id)
+    success = await chat_repo.mark_messages_as_read(room_id, current_user.id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Room not found")
     
     await manager.broadcast_message_read(room_id, current_user.id, current_user.name)
+    if previous_unread:
+        await manager.send_unread_update(current_user.id, room_id=room_id, delta=-previous_unread, unread_count=0)
     
     return {"status": "success", "message": "Room marked as read"}
 
-@router.put("/messages/{message_id}")
-async def update_message(
-    message_id: int,
-    content: str = Form(..., min_length=1, max_length=5000),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Update a message (only text messages can be updated)"""
+def _update_text_message(db: Session, message_id: int, content: str, user_id: int) -> Tuple[dict, int, int]:
+    """
+    Update a text message and serialize it (runs on the DB threadpool).
+    Returns the message payload, its room ID and its receiver ID.
+    """
     chat_repo = ChatRepository(db)
     
     message = chat_repo.get_message(message_id)
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
     
-    if message.sender_id != current_user.id:
+    if message.sender_id != user_id:
         raise HTTPException(status_code=403, detail="You can only update your own messages")
     
     if message.message_type != "text":
         raise HTTPException(status_code=400, detail="Only text messages can be updated")
     
-    success = chat_repo.update_message(message_id, content, current_user.id)
+    success = chat_repo.update_message(message_id, content, user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Message not found")
     
     updated_message = chat_repo.get_message(message_id)
-    other_user = chat_repo.get_room_other_user(updated_message.room_id, current_user.id)
+    other_user = chat_repo.get_room_other_user(updated_message.room_id, user_id)
     
     file_url = None
     files_data_with_urls = None
@@ -676,17 +557,31 @@ async def update_message(
     if updated_message.file_size:
         message_response["file_size"] = updated_message.file_size
     
+    return message_response, updated_message.room_id, updated_message.receiver_id
+
+@router.put("/messages/{message_id}")
+async def update_message(
+    message_id: int,
+    content: str = Form(..., min_length=1, max_length=5000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update a message (only text messages can be updated)"""
+    message_response, room_id, receiver_id = await run_db(
+        _update_text_message, db, message_id, content, current_user.id
+    )
+    
     await manager.broadcast_message_update(
         message_response,
-        updated_message.room_id,
+        room_id,
         current_user.id,
-        updated_message.receiver_id
+        receiver_id
     )
     
     return message_response
 
 @router.delete("/messages/{message_id}")
-async def delete_message(
+def delete_message(
     message_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -701,7 +596,7 @@ async def delete_message(
     return {"status": "success", "message": "Message deleted"}
 
 @router.post("/messages/{message_id}/like", response_model=MessageLikeResponse)
-async def toggle_message_like(
+def toggle_message_like(
     message_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -719,6 +614,262 @@ async def toggle_message_like(
         message_id=message_id
     )
 
+@router.post("/uploads", response_model=ChatUploadResponse)
+async def create_chat_upload(
+    upload_data: ChatUploadCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable chunked upload for a chat attachment.
+    
+    PUT the raw bytes to /uploads/{upload_id}?offset=N, then reference the
+    upload_id in the WebSocket send_message files_data instead of base64 file_data.
+    """
+    return await chat_upload_manager.create_upload(
+        user_id=current_user.id,
+        file_name=upload_data.file_name,
+        file_size=upload_data.file_size,
+        mime_type=upload_data.mime_type,
+        message_type=upload_data.message_type.value
+    )
+
+@router.get("/uploads/{upload_id}", response_model=ChatUploadResponse)
+async def get_chat_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get upload progress so an interrupted upload can resume from the received offset"""
+    return await chat_upload_manager.get_upload(upload_id, current_user.id)
+
+@router.put("/uploads/{upload_id}", response_model=ChatUploadResponse)
+async def upload_chat_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk, must equal the bytes received so far"),
+    current_user: User = Depends(get_current_user)
+):
+    """Append a chunk of raw bytes to an upload (the request body is streamed to disk)"""
+    return await chat_upload_manager.append_chunks(upload_id, current_user.id, offset, request.stream())
+
+def _load_websocket_user(user_id: int) -> Optional[User]:
+    """Load the user authenticating a WebSocket connection (runs on the DB threadpool)"""
+    db = SessionLocal()
+    try:
+        return db.query(User).filter(User.id == user_id).first()
+    finally:
+        db.close()
+
+def _store_chat_message(
+    user_id: int,
+    user_name: str,
+    message_room_id: int,
+    receiver_id: int,
+    message_type: str,
+    content: str,
+    local_temp_id: Optional[str],
+    files_data: list
+) -> Tuple[Optional[dict], List[str], Optional[int]]:
+    """
+    Validate and persist a WebSocket send_message frame.
+    
+    Runs on the DB threadpool so that queries and file writes never block the
+    event loop. The message, its notification and the push outbox entry are
+    committed together; the outbox relay sends the push. Returns the message
+    payload to broadcast (or None), the error messages to send back and the
+    receiver's unread counter for the room.
+    """
+    errors = []
+    message_db = SessionLocal()
+    try:
+        chat_repo = ChatRepository(message_db)
+        
+        room = chat_repo.get_room(message_room_id, user_id)
+        if not room:
+            return None, ["Room not found"], None
+        
+        other_user = chat_repo.get_room_other_user(room.id, user_id)
+        if not other_user or other_user.id != receiver_id:
+            return None, ["Invalid receiver"], None
+        
+        processed_files_data = None
+        
+        if message_type in ["image", "file", "voice"] and files_data:
+            try:
+                import base64
+                import os
+                
+                processed_files = []
+                
+                for file_info in files_data:
+                    file_data_item = file_info.get("file_data")
+                    file_name_item = file_info.get("file_name")
+                    file_size_item = file_info.get("file_size")
+                    mime_type_item = file_info.get("mime_type")
+                    duration_item = file_info.get("duration")
+                    upload_id_item = file_info.get("upload_id")
+                    
+                    if upload_id_item:
+                        try:
+                            file_data = chat_upload_manager.claim_upload(upload_id_item, user_id, message_type)
+                        except ValueError as claim_error:
+                            errors.append(str(claim_error))
+                            continue
+                        
+                        if message_type == "voice" and duration_item is not None:
+                            file_data["duration"] = int(duration_item)
+                        
+                        processed_files.append(file_data)
+                        continue
+                    
+                    if not file_data_item or not file_name_item:
+                        continue
+                    
+                    try:
+                        file_data_item = file_data_item.strip()
+                        
+                        missing_padding = len(file_data_item) % 4
+                        if missing_padding:
+                            file_data_item += '=' * (4 - missing_padding)
+                        
+                        file_bytes = base64.b64decode(file_data_item, validate=True)
+                    except Exception as decode_error:
+                        errors.append(f"Invalid base64 data for file '{file_name_item}': {str(decode_error)}")
+                        continue
+                    
+                    max_size = CHAT_UPLOAD_MAX_SIZES[message_type]
+                    if len(file_bytes) > max_size:
+                        size_mb = max_size / (1024 * 1024)
+                        errors.append(f"File '{file_name_item}' too large. Maximum size: {size_mb:.1f}MB")
+                        continue
+                    
+                    upload_dir = CHAT_UPLOAD_DIRS[message_type]
+                    
+                    os.makedirs(upload_dir, exist_ok=True)
+                    
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    unique_filename = f"{user_id}_{timestamp}_{len(processed_files)}_{file_name_item}"
+                    file_path_item = os.path.join(upload_dir, unique_filename)
+                    
+                    with open(file_path_item, "wb") as f:
+                        f.write(file_bytes)
+                    
+                    file_data = {
+                        "file_name": file_name_item,
+                        "file_path": file_path_item,
+                        "file_size": file_size_item or len(file_bytes),
+                        "mime_type": mime_type_item
+                    }
+                    
+                    if message_type == "voice" and duration_item is not None:
+                        file_data["duration"] = int(duration_item)
+                    
+                    processed_files.append(file_data)
+                
+                processed_files_data = processed_files if processed_files else None
+                
+            except Exception as e:
+                errors.append(f"File upload failed: {str(e)}")
+                return None, errors, None
+        
+        file_name = None
+        file_path = None
+        file_size = None
+        mime_type = None
+        duration = None
+        
+        if processed_files_data and len(processed_files_data) == 1:
+            single_file = processed_files_data[0]
+            file_name = single_file["file_name"]
+            file_path = single_file["file_path"]
+            file_size = single_file["file_size"]
+            mime_type = single_file["mime_type"]
+            duration = single_file.get("duration")
+        
+        notification_title, notification_body = chat_notification_text(user_name, message_type, content)
+        
+        message = chat_repo.create_message(
+            room_id=message_room_id,
+            sender_id=user_id,
+            receiver_id=receiver_id,
+            message_type=message_type,
+            content=content,
+            file_name=file_name,
+            file_path=file_path,
+            file_size=file_size,
+            mime_type=mime_type,
+            duration=duration,
+            files_data=processed_files_data,
+            notification={
+                "title": notification_title,
+                "body": notification_body,
+                "data": {
+                    "type": "chat_message",
+                    "room_id": str(message_room_id),
+                    "sender_id": str(user_id),
+                    "chat_message_type": message_type
+                }
+            }
+        )
+        
+        files_data_with_urls = None
+        
+        if message.files_data:
+            from ..core.config import settings
+            files_data_with_urls = []
+            for file_data in message.files_data:
+                clean_path = file_data["file_path"].replace("\\", "/")
+                file_data_with_url = {
+                    "file_name": file_data["file_name"],
+                    "file_path": f"{settings.BASE_URL}/{clean_path}",
+                    "file_size": file_data["file_size"],
+                    "mime_type": file_data["mime_type"]
+                }
+                if "duration" in file_data and file_data["duration"] is not None:
+                    file_data_with_url["duration"] = int(file_data["duration"])
+                files_data_with_urls.append(file_data_with_url)
+        
+        sender_details = None
+        if message.sender:
+            is_online = chat_repo.is_user_online(message.sender.id)
+            sender_details = {
+                "id": message.sender.id,
+                "name": message.sender.name,
+                "email": message.sender.email,
+                "avatar_url": message.sender.avatar_url,
+                "is_online": is_online
+            }
+        
+        receiver_details = None
+        if message.receiver:
+            is_online = chat_repo.is_user_online(message.receiver.id)
+            receiver_details = {
+                "id": message.receiver.id,
+                "name": message.receiver.name,
+                "email": message.receiver.email,
+                "avatar_url": message.receiver.avatar_url,
+                "is_online": is_online
+            }
+        
+        receiver_unread_count = chat_repo.get_room_unread_count(message_room_id, receiver_id)
+        
+        message_response = {
+            "id": message.id,
+            "content": message.content,
+            "message_type": message.message_type,
+            "created_at": message.created_at.isoformat(),
+            "is_read": message.is_read,
+            "is_deleted": message.is_deleted,
+            "sender_details": sender_details,
+            "receiver_details": receiver_details,
+            "local_temp_id": local_temp_id if local_temp_id else None,
+            "files_data": files_data_with_urls if files_data_with_urls else None,
+            "duration": message.duration if message.duration else None
+        }
+        
+        return message_response, errors, receiver_unread_count
+    finally:
+        message_db.close()
+
 async def _websocket_endpoint_handler(websocket: WebSocket):
     """WebSocket endpoint handler for real-time chat with authentication and room_id"""
     import logging
@@ -753,7 +904,6 @@ async def _websocket_endpoint_handler(websocket: WebSocket):
         
         from ..utils.websocket_auth import authenticate_websocket
         from ..utils.auth import verify_token
-        from ..db.database import SessionLocal
         from ..models.user import User
         
         await websocket.accept()
@@ -780,20 +930,15 @@ async def _websocket_endpoint_handler(websocket: WebSocket):
             await websocket.close(code=4001, reason="Invalid token payload - no user_id")
             return
         
-        db = SessionLocal()
-        user = None
-        try:
-            user = db.query(User).filter(User.id == int(user_id)).first()
-            
-            if not user:
-                await websocket.close(code=4001, reason="User not found")
-                return
-            
-            if not user.is_active:
-                await websocket.close(code=4001, reason="User account is inactive")
-                return
-        finally:
-            db.close()
+        user = await run_db(_load_websocket_user, int(user_id))
+        
+        if not user:
+            await websocket.close(code=4001, reason="User not found")
+            return
+        
+        if not user.is_active:
+            await websocket.close(code=4001, reason="User account is inactive")
+            return
         
         user_id = user.id
         user_name = user.name
@@ -807,80 +952,36 @@ async def _websocket_endpoint_handler(websocket: WebSocket):
             print(f"WebSocket error while closing connection: {close_error}")
         return
     
-    await manager.connect(websocket, user_id)
+    connection_id = await manager.connect(websocket, user_id)
     
     if room_id:
         manager.set_user_room(user_id, room_id)
     
-    from ..db.database import SessionLocal
-    db = SessionLocal()
-    try:
-        chat_repo = ChatRepository(db)
-        chat_repo.update_user_presence(user_id, True)
-        
+    if manager.device_count(user_id) == 1:
         await manager.broadcast_presence(user_id, True, user_name)
-    finally:
-        db.close()
+    heartbeat_task = asyncio.create_task(manager.heartbeat(connection_id, user_id))
     
     try:
         while True:
             data = await websocket.receive_text()
+            manager.touch(user_id, connection_id)
             
             try:
-                import re
-                original_data = data
-                data = re.sub(r'/\*.*?\*/', '', data, flags=re.DOTALL)
-                
-                lines = data.split('\n')
-                cleaned_lines = []
-                in_string = False
-                escape_next = False
-                
-                for line in lines:
-                    cleaned_line = ""
-                    i = 0
-                    while i < len(line):
-                        char = line[i]
-                        
-                        if escape_next:
-                            cleaned_line += char
-                            escape_next = False
-                            i += 1
-                            continue
-                        
-                        if char == '\\':
-                            cleaned_line += char
-                            escape_next = True
-                            i += 1
-                            continue
-                        
-                        if char == '"' and not escape_next:
-                            in_string = not in_string
-                            cleaned_line += char
-                            i += 1
-                            continue
-                        
-                        if not in_string and i < len(line) - 1 and line[i:i+2] == '//':
-                            break
-                        
-                        cleaned_line += char
-                        i += 1
-                    
-                    cleaned_lines.append(cleaned_line)
-                
-                data = '\n'.join(cleaned_lines)
-                data = re.sub(r',(\s*[}\]])', r'\1', data)
-                data = re.sub(r'\s+([}\]])', r'\1', data)
-
-                message_data = json.loads(data)
+                message_data = loads_lenient(data)
             except json.JSONDecodeError as e:
-                await websocket.send_text(json.dumps({
+                manager.send_to_connection(connection_id, {
                     "type": "error",
                     "message": f"Invalid JSON format: {str(e)}"
-                }))
+                })
+                continue
+            
+            if message_data.get("type") == "pong":
                 continue
             
-            if message_data.get("type") == "typing":
+            elif message_data.get("type") == "ping":
+                manager.send_to_connection(connection_id, {"type": "pong"})
+            
+            elif message_data.get("type") == "typing":
                 typing_data = message_data.get("data", {})
                 await manager.broadcast_typing(
                     typing_data.get("room_id"),
@@ -893,6 +994,7 @@ async def _websocket_endpoint_handler(websocket: WebSocket):
                 room_id = message_data.get("data", {}).get("room_id")
                 if room_id:
                     manager.set_user_room(user_id, room_id)
+                    await manager.get_room_members(room_id)
             
             elif message_data.get("type") == "leave_room":
                 manager.leave_room(user_id)
@@ -909,285 +1011,62 @@ async def _websocket_endpoint_handler(websocket: WebSocket):
                 files_data = message_info.get("files_data", [])
                 
                 if not message_room_id or not receiver_id:
-                    await websocket.send_text(json.dumps({
+                    manager.send_to_connection(connection_id, {
                         "type": "error",
                         "message": "Missing room_id or receiver_id"
-                    }))
+                    })
                     continue
                 
-                from ..db.database import SessionLocal
-                message_db = SessionLocal()
-                try:
-                    chat_repo = ChatRepository(message_db)
-                
-                    room = chat_repo.get_room(message_room_id, user_id)
-                    if not room:
-                        await websocket.send_text(json.dumps({
-                            "type": "error",
-                            "message": "Room not found"
-                        }))
-                        continue
-                    
-                    other_user = chat_repo.get_room_other_user(room.id, user_id)
-                    if not other_user or other_user.id != receiver_id:
-                        await websocket.send_text(json.dumps({
-                            "type": "error",
-                            "message": "Invalid receiver"
-                        }))
-                        continue
-                
-                    processed_files_data = None
-                    
-                    MAX_IMAGE_SIZE = 10 * 1024 * 1024
-                    MAX_FILE_SIZE = 50 * 1024 * 1024
-                    MAX_VOICE_SIZE = 50 * 1024 * 1024
-                    
-                    if message_type in ["image", "file", "voice"] and files_data:
-                        try:
-                            import base64
-                            import os
-                            from datetime import datetime
-                            
-                            processed_files = []
-                            
-                            for file_info in files_data:
-                                file_data_item = file_info.get("file_data")
-                                file_name_item = file_info.get("file_name")
-                                file_size_item = file_info.get("file_size")
-                                mime_type_item = file_info.get("mime_type")
-                                duration_item = file_info.get("duration")
-                                
-                                if not file_data_item or not file_name_item:
-                                    continue
-                                
-                                try:
-                                    file_data_item = file_data_item.strip()
-                                    
-                                    missing_padding = len(file_data_item) % 4
-                                    if missing_padding:
-                                        file_data_item += '=' * (4 - missing_padding)
-                                    
-                                    file_bytes = base64.b64decode(file_data_item, validate=True)
-                                except Exception as decode_error:
-                                    await websocket.send_text(json.dumps({
-                                        "type": "error",
-                                        "message": f"Invalid base64 data for file '{file_name_item}': {str(decode_error)}"
-                                    }))
-                                    continue
-                                
-                                max_size = MAX_IMAGE_SIZE if message_type == "image" else (MAX_VOICE_SIZE if message_type == "voice" else MAX_FILE_SIZE)
-                                if len(file_bytes) > max_size:
-                                    size_mb = max_size / (1024 * 1024)
-                                    await websocket.send_text(json.dumps({
-                                        "type": "error",
-                                        "message": f"File '{file_name_item}' too large. Maximum size: {size_mb:.1f}MB"
-                                    }))
-                                    continue
-                                
-                                if message_type == "image":
-                                    upload_dir = "static/chat_files/images"
-                                elif message_type == "voice":
-                                    upload_dir = "static/chat_files/voices"
-                                else:
-                                    upload_dir = "static/chat_files/files"
-                                
-                                os.makedirs(upload_dir, exist_ok=True)
-                                
-                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                                unique_filename = f"{user_id}_{timestamp}_{len(processed_files)}_{file_name_item}"
-                                file_path_item = os.path.join(upload_dir, unique_filename)
-                                
-                                with open(file_path_item, "wb") as f:
-                                    f.write(file_bytes)
-                                
-                                file_data = {
-                                    "file_name": file_name_item,
-                                    "file_path": file_path_item,
-                                    "file_size": file_size_item or len(file_bytes),
-                                    "mime_type": mime_type_item
-                                }
-                                
-                                if message_type == "voice" and duration_item is not None:
-                                    file_data["duration"] = int(duration_item)
-                                
-                                processed_files.append(file_data)
-                            
-                            processed_files_data = processed_files if processed_files else None
-                            
-                            duration = None
-                            if processed_files_data and len(processed_files_data) == 1:
-                                single_file = processed_files_data[0]
-                                file_name = single_file["file_name"]
-                                file_path = single_file["file_path"]
-                                file_size = single_file["file_size"]
-                                mime_type = single_file["mime_type"]
-                                duration = single_file.get("duration")
-                            
-                        except Exception as e:
-                            await websocket.send_text(json.dumps({
-                                "type": "error",
-                                "message": f"File upload failed: {str(e)}"
-                            }))
-                            continue
-                
-                    file_name = None
-                    file_path = None
-                    file_size = None
-                    mime_type = None
-                    duration = None
-                    
-                    if processed_files_data and len(processed_files_data) == 1:
-                        single_file = processed_files_data[0]
-                        file_name = single_file["file_name"]
-                        file_path = single_file["file_path"]
-                        file_size = single_file["file_size"]
-                        mime_type = single_file["mime_type"]
-                        duration = single_file.get("duration")
-                    
-                    message = chat_repo.create_message(
-                    room_id=message_room_id,
-                    sender_id=user_id,
+                message_response, errors, receiver_unread_count = await run_db(
+                    _store_chat_message,
+                    user_id=user_id,
+                    user_name=user_name,
+                    message_room_id=message_room_id,
                     receiver_id=receiver_id,
                     message_type=message_type,
                     content=content,
-                    file_name=file_name,
-                    file_path=file_path,
-                    file_size=file_size,
-                    mime_type=mime_type,
-                    duration=duration,
-                    files_data=processed_files_data
+                    local_temp_id=local_temp_id,
+                    files_data=files_data
                 )
                 
-                    files_data_with_urls = None
-                    
-                    if message.files_data:
-                        from ..core.config import settings
-                        files_data_with_urls = []
-                        for file_data in message.files_data:
-                            clean_path = file_data["file_path"].replace("\\", "/")
-                            file_data_with_url = {
-                                "file_name": file_data["file_name"],
-                                "file_path": f"{settings.BASE_URL}/{clean_path}",
-                                "file_size": file_data["file_size"],
-                                "mime_type": file_data["mime_type"]
-                            }
-                            if "duration" in file_data and file_data["duration"] is not None:
-                                file_data_with_url["duration"] = int(file_data["duration"])
-                            files_data_with_urls.append(file_data_with_url)
-                    
-                    sender_details = None
-                    if message.sender:
-                        is_online = chat_repo.is_user_online(message.sender.id)
-                        sender_details = {
-                            "id": message.sender.id,
-                            "name": message.sender.name,
-                            "email": message.sender.email,
-                            "avatar_url": message.sender.avatar_url,
-                            "is_online": is_online
-                        }
-                    
-                    receiver_details = None
-                    if message.receiver:
-                        is_online = chat_repo.is_user_online(message.receiver.id)
-                        receiver_details = {
-                            "id": message.receiver.id,
-                            "name": message.receiver.name,
-                            "email": message.receiver.email,
-                            "avatar_url": message.receiver.avatar_url,
-                            "is_online": is_online
-                        }
-                    
-                    message_response = {
-                        "id": message.id,
-                        "content": message.content,
-                        "message_type": message.message_type,
-                        "created_at": message.created_at.isoformat(),
-                        "is_read": message.is_read,
-                        "is_deleted": message.is_deleted,
-                        "sender_details": sender_details,
-                        "receiver_details": receiver_details,
-                        "local_temp_id": local_temp_id if local_temp_id else None,
-                        "files_data": files_data_with_urls if files_data_with_urls else None,
-                        "duration": message.duration if message.duration else None
-                    }
-                    
-                    try:
-                        from ..repositories.notification_repository import NotificationRepository
-                        from ..models.notification import NotificationType
-                        from ..db.database import SessionLocal
-                        
-                        notification_db = SessionLocal()
-                        try:
-                            notification_repo = NotificationRepository(notification_db)
-                            
-                            sender_name = user_name
-                            if message_type == "text":
-                                notification_title = f"New message from {sender_name}"
-                                notification_body = content[:100] if content else "New message"
-                            elif message_type == "image":
-                                notification_title = f"New image from {sender_name}"
-                                notification_body = f"{sender_name} sent an image"
-                            elif message_type == "voice":
-                                notification_title = f"New voice message from {sender_name}"
-                                notification_body = f"{sender_name} sent a voice message"
-                            elif message_type == "file":
-                                notification_title = f"New file from {sender_name}"
-                                notification_body = f"{sender_name} sent a file"
-                            else:
-                                notification_title = f"New message from {sender_name}"
-                                notification_body = f"{sender_name} sent a message"
-                            
-                            notification_repo.create(
-                                type=NotificationType.MESSAGE_RECEIVED,
-                                title=notification_title,
-                                body=notification_body,
-                                recipient_user_id=receiver_id,
-                                room_id=message_room_id,
-                                message_id=message.id,
-                                sender_id=user_id
-                            )
-                            
-                            send_chat_notification(
-                                db=notification_db,
-                                recipient_user_id=receiver_id,
-                                sender_name=sender_name,
-                                message_content=content or "",
-                                message_type=message_type,
-                                room_id=message_room_id,
-                                message_id=message.id,
-                                sender_id=user_id
-                            )
-                        finally:
-                            notification_db.close()
-                    except Exception as e:
-                        print(f"Chat notification: failed to create/send notification: {str(e)}")
+                for error in errors:
+                    manager.send_to_connection(connection_id, {
+                        "type": "error",
+                        "message": error
+                    })
                 
+                if message_response:
+                    notification_relay.wake()
                     await manager.broadcast_new_message(
                         message_response,
                         message_room_id,
                         user_id,
                         receiver_id
                     )
-                finally:
-                    message_db.close()
+                    await manager.send_unread_update(
+                        receiver_id,
+                        room_id=message_room_id,
+                        delta=1,
+                        unread_count=receiver_unread_count
+                    )
+                    await manager.send_unread_update(
+                        receiver_id,
+                        notification_type=NotificationType.MESSAGE_RECEIVED.value,
+                        delta=1
+                    )
     
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
-        
-        db = SessionLocal()
-        try:
-            chat_repo = ChatRepository(db)
-            chat_repo.update_user_presence(user_id, False)
-            
-            user = db.query(User).filter(User.id == user_id).first()
-            user_name = user.name if user else f"User {user_id}"
-            
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket connection {connection_id} of user {user_id} failed: {e}", exc_info=True)
+    finally:
+        heartbeat_task.cancel()
+        # any exit path must release the connection, or the user stays online on every node
+        if manager.disconnect(user_id, connection_id):
             await manager.broadcast_presence(user_id, False, user_name)
-        finally:
-            db.close()
 
 @router.get("/unread-count")
-async def get_unread_count(
+def get_unread_count(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1197,7 +1076,7 @@ async def get_unread_count(
     return {"unread_counts": unread_counts}
 
 @router.get("/online-users", response_model=OnlineUsersResponse)
-async def get_online_users(
+def get_online_users(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1207,8 +1086,7 @@ async def get_online_users(
     
     online_user_details = []
     for user in online_users:
-        presence = chat_repo.get_user_presence(user.id)
-        last_seen = presence.last_seen if presence else user.last_login or user.created_at
+        last_seen = manager.presence.get_last_seen(user.id) or user.last_login or user.created_at
         
         online_user_details.append(OnlineUserDetails(
             id=user.id,
@@ -1226,7 +1104,7 @@ async def get_online_users(
     return OnlineUsersResponse(online_users=online_user_details)
 
 @router.get("/check-room", response_model=RoomCheckResponse)
-async def check_user_room(
+def check_user_room(
     user_id: int = Query(..., description="ID of the user to check room with"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1301,22 +1179,24 @@ async def delete_room(
     db: Session = Depends(get_db)
 ):
     """Delete a chat room (soft delete)"""
-    chat_repo = ChatRepository(db)
+    chat_repo = AsyncRepository(ChatRepository(db))
     
     # Check if room exists and user is a participant
-    room = chat_repo.get_room(room_id, current_user.id)
+    room = await chat_repo.get_room(room_id, current_user.id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found or you are not a participant")
     
     # Get participants BEFORE deleting the room (because get_room_participants checks is_active)
-    participants = chat_repo.get_room_participants(room_id)
+    participants = await chat_repo.get_room_participants(room_id)
     
     # Delete the room
-    success = chat_repo.delete_room(room_id, current_user.id)
+    success = await chat_repo.delete_room(room_id, current_user.id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Room not found")
     
+    await manager.invalidate_room(room_id, participants)
+    
     # Notify other participants via WebSocket
     for participant_id in participants:
         if participant_id != current_user.id:
@@ -1332,6 +1212,7 @@ async def delete_room(
 @router.websocket("/ws/test")
 async def websocket_test_endpoint(websocket: WebSocket):
     """Test WebSocket endpoint without authentication"""
+    connection_id = None
     try:
         await websocket.accept()
         print("WebSocket connection accepted")
@@ -1339,15 +1220,15 @@ async def websocket_test_endpoint(websocket: WebSocket):
         user_id = 1
         user_name = "Test User"
         
-        await manager.connect(websocket, user_id)
+        connection_id = await manager.connect(websocket, user_id)
         print(f"User {user_id} connected to manager")
         
-        await websocket.send_text(json.dumps({
+        manager.send_to_connection(connection_id, {
             "type": "welcome",
             "message": "Connected to test WebSocket",
             "user_id": user_id,
             "timestamp": datetime.utcnow().isoformat()
-        }))
+        })
         
         while True:
             try:
@@ -1355,11 +1236,11 @@ async def websocket_test_endpoint(websocket: WebSocket):
                 message_data = json.loads(data)
                 print(f"Received message: {message_data}")
                 
-                await websocket.send_text(json.dumps({
+                manager.send_to_connection(connection_id, {
                     "type": "echo",
                     "data": message_data,
                     "timestamp": datetime.utcnow().isoformat()
-                }))
+                })
                 
             except WebSocketDisconnect:
                 print(f"WebSocket disconnected for user {user_id}")
@@ -1372,7 +1253,8 @@ async def websocket_test_endpoint(websocket: WebSocket):
         print(f"WebSocket error: {e}")
     finally:
         try:
-            manager.disconnect(user_id)
+            if connection_id:
+                manager.disconnect(user_id, connection_id)
             print(f"Test user {user_id} disconnected")
         except:
             pass
@@ -1388,7 +1270,7 @@ async def websocket_endpoint_with_slash(websocket: WebSocket):
     await _websocket_endpoint_handler(websocket)
 
 @router.post("/video-call/token", response_model=VideoCallTokenResponse)
-async def generate_video_call_token(
+def generate_video_call_token(
     token_request: VideoCallTokenRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1508,6 +1390,28 @@ async def generate_video_call_token(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Token generation failed: {str(e)}")
 
+def _open_video_call_room(db: Session, caller_id: int, receiver_id: int, call_id: str, channel_name: str) -> int:
+    """Open the caller and receiver's direct room, record the call and its chat message (runs on the DB threadpool); returns the room ID"""
+    chat_repo = ChatRepository(db)
+    room = chat_repo.create_direct_room(caller_id, receiver_id)
+    chat_repo.start_call(room.id, call_id)
+    chat_repo.create_message(
+        room_id=room.id,
+        sender_id=caller_id,
+        receiver_id=receiver_id,
+        message_type="video_call",
+        content=f"Video call started in channel: {channel_name}",
+        file_name=None,
+        file_path=None,
+        file_size=None,
+        mime_type=None
+    )
+    return room.id
+
+def _user_exists(db: Session, user_id: int) -> bool:
+    """Check a user exists (runs on the DB threadpool)"""
+    return db.query(User.id).filter(User.id == user_id).first() is not None
+
 @router.post("/video-call/start", response_model=VideoCallResponse)
 async def start_video_call(
     call_request: VideoCallRequest,
@@ -1515,10 +1419,7 @@ async def start_video_call(
     db: Session = Depends(get_db)
 ):
     """Start a video call with another user"""
-    chat_repo = ChatRepository(db)
-    
-    receiver = db.query(User).filter(User.id == call_request.receiver_id).first()
-    if not receiver:
+    if not await run_db(_user_exists, db, call_request.receiver_id):
         raise HTTPException(status_code=404, detail="User not found")
     
     call_id = str(uuid.uuid4())
@@ -1541,19 +1442,11 @@ async def start_video_call(
             token=token_data["token"]
         )
         
-        room = chat_repo.create_direct_room(current_user.id, call_request.receiver_id)
-        
-        message = chat_repo.create_message(
-            room_id=room.id,
-            sender_id=current_user.id,
-            receiver_id=call_request.receiver_id,
-            message_type="video_call",
-            content=f"Video call started in channel: {call_request.channel_name}",
-            file_name=None,
-            file_path=None,
-            file_size=None,
-            mime_type=None
+        room_id = await run_db(
+            _open_video_call_room, db, current_user.id, call_request.receiver_id, call_id, call_request.channel_name
         )
+        await manager.invalidate_room(room_id, [current_user.id, call_request.receiver_id])
+        manager.register_call(call_id, [current_user.id, call_request.receiver_id])
         
         await manager.broadcast_video_call(
             call_id=call_id,
@@ -1561,7 +1454,7 @@ async def start_video_call(
             caller_id=current_user.id,
             caller_name=current_user.name,
             receiver_id=call_request.receiver_id,
-            room_id=room.id
+            room_id=room_id
         )
         
         return VideoCallResponse(
@@ -1644,7 +1537,7 @@ async def end_video_call(
     return {"status": "ended", "call_id": call_id}
 
 @router.post("/video-call/token/test", response_model=VideoCallTokenResponse)
-async def generate_video_call_token_test(
+def generate_video_call_token_test(
     token_request: VideoCallTokenRequest
 ):
     """
@@ -1707,6 +1600,7 @@ async def generate_video_call_token_test(
 @router.websocket("/ws/test")
 async def websocket_test_endpoint(websocket: WebSocket):
     """Test WebSocket endpoint without authentication"""
+    connection_id = None
     try:
         await websocket.accept()
         print("WebSocket connection accepted")
@@ -1714,15 +1608,15 @@ async def websocket_test_endpoint(websocket: WebSocket):
         user_id = 1
         user_name = "Test User"
         
-        await manager.connect(websocket, user_id)
+        connection_id = await manager.connect(websocket, user_id)
         print(f"User {user_id} connected to manager")
         
-        await websocket.send_text(json.dumps({
+        manager.send_to_connection(connection_id, {
             "type": "welcome",
             "message": "Connected to test WebSocket",
             "user_id": user_id,
             "timestamp": datetime.utcnow().isoformat()
-        }))
+        })
         
         while True:
             try:
@@ -1730,11 +1624,11 @@ async def websocket_test_endpoint(websocket: WebSocket):
                 message_data = json.loads(data)
                 print(f"Received message: {message_data}")
                 
-                await websocket.send_text(json.dumps({
+                manager.send_to_connection(connection_id, {
                     "type": "echo",
                     "data": message_data,
                     "timestamp": datetime.utcnow().isoformat()
-                }))
+                })
                 
             except WebSocketDisconnect:
                 print(f"WebSocket disconnected for user {user_id}")
@@ -1747,7 +1641,8 @@ async def websocket_test_endpoint(websocket: WebSocket):
         print(f"WebSocket error: {e}")
     finally:
         try:
-            manager.disconnect(user_id)
+            if connection_id:
+                manager.disconnect(user_id, connection_id)
             print(f"Test user {user_id} disconnected")
         except:
             pass
\ No newline at end of file
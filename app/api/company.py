@@ -21,7 +21,7 @@ router = APIRouter(prefix="/companies", tags=["Companies"])
 
 @router.get("/", response_model=SuccessResponse, tags=["Companies"])
 @handle_errors
-async def get_companies(
+def get_companies(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: str = Query(None),
@@ -43,7 +43,7 @@ async def get_companies(
 
 @router.get("/{company_id}", response_model=SuccessResponse, tags=["Companies"])
 @handle_errors
-async def get_company(
+def get_company(
     company_id: int,
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
@@ -61,7 +61,7 @@ async def get_company(
 
 @router.post("/", response_model=SuccessResponse, tags=["Companies"])
 @handle_errors
-async def create_company(
+def create_company(
     company: CompanyCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -83,7 +83,7 @@ async def create_company(
 
 @router.patch("/{company_id}", response_model=SuccessResponse, tags=["Companies"])
 @handle_errors
-async def update_company(
+def update_company(
     company_id: int,
     company: CompanyUpdate,
     current_user: User = Depends(get_current_user),
@@ -112,7 +112,7 @@ async def update_company(
 
 @router.delete("/{company_id}", response_model=SuccessResponse, tags=["Companies"])
 @handle_errors
-async def delete_company(
+def delete_company(
     company_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
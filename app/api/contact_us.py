@@ -12,7 +12,7 @@ router = APIRouter(prefix="/contact-us", tags=["Contact Us"])
 
 @router.get("/", response_model=SuccessResponse)
 @handle_errors
-async def get_contacts(db: Session = Depends(get_db)):
+def get_contacts(db: Session = Depends(get_db)):
     """Get all contacts"""
     contacts = ContactUsRepository.get_all(db)
     contact_schemas = [ContactUsOut.model_validate(contact) for contact in contacts]
@@ -23,7 +23,7 @@ async def get_contacts(db: Session = Depends(get_db)):
 
 @router.get("/{contact_id}", response_model=SuccessResponse)
 @handle_errors
-async def get_contact(contact_id: int, db: Session = Depends(get_db)):
+def get_contact(contact_id: int, db: Session = Depends(get_db)):
     """Get contact by ID"""
     contact = ContactUsRepository.get_by_id(db, contact_id)
     validate_entity_exists(contact, "Contact")
@@ -35,7 +35,7 @@ async def get_contact(contact_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=SuccessResponse)
 @handle_errors
-async def create_contact(contact: ContactUsCreate, db: Session = Depends(get_db)):
+def create_contact(contact: ContactUsCreate, db: Session = Depends(get_db)):
     """Create a new contact"""
     created_contact = ContactUsRepository.create(db, contact)
     contact_schema = ContactUsOut.model_validate(created_contact)
@@ -46,7 +46,7 @@ async def create_contact(contact: ContactUsCreate, db: Session = Depends(get_db)
 
 @router.put("/{contact_id}", response_model=SuccessResponse)
 @handle_errors
-async def update_contact(contact_id: int, contact: ContactUsUpdate, db: Session = Depends(get_db)):
+def update_contact(contact_id: int, contact: ContactUsUpdate, db: Session = Depends(get_db)):
     """Update contact"""
     updated = ContactUsRepository.update(db, contact_id, contact)
     validate_entity_exists(updated, "Contact")
@@ -58,7 +58,7 @@ async def update_contact(contact_id: int, contact: ContactUsUpdate, db: Session
 
 @router.delete("/{contact_id}", response_model=SuccessResponse)
 @handle_errors
-async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
+def delete_contact(contact_id: int, db: Session = Depends(get_db)):
     """Delete contact"""
     deleted = ContactUsRepository.delete(db, contact_id)
     if not deleted:
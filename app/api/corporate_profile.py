@@ -18,9 +18,9 @@ from ..schemas.corporate_profile import (
 )
 from ..schemas.full_time_job import FullTimeJobResponse, FullTimeJobListResponse
 from ..schemas.common import MessageResponse, SuccessResponse
-from ..utils.auth import get_current_user, verify_token
+from ..utils.auth import get_current_user, get_auth_principal, verify_token
 from ..utils.permissions import check_admin_or_owner, is_admin_user
-from ..utils.email import send_email_with_retry, send_corporate_verification_email
+from ..utils.email import send_email_with_retry, send_corporate_verification_email_sync
 from ..core.config import settings
 from ..models.otp import OTP
 from ..models.user import User
@@ -44,9 +44,7 @@ def get_current_user_optional(
         token = authorization.split(" ")[1]
         payload = verify_token(token)
         if payload and 'sub' in payload:
-            user_id = int(payload['sub'])
-            user_repo = UserRepository(db)
-            user = user_repo.get_user_by_id(user_id)
+            user = get_auth_principal(db, int(payload['sub']))
             if user:
                 return {"id": user.id, "name": user.name, "email": user.email}
         return None
@@ -63,7 +61,7 @@ def generate_otp(email: Optional[str] = None) -> str:
 
 
 
-async def save_logo_file(logo_file: UploadFile, profile_id: int) -> str:
+def save_logo_file(logo_file: UploadFile, profile_id: int) -> str:
     """Save logo file and return the URL"""
     project_root = Path(__file__).parent.parent.parent
     
@@ -75,7 +73,7 @@ async def save_logo_file(logo_file: UploadFile, profile_id: int) -> str:
     file_path = upload_dir / unique_filename
     
     try:
-        content = await logo_file.read()
+        content = logo_file.file.read()
         with open(file_path, "wb") as buffer:
             buffer.write(content)
     except PermissionError as e:
@@ -244,7 +242,7 @@ def convert_profile_to_response(profile_with_urls, current_user_id: Optional[int
 
 
 @router.post("/", response_model=SuccessResponse, tags=["Corporate Profile"])
-async def create_corporate_profile(
+def create_corporate_profile(
     company_name: str = Form(...),
     phone_number: str = Form(...),
     country_code: str = Form(default="+1"),
@@ -342,7 +340,7 @@ async def create_corporate_profile(
         if logo:
             try:
                 print(f"[DEBUG] Uploading logo file...")
-                logo_url = await save_logo_file(logo, db_profile.id)
+                logo_url = save_logo_file(logo, db_profile.id)
                 print(f"[DEBUG] Logo uploaded successfully: {logo_url}")
                 db_profile.logo_url = logo_url
                 db.commit()
@@ -388,7 +386,7 @@ async def create_corporate_profile(
         
         try:
             print(f"[DEBUG] Sending verification email...")
-            await send_corporate_verification_email(
+            send_corporate_verification_email_sync(
                 email=current_user.email,
                 otp_code=otp_code
             )
@@ -424,7 +422,7 @@ async def create_corporate_profile(
 
 
 @router.get("/", response_model=CorporateProfileListResponse, tags=["Corporate Profile"])
-async def get_corporate_profiles(
+def get_corporate_profiles(
     page: int = 1,
     size: int = 10,
     current_user: Optional[dict] = Depends(get_current_user_optional),
@@ -468,7 +466,7 @@ async def get_corporate_profiles(
 
 
 @router.get("/active", response_model=CorporateProfileListResponse, tags=["Corporate Profile"])
-async def get_active_corporate_profiles(
+def get_active_corporate_profiles(
     page: int = 1,
     size: int = 10,
     current_user: Optional[dict] = Depends(get_current_user_optional),
@@ -494,7 +492,7 @@ async def get_active_corporate_profiles(
 
 
 @router.get("/{profile_id}", response_model=CorporateProfileResponse, tags=["Corporate Profile"])
-async def get_corporate_profile(
+def get_corporate_profile(
     profile_id: int,
     current_user: Optional[dict] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
@@ -521,7 +519,7 @@ async def get_corporate_profile(
 
 
 @router.get("/{profile_id}/recently-posted-jobs", response_model=FullTimeJobListResponse, tags=["Corporate Profile"])
-async def get_recently_posted_jobs(
+def get_recently_posted_jobs(
     profile_id: int,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=50, description="Page size"),
@@ -580,7 +578,7 @@ async def get_recently_posted_jobs(
 
 
 @router.get("/user/me", response_model=CorporateProfileResponse, tags=["Corporate Profile"])
-async def get_my_corporate_profile(
+def get_my_corporate_profile(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -599,7 +597,7 @@ async def get_my_corporate_profile(
 
 
 @router.put("/{profile_id}", response_model=CorporateProfileResponse, tags=["Corporate Profile"])
-async def update_corporate_profile(
+def update_corporate_profile(
     profile_id: int,
     company_name: Optional[str] = Form(None),
     phone_number: Optional[str] = Form(None),
@@ -693,7 +691,7 @@ async def update_corporate_profile(
     
     if logo:
         try:
-            logo_url = await save_logo_file(logo, profile_id)
+            logo_url = save_logo_file(logo, profile_id)
             updated_profile.logo_url = logo_url
             db.commit()
             db.refresh(updated_profile)
@@ -710,7 +708,7 @@ async def update_corporate_profile(
 
 
 @router.delete("/{profile_id}", response_model=MessageResponse, tags=["Corporate Profile"])
-async def delete_corporate_profile(
+def delete_corporate_profile(
     profile_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -748,7 +746,7 @@ async def delete_corporate_profile(
 
 
 @router.post("/resend-otp", response_model=SuccessResponse, tags=["Corporate Profile"])
-async def resend_corporate_otp(
+def resend_corporate_otp(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -799,7 +797,7 @@ async def resend_corporate_otp(
     db.commit()
     
     try:
-        await send_corporate_verification_email(
+        send_corporate_verification_email_sync(
             email=current_user.email,
             otp_code=otp_code
         )
@@ -820,7 +818,7 @@ async def resend_corporate_otp(
 
 
 @router.post("/verify", response_model=MessageResponse, tags=["Corporate Profile"])
-async def verify_corporate_profile(
+def verify_corporate_profile(
     verification: CorporateProfileVerification,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -10,6 +10,7 @@ from ..models.language import Language
 from ..models.category import Category
 from ..models.skill import Skill
 from ..schemas.common import SuccessResponse
+from ..utils.reference_cache import invalidate_reference_data
 import json
 import os
 from sqlalchemy import and_
@@ -331,12 +332,13 @@ def batch_insert_categories_and_skills(db: Session) -> Dict[str, int]:
         raise Exception(f"Failed to import from Excel: {str(e)}")
 
 @router.post("/import-categories-skills", response_model=SuccessResponse)
-async def import_categories_and_skills(db: Session = Depends(get_db)):
+def import_categories_and_skills(db: Session = Depends(get_db)):
     """
     Import categories, sub-categories, and skills from Excel file (Categories.xlsx)
     """
     try:
         result = batch_insert_categories_and_skills(db)
+        invalidate_reference_data("categories", "skills")
         
         return SuccessResponse(
             msg="Categories and skills imported successfully",
@@ -348,7 +350,7 @@ async def import_categories_and_skills(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to import categories and skills: {str(e)}")
 
 @router.post("/import-all", response_model=SuccessResponse)
-async def import_all_data(db: Session = Depends(get_db)):
+def import_all_data(db: Session = Depends(get_db)):
     """
     Import all data from JSON files into database models with optimized batch operations
     """
@@ -370,6 +372,7 @@ async def import_all_data(db: Session = Depends(get_db)):
         languages_imported = batch_insert_languages(db, languages_data)
         
         categories_result = batch_insert_categories_and_skills(db)
+        invalidate_reference_data()
         
         total_imported = (companies_imported + education_imported + certifications_imported + 
                          locations_imported + languages_imported + categories_result["total_imported"])
@@ -394,7 +397,7 @@ async def import_all_data(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to import data: {str(e)}")
 
 @router.get("/stats", response_model=SuccessResponse)
-async def get_import_stats(db: Session = Depends(get_db)):
+def get_import_stats(db: Session = Depends(get_db)):
     """
     Get statistics about imported data with optimized queries
     """
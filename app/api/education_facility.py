@@ -24,7 +24,7 @@ router = APIRouter(tags=["Education Facilities"])
 
 @router.post("/education-facilities", response_model=EducationFacilityResponse)
 @handle_errors
-async def create_education_facility(
+def create_education_facility(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     name: str = Query(..., description="Education facility name", example="Mansoura University"),
@@ -49,7 +49,7 @@ async def create_education_facility(
 
 @router.get("/education-facilities/{facility_id}", response_model=EducationFacilityResponse)
 @handle_errors
-async def get_education_facility(
+def get_education_facility(
     facility_id: int,
     db: Session = Depends(get_db)
 ):
@@ -60,7 +60,7 @@ async def get_education_facility(
     return facility
 
 @router.get("/education-facilities", response_model=EducationFacilityListResponse)
-async def get_education_facilities(
+def get_education_facilities(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: str = Query(None, description="Search by facility name"),
@@ -91,7 +91,7 @@ async def get_education_facilities(
 
 @router.put("/education-facilities/{facility_id}", response_model=EducationFacilityResponse)
 @handle_errors
-async def update_education_facility(
+def update_education_facility(
     facility_id: int,
     facility_data: EducationFacilityUpdate,
     db: Session = Depends(get_db),
@@ -118,7 +118,7 @@ async def update_education_facility(
 
 @router.delete("/education-facilities/{facility_id}")
 @handle_errors
-async def delete_education_facility(
+def delete_education_facility(
     facility_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -137,7 +137,7 @@ async def delete_education_facility(
     return {"message": "Education facility deleted successfully"}
 
 @router.get("/education-facilities/search/autocomplete")
-async def search_education_facilities_autocomplete(
+def search_education_facilities_autocomplete(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
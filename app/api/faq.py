@@ -12,7 +12,7 @@ router = APIRouter(prefix="/faq", tags=["FAQ"])
 
 @router.get("/", response_model=SuccessResponse)
 @handle_errors
-async def get_faqs(db: Session = Depends(get_db)):
+def get_faqs(db: Session = Depends(get_db)):
     """Get all FAQs"""
     faqs = FAQRepository.get_all(db)
     faq_schemas = [FAQOut.model_validate(faq) for faq in faqs]
@@ -23,7 +23,7 @@ async def get_faqs(db: Session = Depends(get_db)):
 
 @router.get("/{faq_id}", response_model=SuccessResponse)
 @handle_errors
-async def get_faq(faq_id: int, db: Session = Depends(get_db)):
+def get_faq(faq_id: int, db: Session = Depends(get_db)):
     """Get FAQ by ID"""
     faq = FAQRepository.get_by_id(db, faq_id)
     validate_entity_exists(faq, "FAQ")
@@ -35,7 +35,7 @@ async def get_faq(faq_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=SuccessResponse)
 @handle_errors
-async def create_faq(faq: FAQCreate, db: Session = Depends(get_db)):
+def create_faq(faq: FAQCreate, db: Session = Depends(get_db)):
     """Create a new FAQ"""
     created_faq = FAQRepository.create(db, faq)
     faq_schema = FAQOut.model_validate(created_faq)
@@ -46,7 +46,7 @@ async def create_faq(faq: FAQCreate, db: Session = Depends(get_db)):
 
 @router.put("/{faq_id}", response_model=SuccessResponse)
 @handle_errors
-async def update_faq(faq_id: int, faq: FAQUpdate, db: Session = Depends(get_db)):
+def update_faq(faq_id: int, faq: FAQUpdate, db: Session = Depends(get_db)):
     """Update FAQ"""
     updated = FAQRepository.update(db, faq_id, faq)
     validate_entity_exists(updated, "FAQ")
@@ -58,7 +58,7 @@ async def update_faq(faq_id: int, faq: FAQUpdate, db: Session = Depends(get_db))
 
 @router.delete("/{faq_id}", response_model=SuccessResponse)
 @handle_errors
-async def delete_faq(faq_id: int, db: Session = Depends(get_db)):
+def delete_faq(faq_id: int, db: Session = Depends(get_db)):
     """Delete FAQ"""
     deleted = FAQRepository.delete(db, faq_id)
     if not deleted:
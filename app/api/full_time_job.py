@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, status, Query, Header
 from sqlalchemy.orm import Session
 from typing import List, Optional, Tuple
 from ..db.database import get_db
+from ..db.offload import run_db
 from ..repositories.full_time_job_repository import FullTimeJobRepository
 from ..repositories.corporate_profile_repository import CorporateProfileRepository
 from ..repositories.team_member_repository import TeamMemberRepository
@@ -22,6 +23,8 @@ from ..utils.response_helpers import (
     forbidden_error,
     validate_entity_exists
 )
+from ..utils.job_recommender import recommendation_updater
+from ..pagination import TotalMode
 from ..utils.permissions import has_permission, Permission, is_admin_user, check_admin_or_owner
 from ..models.team_member import TeamMemberRole, TeamMemberStatus
 
@@ -99,7 +102,7 @@ def get_user_corporate_profiles(user_id: int, db: Session) -> List[int]:
 
 @router.post("/", response_model=SuccessResponse, tags=["Full Time Job"])
 @handle_errors
-async def create_full_time_job(
+def create_full_time_job(
     full_time_job: FullTimeJobCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -146,6 +149,7 @@ async def create_full_time_job(
         user_role
     )
     print(f"[DEBUG POST] Job created successfully with ID: {formatted_job.get('id')}, status={formatted_job.get('status')}")
+    recommendation_updater.job_changed("full_time", formatted_job["id"])
     
     return success_response(
         data=formatted_job,
@@ -166,6 +170,8 @@ async def get_all_full_time_jobs(
     subcategory_id: Optional[int] = Query(None, description="Filter by subcategory ID"),
     min_salary: Optional[float] = Query(None, ge=0, description="Filter by minimum salary"),
     max_salary: Optional[float] = Query(None, ge=0, description="Filter by maximum salary"),
+    sort_by: Optional[str] = Query(None, description="Sort by (most_recent, most_relevant)"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Total: exact, estimated (planner estimate for large results) or none (has_more only)"),
     db: Session = Depends(get_db),
     current_user: Optional[dict] = Depends(get_current_user_optional)
 ):
@@ -181,7 +187,8 @@ async def get_all_full_time_jobs(
             from ..utils.response_helpers import bad_request_error
             raise bad_request_error("Invalid skill_ids format. Use comma-separated integers.")
     
-    jobs = job_repo.get_all_active(
+    result = await run_db(
+        job_repo.get_all_active,
         skip=skip,
         limit=size,
         current_user_id=get_user_id(current_user) if current_user else None,
@@ -193,31 +200,23 @@ async def get_all_full_time_jobs(
         work_mode=work_mode,
         skill_ids=skill_id_list,
         min_salary=min_salary,
-        max_salary=max_salary
-    )
-    
-    total = job_repo.count_active(
-        category_id=category_id,
-        subcategory_id=subcategory_id,
-        title=title,
-        location=location,
-        experience_level=experience_level,
-        work_mode=work_mode,
-        skill_ids=skill_id_list,
-        min_salary=min_salary,
-        max_salary=max_salary
+        max_salary=max_salary,
+        sort_by=sort_by,
+        total_mode=total_mode
     )
     
     response_jobs = []
-    for job in jobs:
+    for job in result.items:
         response_data = FullTimeJobResponse(**job)
         response_jobs.append(response_data)
     
     return FullTimeJobListResponse(
         jobs=response_jobs,
-        total=total,
+        total=result.total,
         page=page,
-        size=size
+        size=size,
+        has_more=result.has_more,
+        total_is_estimate=result.total_is_estimate
     )
 
 
@@ -249,7 +248,8 @@ async def search_full_time_jobs(
         except ValueError:
             raise bad_request_error("Invalid skill_ids format. Use comma-separated integers.")
     
-    jobs = job_repo.search_jobs(
+    jobs = await run_db(
+        job_repo.search_jobs,
         title=title,
         location=location,
         experience_level=experience_level,
@@ -289,8 +289,8 @@ async def get_my_full_time_jobs(
     job_repo = FullTimeJobRepository(db)
     skip = (page - 1) * size
     
-    jobs = job_repo.get_user_accessible_jobs(user_id, skip=skip, limit=size)
-    total = job_repo.count_user_accessible_jobs(user_id)
+    jobs = await run_db(job_repo.get_user_accessible_jobs, user_id, skip=skip, limit=size)
+    total = await run_db(job_repo.count_user_accessible_jobs, user_id)
     
     response_jobs = []
     for job in jobs:
@@ -325,7 +325,7 @@ async def get_my_full_time_jobs_with_filters(
     job_repo = FullTimeJobRepository(db)
     skip = (page - 1) * size
     
-    corporate_profile_ids = get_user_corporate_profiles(user_id, db)
+    corporate_profile_ids = await run_db(get_user_corporate_profiles, user_id, db)
     
     if not corporate_profile_ids:
         return UserFullTimeJobsResponse(
@@ -335,7 +335,8 @@ async def get_my_full_time_jobs_with_filters(
             size=size
         )
     
-    jobs = job_repo.get_by_corporate_profiles_with_filters(
+    jobs = await run_db(
+        job_repo.get_by_corporate_profiles_with_filters,
         corporate_profile_ids=corporate_profile_ids,
         skip=skip,
         limit=size,
@@ -349,7 +350,8 @@ async def get_my_full_time_jobs_with_filters(
         current_user_id=user_id
     )
     
-    total = job_repo.count_by_corporate_profiles_with_filters(
+    total = await run_db(
+        job_repo.count_by_corporate_profiles_with_filters,
         corporate_profile_ids=corporate_profile_ids,
         status=job_status,
         job_type=job_type,
@@ -375,7 +377,7 @@ async def get_my_full_time_jobs_with_filters(
 
 @router.get("/{job_id}", response_model=FullTimeJobResponse, tags=["Full Time Job"])
 @handle_errors
-async def get_full_time_job(
+def get_full_time_job(
     job_id: int,
     current_user: Optional[dict] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
@@ -428,7 +430,7 @@ async def get_full_time_job(
 
 @router.put("/{job_id}", response_model=FullTimeJobResponse, tags=["Full Time Job"])
 @handle_errors
-async def update_full_time_job(
+def update_full_time_job(
     job_id: int,
     full_time_job: FullTimeJobUpdate,
     current_user: dict = Depends(get_current_user),
@@ -461,6 +463,7 @@ async def update_full_time_job(
     updated_job = job_repo.update(job_id, full_time_job)
     validate_entity_exists(updated_job, "Full-time job")
     print(f"[DEBUG PUT] Job updated successfully, new status: {updated_job.get('status')}")
+    recommendation_updater.job_changed("full_time", job_id)
     
     response_data = FullTimeJobResponse(**updated_job)
     
@@ -469,7 +472,7 @@ async def update_full_time_job(
 
 @router.delete("/{job_id}", response_model=MessageResponse, tags=["Full Time Job"])
 @handle_errors
-async def delete_full_time_job(
+def delete_full_time_job(
     job_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -497,13 +500,14 @@ async def delete_full_time_job(
     success = job_repo.delete(job_id)
     if not success:
         raise bad_request_error("Failed to delete job")
+    recommendation_updater.job_changed("full_time", job_id)
     
     return MessageResponse(message="Full-time job deleted successfully")
 
 
 @router.patch("/{job_id}/status", response_model=FullTimeJobResponse, tags=["Full Time Job"])
 @handle_errors
-async def change_job_status(
+def change_job_status(
     job_id: int,
     new_status: str = Query(..., regex="^(active|closed|draft)$"),
     current_user: dict = Depends(get_current_user),
@@ -525,6 +529,7 @@ async def change_job_status(
     job_repo = FullTimeJobRepository(db)
     updated_job = job_repo.change_status(job_id, new_status)
     validate_entity_exists(updated_job, "Full-time job")
+    recommendation_updater.job_changed("full_time", job_id)
     
     response_data = FullTimeJobResponse(**updated_job)
     
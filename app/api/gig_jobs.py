@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, Query, status, Header
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.db.database import get_db
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_optional
 from app.utils.decorators import handle_errors
 from app.utils.response_helpers import (
     success_response,
@@ -13,6 +13,8 @@ from app.utils.response_helpers import (
 )
 from app.models.user import User
 from app.repositories.gig_job_repository import GigJobRepository
+from app.db.offload import AsyncRepository
+from app.utils.job_recommender import recommendation_updater
 from app.schemas.gig_job import (
     GigJobCreate, 
     GigJobUpdate, 
@@ -21,35 +23,11 @@ from app.schemas.gig_job import (
     GigJobSkillRemove
 )
 from app.schemas.common import SuccessResponse
-from app.pagination import PaginationParams, create_pagination_response
+from app.pagination import PaginationParams, TotalMode, create_pagination_response, create_page_response
 
 router = APIRouter(prefix="/gig-jobs", tags=["Gig Jobs"])
 
 
-def get_current_user_optional(authorization: Optional[str] = Header(None)) -> Optional[User]:
-    """Get current user if authorization header is provided, otherwise return None"""
-    if not authorization or not authorization.startswith("Bearer "):
-        return None
-    
-    try:
-        token = authorization.split(" ")[1]
-        from app.utils.auth import verify_token
-        from app.repositories.user_repository import UserRepository
-        from app.db.database import get_db
-        
-        db = next(get_db())
-        user_repo = UserRepository(db)
-        
-        payload = verify_token(token)
-        if payload and 'sub' in payload:
-            user_id = int(payload['sub'])
-            user = user_repo.get_by_id(user_id)
-            return user
-        return None
-    except Exception:
-        return None
-
-
 @router.post("/gig-job", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
 @handle_errors
 async def create_gig_job(
@@ -71,12 +49,13 @@ async def create_gig_job(
     - **category_id**: Category id (required)
     - **subcategory_id**: Subcategory id (required)
     """
-    repository = GigJobRepository(db)
+    repository = AsyncRepository(GigJobRepository(db))
     
     if gig_job_data.min_salary >= gig_job_data.max_salary:
         raise bad_request_error("Minimum salary must be less than maximum salary")
     
-    gig_job = repository.create(gig_job_data, current_user.id)
+    gig_job = await repository.create(gig_job_data, current_user.id)
+    recommendation_updater.job_changed("gig", gig_job["id"])
     return success_response(
         data=gig_job,
         message="Gig job successfully added"
@@ -97,6 +76,7 @@ async def get_all_gig_jobs(
     subcategory_id: Optional[int] = Query(None, description="Filter by subcategory ID"),
     date_posted: Optional[str] = Query(None, description="Filter by date posted (any_time, past_24_hours, past_week, past_month)"),
     sort_by: Optional[str] = Query("most_recent", description="Sort by (most_recent, most_relevant)"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Total: exact, estimated (planner estimate for large results) or none (has_more only)"),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
@@ -116,12 +96,13 @@ async def get_all_gig_jobs(
     - **subcategory_id**: Filter by subcategory ID
     - **date_posted**: Filter by date posted (any_time, past_24_hours, past_week, past_month)
     - **sort_by**: Sort by (most_recent, most_relevant)
+    - **total_mode**: exact (default), estimated or none; estimated and none skip the exact count on large results
     - **Authorization**: Optional Bearer token for authentication
     """
-    repository = GigJobRepository(db)
-    pagination = PaginationParams(page=page, size=size)
+    repository = AsyncRepository(GigJobRepository(db))
+    pagination = PaginationParams(page=page, size=size, total_mode=total_mode)
     
-    gig_jobs, total = repository.get_all_gig_jobs(
+    result = await repository.get_all_gig_jobs(
         pagination=pagination,
         status=status_filter,
         experience_level=experience_level,
@@ -136,11 +117,7 @@ async def get_all_gig_jobs(
         current_user_id=current_user.id if current_user else None
     )
     
-    return create_pagination_response(
-        items=gig_jobs,
-        total=total,
-        pagination=pagination
-    )
+    return create_page_response(result.items, result, pagination)
 
 
 @router.get("/my-jobs", response_model=GigJobListResponse)
@@ -176,10 +153,10 @@ async def get_my_gig_jobs(
     - **date_posted**: Filter by date posted (any_time, past_24_hours, past_week, past_month)
     - **sort_by**: Sort by (most_recent, most_relevant)
     """
-    repository = GigJobRepository(db)
+    repository = AsyncRepository(GigJobRepository(db))
     pagination = PaginationParams(page=page, size=size)
     
-    gig_jobs, total = repository.get_user_gig_jobs_with_filters(
+    gig_jobs, total = await repository.get_user_gig_jobs_with_filters(
         user_id=current_user.id,
         pagination=pagination,
         status=status_filter,
@@ -215,8 +192,8 @@ async def get_gig_job_by_id(
     - **gig_job_id**: ID of the gig job
     - **Authorization**: Optional Bearer token for authentication
     """
-    repository = GigJobRepository(db)
-    gig_job = repository.get_by_id(gig_job_id, current_user.id if current_user else None)
+    repository = AsyncRepository(GigJobRepository(db))
+    gig_job = await repository.get_by_id(gig_job_id, current_user.id if current_user else None)
     validate_entity_exists(gig_job, "Gig job")
     return gig_job
 
@@ -235,14 +212,15 @@ async def update_gig_job(
     - **gig_job_id**: ID of the gig job to update
     - **skill_ids**: List of skill IDs to add (will not remove existing skills)
     """
-    repository = GigJobRepository(db)
+    repository = AsyncRepository(GigJobRepository(db))
     
     if gig_job_data.min_salary is not None and gig_job_data.max_salary is not None:
         if gig_job_data.min_salary >= gig_job_data.max_salary:
             raise bad_request_error("Minimum salary must be less than maximum salary")
     
-    updated_gig_job = repository.update(gig_job_id, gig_job_data, current_user.id)
+    updated_gig_job = await repository.update(gig_job_id, gig_job_data, current_user.id)
     validate_entity_exists(updated_gig_job, "Gig job")
+    recommendation_updater.job_changed("gig", gig_job_id)
     
     return success_response(
         data=updated_gig_job,
@@ -262,12 +240,13 @@ async def delete_gig_job(
     
     - **gig_job_id**: ID of the gig job to delete
     """
-    repository = GigJobRepository(db)
+    repository = AsyncRepository(GigJobRepository(db))
     
-    success = repository.delete(gig_job_id, current_user.id)
+    success = await repository.delete(gig_job_id, current_user.id)
     
     if not success:
         raise not_found_error("Gig job not found or you don't have permission to delete it")
+    recommendation_updater.job_changed("gig", gig_job_id)
     
     return success_response(
         data=None,
@@ -294,14 +273,15 @@ async def remove_gig_job_skill(
         "gig_job_skill_id": 48
     }
     """
-    repository = GigJobRepository(db)
+    repository = AsyncRepository(GigJobRepository(db))
     
     try:
-        result = repository.remove_gig_job_skill(
+        result = await repository.remove_gig_job_skill(
             gig_job_id=gig_job_id,
             gig_job_skill_id=skill_data.gig_job_skill_id,
             user_id=current_user.id
         )
+        recommendation_updater.job_changed("gig", gig_job_id)
         
         return success_response(
             data={
@@ -321,23 +301,21 @@ async def search_gig_jobs(
     q: str = Query(..., min_length=2, description="Search term"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Total: exact, estimated (planner estimate for large results) or none (has_more only)"),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """
-    Search gig jobs by title, description, or skills.
+    Search gig jobs by title and description, best matches first.
     
-    - **q**: Search term (minimum 2 characters)
+    - **q**: Search term (minimum 2 characters); each word matches as a prefix
     - **page**: Page number (default: 1)
     - **size**: Page size (default: 10, max: 100)
+    - **total_mode**: exact (default), estimated or none
     """
-    repository = GigJobRepository(db)
-    pagination = PaginationParams(page=page, size=size)
+    repository = AsyncRepository(GigJobRepository(db))
+    pagination = PaginationParams(page=page, size=size, total_mode=total_mode)
     
-    gig_jobs, total = repository.search_gig_jobs(q, pagination, current_user.id if current_user else None)
+    result = await repository.search_gig_jobs(q, pagination, current_user.id if current_user else None)
     
-    return create_pagination_response(
-        items=gig_jobs,
-        total=total,
-        pagination=pagination
-    )
\ No newline at end of file
+    return create_page_response(result.items, result, pagination)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from ..db.database import get_db
 from ..repositories.language_repository import LanguageRepository
@@ -8,12 +8,13 @@ from ..utils.decorators import handle_errors
 from ..utils.response_helpers import success_response, not_found_error, validate_entity_exists
 from ..models.user import User
 from ..utils.auth import get_current_user
+from ..utils.reference_cache import cached_reference_response, invalidate_reference_data
 
 router = APIRouter(prefix="/languages", tags=["Languages"])
 
 @router.get("/{language_id}", response_model=SuccessResponse)
 @handle_errors
-async def get_language(
+def get_language(
     language_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -30,21 +31,22 @@ async def get_language(
 @router.get("/", response_model=SuccessResponse)
 @handle_errors
 async def get_languages(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all languages"""
     repo = LanguageRepository(db)
-    langs = repo.get_all_languages()
-    languages = [LanguageResponse.model_validate(l) for l in langs]
-    return success_response(
-        data=languages,
-        message="Languages retrieved successfully"
-    )
+
+    def build() -> bytes:
+        languages = [LanguageResponse.model_validate(l) for l in repo.get_all_languages()]
+        return SuccessResponse(msg="Languages retrieved successfully", data=languages).model_dump_json().encode()
+
+    return await cached_reference_response(request, ("languages",), build)
 
 @router.post("/", response_model=SuccessResponse)
 @handle_errors
-async def create_language(
+def create_language(
     language: LanguageCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -52,6 +54,7 @@ async def create_language(
     """Create a new language"""
     repo = LanguageRepository(db)
     lang = repo.create_language(language.name)
+    invalidate_reference_data("languages")
     return success_response(
         data=LanguageResponse.model_validate(lang),
         message="Language created successfully"
@@ -59,7 +62,7 @@ async def create_language(
 
 @router.put("/{language_id}", response_model=SuccessResponse)
 @handle_errors
-async def update_language(
+def update_language(
     language_id: int,
     language: LanguageUpdate,
     current_user: User = Depends(get_current_user),
@@ -69,6 +72,7 @@ async def update_language(
     repo = LanguageRepository(db)
     lang = repo.update_language(language_id, language.name)
     validate_entity_exists(lang, "Language")
+    invalidate_reference_data("languages")
     return success_response(
         data=LanguageResponse.model_validate(lang),
         message="Language updated successfully"
@@ -76,7 +80,7 @@ async def update_language(
 
 @router.delete("/{language_id}", response_model=SuccessResponse)
 @handle_errors
-async def delete_language(
+def delete_language(
     language_id: int,
     db: Session = Depends(get_db)
 ):
@@ -85,6 +89,7 @@ async def delete_language(
     success = repo.delete(language_id)
     if not success:
         raise not_found_error("Language not found")
+    invalidate_reference_data("languages")
     return success_response(
         data=None,
         message="Language deleted successfully"
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
+from ..core.config import settings
 from ..db.database import get_db
 from ..repositories.location_repository import LocationRepository
 from ..schemas.profile import LocationResponse, LocationCreate, LocationUpdate
@@ -10,6 +11,7 @@ from ..utils.permissions import is_admin_user
 from typing import List, Optional
 from ..models.user import User
 from ..utils.auth import get_current_user, get_current_user_optional
+from ..utils.reference_cache import cached_reference_response, invalidate_reference_data
 import os
 
 router = APIRouter(prefix="/locations", tags=["Locations"])
@@ -23,22 +25,22 @@ async def get_locations(
 ):
     """Get all locations"""
     repo = LocationRepository(db)
-    locations = repo.get_all_locations()
-    base_url = str(request.base_url).rstrip("/") if request else ""
-    result = []
-    for loc in locations:
-        loc_data = LocationResponse.model_validate(loc).dict()
-        if loc_data["flag_image"] and not loc_data["flag_image"].startswith("http"):
-            loc_data["flag_image"] = f"{base_url}{loc_data['flag_image']}"
-        result.append(loc_data)
-    return success_response(
-        data=result,
-        message="Locations retrieved successfully"
-    )
+    base_url = settings.BASE_URL.rstrip("/")
+
+    def build() -> bytes:
+        result = []
+        for loc in repo.get_all_locations():
+            loc_data = LocationResponse.model_validate(loc).dict()
+            if loc_data["flag_image"] and not loc_data["flag_image"].startswith("http"):
+                loc_data["flag_image"] = f"{base_url}{loc_data['flag_image']}"
+            result.append(loc_data)
+        return SuccessResponse(msg="Locations retrieved successfully", data=result).model_dump_json().encode()
+
+    return await cached_reference_response(request, ("locations",), build)
 
 @router.get("/{location_id}", response_model=SuccessResponse, tags=["Locations"])
 @handle_errors
-async def get_location(
+def get_location(
     location_id: int,
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
@@ -54,7 +56,7 @@ async def get_location(
 
 @router.post("/", response_model=SuccessResponse, tags=["Locations"])
 @handle_errors
-async def create_location(
+def create_location(
     location_data: LocationCreate = None,
     name: str = Form(None),
     code: str = Form(None),
@@ -80,7 +82,7 @@ async def create_location(
             filename = f"{name}_{flag_image.filename}"
             file_path = os.path.join(upload_dir, filename)
             with open(file_path, "wb") as buffer:
-                content = await flag_image.read()
+                content = flag_image.file.read()
                 buffer.write(content)
             normalized_path = file_path.replace('\\', '/')
             flag_image_path = f"/{normalized_path}"
@@ -97,7 +99,7 @@ async def create_location(
     if location_data["flag_image"]:
         base_url = str(request.base_url).rstrip("/")
         location_data["flag_image"] = f"{base_url}{location_data['flag_image']}"
-    
+    invalidate_reference_data("locations")
     return success_response(
         data=location_data,
         message="Location created successfully"
@@ -105,7 +107,7 @@ async def create_location(
 
 @router.patch("/{location_id}", response_model=SuccessResponse, tags=["Locations"])
 @handle_errors
-async def update_location(
+def update_location(
     location_id: int,
     data: LocationUpdate,
     current_user: User = Depends(get_current_user),
@@ -117,6 +119,7 @@ async def update_location(
     repo = LocationRepository(db)
     updated = repo.update_location(location_id, data)
     validate_entity_exists(updated, "Location")
+    invalidate_reference_data("locations")
     return success_response(
         data=updated,
         message="Location updated successfully"
@@ -124,7 +127,7 @@ async def update_location(
 
 @router.delete("/{location_id}", response_model=SuccessResponse, tags=["Locations"])
 @handle_errors
-async def delete_location(
+def delete_location(
     location_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -135,6 +138,7 @@ async def delete_location(
     repo = LocationRepository(db)
     if not repo.delete_location(location_id):
         raise not_found_error("Location not found")
+    invalidate_reference_data("locations")
     return success_response(
         data=None,
         message="Location deleted successfully"
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.db.database import get_db
+from app.db.offload import AsyncRepository
 from app.utils.auth import get_current_user
 from app.models.user import User
 from app.repositories.notification_repository import NotificationRepository
@@ -26,7 +27,7 @@ def get_user_id(user) -> int:
 
 
 @router.get("/applications", response_model=NotificationListResponse)
-async def get_applications(
+def get_applications(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user: User = Depends(get_current_user),
@@ -95,7 +96,7 @@ async def get_applications(
 
 
 @router.get("/my-proposals", response_model=NotificationListResponse)
-async def get_my_proposals(
+def get_my_proposals(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user: User = Depends(get_current_user),
@@ -160,37 +161,23 @@ async def get_my_proposals(
 
 
 @router.get("/counts", response_model=NotificationCountResponse)
-async def get_notification_counts(
+def get_notification_counts(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get unread notification counts for Applications and My Proposals"""
     repository = NotificationRepository(db)
-    
-    applications_unread = repository.get_unread_count(
-        user_id=get_user_id(current_user),
-        notification_type=NotificationType.PROPOSAL_RECEIVED
-    )
-    
-    my_proposals_unread = repository.get_unread_count(
-        user_id=get_user_id(current_user),
-        notification_type=NotificationType.PROPOSAL_ACCEPTED
-    )
-    
-    chat_messages_unread = repository.get_unread_count(
-        user_id=get_user_id(current_user),
-        notification_type=NotificationType.MESSAGE_RECEIVED
-    )
+    unread_counts = repository.get_unread_counts(get_user_id(current_user))
     
     return NotificationCountResponse(
-        applications_unread=applications_unread,
-        my_proposals_unread=my_proposals_unread,
-        chat_messages_unread=chat_messages_unread
+        applications_unread=unread_counts.get(NotificationType.PROPOSAL_RECEIVED.value, 0),
+        my_proposals_unread=unread_counts.get(NotificationType.PROPOSAL_ACCEPTED.value, 0),
+        chat_messages_unread=unread_counts.get(NotificationType.MESSAGE_RECEIVED.value, 0)
     )
 
 
 @router.get("/chat-messages", response_model=NotificationListResponse)
-async def get_chat_messages(
+def get_chat_messages(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user: User = Depends(get_current_user),
@@ -257,6 +244,28 @@ async def get_chat_messages(
     )
 
 
+async def _send_cleared_counts(user_id: int, cleared: dict):
+    """Push one negative delta per notification type that was marked read"""
+    from app.utils.websocket_manager import manager
+    for notification_type, count in cleared.items():
+        await manager.send_unread_update(user_id, notification_type=notification_type, delta=-count)
+
+
+@router.patch("/read-all", status_code=status.HTTP_200_OK)
+async def mark_all_notifications_as_read(
+    type: Optional[NotificationType] = Query(None, description="Only mark notifications of this type"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark all unread notifications as read, optionally only those of one type"""
+    repository = AsyncRepository(NotificationRepository(db))
+    cleared = await repository.mark_all_as_read(get_user_id(current_user), notification_type=type)
+    
+    await _send_cleared_counts(get_user_id(current_user), cleared)
+    
+    return {"message": "Notifications marked as read", "marked_count": sum(cleared.values())}
+
+
 @router.patch("/{notification_id}/read", status_code=status.HTTP_200_OK)
 async def mark_notification_as_read(
     notification_id: int,
@@ -264,13 +273,15 @@ async def mark_notification_as_read(
     db: Session = Depends(get_db)
 ):
     """Mark a notification as read"""
-    repository = NotificationRepository(db)
-    success = repository.mark_as_read(notification_id, get_user_id(current_user))
+    repository = AsyncRepository(NotificationRepository(db))
+    cleared = await repository.mark_as_read(notification_id, get_user_id(current_user))
     
-    if not success:
+    if cleared is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
     
+    await _send_cleared_counts(get_user_id(current_user), cleared)
+    
     return {"message": "Notification marked as read"}
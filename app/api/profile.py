@@ -4,7 +4,9 @@ from sqlalchemy.orm import Session
 from ..db.database import get_db
 from ..models.user import User
 from ..models.language import Language
-from ..utils.auth import get_current_user
+from ..utils.auth import get_current_user, get_current_user_profile
+from ..utils.auth_cache import invalidate_auth_user
+from ..utils.profile_cache import get_full_profile, invalidate_profile
 from ..utils.decorators import handle_errors
 from ..utils.response_helpers import (
     success_response,
@@ -38,17 +40,15 @@ router = APIRouter(prefix="/profile", tags=[])
 
 @router.get("/user/{user_id}", response_model=SuccessResponse, tags=["Account"])
 @handle_errors
-async def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
+def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
     """
     Get user profile by ID (public endpoint)
     
     - **user_id**: ID of the user to retrieve
     """
-    repo = UserRepository(db)
-    user = repo.get_by_id(user_id)
-    validate_entity_exists(user, "User")
+    user_response = get_full_profile(db, user_id)
+    validate_entity_exists(user_response, "User")
     
-    user_response = UserFullResponse.model_validate(user)
     return success_response(
         data=user_response,
         message="User retrieved successfully"
@@ -56,7 +56,7 @@ async def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
 
 @router.get("/educations", response_model=SuccessResponse, tags=["Profile Education"])
 @handle_errors
-async def get_my_educations(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_my_educations(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get all educations for current user"""
     repo = EducationRepository(db)
     educations = repo.get_educations_by_user(current_user.id)
@@ -68,7 +68,7 @@ async def get_my_educations(current_user: User = Depends(get_current_user), db:
 
 @router.get("/educations/{education_id}", response_model=SuccessResponse, tags=["Profile Education"])
 @handle_errors
-async def get_education_by_id(education_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_education_by_id(education_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get education by ID"""
     repo = EducationRepository(db)
     education = repo.get_education_by_id(education_id)
@@ -82,11 +82,12 @@ async def get_education_by_id(education_id: int, current_user: User = Depends(ge
 
 @router.post("/educations", response_model=SuccessResponse, tags=["Profile Education"])
 @handle_errors
-async def add_education(education: EducationCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def add_education(education: EducationCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Add new education"""
     repo = EducationRepository(db)
     created_education = repo.create_education(current_user.id, education)
     education_response = EducationResponse.model_validate(created_education)
+    invalidate_profile(current_user.id)
     return success_response(
         data=education_response,
         message="Education added successfully"
@@ -94,13 +95,14 @@ async def add_education(education: EducationCreate, current_user: User = Depends
 
 @router.patch("/educations/{education_id}", response_model=SuccessResponse, tags=["Profile Education"])
 @handle_errors
-async def update_education(education_id: int, education: EducationUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_education(education_id: int, education: EducationUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Update education"""
     repo = EducationRepository(db)
     updated = repo.update_education(education_id, education.dict(exclude_unset=True))
     validate_entity_exists(updated, "Education")
     validate_ownership(updated.user_id, current_user.id, "Education")
     education_response = EducationResponse.model_validate(updated)
+    invalidate_profile(current_user.id)
     return success_response(
         data=education_response,
         message="Education updated successfully"
@@ -108,11 +110,12 @@ async def update_education(education_id: int, education: EducationUpdate, curren
 
 @router.delete("/educations/{education_id}", response_model=SuccessResponse, tags=["Profile Education"])
 @handle_errors
-async def delete_education(education_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_education(education_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete education"""
     repo = EducationRepository(db)
     if not repo.delete_education(education_id, current_user.id):
         raise not_found_error("Education not found")
+    invalidate_profile(current_user.id)
     return success_response(
         data=None,
         message="Education deleted successfully"
@@ -120,7 +123,7 @@ async def delete_education(education_id: int, current_user: User = Depends(get_c
 
 @router.get("/experiences", response_model=SuccessResponse, tags=["Profile Experience"])
 @handle_errors
-async def get_my_experiences(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_my_experiences(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get all experiences for current user"""
     repo = ExperienceRepository(db)
     experiences = repo.get_experiences_by_user(current_user.id)
@@ -132,7 +135,7 @@ async def get_my_experiences(current_user: User = Depends(get_current_user), db:
 
 @router.get("/experiences/{id}", response_model=SuccessResponse, tags=["Profile Experience"])
 @handle_errors
-async def get_experience_by_id(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_experience_by_id(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get experience by ID"""
     repo = ExperienceRepository(db)
     experience = repo.get_experience_by_id(id)
@@ -146,7 +149,7 @@ async def get_experience_by_id(id: int, current_user: User = Depends(get_current
 
 @router.post("/experiences", response_model=SuccessResponse, tags=["Profile Experience"])
 @handle_errors
-async def add_experience(data: ExperienceCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def add_experience(data: ExperienceCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Add new experience"""
     from ..core.logging_config import logger
     from fastapi import HTTPException
@@ -157,6 +160,7 @@ async def add_experience(data: ExperienceCreate, current_user: User = Depends(ge
         if not created_experience:
             raise HTTPException(status_code=500, detail="Failed to create experience")
         experience_response = ExperienceResponse.model_validate(created_experience)
+        invalidate_profile(current_user.id)
         return success_response(
             data=experience_response,
             message="Experience added successfully"
@@ -169,7 +173,7 @@ async def add_experience(data: ExperienceCreate, current_user: User = Depends(ge
 
 @router.patch("/experiences/{id}", response_model=SuccessResponse, tags=["Profile Experience"])
 @handle_errors
-async def update_experience(id: int, data: ExperienceUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_experience(id: int, data: ExperienceUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Update experience"""
     repo = ExperienceRepository(db)
     if hasattr(data, 'model_dump'):
@@ -180,6 +184,7 @@ async def update_experience(id: int, data: ExperienceUpdate, current_user: User
     validate_entity_exists(updated, "Experience")
     validate_ownership(updated.user_id, current_user.id, "Experience")
     experience_response = ExperienceResponse.model_validate(updated)
+    invalidate_profile(current_user.id)
     return success_response(
         data=experience_response,
         message="Experience updated successfully"
@@ -187,11 +192,12 @@ async def update_experience(id: int, data: ExperienceUpdate, current_user: User
 
 @router.delete("/experiences/{id}", response_model=SuccessResponse, tags=["Profile Experience"])
 @handle_errors
-async def delete_experience(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_experience(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete experience"""
     repo = ExperienceRepository(db)
     if not repo.delete_experience(id, current_user.id):
         raise not_found_error("Experience not found")
+    invalidate_profile(current_user.id)
     return success_response(
         data=None,
         message="Experience deleted successfully"
@@ -199,7 +205,7 @@ async def delete_experience(id: int, current_user: User = Depends(get_current_us
 
 @router.get("/certifications", response_model=SuccessResponse, tags=["Profile Certifications"])
 @handle_errors
-async def get_my_certifications(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_my_certifications(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get all certifications for current user"""
     repo = CertificationRepository(db)
     certifications = repo.get_certifications_by_user(current_user.id)
@@ -211,7 +217,7 @@ async def get_my_certifications(current_user: User = Depends(get_current_user),
 
 @router.get("/certifications/{id}", response_model=SuccessResponse, tags=["Profile Certifications"])
 @handle_errors
-async def get_certification_by_id(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_certification_by_id(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get certification by ID"""
     repo = CertificationRepository(db)
     certification = repo.get_certification_by_id(id)
@@ -225,11 +231,12 @@ async def get_certification_by_id(id: int, current_user: User = Depends(get_curr
 
 @router.post("/certifications", response_model=SuccessResponse, tags=["Profile Certifications"])
 @handle_errors
-async def add_certification(data: CertificationCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def add_certification(data: CertificationCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Add new certification"""
     repo = CertificationRepository(db)
     created_certification = repo.create_certification(current_user.id, data)
     certification_response = CertificationResponse.model_validate(created_certification)
+    invalidate_profile(current_user.id)
     return success_response(
         data=certification_response,
         message="Certification added successfully"
@@ -237,13 +244,14 @@ async def add_certification(data: CertificationCreate, current_user: User = Depe
 
 @router.patch("/certifications/{id}", response_model=SuccessResponse, tags=["Profile Certifications"])
 @handle_errors
-async def update_certification(id: int, data: CertificationUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_certification(id: int, data: CertificationUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Update certification"""
     repo = CertificationRepository(db)
     updated = repo.update_certification(id, data.dict(exclude_unset=True))
     validate_entity_exists(updated, "Certification")
     validate_ownership(updated.user_id, current_user.id, "Certification")
     certification_response = CertificationResponse.model_validate(updated)
+    invalidate_profile(current_user.id)
     return success_response(
         data=certification_response,
         message="Certification updated successfully"
@@ -251,11 +259,12 @@ async def update_certification(id: int, data: CertificationUpdate, current_user:
 
 @router.delete("/certifications/{id}", response_model=SuccessResponse, tags=["Profile Certifications"])
 @handle_errors
-async def delete_certification(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_certification(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete certification"""
     repo = CertificationRepository(db)
     if not repo.delete_certification(id, current_user.id):
         raise not_found_error("Certification not found")
+    invalidate_profile(current_user.id)
     return success_response(
         data=None,
         message="Certification deleted successfully"
@@ -263,7 +272,7 @@ async def delete_certification(id: int, current_user: User = Depends(get_current
 
 @router.get("/projects", response_model=SuccessResponse, tags=["Profile Projects"])
 @handle_errors
-async def get_my_projects(
+def get_my_projects(
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
@@ -288,7 +297,7 @@ async def get_my_projects(
 
 @router.get("/projects/{id}", response_model=SuccessResponse, tags=["Profile Projects"])
 @handle_errors
-async def get_project_by_id(
+def get_project_by_id(
     id: int, 
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
@@ -315,7 +324,7 @@ async def get_project_by_id(
 
 @router.post("/projects", response_model=SuccessResponse, tags=["Profile Projects"])
 @handle_errors
-async def add_project(
+def add_project(
     request: Request,
     project_name: str = Form(...),
     role: str = Form(None),
@@ -378,7 +387,7 @@ async def add_project(
                         filename = f"{project.id}_{img.filename}"
                         file_path = os.path.join(upload_dir, filename)
                         with open(file_path, "wb") as buffer:
-                            content = await img.read()
+                            content = img.file.read()
                             buffer.write(content)
                         normalized_path = file_path.replace('\\', '/')
                         rel_path = f"/{normalized_path}"
@@ -409,6 +418,7 @@ async def add_project(
                 if img.image and not img.image.startswith("http"):
                     img.image = f"{base_url}{img.image}"
 
+        invalidate_profile(current_user.id)
         return success_response(
             data=project_response,
             message="Project added successfully"
@@ -419,7 +429,7 @@ async def add_project(
 
 @router.patch("/projects/{id}", response_model=SuccessResponse, tags=["Profile Projects"])
 @handle_errors
-async def update_project(
+def update_project(
     id: int, 
     project_name: str = Form(None),
     role: str = Form(None),
@@ -466,7 +476,7 @@ async def update_project(
                 filename = f"{project.id}_{img.filename}"
                 file_path = os.path.join(upload_dir, filename)
                 with open(file_path, "wb") as buffer:
-                    content = await img.read()
+                    content = img.file.read()
                     buffer.write(content)
                 normalized_path = file_path.replace('\\', '/')
                 rel_path = f"/{normalized_path}"
@@ -485,6 +495,7 @@ async def update_project(
         if img.image and not img.image.startswith("http"):
             img.image = f"{base_url}{img.image}"
     
+    invalidate_profile(current_user.id)
     return success_response(
         data=project_response,
         message="Project updated successfully"
@@ -492,11 +503,12 @@ async def update_project(
 
 @router.delete("/projects/{id}", response_model=SuccessResponse, tags=["Profile Projects"])
 @handle_errors
-async def delete_project(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_project(id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete project"""
     repo = ProjectRepository(db)
     if not repo.delete_project(id, current_user.id):
         raise not_found_error("Project not found")
+    invalidate_profile(current_user.id)
     return success_response(
         data=None,
         message="Project deleted successfully"
@@ -504,7 +516,7 @@ async def delete_project(id: int, current_user: User = Depends(get_current_user)
 
 @router.patch("/avatar", response_model=SuccessResponse, tags=["Profile Avatar Upload and Update"])
 @handle_errors
-async def upload_avatar(file: UploadFile = File(...), current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def upload_avatar(file: UploadFile = File(...), current_user: User = Depends(get_current_user_profile), db: Session = Depends(get_db)):
     """Upload user avatar"""
     if not file.content_type.startswith('image/'):
         raise bad_request_error("Only images allowed")
@@ -512,11 +524,13 @@ async def upload_avatar(file: UploadFile = File(...), current_user: User = Depen
     os.makedirs(upload_dir, exist_ok=True)
     file_path = os.path.join(upload_dir, f"{current_user.id}_{file.filename}")
     with open(file_path, "wb") as buffer:
-        content = await file.read()
+        content = file.file.read()
         buffer.write(content)
     normalized_path = file_path.replace('\\', '/')
     current_user.avatar_url = f"/{normalized_path}"
     db.commit()
+    invalidate_auth_user(current_user.id)
+    invalidate_profile(current_user.id)
     db.refresh(current_user)
     user_response = UserFullResponse.model_validate(current_user)
     return success_response(
@@ -526,7 +540,7 @@ async def upload_avatar(file: UploadFile = File(...), current_user: User = Depen
 
 @router.post("/language", response_model=SuccessResponse, tags=["Profile Language"])
 @handle_errors
-async def update_user_language(data: UserLanguageUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_user_language(data: UserLanguageUpdate, current_user: User = Depends(get_current_user_profile), db: Session = Depends(get_db)):
     """Update user language"""
     language_repo = LanguageRepository(db)
     language = language_repo.get(data.language_id)
@@ -534,6 +548,8 @@ async def update_user_language(data: UserLanguageUpdate, current_user: User = De
 
     current_user.language_id = data.language_id
     db.commit()
+    invalidate_auth_user(current_user.id)
+    invalidate_profile(current_user.id)
     db.refresh(current_user)
 
     user_response = UserFullResponse.model_validate(current_user)
@@ -544,7 +560,7 @@ async def update_user_language(data: UserLanguageUpdate, current_user: User = De
 
 @router.get("/categories", response_model=SuccessResponse, tags=["Profile Categories"])
 @handle_errors
-async def get_categories(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_categories(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get all main categories"""
     repo = CategoryRepository(db)
     categories = repo.get_categories_only_with_filter(is_active=True)
@@ -556,7 +572,7 @@ async def get_categories(current_user: User = Depends(get_current_user), db: Ses
 
 @router.get("/categories/{category_id}/subcategories", response_model=SuccessResponse, tags=["Profile Categories"])
 @handle_errors
-async def get_subcategories(category_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_subcategories(category_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get subcategories for a specific main category"""
     repo = CategoryRepository(db)
     subcategories = repo.get_subcategories_with_filter(category_id, is_active=True)
@@ -568,7 +584,7 @@ async def get_subcategories(category_id: int, current_user: User = Depends(get_c
 
 @router.patch("/categories", response_model=SuccessResponse, tags=["Profile Categories"])
 @handle_errors
-async def update_user_categories(
+def update_user_categories(
     main_category_id: Optional[int] = None,
     sub_category_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
@@ -591,9 +607,10 @@ async def update_user_categories(
 
 @router.get("/my-categories", response_model=SuccessResponse, tags=["Profile Categories"])
 @handle_errors
-async def get_my_categories(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_my_categories(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get current user's categories"""
-    user_response = UserFullResponse.model_validate(current_user)
+    user_response = get_full_profile(db, current_user.id)
+    validate_entity_exists(user_response, "User")
     categories_data = {
         "main_category": user_response.main_category,
         "sub_category": user_response.sub_category
@@ -13,7 +13,6 @@ from app.utils.response_helpers import (
     validate_entity_exists
 )
 from app.models.user import User
-from app.models.user_device_token import UserDeviceToken
 from app.repositories.proposal_repository import ProposalRepository
 from app.repositories.proposal_attachment_repository import ProposalAttachmentRepository
 from app.repositories.gig_job_repository import GigJobRepository
@@ -28,7 +27,8 @@ from app.schemas.proposal import (
 )
 from app.repositories.full_time_job_repository import FullTimeJobRepository
 from app.pagination import PaginationParams, create_pagination_response
-from app.utils.firebase_notifications import send_push_notification_multiple
+from app.utils.push_dispatcher import push_dispatcher
+from app.utils.device_tokens import get_user_device_tokens
 import json
 import os
 from typing import List, Optional
@@ -46,7 +46,7 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.get("/", response_model=ProposalListResponse)
 @handle_errors
-async def get_all_proposals(
+def get_all_proposals(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     db: Session = Depends(get_db),
@@ -75,37 +75,6 @@ async def get_all_proposals(
     )
 
 
-def get_user_device_tokens(db: Session, user_id: int) -> List[str]:
-    """Get all active device tokens for a user"""
-    from sqlalchemy import text
-    try:
-        result = db.execute(text("""
-            SELECT device_token 
-            FROM user_device_tokens 
-            WHERE user_id = :user_id 
-            AND is_active = true
-            AND LOWER(device_type::text) IN ('ios', 'android')
-        """), {"user_id": user_id})
-        return [row[0] for row in result if row[0]]
-    except Exception as e:
-        print(f"DEBUG: Error getting device tokens: {str(e)}")
-        try:
-            device_tokens = db.query(UserDeviceToken).filter(
-                UserDeviceToken.user_id == user_id,
-                UserDeviceToken.is_active == True
-            ).all()
-            valid_tokens = []
-            for token in device_tokens:
-                try:
-                    if token.device_token:
-                        valid_tokens.append(token.device_token)
-                except (LookupError, KeyError, ValueError):
-                    continue
-            return valid_tokens
-        except Exception:
-            return []
-
-
 def send_proposal_notification(
     db: Session,
     recipient_user_id: int,
@@ -113,28 +82,13 @@ def send_proposal_notification(
     body: str,
     data: dict
 ):
-    """Send push notification to user's devices"""
+    """Queue a push notification for the user's devices (sent by the background push dispatcher)"""
     try:
         device_tokens = get_user_device_tokens(db, recipient_user_id)
         print(f"DEBUG: Found {len(device_tokens)} device token(s) for user_id={recipient_user_id}")
         if device_tokens:
-            print(f"DEBUG: Sending notification - Title: {title}, Body: {body}")
-            try:
-                result = send_push_notification_multiple(
-                    device_tokens=device_tokens,
-                    title=title,
-                    body=body,
-                    data={str(k): str(v) for k, v in data.items()}
-                )
-                skipped = result.get('skipped_count', 0)
-                if skipped > 0:
-                    print(f"DEBUG: Notification result - Success: {result.get('success_count', 0)}, Failed: {result.get('failure_count', 0)}, Skipped: {skipped}")
-                else:
-                    print(f"DEBUG: Notification result - Success: {result.get('success_count', 0)}, Failed: {result.get('failure_count', 0)}")
-            except FileNotFoundError as fe:
-                print(f"WARNING: Firebase service account file not found. Push notification skipped, but notification is saved to database: {str(fe)}")
-            except Exception as fe:
-                print(f"WARNING: Failed to send push notification (notification saved to database): {str(fe)}")
+            push_dispatcher.enqueue(device_tokens, title=title, body=body, data=data)
+            print(f"DEBUG: Queued notification - Title: {title}, Body: {body}")
         else:
             print(f"DEBUG: No device tokens found for user_id={recipient_user_id}")
     except Exception as e:
@@ -175,7 +129,7 @@ def save_uploaded_files(files: List[UploadFile], user_id: int, proposal_id: int)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_proposal(
+def create_proposal(
     cover_letter: str = Form(..., min_length=10, description="Cover letter content"),
     delivery_time: Optional[int] = Form(None, ge=1, description="Delivery time in days"),
     offer_amount: Optional[float] = Form(None, ge=0, description="Offer amount in currency"),
@@ -347,6 +301,7 @@ async def create_proposal(
                 job_type="gig" if gig_job_id else "full_time",
                 applicant_id=user_id
             )
+            manager.push_unread_update(job_owner_id, notification_type=NotificationType.PROPOSAL_RECEIVED.value, delta=1)
             
             send_proposal_notification(
                 db=db,
@@ -403,7 +358,7 @@ async def create_proposal(
 
 
 @router.get("/my-proposals-gig-job", response_model=ProposalListResponse)
-async def get_my_gig_job_proposals(
+def get_my_gig_job_proposals(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     db: Session = Depends(get_db),
@@ -430,7 +385,7 @@ async def get_my_gig_job_proposals(
 
 
 @router.get("/my-proposals-full-time-jobs", response_model=ProposalListResponse)
-async def get_my_full_time_job_proposals(
+def get_my_full_time_job_proposals(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     db: Session = Depends(get_db),
@@ -458,7 +413,7 @@ async def get_my_full_time_job_proposals(
 
 @router.get("/{proposal_id}", response_model=ProposalResponse)
 @handle_errors
-async def get_proposal_by_id(
+def get_proposal_by_id(
     proposal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -516,6 +471,7 @@ async def get_proposal_by_id(
                 
                 from app.repositories.notification_repository import NotificationRepository
                 from app.models.notification import NotificationType
+                from app.utils.websocket_manager import manager
                 notification_repo = NotificationRepository(db)
                 notification_repo.create(
                     type=NotificationType.PROPOSAL_ACCEPTED,
@@ -526,6 +482,7 @@ async def get_proposal_by_id(
                     job_id=proposal.gig_job_id or proposal.full_time_job_id,
                     job_type="gig" if proposal.gig_job_id else "full_time"
                 )
+                manager.push_unread_update(proposal_sender_id, notification_type=NotificationType.PROPOSAL_ACCEPTED.value, delta=1)
                 
                 send_proposal_notification(
                     db=db,
@@ -549,7 +506,7 @@ async def get_proposal_by_id(
 
 @router.get("/gig-job/{gig_job_id}", response_model=ProposalListResponse)
 @handle_errors
-async def get_gig_job_proposals(
+def get_gig_job_proposals(
     gig_job_id: int,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -586,7 +543,7 @@ async def get_gig_job_proposals(
 
 @router.get("/full-time-job/{full_time_job_id}", response_model=ProposalListResponse)
 @handle_errors
-async def get_full_time_job_proposals(
+def get_full_time_job_proposals(
     full_time_job_id: int,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -623,7 +580,7 @@ async def get_full_time_job_proposals(
 
 @router.put("/{proposal_id}")
 @handle_errors
-async def update_proposal(
+def update_proposal(
     proposal_id: int,
     cover_letter: Optional[str] = Form(None, min_length=10, description="Cover letter content"),
     delivery_time: Optional[int] = Form(None, ge=1, description="Delivery time in days"),
@@ -723,7 +680,7 @@ async def update_proposal(
 
 @router.delete("/{proposal_id}")
 @handle_errors
-async def delete_proposal(
+def delete_proposal(
     proposal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -768,7 +725,7 @@ async def delete_proposal(
 
 
 @router.get("/{proposal_id}/mark-as-read", status_code=status.HTTP_200_OK)
-async def mark_proposal_as_read(
+def mark_proposal_as_read(
     proposal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -860,6 +817,7 @@ async def mark_proposal_as_read(
             
             from app.repositories.notification_repository import NotificationRepository
             from app.models.notification import NotificationType
+            from app.utils.websocket_manager import manager
             notification_repo = NotificationRepository(db)
             notification_repo.create(
                 type=NotificationType.PROPOSAL_ACCEPTED,
@@ -870,6 +828,7 @@ async def mark_proposal_as_read(
                 job_id=proposal.gig_job_id or proposal.full_time_job_id,
                 job_type="gig" if proposal.gig_job_id else "full_time"
             )
+            manager.push_unread_update(proposal_sender_id, notification_type=NotificationType.PROPOSAL_ACCEPTED.value, delta=1)
             
             print(f"DEBUG: Sending notification to proposal sender (user_id={proposal_sender_id})")
             send_proposal_notification(
@@ -905,7 +864,7 @@ async def mark_proposal_as_read(
 
 
 @router.get("/mark-all-as-read", status_code=status.HTTP_200_OK)
-async def mark_all_proposals_as_read(
+def mark_all_proposals_as_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -999,6 +958,7 @@ async def mark_all_proposals_as_read(
                         
                         from app.repositories.notification_repository import NotificationRepository
                         from app.models.notification import NotificationType
+                        from app.utils.websocket_manager import manager
                         notification_repo = NotificationRepository(db)
                         notification_repo.create(
                             type=NotificationType.PROPOSAL_ACCEPTED,
@@ -1009,6 +969,7 @@ async def mark_all_proposals_as_read(
                             job_id=proposal.gig_job_id or proposal.full_time_job_id,
                             job_type="gig" if proposal.gig_job_id else "full_time"
                         )
+                        manager.push_unread_update(proposal_sender_id, notification_type=NotificationType.PROPOSAL_ACCEPTED.value, delta=1)
                         
                         send_proposal_notification(
                             db=db,
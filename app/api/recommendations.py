@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db.database import get_db
+from app.db.offload import run_db
+from app.models.user import User
+from app.repositories.recommendation_repository import RecommendationRepository
+from app.schemas.common import SuccessResponse
+from app.schemas.recommendation import JobRecommendationResponse
+from app.utils.auth import get_current_user
+from app.utils.decorators import handle_errors
+from app.utils.response_helpers import success_response
+from app.pagination import PaginationParams
+
+router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
+
+
+@router.get("/", response_model=SuccessResponse)
+@handle_errors
+async def get_my_recommendations(
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(20, ge=1, le=50, description="Page size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Best open gig and full-time jobs for the current user, ranked by skill similarity.
+
+    Served from the precomputed job_recommendations table; jobs that closed since
+    the list was computed and the user's own postings are skipped.
+    """
+    pagination = PaginationParams(page=page, size=size)
+    recommendations = await run_db(
+        RecommendationRepository(db).get_for_user,
+        current_user.id,
+        pagination.limit,
+        pagination.offset
+    )
+    return success_response(
+        data=[JobRecommendationResponse(**recommendation) for recommendation in recommendations],
+        message="Recommendations retrieved successfully"
+    )
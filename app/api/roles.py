@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from typing import List
 from ..db.database import get_db
@@ -6,6 +6,7 @@ from ..repositories.role_repository import RoleRepository
 from ..utils.decorators import handle_errors
 from ..utils.response_helpers import success_response, not_found_error, bad_request_error, validate_entity_exists
 from ..schemas.common import SuccessResponse
+from ..utils.reference_cache import cached_reference_response, invalidate_reference_data
 from pydantic import BaseModel
 
 class RoleCreate(BaseModel):
@@ -22,13 +23,14 @@ router = APIRouter(prefix='/roles', tags=['Roles'])
 
 @router.post('/', response_model=SuccessResponse)
 @handle_errors
-async def create_role(role_data: RoleCreate, db: Session = Depends(get_db)):
+def create_role(role_data: RoleCreate, db: Session = Depends(get_db)):
     """Create a new role"""
     repo = RoleRepository(db)
     existing = repo.get_role_by_name(role_data.name)
     if existing:
         raise bad_request_error('Role already exists')
     role = repo.create_role(role_data.name)
+    invalidate_reference_data("roles")
     role_response = RoleResponse.model_validate(role)
     return success_response(
         data=role_response,
@@ -37,19 +39,19 @@ async def create_role(role_data: RoleCreate, db: Session = Depends(get_db)):
 
 @router.get('/', response_model=SuccessResponse)
 @handle_errors
-async def get_roles(db: Session = Depends(get_db)):
+async def get_roles(request: Request, db: Session = Depends(get_db)):
     """Get all roles"""
     repo = RoleRepository(db)
-    roles = repo.get_all_roles()
-    role_responses = [RoleResponse.model_validate(role) for role in roles]
-    return success_response(
-        data=role_responses,
-        message="Roles retrieved successfully"
-    )
+
+    def build() -> bytes:
+        role_responses = [RoleResponse.model_validate(role) for role in repo.get_all_roles()]
+        return SuccessResponse(msg="Roles retrieved successfully", data=role_responses).model_dump_json().encode()
+
+    return await cached_reference_response(request, ("roles",), build)
 
 @router.get('/{role_id}', response_model=SuccessResponse)
 @handle_errors
-async def get_role(role_id: int, db: Session = Depends(get_db)):
+def get_role(role_id: int, db: Session = Depends(get_db)):
     """Get role by ID"""
     repo = RoleRepository(db)
     role = repo.get_role_by_id(role_id)
@@ -62,11 +64,12 @@ async def get_role(role_id: int, db: Session = Depends(get_db)):
 
 @router.put('/{role_id}', response_model=SuccessResponse)
 @handle_errors
-async def update_role(role_id: int, role_data: RoleCreate, db: Session = Depends(get_db)):
+def update_role(role_id: int, role_data: RoleCreate, db: Session = Depends(get_db)):
     """Update role"""
     repo = RoleRepository(db)
     role = repo.update_role(role_id, role_data.name)
     validate_entity_exists(role, "Role")
+    invalidate_reference_data("roles")
     role_response = RoleResponse.model_validate(role)
     return success_response(
         data=role_response,
@@ -75,11 +78,12 @@ async def update_role(role_id: int, role_data: RoleCreate, db: Session = Depends
 
 @router.delete('/{role_id}', response_model=SuccessResponse)
 @handle_errors
-async def delete_role(role_id: int, db: Session = Depends(get_db)):
+def delete_role(role_id: int, db: Session = Depends(get_db)):
     """Delete role"""
     repo = RoleRepository(db)
     if not repo.delete_role(role_id):
         raise not_found_error('Role not found')
+    invalidate_reference_data("roles")
     return success_response(
         data=None,
         message="Role deleted successfully"
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from app.db.database import get_db
+from app.db.offload import run_db
 from app.utils.auth import get_current_user
 from app.utils.decorators import handle_errors
 from app.utils.response_helpers import not_found_error, bad_request_error
 from app.models.user import User
 from app.repositories.saved_job_repository import SavedJobRepository
+from app.repositories.job_viewer_context import JobViewerContext
+from app.repositories.gig_job_repository import GigJobRepository
+from app.repositories.full_time_job_repository import FullTimeJobRepository
 from app.schemas.saved_job import (
     SavedJobCreate, 
     SavedJobResponse, 
@@ -18,9 +22,30 @@ from app.pagination import PaginationParams, create_pagination_response
 router = APIRouter(prefix="/saved-jobs", tags=["Saved Jobs"])
 
 
+def _prepare_saved_jobs(db: Session, saved_jobs: list, user_id: int) -> list:
+    """Build detailed saved job responses for one page, preparing its gig and full-time jobs in one batch each"""
+    viewer = JobViewerContext.load(db, user_id)
+    gig_jobs = GigJobRepository(db)._prepare_gig_job_responses(
+        [saved_job.gig_job for saved_job in saved_jobs if saved_job.gig_job], user_id, viewer
+    )
+    full_time_jobs = FullTimeJobRepository(db)._prepare_full_time_job_responses(
+        [saved_job.full_time_job for saved_job in saved_jobs if saved_job.full_time_job], user_id, viewer
+    )
+    gig_jobs_by_id = {job["id"]: job for job in gig_jobs}
+    full_time_jobs_by_id = {job["id"]: job for job in full_time_jobs}
+    return [
+        SavedJobDetailedResponse.from_orm(
+            saved_job,
+            gig_job_data=gig_jobs_by_id.get(saved_job.gig_job_id),
+            full_time_job_data=full_time_jobs_by_id.get(saved_job.full_time_job_id)
+        )
+        for saved_job in saved_jobs
+    ]
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=SavedJobResponse)
 @handle_errors
-async def save_job(
+def save_job(
     saved_job_data: SavedJobCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -57,9 +82,9 @@ async def get_my_saved_jobs(
     repository = SavedJobRepository(db)
     pagination = PaginationParams(page=page, size=size)
     
-    saved_jobs, total = repository.get_user_saved_jobs(current_user.id, pagination)
+    saved_jobs, total = await run_db(repository.get_user_saved_jobs, current_user.id, pagination)
     
-    saved_job_responses = [SavedJobDetailedResponse.from_orm(saved_job, db, current_user.id) for saved_job in saved_jobs]
+    saved_job_responses = await run_db(_prepare_saved_jobs, db, saved_jobs, current_user.id)
     
     return create_pagination_response(
         items=saved_job_responses,
@@ -85,9 +110,9 @@ async def get_my_saved_gig_jobs(
     repository = SavedJobRepository(db)
     pagination = PaginationParams(page=page, size=size)
     
-    saved_jobs, total = repository.get_user_saved_gig_jobs(current_user.id, pagination)
+    saved_jobs, total = await run_db(repository.get_user_saved_gig_jobs, current_user.id, pagination)
     
-    saved_job_responses = [SavedJobDetailedResponse.from_orm(saved_job, db, current_user.id) for saved_job in saved_jobs]
+    saved_job_responses = await run_db(_prepare_saved_jobs, db, saved_jobs, current_user.id)
     
     return create_pagination_response(
         items=saved_job_responses,
@@ -112,9 +137,9 @@ async def get_my_saved_full_time_jobs(
     repository = SavedJobRepository(db)
     pagination = PaginationParams(page=page, size=size)
     
-    saved_jobs, total = repository.get_user_saved_full_time_jobs(current_user.id, pagination)
+    saved_jobs, total = await run_db(repository.get_user_saved_full_time_jobs, current_user.id, pagination)
     
-    saved_job_responses = [SavedJobDetailedResponse.from_orm(saved_job, db, current_user.id) for saved_job in saved_jobs]
+    saved_job_responses = await run_db(_prepare_saved_jobs, db, saved_jobs, current_user.id)
     
     return create_pagination_response(
         items=saved_job_responses,
@@ -125,7 +150,7 @@ async def get_my_saved_full_time_jobs(
 
 @router.delete("/{saved_job_id}")
 @handle_errors
-async def unsave_job(
+def unsave_job(
     saved_job_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -146,7 +171,7 @@ async def unsave_job(
 
 @router.delete("/gig-job/{gig_job_id}")
 @handle_errors
-async def unsave_gig_job(
+def unsave_gig_job(
     gig_job_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -167,7 +192,7 @@ async def unsave_gig_job(
 
 @router.delete("/full-time-job/{full_time_job_id}")
 @handle_errors
-async def unsave_full_time_job(
+def unsave_full_time_job(
     full_time_job_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from ..db.database import get_db
+from ..db.offload import run_db
 from ..repositories.skill_repository import SkillRepository
 from ..schemas.profile import SkillResponse, SkillCreate, SkillUpdate
 from ..schemas.common import SuccessResponse
@@ -10,22 +11,27 @@ from ..utils.permissions import is_admin_user
 from typing import List, Optional
 from ..models.user import User
 from ..utils.auth import get_current_user
+from ..utils.reference_cache import cached_reference_response, invalidate_reference_data
 
 router = APIRouter(prefix="/skills", tags=["Skills"])
 
 @router.get("/", response_model=SuccessResponse, tags=["Skills"])
 @handle_errors
 async def get_skills(
+    request: Request,
     name: Optional[str] = Query(None, description="Filter by name (partial match)"),
     db: Session = Depends(get_db)
 ):
     """Get all skills or filter by name"""
     repo = SkillRepository(db)
-    if name:
-        skills = repo.get_skills_by_name(name)
-    else:
-        skills = repo.get_all_skills()
-    skill_responses = [SkillResponse.model_validate(skill) for skill in skills]
+    if not name:
+        def build() -> bytes:
+            skills = [SkillResponse.model_validate(skill) for skill in repo.get_all_skills()]
+            return SuccessResponse(msg="Skills retrieved successfully", data=skills).model_dump_json().encode()
+        return await cached_reference_response(request, ("skills",), build)
+    def search() -> List[SkillResponse]:
+        return [SkillResponse.model_validate(skill) for skill in repo.get_skills_by_name(name)]
+    skill_responses = await run_db(search)
     return success_response(
         data=skill_responses,
         message="Skills retrieved successfully"
@@ -33,7 +39,7 @@ async def get_skills(
 
 @router.post("/", response_model=SuccessResponse, tags=["Skills"])
 @handle_errors
-async def create_skill(
+def create_skill(
     skill: SkillCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -41,6 +47,7 @@ async def create_skill(
     """Create a new skill"""
     repo = SkillRepository(db)
     created_skill = repo.create_skill(skill.name)
+    invalidate_reference_data("skills")
     skill_response = SkillResponse.model_validate(created_skill)
     return success_response(
         data=skill_response,
@@ -49,7 +56,7 @@ async def create_skill(
 
 @router.patch("/{skill_id}", response_model=SuccessResponse, tags=["Skills"])
 @handle_errors
-async def update_skill(
+def update_skill(
     skill_id: int,
     skill: SkillUpdate,
     current_user: User = Depends(get_current_user),
@@ -61,6 +68,7 @@ async def update_skill(
     repo = SkillRepository(db)
     updated = repo.update_skill(skill_id, skill.name)
     validate_entity_exists(updated, "Skill")
+    invalidate_reference_data("skills")
     skill_response = SkillResponse.model_validate(updated)
     return success_response(
         data=skill_response,
@@ -69,7 +77,7 @@ async def update_skill(
 
 @router.delete("/{skill_id}", response_model=SuccessResponse, tags=["Skills"])
 @handle_errors
-async def delete_skill(
+def delete_skill(
     skill_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -80,6 +88,7 @@ async def delete_skill(
     repo = SkillRepository(db)
     if not repo.delete_skill(skill_id):
         raise not_found_error("Skill not found")
+    invalidate_reference_data("skills")
     return success_response(
         data=None,
         message="Skill deleted successfully"
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db
+from app.db.offload import AsyncRepository
 from app.repositories.team_member_repository import TeamMemberRepository
 from app.repositories.corporate_profile_repository import CorporateProfileRepository
 from app.schemas.team_member import (
@@ -32,7 +33,7 @@ router = APIRouter(prefix="/team-members", tags=["Team Members"])
 
 
 @router.get("/search-users", response_model=List[UserSearchResponse])
-async def search_users(
+def search_users(
     query: str = Query(..., min_length=1, description="Search by name or email"),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -75,17 +76,17 @@ async def invite_team_member(
     current_user: User = Depends(get_current_user)
 ):
     """Invite a new team member to the company"""
-    corporate_profile_repo = CorporateProfileRepository(db)
-    corporate_profile = corporate_profile_repo.get_by_id(corporate_profile_id)
+    corporate_profile_repo = AsyncRepository(CorporateProfileRepository(db))
+    corporate_profile = await corporate_profile_repo.get_by_id(corporate_profile_id)
     validate_entity_exists(corporate_profile, "Corporate profile")
     
     if corporate_profile.user_id != current_user.id:
         raise forbidden_error("Access denied")
     
-    team_member_repo = TeamMemberRepository(db)
+    team_member_repo = AsyncRepository(TeamMemberRepository(db))
     
     try:
-        new_team_member = team_member_repo.create_team_member(
+        new_team_member = await team_member_repo.create_team_member(
             team_member, corporate_profile_id, current_user.id
         )
         
@@ -108,7 +109,7 @@ async def invite_team_member(
 
 @router.get("/list", response_model=TeamMemberListResponse)
 @handle_errors
-async def get_team_members(
+def get_team_members(
     corporate_profile_id: int = Query(..., description="Corporate profile ID"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -158,7 +159,7 @@ async def get_team_members(
 
 @router.put("/{team_member_id}/role", response_model=TeamMemberResponse)
 @handle_errors
-async def update_team_member_role(
+def update_team_member_role(
     team_member_id: int,
     role_update: TeamMemberUpdate,
     corporate_profile_id: int = Query(..., description="Corporate profile ID"),
@@ -201,7 +202,7 @@ async def update_team_member_role(
 
 @router.put("/{team_member_id}/status")
 @handle_errors
-async def update_invitation_status(
+def update_invitation_status(
     team_member_id: int,
     status_update: StatusUpdateRequest,
     db: Session = Depends(get_db),
@@ -230,7 +231,7 @@ async def update_invitation_status(
 
 @router.delete("/{team_member_id}")
 @handle_errors
-async def remove_team_member(
+def remove_team_member(
     team_member_id: int,
     corporate_profile_id: int = Query(..., description="Corporate profile ID"),
     db: Session = Depends(get_db),
@@ -258,7 +259,7 @@ async def remove_team_member(
 
 @router.get("/pending-invitations", response_model=List[TeamMemberResponse])
 @handle_errors
-async def get_pending_invitations(
+def get_pending_invitations(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -296,7 +297,7 @@ async def get_pending_invitations(
 
 @router.get("/accept-invitation")
 @handle_errors
-async def accept_invitation(
+def accept_invitation(
     team_member_id: int = Query(..., description="Team member invitation ID"),
     db: Session = Depends(get_db)
 ):
@@ -341,7 +342,7 @@ async def accept_invitation(
 
 @router.get("/reject-invitation")
 @handle_errors
-async def reject_invitation(
+def reject_invitation(
     team_member_id: int = Query(..., description="Team member invitation ID"),
     db: Session = Depends(get_db)
 ):
@@ -28,7 +28,7 @@ def get_user_email(user) -> str:
 
 
 @router.post("/corporate-profile")
-async def test_corporate_profile(
+def test_corporate_profile(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -124,7 +124,7 @@ async def test_corporate_profile(
 
 
 @router.post("/full-time-job")
-async def test_full_time_job(
+def test_full_time_job(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -232,7 +232,7 @@ async def test_full_time_job(
 
 
 @router.post("/all")
-async def test_all_apis(
+def test_all_apis(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -486,7 +486,7 @@ async def test_all_apis(
 
 
 @router.get("/health")
-async def test_health():
+def test_health():
     """Simple health check endpoint - no authentication required"""
     return {
         "status": "healthy",
@@ -5,6 +5,8 @@ from typing import List, Optional
 from ..db.database import get_db
 from ..models.user import User
 from ..utils.auth import get_current_user
+from ..utils.profile_cache import invalidate_profile
+from ..utils.job_recommender import recommendation_updater
 from ..repositories.skill_repository import SkillRepository
 from ..schemas.profile import UserSkillResponse, UserSkillCreate, UserSkillCreateWithoutUser, UserSkillCreateBySkillName, UserSkillCreateBySkillId, SkillResponse, UserSkillWithDetailsResponse
 from ..utils.decorators import handle_errors
@@ -16,7 +18,7 @@ router = APIRouter(prefix="/user-skills", tags=["Profile Skills"])
 
 @router.get("/", response_model=SuccessResponse)
 @handle_errors
-async def get_user_skills(
+def get_user_skills(
     skill_id: Optional[int] = Query(None, description="Filter by skill ID"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -53,7 +55,7 @@ async def get_user_skills(
 
 @router.get("/search", response_model=SuccessResponse)
 @handle_errors
-async def search_skills_by_name(
+def search_skills_by_name(
     name: str = Query(..., description="Skill name to search for"),
     db: Session = Depends(get_db)
 ):
@@ -68,7 +70,7 @@ async def search_skills_by_name(
 
 @router.post("/", response_model=SuccessResponse)
 @handle_errors
-async def create_user_skill_by_skill_id(
+def create_user_skill_by_skill_id(
     data: UserSkillCreateBySkillId, 
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
@@ -110,6 +112,9 @@ async def create_user_skill_by_skill_id(
         created_user_skills.append(user_skill_response)
     
     db.commit()
+    invalidate_profile(current_user.id)
+    if created_user_skills:
+        recommendation_updater.user_changed(current_user.id)
     
     message_parts = []
     
@@ -143,7 +148,7 @@ async def create_user_skill_by_skill_id(
 
 @router.delete("/{user_skill_id}", response_model=SuccessResponse)
 @handle_errors
-async def delete_user_skill(
+def delete_user_skill(
     user_skill_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -156,6 +161,8 @@ async def delete_user_skill(
     validate_entity_exists(user_skill, "UserSkill")
     user_skill.is_deleted = True
     db.commit()
+    invalidate_profile(user_skill.user_id)
+    recommendation_updater.user_changed(user_skill.user_id)
     return success_response(
         data=None,
         message="UserSkill deleted successfully"
@@ -163,7 +170,7 @@ async def delete_user_skill(
 
 @router.post("/cleanup-duplicates", response_model=SuccessResponse)
 @handle_errors
-async def cleanup_duplicate_skills(
+def cleanup_duplicate_skills(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -185,6 +192,7 @@ async def cleanup_duplicate_skills(
             duplicates_removed += 1
     
     db.commit()
+    invalidate_profile(current_user.id)
     
     return success_response(
         data={"duplicates_removed": duplicates_removed},
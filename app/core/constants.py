@@ -26,6 +26,29 @@ SLOW_QUERY_THRESHOLD_SECONDS = 1.0
 
 WEBSOCKET_PING_INTERVAL = 20
 WEBSOCKET_PING_TIMEOUT = 10
+WEBSOCKET_SEND_QUEUE_SIZE = 256
+VIDEO_CALL_REGISTRY_TTL = 3600
+BACKPLANE_RECONNECT_MIN_DELAY = 1
+BACKPLANE_RECONNECT_MAX_DELAY = 30
+
+FCM_MULTICAST_LIMIT = 500
+DEVICE_TOKEN_CACHE_TTL = 300
+PRESENCE_FLUSH_INTERVAL = 30
+PRESENCE_TTL_SECONDS = 90
+NOTIFICATION_OUTBOX_BATCH_SIZE = 100
+NOTIFICATION_OUTBOX_POLL_INTERVAL = 5
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 5
+NOTIFICATION_OUTBOX_SEND_TIMEOUT = 30
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TTL = 300
+AUTH_PRINCIPAL_TTL = 60
+PROFILE_CACHE_TTL = 300
+REFERENCE_CACHE_TTL = 300
+REFERENCE_CACHE_MAX_ENTRIES = 512
+SEARCH_MAX_TERMS = 8
+RECOMMENDATIONS_PER_USER = 50
+RECOMMENDATION_USER_BATCH = 64
+ESTIMATED_TOTAL_THRESHOLD = 10000
 
 ERROR_MESSAGES = {
     "UNAUTHORIZED": "Authentication required",
@@ -6,7 +6,7 @@ from ..api import (
     auth, profile, contact_us, faq, skills, roles, languages, locations,
     user_skills, data_management, company, education_facility, certification_center,
     gig_jobs, proposals, saved_jobs, corporate_profile, full_time_job, team_member,
-    category, chat, notifications, admin, test_endpoints
+    category, chat, notifications, admin, test_endpoints, recommendations
 )
 
 
@@ -34,6 +34,7 @@ def register_routers(app: FastAPI):
         (full_time_job.router, "/api/v1"),
         (team_member.router, "/api/v1"),
         (category.router, "/api/v1"),
+        (recommendations.router, "/api/v1"),
         (chat.router, "/api/v1/chat"),
         (notifications.router, "/api/v1"),
         (admin.router, "/api/v1"),
@@ -0,0 +1,63 @@
+"""
+Offload blocking database work from async endpoints to a bounded threadpool.
+
+Routes in app/api that only do blocking work are plain ``def`` and run on
+Starlette's threadpool. Routes that also await (WebSocket broadcasts, email,
+the reference cache) are ``async def``, and any synchronous SQLAlchemy call
+made directly inside them runs on the event loop and stalls every other
+request and WebSocket. Wrap those calls with ``run_db`` (or an
+``AsyncRepository``) so they run on a dedicated executor whose size stays
+below the engine's connection pool.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from ..core.config import settings
+
+T = TypeVar('T')
+
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_THREADPOOL_SIZE,
+    thread_name_prefix="db_worker"
+)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking database call on the DB threadpool
+    
+    Args:
+        func: Synchronous callable that uses a SQLAlchemy session
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+
+class AsyncRepository:
+    """
+    Awaitable facade over a synchronous repository
+    
+    Usage:
+        repository = AsyncRepository(GigJobRepository(db))
+        gig_jobs, total = await repository.get_all_gig_jobs(pagination=pagination)
+    """
+    
+    def __init__(self, repository: Any):
+        self._repository = repository
+    
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._repository, name)
+        if not callable(attr):
+            return attr
+        
+        @functools.wraps(attr)
+        async def call_in_threadpool(*args: Any, **kwargs: Any) -> Any:
+            return await run_db(attr, *args, **kwargs)
+        
+        return call_in_threadpool
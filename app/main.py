@@ -1,10 +1,12 @@
 """
 Main FastAPI application
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
+import asyncio
 import os
 
 from .core.logging_config import logger
@@ -14,6 +16,9 @@ from fastapi.exceptions import RequestValidationError
 from .core.router_setup import register_routers
 from .core.database_setup import create_all_tables
 from .utils.admin_setup import ensure_admin_user_exists
+from .utils.websocket_manager import manager
+from .utils.notification_outbox import notification_relay
+from .utils.push_dispatcher import push_dispatcher
 
 load_dotenv()
 
@@ -22,8 +27,23 @@ if not os.path.exists('.env') and os.path.exists('env.example'):
     shutil.copy('env.example', '.env')
     load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the chat backplane, presence loop and notification outbox relay on every worker, stop them on shutdown"""
+    await manager.start()
+    notification_relay.start()
+    try:
+        yield
+    finally:
+        await notification_relay.stop()
+        await asyncio.get_running_loop().run_in_executor(None, push_dispatcher.stop)
+        await manager.stop()
+
+
 app = FastAPI(
     title="Phix HRMS API", 
+    lifespan=lifespan,
     version="1.0.0", 
     redirect_slashes=False,  # Redirect'lar CORS header'larni yo'qotadi, shuning uchun False
     docs_url="/docs",
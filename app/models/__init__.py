@@ -26,8 +26,9 @@ from .category import Category
 from .chat import ChatRoom, ChatMessage, ChatParticipant, UserPresence
 from .saved_job import SavedJob
 from .user_device_token import UserDeviceToken, DeviceType
-from .notification import Notification, NotificationType
+from .notification import Notification, NotificationType, NotificationUnreadCounter, NotificationOutbox
 from .agora_channel import AgoraChannel
+from .job_recommendation import JobRecommendation
 
 __all__ = [
     "Certification",
@@ -64,5 +65,8 @@ __all__ = [
     "DeviceType",
     "Notification",
     "NotificationType",
+    "NotificationUnreadCounter",
+    "NotificationOutbox",
     "AgoraChannel",
+    "JobRecommendation",
 ] 
\ No newline at end of file
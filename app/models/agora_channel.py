@@ -8,12 +8,14 @@ class AgoraChannel(Base):
     """
     Stores Agora channel names for chat rooms.
     Token is generated fresh on each request for better security.
+    call_id is the room's current call, used to route call events to its participants.
     """
     __tablename__ = "agora_channels"
     
     id = Column(Integer, primary_key=True, index=True)
     room_id = Column(Integer, ForeignKey("chat_rooms.id"), nullable=False, unique=True)
     channel_name = Column(String(255), nullable=False, unique=True)
+    call_id = Column(String(64), nullable=True, unique=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     room = relationship("ChatRoom", foreign_keys=[room_id])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum, LargeBinary, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.database import Base
@@ -24,6 +24,10 @@ class ChatRoom(Base):
     creator = relationship("User", foreign_keys=[created_by])
     participants = relationship("ChatParticipant", back_populates="room", cascade="all, delete-orphan")
     messages = relationship("ChatMessage", back_populates="room", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index('ix_chat_rooms_updated_at_id', 'updated_at', 'id'),
+    )
 
 class ChatParticipant(Base):
     __tablename__ = "chat_participants"
@@ -33,10 +37,15 @@ class ChatParticipant(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
     last_read_at = Column(DateTime(timezone=True), nullable=True)
+    unread_count = Column(Integer, default=0, server_default="0", nullable=False)
     is_active = Column(Boolean, default=True)
     
     room = relationship("ChatRoom", back_populates="participants")
     user = relationship("User")
+    
+    __table_args__ = (
+        Index('ix_chat_participants_user_room', 'user_id', 'room_id'),
+    )
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
@@ -60,6 +69,10 @@ class ChatMessage(Base):
     room = relationship("ChatRoom", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id])
     receiver = relationship("User", foreign_keys=[receiver_id])
+    
+    __table_args__ = (
+        Index('ix_chat_messages_room_created_id', 'room_id', 'created_at', 'id'),
+    )
 
 class UserPresence(Base):
     __tablename__ = "user_presence"
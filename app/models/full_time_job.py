@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Float, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.utils.full_text_search import job_search_vector_sql
 import enum
 from .team_member import TeamMemberRole
 
@@ -67,6 +69,8 @@ class FullTimeJob(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Only full-text search reads it; deferred so listings and detail queries do not load the tsvector
+    search_vector = deferred(Column(TSVECTOR, Computed(job_search_vector_sql(), persisted=True)))
     
     company = relationship("CorporateProfile", back_populates="full_time_jobs")
     category = relationship("Category", foreign_keys=[category_id], back_populates="full_time_jobs")
@@ -75,6 +79,11 @@ class FullTimeJob(Base):
     skills = relationship("Skill", secondary="full_time_job_skills", back_populates="full_time_jobs")
     created_by_user = relationship("User", foreign_keys=[created_by_user_id])
     saved_jobs = relationship("SavedJob", back_populates="full_time_job", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index('ix_full_time_jobs_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_full_time_jobs_location_trgm', 'location', postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'}),
+    )
     
     def __repr__(self):
         return f"<FullTimeJob(id={self.id}, title='{self.title}', company_id={self.company_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -11,6 +11,11 @@ class FullTimeJobSkill(Base):
     skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_full_time_job_skills_job_skill', 'full_time_job_id', 'skill_id'),
+        Index('ix_full_time_job_skills_skill_job', 'skill_id', 'full_time_job_id'),
+    )
     
     def __repr__(self):
         return f"<FullTimeJobSkill(full_time_job_id={self.full_time_job_id}, skill_id={self.skill_id})>"
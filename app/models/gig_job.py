@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, Enum, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.utils.full_text_search import job_search_vector_sql
 import enum
 
 
@@ -46,6 +48,8 @@ class GigJob(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_deleted = Column(Boolean, default=False)
+    # Only full-text search reads it; deferred so listings and detail queries do not load the tsvector
+    search_vector = deferred(Column(TSVECTOR, Computed(job_search_vector_sql(), persisted=True)))
     
     author = relationship("User", back_populates="gig_jobs")
     category = relationship("Category", foreign_keys=[category_id], back_populates="gig_jobs")
@@ -54,6 +58,11 @@ class GigJob(Base):
     proposals = relationship("Proposal", back_populates="gig_job", cascade="all, delete-orphan")
     skills = relationship("Skill", secondary="gig_job_skills", back_populates="gig_jobs")
     saved_jobs = relationship("SavedJob", back_populates="gig_job", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index('ix_gig_jobs_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_gig_jobs_location_id', 'location_id'),
+    )
     
     def __repr__(self):
         return f"<GigJob(id={self.id}, title='{self.title}', author_id={self.author_id})>"
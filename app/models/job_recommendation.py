@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class JobRecommendation(Base):
+    __tablename__ = "job_recommendations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    gig_job_id = Column(Integer, ForeignKey("gig_jobs.id", ondelete="CASCADE"), nullable=True)
+    full_time_job_id = Column(Integer, ForeignKey("full_time_jobs.id", ondelete="CASCADE"), nullable=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_job_recommendations_user_score', 'user_id', 'score'),
+        Index('ix_job_recommendations_gig_job_id', 'gig_job_id'),
+        Index('ix_job_recommendations_full_time_job_id', 'full_time_job_id'),
+    )
+
+    def __repr__(self):
+        return f"<JobRecommendation(user_id={self.user_id}, gig_job_id={self.gig_job_id}, full_time_job_id={self.full_time_job_id}, score={self.score})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -47,3 +47,42 @@ class Notification(Base):
     def __repr__(self):
         return f"<Notification(id={self.id}, type={self.type}, recipient_user_id={self.recipient_user_id}, is_read={self.is_read})>"
 
+
+
+class NotificationUnreadCounter(Base):
+    """Unread notification count per (user, notification type), kept in step with Notification.is_read"""
+    __tablename__ = "notification_unread_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    def __repr__(self):
+        return f"<NotificationUnreadCounter(user_id={self.user_id}, type={self.type}, count={self.count})>"
+
+
+class NotificationOutbox(Base):
+    """
+    Push notification waiting to be sent.
+    Written in the same transaction as the row that triggered it; the outbox
+    relay sends it and sets processed_at.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id", ondelete="SET NULL"), nullable=True)
+    recipient_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    title = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    data = Column(JSON, nullable=True)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_notification_outbox_pending', 'id', postgresql_where=text('processed_at IS NULL')),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, recipient_user_id={self.recipient_user_id}, processed_at={self.processed_at})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.database import Base
@@ -13,6 +13,10 @@ class UserSkill(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_deleted = Column(Boolean, default=False)
+
+    __table_args__ = (
+        Index('ix_user_skills_skill_user', 'skill_id', 'user_id'),
+    )
     
     user = relationship('User')
     skill = relationship('Skill') 
\ No newline at end of file
@@ -1,13 +1,29 @@
+from enum import Enum
 from pydantic import BaseModel, Field
-from typing import List, TypeVar, Generic
+from typing import Any, List, NamedTuple, Optional, TypeVar, Generic
 from math import ceil
 
 T = TypeVar('T')
 
 
+class TotalMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class Page(NamedTuple):
+    """One page of a listing with its total (None in TotalMode.NONE)"""
+    items: List[Any]
+    total: Optional[int]
+    has_more: bool
+    total_is_estimate: bool = False
+
+
 class PaginationParams(BaseModel):
     page: int = Field(1, ge=1, description="Page number")
     size: int = Field(10, ge=1, le=100, description="Page size")
+    total_mode: TotalMode = Field(TotalMode.EXACT, description="How the total is computed")
     
     @property
     def offset(self) -> int:
@@ -22,15 +38,17 @@ class PaginationParams(BaseModel):
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int]
     page: int
     size: int
-    pages: int
+    pages: Optional[int]
+    has_more: bool = False
+    total_is_estimate: bool = False
     
     @property
     def has_next(self) -> bool:
         """Check if there's a next page"""
-        return self.page < self.pages
+        return self.has_more
     
     @property
     def has_previous(self) -> bool:
@@ -40,26 +58,48 @@ class PaginatedResponse(BaseModel, Generic[T]):
 
 def create_pagination_response(
     items: List[T],
-    total: int,
-    pagination: PaginationParams
+    total: Optional[int],
+    pagination: PaginationParams,
+    has_more: Optional[bool] = None,
+    total_is_estimate: bool = False
 ) -> PaginatedResponse[T]:
     """
     Create a paginated response from items and pagination parameters
     
     Args:
         items: List of items for current page
-        total: Total number of items
+        total: Total number of items, None when it was not counted
         pagination: Pagination parameters
+        has_more: Whether another page follows (derived from total when omitted)
+        total_is_estimate: Whether total is a planner estimate
         
     Returns:
         PaginatedResponse with calculated pagination info
     """
-    pages = ceil(total / pagination.size) if total > 0 else 0
+    if total is None:
+        pages = None
+    else:
+        pages = ceil(total / pagination.size) if total > 0 else 0
+    if has_more is None:
+        has_more = pages is not None and pagination.page < pages
     
     return PaginatedResponse(
         items=items,
         total=total,
         page=pagination.page,
         size=pagination.size,
-        pages=pages
+        pages=pages,
+        has_more=has_more,
+        total_is_estimate=total_is_estimate
+    )
+
+
+def create_page_response(items: List[T], page: Page, pagination: PaginationParams) -> PaginatedResponse[T]:
+    """Create a paginated response for a Page, with items already converted for the response"""
+    return create_pagination_response(
+        items=items,
+        total=page.total,
+        pagination=pagination,
+        has_more=page.has_more,
+        total_is_estimate=page.total_is_estimate
     )
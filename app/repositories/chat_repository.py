@@ -1,9 +1,14 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc, func
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Session, joinedload, aliased
+from sqlalchemy import and_, or_, desc, func, select, true, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Optional, Dict, Any, Tuple
 from ..models.chat import ChatRoom, ChatMessage, ChatParticipant, UserPresence, MessageLike
 from ..models.user import User
+from ..models.agora_channel import AgoraChannel
+from ..models.notification import NotificationType
 from ..schemas.chat import ChatRoomCreate, ChatMessageCreate, MessageType
+from ..utils.presence import presence_registry
+from .notification_repository import NotificationRepository
 from datetime import datetime, timedelta
 
 class ChatRepository:
@@ -83,6 +88,98 @@ class ChatRepository:
         
         return rooms
 
+    def get_user_room_summaries(self, user_id: int, limit: Optional[int] = None,
+                                before: Optional[Tuple[datetime, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Get the user's inbox: each room with its other participant, presence,
+        unread counter and last message, newest first, in two queries.
+
+        before is an (updated_at, room_id) keyset cursor from the previous page.
+        Each room yields exactly one row (its earliest other active participant),
+        so limit counts rooms, and the last message is read per room through
+        ix_chat_messages_room_created_id instead of ranking the whole history.
+        """
+        me = aliased(ChatParticipant)
+        other = aliased(ChatParticipant)
+
+        other_user_id = select(other.user_id).where(
+            and_(
+                other.room_id == ChatRoom.id,
+                other.user_id != user_id,
+                other.is_active == True
+            )
+        ).order_by(other.id).limit(1).correlate(ChatRoom).scalar_subquery()
+
+        query = self.db.query(ChatRoom, User, me.unread_count).join(
+            me, and_(
+                me.room_id == ChatRoom.id,
+                me.user_id == user_id,
+                me.is_active == True
+            )
+        ).outerjoin(
+            User, User.id == other_user_id
+        ).filter(ChatRoom.is_active == True)
+
+        if before:
+            query = query.filter(tuple_(ChatRoom.updated_at, ChatRoom.id) < tuple_(*before))
+
+        query = query.order_by(desc(ChatRoom.updated_at), desc(ChatRoom.id))
+        if limit:
+            query = query.limit(limit)
+
+        summaries = [
+            {
+                "room": room,
+                "other_user": other_user,
+                "is_online": bool(other_user and presence_registry.is_online(other_user.id)),
+                "last_message": None,
+                "unread_count": unread_count or 0
+            }
+            for room, other_user, unread_count in query.all()
+        ]
+
+        if not summaries:
+            return summaries
+
+        by_room = {summary["room"].id: summary for summary in summaries}
+        latest = select(
+            ChatMessage.id,
+            ChatMessage.content,
+            ChatMessage.message_type,
+            ChatMessage.created_at,
+            ChatMessage.sender_id
+        ).where(
+            and_(
+                ChatMessage.room_id == ChatRoom.id,
+                ChatMessage.is_deleted == False
+            )
+        ).order_by(desc(ChatMessage.created_at), desc(ChatMessage.id)).limit(1).lateral("latest")
+
+        last_messages = self.db.query(
+            ChatRoom.id.label("room_id"),
+            latest.c.id,
+            latest.c.content,
+            latest.c.message_type,
+            latest.c.created_at,
+            User.name.label("sender_name")
+        ).select_from(ChatRoom).join(
+            latest, true()
+        ).outerjoin(
+            User, User.id == latest.c.sender_id
+        ).filter(ChatRoom.id.in_(list(by_room))).all()
+
+        for row in last_messages:
+            summary = by_room[row.room_id]
+            summary["last_message"] = {
+                "id": row.id,
+                "content": row.content,
+                "message_type": row.message_type,
+                "created_at": row.created_at,
+                "sender_name": row.sender_name
+            }
+
+        return summaries
+
     def fix_room_participants(self, room_id: int) -> bool:
         """Fix room participants if they have data integrity issues"""
         participants = self.db.query(ChatParticipant).filter(
@@ -164,8 +261,15 @@ class ChatRepository:
                       message_type: MessageType, content: str = None, 
                       file_name: str = None, file_path: str = None, 
                       file_size: int = None, mime_type: str = None,
-                      duration: int = None, files_data: list = None) -> ChatMessage:
-        """Create a new message"""
+                      duration: int = None, files_data: list = None,
+                      notification: Optional[Dict[str, Any]] = None) -> ChatMessage:
+        """
+        Create a new message.
+
+        If notification ({"title", "body", "data"}) is given, the receiver's
+        Notification row and its push outbox entry are written in the same
+        transaction, so the message and its notification commit together.
+        """
         message = ChatMessage(
             room_id=room_id,
             sender_id=sender_id,
@@ -185,6 +289,28 @@ class ChatRepository:
         if room:
             room.updated_at = datetime.utcnow()
         
+        self._adjust_unread_count(room_id, receiver_id, 1)
+        
+        if notification:
+            self.db.flush()
+            notification_repo = NotificationRepository(self.db)
+            notification_row = notification_repo.add(
+                type=NotificationType.MESSAGE_RECEIVED,
+                title=notification["title"],
+                body=notification["body"],
+                recipient_user_id=receiver_id,
+                room_id=room_id,
+                message_id=message.id,
+                sender_id=sender_id
+            )
+            notification_repo.add_push(
+                recipient_user_id=receiver_id,
+                title=notification["title"],
+                body=notification["body"],
+                data={**(notification.get("data") or {}), "message_id": str(message.id)},
+                notification_id=notification_row.id
+            )
+        
         self.db.commit()
         self.db.refresh(message)
         
@@ -198,7 +324,8 @@ class ChatRepository:
         
         offset = (page - 1) * per_page
         return self.db.query(ChatMessage).options(
-            joinedload(ChatMessage.sender)
+            joinedload(ChatMessage.sender),
+            joinedload(ChatMessage.receiver)
         ).filter(
             and_(
                 ChatMessage.room_id == room_id,
@@ -206,6 +333,74 @@ class ChatRepository:
             )
         ).order_by(desc(ChatMessage.created_at)).offset(offset).limit(per_page).all()
     
+    def get_room_messages_page(self, room_id: int, limit: int = 50, before_id: Optional[int] = None,
+                               after_id: Optional[int] = None, offset: int = 0,
+                               user_id: Optional[int] = None) -> List[ChatMessage]:
+        """
+        Get a page of room messages, newest first.
+
+        before_id returns messages older than that message and after_id returns
+        newer ones, both seeking on the (room_id, created_at, id) index so deep
+        scrollback costs the same as the first page. offset is kept for
+        page-number clients. With user_id, only rooms the user actively takes
+        part in return messages, checked in the same query.
+        """
+        query = self.db.query(ChatMessage).options(
+            joinedload(ChatMessage.sender),
+            joinedload(ChatMessage.receiver)
+        ).filter(
+            and_(
+                ChatMessage.room_id == room_id,
+                ChatMessage.is_deleted == False
+            )
+        )
+        if user_id is not None:
+            query = query.filter(
+                self.db.query(ChatParticipant.id).join(
+                    ChatRoom, ChatRoom.id == ChatParticipant.room_id
+                ).filter(
+                    and_(
+                        ChatParticipant.room_id == room_id,
+                        ChatParticipant.user_id == user_id,
+                        ChatParticipant.is_active == True,
+                        ChatRoom.is_active == True
+                    )
+                ).exists()
+            )
+
+        cursor_id = before_id or after_id
+        if cursor_id:
+            cursor_created_at = self.db.query(ChatMessage.created_at).filter(
+                and_(
+                    ChatMessage.id == cursor_id,
+                    ChatMessage.room_id == room_id
+                )
+            ).scalar_subquery()
+            position = tuple_(ChatMessage.created_at, ChatMessage.id)
+            cursor = tuple_(cursor_created_at, cursor_id)
+
+            if after_id and not before_id:
+                messages = query.filter(position > cursor).order_by(
+                    ChatMessage.created_at, ChatMessage.id
+                ).limit(limit).all()
+                messages.reverse()
+                return messages
+
+            query = query.filter(position < cursor)
+
+        return query.order_by(
+            desc(ChatMessage.created_at), desc(ChatMessage.id)
+        ).offset(offset).limit(limit).all()
+
+    def count_room_messages(self, room_id: int) -> int:
+        """Get total count of messages in a room without a membership check"""
+        return self.db.query(func.count(ChatMessage.id)).filter(
+            and_(
+                ChatMessage.room_id == room_id,
+                ChatMessage.is_deleted == False
+            )
+        ).scalar() or 0
+
     def get_room_messages_count(self, room_id: int, user_id: int) -> int:
         """Get total count of messages in a room"""
         if not self.get_room(room_id, user_id):
@@ -246,27 +441,61 @@ class ChatRepository:
         
         if participant:
             participant.last_read_at = datetime.utcnow()
+            participant.unread_count = 0
         
         self.db.commit()
         return True
 
     def get_unread_count(self, user_id: int) -> Dict[int, int]:
         """Get unread message count for each room"""
-        unread_counts = {}
-        rooms = self.get_user_rooms(user_id)
+        rows = self.db.query(ChatParticipant.room_id, ChatParticipant.unread_count).join(ChatRoom).filter(
+            and_(
+                ChatParticipant.user_id == user_id,
+                ChatParticipant.is_active == True,
+                ChatRoom.is_active == True
+            )
+        ).all()
         
-        for room in rooms:
-            unread_count = self.db.query(ChatMessage).filter(
-                and_(
-                    ChatMessage.room_id == room.id,
-                    ChatMessage.receiver_id == user_id,
-                    ChatMessage.is_read == False,
-                    ChatMessage.is_deleted == False
-                )
-            ).count()
-            unread_counts[room.id] = unread_count
+        return {room_id: unread_count for room_id, unread_count in rows}
+
+    def get_room_unread_count(self, room_id: int, user_id: int) -> int:
+        """Get unread message count for a single room"""
+        return self.db.query(ChatParticipant.unread_count).filter(
+            and_(
+                ChatParticipant.room_id == room_id,
+                ChatParticipant.user_id == user_id
+            )
+        ).scalar() or 0
+
+    def _adjust_unread_count(self, room_id: int, user_id: int, delta: int):
+        """Shift a participant's unread counter inside the caller's transaction"""
+        self.db.query(ChatParticipant).filter(
+            and_(
+                ChatParticipant.room_id == room_id,
+                ChatParticipant.user_id == user_id
+            )
+        ).update(
+            {"unread_count": func.greatest(ChatParticipant.unread_count + delta, 0)},
+            synchronize_session=False
+        )
+
+    def reconcile_unread_counters(self) -> int:
+        """Recompute every participant's unread counter from chat_messages and fix drift. Returns rows fixed"""
+        actual = self.db.query(func.count(ChatMessage.id)).filter(
+            and_(
+                ChatMessage.room_id == ChatParticipant.room_id,
+                ChatMessage.receiver_id == ChatParticipant.user_id,
+                ChatMessage.is_read == False,
+                ChatMessage.is_deleted == False
+            )
+        ).correlate(ChatParticipant).scalar_subquery()
         
-        return unread_counts
+        fixed = self.db.query(ChatParticipant).filter(
+            ChatParticipant.unread_count != actual
+        ).update({"unread_count": actual}, synchronize_session=False)
+        
+        self.db.commit()
+        return fixed
 
     def get_message(self, message_id: int) -> Optional[ChatMessage]:
         """Get a message by ID with sender and receiver info"""
@@ -304,6 +533,8 @@ class ChatRepository:
         ).first()
         
         if message:
+            if not message.is_deleted and not message.is_read:
+                self._adjust_unread_count(message.room_id, message.receiver_id, -1)
             message.is_deleted = True
             message.content = "This message was deleted"
             self.db.commit()
@@ -327,28 +558,39 @@ class ChatRepository:
         self.db.refresh(presence)
         return presence
 
+    def upsert_user_presence_batch(self, rows: List[Dict[str, Any]]):
+        """Upsert many presence rows ({user_id, is_online, last_seen}) in one statement"""
+        if not rows:
+            return
+        statement = insert(UserPresence).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserPresence.user_id],
+            set_={
+                "is_online": statement.excluded.is_online,
+                "last_seen": statement.excluded.last_seen
+            }
+        )
+        self.db.execute(statement)
+        self.db.commit()
+
     def get_user_presence(self, user_id: int) -> Optional[UserPresence]:
         """Get user's presence status"""
         return self.db.query(UserPresence).filter(UserPresence.user_id == user_id).first()
 
     def get_online_users(self) -> List[UserPresence]:
         """Get all currently online users"""
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        five_minutes_ago = now - timedelta(minutes=5)
-        
         return self.db.query(UserPresence).filter(
             and_(
-                UserPresence.is_online == True,
-                UserPresence.last_seen > five_minutes_ago
+                UserPresence.user_id.in_(presence_registry.online_user_ids()),
+                UserPresence.is_online == True
             )
         ).all()
 
     def get_online_users_in_rooms(self, current_user_id: int) -> List[User]:
         """Get online users who are in the same chat rooms as the current user"""
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        five_minutes_ago = now - timedelta(minutes=5)
+        online_user_ids = presence_registry.online_user_ids()
+        if not online_user_ids:
+            return []
         
         user_room_ids = self.db.query(ChatParticipant.room_id).filter(
             and_(
@@ -365,14 +607,36 @@ class ChatRepository:
             )
         ).subquery()
         
-        return self.db.query(User).join(UserPresence, User.id == UserPresence.user_id).filter(
+        return self.db.query(User).filter(
             and_(
                 User.id.in_(room_user_ids),
-                User.is_active == True,
-                UserPresence.is_online == True,
-                UserPresence.last_seen > five_minutes_ago
+                User.id.in_(online_user_ids),
+                User.is_active == True
+            )
+        ).all()
+
+    def start_call(self, room_id: int, call_id: str) -> AgoraChannel:
+        """Record call_id as the room's current call, creating the room's Agora channel if needed"""
+        channel = self.db.query(AgoraChannel).filter(AgoraChannel.room_id == room_id).first()
+        if not channel:
+            channel = AgoraChannel(room_id=room_id, channel_name=f"room_{room_id}_call")
+            self.db.add(channel)
+        channel.call_id = call_id
+        self.db.commit()
+        self.db.refresh(channel)
+        return channel
+
+    def get_call_participants(self, call_id: str) -> List[int]:
+        """Get user IDs of the participants of the room a call belongs to"""
+        participants = self.db.query(ChatParticipant.user_id).join(
+            AgoraChannel, AgoraChannel.room_id == ChatParticipant.room_id
+        ).filter(
+            and_(
+                AgoraChannel.call_id == call_id,
+                ChatParticipant.is_active == True
             )
         ).all()
+        return [participant.user_id for participant in participants]
 
     def get_room_participants(self, room_id: int) -> List[int]:
         """Get all user IDs who are participants in a specific room"""
@@ -384,34 +648,35 @@ class ChatRepository:
         ).all()
         return [participant.user_id for participant in participants]
 
-    def batch_get_users_online_status(self, user_ids: List[int]) -> Dict[int, bool]:
-        """Batch get online status for multiple users to avoid N+1 queries"""
-        if not user_ids:
-            return {}
-        
-        from datetime import datetime, timedelta
-        online_threshold = datetime.utcnow() - timedelta(minutes=5)
-        
-        online_users = self.db.query(UserPresence.user_id).filter(
+    def get_user_room_memberships(self, user_id: int) -> Dict[int, List[int]]:
+        """Get participant IDs of every active room the user is in, keyed by room ID, in one query"""
+        user_room_ids = self.db.query(ChatParticipant.room_id).join(ChatRoom).filter(
             and_(
-                UserPresence.user_id.in_(user_ids),
-                UserPresence.last_seen >= online_threshold
+                ChatParticipant.user_id == user_id,
+                ChatParticipant.is_active == True,
+                ChatRoom.is_active == True
+            )
+        ).subquery()
+
+        rows = self.db.query(ChatParticipant.room_id, ChatParticipant.user_id).filter(
+            and_(
+                ChatParticipant.room_id.in_(user_room_ids),
+                ChatParticipant.is_active == True
             )
         ).all()
-        
-        online_user_ids = {user_id for (user_id,) in online_users}
-        return {user_id: user_id in online_user_ids for user_id in user_ids}
+
+        memberships = {}
+        for room_id, participant_id in rows:
+            memberships.setdefault(room_id, []).append(participant_id)
+        return memberships
+
+    def batch_get_users_online_status(self, user_ids: List[int]) -> Dict[int, bool]:
+        """Batch get online status for multiple users (served from the in-memory presence registry)"""
+        return presence_registry.online_status(user_ids)
     
     def is_user_online(self, user_id: int) -> bool:
-        """Check if a user is currently online"""
-        presence = self.get_user_presence(user_id)
-        if not presence:
-            return False
-        
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        five_minutes_ago = now - timedelta(minutes=5)
-        return presence.is_online and presence.last_seen > five_minutes_ago
+        """Check if a user is currently online (served from the in-memory presence registry)"""
+        return presence_registry.is_online(user_id)
 
     def toggle_message_like(self, message_id: int, user_id: int) -> Dict[str, Any]:
         """Toggle like/unlike for a message. Returns {'action': 'liked'/'unliked', 'like_count': int}"""
@@ -1,11 +1,17 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, desc
 from typing import List, Optional
 from ..models.full_time_job import FullTimeJob
 from ..models.corporate_profile import CorporateProfile
 from ..models.skill import Skill
+from ..models.full_time_job_skill import FullTimeJobSkill
 from ..schemas.full_time_job import FullTimeJobCreate, FullTimeJobUpdate
 from ..core.config import settings
+from ..utils.full_text_search import prefix_tsquery, search_matches, search_rank
+from .job_viewer_context import JobViewerContext
+from .job_relevance import skill_match_subquery, relevance_score
+from .paged_query import fetch_page
+from ..pagination import Page, TotalMode
 
 
 class FullTimeJobRepository:
@@ -25,8 +31,90 @@ class FullTimeJobRepository:
         return skills
     
     
-    def _prepare_full_time_job_response(self, job: FullTimeJob, current_user_id: Optional[int] = None) -> dict:
+    def _list_load_options(self) -> list:
+        """Eager-load options used by every list query so rendering never lazy-loads per row"""
+        return [
+            joinedload(FullTimeJob.skills),
+            joinedload(FullTimeJob.company),
+            joinedload(FullTimeJob.category),
+            joinedload(FullTimeJob.subcategory),
+            joinedload(FullTimeJob.created_by_user)
+        ]
+
+    def _filter_by_title(self, query, title: Optional[str]):
+        """Match title words as prefixes through the search_vector GIN index (title-weighted lexemes only)"""
+        if not title:
+            return query
+        tsquery = prefix_tsquery(title, weights="A")
+        if tsquery is None:
+            return query.filter(FullTimeJob.title.ilike(f"%{title}%"))
+        return query.filter(search_matches(FullTimeJob.search_vector, tsquery))
+
+    def _order_by_title_rank(self, query, title: Optional[str]):
+        """Put the best title matches first when searching by title"""
+        tsquery = prefix_tsquery(title, weights="A") if title else None
+        if tsquery is None:
+            return query
+        return query.order_by(search_rank(FullTimeJob.search_vector, tsquery).desc())
+
+    @staticmethod
+    def _newest_first(query):
+        """Final created_at/id tiebreaker so OFFSET pages never repeat or skip rows"""
+        return query.order_by(desc(FullTimeJob.created_at), desc(FullTimeJob.id))
+    
+    def _prepare_full_time_job_response(
+        self,
+        job: FullTimeJob,
+        current_user_id: Optional[int] = None,
+        viewer: Optional[JobViewerContext] = None
+    ) -> dict:
         """Prepare full-time job data for response with skills"""
+        return self._prepare_full_time_job_responses([job], current_user_id, viewer)[0]
+    
+    def _prepare_full_time_job_responses(
+        self,
+        jobs: List[FullTimeJob],
+        current_user_id: Optional[int] = None,
+        viewer: Optional[JobViewerContext] = None
+    ) -> List[dict]:
+        """Prepare a page of full-time jobs with grouped creator counts and a shared viewer context"""
+        if not jobs:
+            return []
+        
+        creator_ids = {job.created_by_user_id for job in jobs}
+        creator_job_counts = dict(
+            self.db.query(FullTimeJob.created_by_user_id, func.count(FullTimeJob.id)).filter(
+                FullTimeJob.created_by_user_id.in_(creator_ids)
+            ).group_by(FullTimeJob.created_by_user_id).all()
+        )
+        
+        if viewer is None:
+            viewer = JobViewerContext.load(self.db, current_user_id)
+        
+        relevance_scores = {}
+        if viewer is not None:
+            job_ids = [job.id for job in jobs]
+            viewer.load_job_flags(self.db, full_time_job_ids=job_ids)
+            relevance_scores = self._relevance_scores(job_ids, viewer)
+        
+        return [
+            self._build_full_time_job_response(
+                job,
+                all_jobs_count=creator_job_counts.get(job.created_by_user_id, 0),
+                viewer=viewer,
+                relevance_score=relevance_scores.get(job.id)
+            )
+            for job in jobs
+        ]
+    
+    def _build_full_time_job_response(
+        self,
+        job: FullTimeJob,
+        all_jobs_count: int,
+        viewer: Optional[JobViewerContext],
+        relevance_score: Optional[float] = None
+    ) -> dict:
+        """Build full-time job response dict from already loaded data"""
         skills_data = []
         
         for skill in job.skills:
@@ -38,10 +126,6 @@ class FullTimeJobRepository:
                 "is_deleted": skill.is_deleted
             })
         
-        all_jobs_count = self.db.query(FullTimeJob).filter(
-            FullTimeJob.created_by_user_id == job.created_by_user_id
-        ).count()
-        
         company_followers_count = 0
         company_follow_relation_id = None
         # Corporate profile follow functionality disabled - table dropped in migration
@@ -55,22 +139,11 @@ class FullTimeJobRepository:
         #         if follow_relation:
         #             company_follow_relation_id = follow_relation.id
         
-        relevance_score = None
         is_saved = False
         is_send_proposal = False
-        if current_user_id:
-            relevance_score = self._calculate_relevance_score(job, current_user_id)
-            from ..models.saved_job import SavedJob
-            is_saved = self.db.query(SavedJob).filter(
-                SavedJob.user_id == current_user_id,
-                SavedJob.full_time_job_id == job.id
-            ).first() is not None
-            from ..models.proposal import Proposal
-            is_send_proposal = self.db.query(Proposal).filter(
-                Proposal.user_id == current_user_id,
-                Proposal.full_time_job_id == job.id,
-                Proposal.is_deleted == False
-            ).first() is not None
+        if viewer is not None:
+            is_saved = job.id in viewer.saved_full_time_job_ids
+            is_send_proposal = job.id in viewer.proposal_full_time_job_ids
         
         company_logo_url = None
         if job.company and job.company.logo_url:
@@ -116,59 +189,26 @@ class FullTimeJobRepository:
         
         return response_data
 
-    def _calculate_relevance_score(self, job: FullTimeJob, current_user_id: int) -> float:
-        """Calculate relevance score based on user skills and job requirements"""
-        from ..models.user_skill import UserSkill
-        from ..models.user import User
-        
-        user_skills = self.db.query(UserSkill).filter(
-            UserSkill.user_id == current_user_id,
-            UserSkill.is_deleted == False
-        ).all()
-        
-        if not user_skills:
-            return 0.0
-        
-        user_skill_ids = {skill.skill_id for skill in user_skills}
-        job_skill_ids = {skill.id for skill in job.skills if not skill.is_deleted}
-        
-        if not job_skill_ids:
-            return 0.0
-        
-        matching_skills = user_skill_ids.intersection(job_skill_ids)
-        skill_match_percentage = (len(matching_skills) / len(job_skill_ids)) * 100
-        
-        user = self.db.query(User).filter(User.id == current_user_id).first()
-        if not user:
-            return round(skill_match_percentage, 2)
-        
-        bonus_score = 0.0
-        
-        if hasattr(job, 'experience_level') and hasattr(user, 'experience_level'):
-            if job.experience_level == user.experience_level:
-                bonus_score += 10.0
-        
-        if hasattr(job, 'work_mode') and hasattr(user, 'preferred_work_mode'):
-            if job.work_mode == user.preferred_work_mode:
-                bonus_score += 8.0
-        
-        if hasattr(job, 'location') and job.location and hasattr(user, 'location_id'):
-            if job.location == user.location_id:
-                bonus_score += 5.0
-        
-        if hasattr(user, 'expected_salary') and user.expected_salary:
-            if job.min_salary <= user.expected_salary <= job.max_salary:
-                bonus_score += 15.0
-            elif user.expected_salary < job.min_salary:
-                bonus_score += 5.0
-        
-        if hasattr(job, 'job_type') and hasattr(user, 'preferred_job_type'):
-            if job.job_type == user.preferred_job_type:
-                bonus_score += 7.0
-        
-        final_score = min(skill_match_percentage + bonus_score, 100.0)
-        
-        return round(final_score, 2)
+    def _relevance_scores(self, job_ids: List[int], viewer: JobViewerContext) -> dict:
+        """Relevance score of each job for the viewer, in one query"""
+        if not viewer.skill_ids:
+            return {job_id: 0.0 for job_id in job_ids}
+        match = skill_match_subquery(self.db, FullTimeJobSkill.full_time_job_id, FullTimeJobSkill.skill_id, viewer, job_ids)
+        return dict(
+            self.db.query(FullTimeJob.id, relevance_score(match))
+            .outerjoin(match, match.c.job_id == FullTimeJob.id)
+            .filter(FullTimeJob.id.in_(job_ids))
+            .all()
+        )
+
+    def _apply_sort(self, query, sort_by: Optional[str], title: Optional[str], viewer: Optional[JobViewerContext]):
+        """Order a job listing by relevance, recency or title match"""
+        if sort_by == "most_relevant" and viewer is not None and viewer.skill_ids:
+            match = skill_match_subquery(self.db, FullTimeJobSkill.full_time_job_id, FullTimeJobSkill.skill_id, viewer)
+            query = query.outerjoin(match, match.c.job_id == FullTimeJob.id).order_by(desc(relevance_score(match)))
+        if sort_by != "most_recent":
+            query = self._order_by_title_rank(query, title)
+        return self._newest_first(query)
 
     def _format_job_response(self, job: FullTimeJob) -> dict:
         """Format job response with all related data including context"""
@@ -362,10 +402,7 @@ class FullTimeJobRepository:
     def get_by_id(self, job_id: int, current_user_id: Optional[int] = None) -> Optional[dict]:
         """Get full-time job by ID with skills"""
         print(f"[REPO DEBUG GET] Querying job_id={job_id} from database")
-        job = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).filter(
+        job = self.db.query(FullTimeJob).options(*self._list_load_options()).filter(
             FullTimeJob.id == job_id
         ).first()
         
@@ -386,10 +423,7 @@ class FullTimeJobRepository:
         from sqlalchemy import desc
         from ..models.full_time_job import JobStatus
         
-        query = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).filter(
+        query = self.db.query(FullTimeJob).options(*self._list_load_options()).filter(
             FullTimeJob.company_id == company_id
         )
         
@@ -398,46 +432,25 @@ class FullTimeJobRepository:
         
         jobs = query.order_by(desc(FullTimeJob.created_at)).offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100, current_user_id: Optional[int] = None) -> List[dict]:
         """Get all jobs by user ID (through corporate profile) - OWNER only"""
-        jobs = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).join(
+        jobs = self.db.query(FullTimeJob).options(*self._list_load_options()).join(
             CorporateProfile, FullTimeJob.company_id == CorporateProfile.id
         ).filter(
             CorporateProfile.user_id == user_id
         ).offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def get_user_created_jobs(self, user_id: int, skip: int = 0, limit: int = 100, current_user_id: Optional[int] = None) -> List[dict]:
         """Get all jobs created by user (as owner or team member)"""
-        jobs = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company),
-            joinedload(FullTimeJob.category),
-            joinedload(FullTimeJob.subcategory),
-            joinedload(FullTimeJob.created_by_user)
-        ).filter(
+        jobs = self.db.query(FullTimeJob).options(*self._list_load_options()).filter(
             FullTimeJob.created_by_user_id == user_id
         ).offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def get_user_accessible_jobs(self, user_id: int, skip: int = 0, limit: int = 100, current_user_id: Optional[int] = None) -> List[dict]:
         """Get all jobs user can access (as owner or team member)"""
@@ -458,21 +471,11 @@ class FullTimeJobRepository:
         if not corporate_profile_ids:
             return []
         
-        jobs = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company),
-            joinedload(FullTimeJob.category),
-            joinedload(FullTimeJob.subcategory),
-            joinedload(FullTimeJob.created_by_user)
-        ).filter(
+        jobs = self.db.query(FullTimeJob).options(*self._list_load_options()).filter(
             FullTimeJob.company_id.in_(corporate_profile_ids)
         ).offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def get_all_active(self, 
                       skip: int = 0, 
@@ -486,12 +489,11 @@ class FullTimeJobRepository:
                       work_mode: Optional[str] = None,
                       skill_ids: Optional[List[int]] = None,
                       min_salary: Optional[float] = None,
-                      max_salary: Optional[float] = None) -> List[dict]:
-        """Get all active full-time jobs from verified corporate profiles with filters"""
-        query = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).join(CorporateProfile, FullTimeJob.company_id == CorporateProfile.id).filter(
+                      max_salary: Optional[float] = None,
+                      sort_by: Optional[str] = None,
+                      total_mode: TotalMode = TotalMode.EXACT) -> Page:
+        """Get a page of active full-time jobs from verified corporate profiles with filters, and their total"""
+        query = self.db.query(FullTimeJob).options(*self._list_load_options()).join(CorporateProfile, FullTimeJob.company_id == CorporateProfile.id).filter(
             and_(
                 FullTimeJob.status == "active",
                 CorporateProfile.is_verified == True,
@@ -499,8 +501,7 @@ class FullTimeJobRepository:
             )
         )
         
-        if title:
-            query = query.filter(FullTimeJob.title.ilike(f"%{title}%"))
+        query = self._filter_by_title(query, title)
         
         if location:
             query = query.filter(FullTimeJob.location.ilike(f"%{location}%"))
@@ -518,9 +519,7 @@ class FullTimeJobRepository:
             query = query.filter(FullTimeJob.subcategory_id == subcategory_id)
         
         if skill_ids:
-            query = query.join(FullTimeJob.skills).filter(
-                Skill.id.in_(skill_ids)
-            ).distinct()
+            query = query.filter(FullTimeJob.skills.any(Skill.id.in_(skill_ids)))
         
         if min_salary is not None:
             query = query.filter(FullTimeJob.max_salary >= min_salary)
@@ -528,26 +527,16 @@ class FullTimeJobRepository:
         if max_salary is not None:
             query = query.filter(FullTimeJob.min_salary <= max_salary)
         
-        jobs = query.offset(skip).limit(limit).all()
-        
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
+        viewer = JobViewerContext.load(self.db, current_user_id)
+        page = fetch_page(self._apply_sort(query, sort_by, title, viewer), skip, limit, total_mode)
         
-        return prepared_jobs
+        return page._replace(items=self._prepare_full_time_job_responses(page.items, current_user_id, viewer))
     
     def get_all(self, skip: int = 0, limit: int = 100, current_user_id: Optional[int] = None) -> List[dict]:
         """Get all full-time jobs with pagination"""
-        jobs = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).offset(skip).limit(limit).all()
-        
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
+        jobs = self.db.query(FullTimeJob).options(*self._list_load_options()).offset(skip).limit(limit).all()
         
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def update(self, job_id: int, full_time_job: FullTimeJobUpdate) -> Optional[dict]:
         """Update full-time job with skills"""
@@ -644,10 +633,7 @@ class FullTimeJobRepository:
                    limit: int = 100,
                    current_user_id: Optional[int] = None) -> List[dict]:
         """Search jobs with filters including skill IDs - only from verified corporate profiles"""
-        query = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).join(CorporateProfile, FullTimeJob.company_id == CorporateProfile.id).filter(
+        query = self.db.query(FullTimeJob).options(*self._list_load_options()).join(CorporateProfile, FullTimeJob.company_id == CorporateProfile.id).filter(
             and_(
                 FullTimeJob.status == "active",
                 CorporateProfile.is_verified == True,
@@ -655,8 +641,7 @@ class FullTimeJobRepository:
             )
         )
         
-        if title:
-            query = query.filter(FullTimeJob.title.ilike(f"%{title}%"))
+        query = self._filter_by_title(query, title)
         
         if location:
             query = query.filter(FullTimeJob.location.ilike(f"%{location}%"))
@@ -674,9 +659,7 @@ class FullTimeJobRepository:
             query = query.filter(FullTimeJob.subcategory_id == subcategory_id)
         
         if skill_ids:
-            query = query.join(FullTimeJob.skills).filter(
-                Skill.id.in_(skill_ids)
-            ).distinct()
+            query = query.filter(FullTimeJob.skills.any(Skill.id.in_(skill_ids)))
         
         if min_salary is not None:
             query = query.filter(FullTimeJob.max_salary >= min_salary)
@@ -684,68 +667,15 @@ class FullTimeJobRepository:
         if max_salary is not None:
             query = query.filter(FullTimeJob.min_salary <= max_salary)
         
+        query = self._newest_first(self._order_by_title_rank(query, title))
         jobs = query.offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def count_total(self) -> int:
         """Get total count of full-time jobs"""
         return self.db.query(FullTimeJob).count()
     
-    def count_active(self,
-                    category_id: Optional[int] = None,
-                    subcategory_id: Optional[int] = None,
-                    title: Optional[str] = None,
-                    location: Optional[str] = None,
-                    experience_level: Optional[str] = None,
-                    work_mode: Optional[str] = None,
-                    skill_ids: Optional[List[int]] = None,
-                    min_salary: Optional[float] = None,
-                    max_salary: Optional[float] = None) -> int:
-        """Get count of active full-time jobs from verified corporate profiles with filters"""
-        query = self.db.query(FullTimeJob).join(CorporateProfile, FullTimeJob.company_id == CorporateProfile.id).filter(
-            and_(
-                FullTimeJob.status == "active",
-                CorporateProfile.is_verified == True,
-                CorporateProfile.is_deleted == False
-            )
-        )
-        
-        if title:
-            query = query.filter(FullTimeJob.title.ilike(f"%{title}%"))
-        
-        if location:
-            query = query.filter(FullTimeJob.location.ilike(f"%{location}%"))
-        
-        if experience_level:
-            query = query.filter(FullTimeJob.experience_level == experience_level)
-        
-        if work_mode:
-            query = query.filter(FullTimeJob.work_mode == work_mode)
-        
-        if category_id:
-            query = query.filter(FullTimeJob.category_id == category_id)
-        
-        if subcategory_id:
-            query = query.filter(FullTimeJob.subcategory_id == subcategory_id)
-        
-        if skill_ids:
-            query = query.join(FullTimeJob.skills).filter(
-                Skill.id.in_(skill_ids)
-            ).distinct()
-        
-        if min_salary is not None:
-            query = query.filter(FullTimeJob.max_salary >= min_salary)
-        
-        if max_salary is not None:
-            query = query.filter(FullTimeJob.min_salary <= max_salary)
-        
-        return query.count()
-    
     def count_by_company(self, company_id: int) -> int:
         """Get count of jobs by company"""
         return self.db.query(FullTimeJob).filter(
@@ -802,13 +732,7 @@ class FullTimeJobRepository:
                                              max_salary: Optional[float] = None,
                                              current_user_id: Optional[int] = None) -> List[dict]:
         """Get jobs by corporate profile IDs with filters"""
-        query = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company),
-            joinedload(FullTimeJob.category),
-            joinedload(FullTimeJob.subcategory),
-            joinedload(FullTimeJob.created_by_user)
-        ).filter(
+        query = self.db.query(FullTimeJob).options(*self._list_load_options()).filter(
             FullTimeJob.company_id.in_(corporate_profile_ids)
         )
         
@@ -829,11 +753,7 @@ class FullTimeJobRepository:
         
         jobs = query.offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def count_by_corporate_profiles_with_filters(self, 
                                                corporate_profile_ids: List[int],
@@ -879,10 +799,7 @@ class FullTimeJobRepository:
                                    max_salary: Optional[float] = None,
                                    current_user_id: Optional[int] = None) -> List[dict]:
         """Get filtered jobs by user ID with skills"""
-        query = self.db.query(FullTimeJob).options(
-            joinedload(FullTimeJob.skills),
-            joinedload(FullTimeJob.company)
-        ).join(
+        query = self.db.query(FullTimeJob).options(*self._list_load_options()).join(
             CorporateProfile, FullTimeJob.company_id == CorporateProfile.id
         ).filter(
             CorporateProfile.user_id == user_id
@@ -911,11 +828,7 @@ class FullTimeJobRepository:
         
         jobs = query.offset(skip).limit(limit).all()
         
-        prepared_jobs = []
-        for job in jobs:
-            prepared_jobs.append(self._prepare_full_time_job_response(job, current_user_id))
-        
-        return prepared_jobs
+        return self._prepare_full_time_job_responses(jobs, current_user_id)
     
     def count_by_user_with_filters(self, 
                                   user_id: int,
@@ -1,6 +1,6 @@
 from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc, text
+from sqlalchemy import and_, or_, func, desc, text, case
 from datetime import datetime, timedelta
 from ..models.gig_job import GigJob
 from ..models.skill import Skill
@@ -11,8 +11,12 @@ from ..models.user import User
 from ..models.proposal import Proposal
 from ..schemas.gig_job import GigJobCreate, GigJobUpdate
 from ..schemas.location import Location as LocationSchema
-from ..pagination import PaginationParams
+from ..pagination import Page, PaginationParams
+from .paged_query import fetch_pagination
+from .job_viewer_context import JobViewerContext
+from .job_relevance import skill_match_subquery, relevance_score
 from ..core.config import settings
+from ..utils.full_text_search import prefix_tsquery, search_matches, search_rank
 
 
 class GigJobRepository:
@@ -88,15 +92,9 @@ class GigJobRepository:
             GigJob.is_deleted == False
         ).order_by(desc(GigJob.created_at))
         
-        total = base_query.count()
+        page = fetch_pagination(base_query, pagination)
         
-        gig_jobs = base_query.offset(pagination.offset).limit(pagination.limit).all()
-        
-        prepared_gig_jobs = []
-        for gig_job in gig_jobs:
-            prepared_gig_jobs.append(self._prepare_gig_job_response(gig_job, current_user_id))
-        
-        return prepared_gig_jobs, total
+        return self._prepare_gig_job_responses(page.items, current_user_id), page.total
 
     def get_user_gig_jobs_with_filters(
         self, 
@@ -159,20 +157,10 @@ class GigJobRepository:
             elif date_posted == "past_month":
                 query = query.filter(GigJob.created_at >= now - timedelta(days=30))
         
-        if sort_by == "most_recent":
-            query = query.order_by(desc(GigJob.created_at))
-        else:
-            query = query.order_by(desc(GigJob.created_at))
-        
-        total = query.count()
-        
-        gig_jobs = query.offset(pagination.offset).limit(pagination.limit).all()
+        viewer = JobViewerContext.load(self.db, current_user_id)
+        page = fetch_pagination(self._apply_sort(query, sort_by, viewer), pagination)
         
-        prepared_gig_jobs = []
-        for gig_job in gig_jobs:
-            prepared_gig_jobs.append(self._prepare_gig_job_response(gig_job, current_user_id))
-        
-        return prepared_gig_jobs, total
+        return self._prepare_gig_job_responses(page.items, current_user_id, viewer), page.total
 
     def update(self, gig_job_id: int, gig_job_data: GigJobUpdate, user_id: int) -> Optional[dict]:
         """Update a gig job"""
@@ -246,8 +234,8 @@ class GigJobRepository:
         date_posted: Optional[str] = None,
         sort_by: Optional[str] = "most_recent",
         current_user_id: Optional[int] = None
-    ) -> Tuple[List[dict], int]:
-        """Get all gig jobs with advanced filtering"""
+    ) -> Page:
+        """Get a page of gig jobs with advanced filtering; the total follows pagination.total_mode"""
         query = self.db.query(GigJob).options(
             joinedload(GigJob.category),
             joinedload(GigJob.subcategory),
@@ -289,57 +277,89 @@ class GigJobRepository:
             elif date_posted == "past_month":
                 query = query.filter(GigJob.created_at >= now - timedelta(days=30))
         
-        if sort_by == "most_recent":
-            query = query.order_by(desc(GigJob.created_at))
-        else:
-            query = query.order_by(desc(GigJob.created_at))
+        viewer = JobViewerContext.load(self.db, current_user_id)
+        page = fetch_pagination(self._apply_sort(query, sort_by, viewer), pagination)
         
-        total = query.count()
+        return page._replace(items=self._prepare_gig_job_responses(page.items, current_user_id, viewer))
+
+    def _prepare_gig_job_response(
+        self,
+        gig_job: GigJob,
+        current_user_id: Optional[int] = None,
+        viewer: Optional[JobViewerContext] = None
+    ) -> dict:
+        """Prepare gig job response data"""
+        return self._prepare_gig_job_responses([gig_job], current_user_id, viewer)[0]
+
+    def _prepare_gig_job_responses(
+        self,
+        gig_jobs: List[GigJob],
+        current_user_id: Optional[int] = None,
+        viewer: Optional[JobViewerContext] = None
+    ) -> List[dict]:
+        """Prepare response data for a page of gig jobs using grouped lookups instead of per-row queries"""
+        if not gig_jobs:
+            return []
+        
+        gig_job_ids = [gig_job.id for gig_job in gig_jobs]
+        author_ids = {gig_job.author_id for gig_job in gig_jobs}
+        
+        proposal_counts = dict(
+            self.db.query(Proposal.gig_job_id, func.count(Proposal.id)).filter(
+                Proposal.gig_job_id.in_(gig_job_ids),
+                Proposal.is_deleted == False
+            ).group_by(Proposal.gig_job_id).all()
+        )
         
-        gig_jobs = query.offset(pagination.offset).limit(pagination.limit).all()
+        author_job_counts = dict(
+            self.db.query(GigJob.author_id, func.count(GigJob.id)).filter(
+                GigJob.author_id.in_(author_ids),
+                GigJob.is_deleted == False
+            ).group_by(GigJob.author_id).all()
+        )
         
-        prepared_gig_jobs = []
-        for gig_job in gig_jobs:
-            prepared_gig_jobs.append(self._prepare_gig_job_response(gig_job, current_user_id))
+        gig_job_skill_ids = {}
+        for gig_job_skill in self.db.query(GigJobSkill).filter(
+            GigJobSkill.gig_job_id.in_(gig_job_ids)
+        ).order_by(GigJobSkill.id).all():
+            gig_job_skill_ids.setdefault((gig_job_skill.gig_job_id, gig_job_skill.skill_id), gig_job_skill.id)
         
-        return prepared_gig_jobs, total
-
-    def _prepare_gig_job_response(self, gig_job: GigJob, current_user_id: Optional[int] = None) -> dict:
-        """Prepare gig job response data"""
-        proposal_count = self.db.query(Proposal).filter(
-            Proposal.gig_job_id == gig_job.id,
-            Proposal.is_deleted == False
-        ).count()
+        if viewer is None:
+            viewer = JobViewerContext.load(self.db, current_user_id)
         
-        all_jobs_count = self.db.query(GigJob).filter(
-            GigJob.author_id == gig_job.author_id,
-            GigJob.is_deleted == False
-        ).count()
-        
-        relevance_score = None
-        is_saved = False
-        is_send_proposal = False
-        if current_user_id:
-            relevance_score = self._calculate_relevance_score(gig_job, current_user_id)
-            from ..models.saved_job import SavedJob
-            is_saved = self.db.query(SavedJob).filter(
-                SavedJob.user_id == current_user_id,
-                SavedJob.gig_job_id == gig_job.id
-            ).first() is not None
-            is_send_proposal = self.db.query(Proposal).filter(
-                Proposal.user_id == current_user_id,
-                Proposal.gig_job_id == gig_job.id,
-                Proposal.is_deleted == False
-            ).first() is not None
+        relevance_scores = {}
+        if viewer is not None:
+            viewer.load_job_flags(self.db, gig_job_ids=gig_job_ids)
+            relevance_scores = self._relevance_scores(gig_job_ids, viewer)
         
+        prepared_gig_jobs = []
+        for gig_job in gig_jobs:
+            prepared_gig_jobs.append(self._build_gig_job_response(
+                gig_job,
+                skill_link_ids=gig_job_skill_ids,
+                proposal_count=proposal_counts.get(gig_job.id, 0),
+                all_jobs_count=author_job_counts.get(gig_job.author_id, 0),
+                relevance_score=relevance_scores.get(gig_job.id),
+                is_saved=viewer is not None and gig_job.id in viewer.saved_gig_job_ids,
+                is_send_proposal=viewer is not None and gig_job.id in viewer.proposal_gig_job_ids
+            ))
+        
+        return prepared_gig_jobs
+
+    def _build_gig_job_response(
+        self,
+        gig_job: GigJob,
+        skill_link_ids: dict,
+        proposal_count: int,
+        all_jobs_count: int,
+        relevance_score: Optional[float],
+        is_saved: bool,
+        is_send_proposal: bool
+    ) -> dict:
+        """Build gig job response dict from already loaded data"""
         skills_data = []
         for skill in gig_job.skills:
             if not skill.is_deleted:
-                gig_job_skill = self.db.query(GigJobSkill).filter(
-                    GigJobSkill.gig_job_id == gig_job.id,
-                    GigJobSkill.skill_id == skill.id
-                ).first()
-                
                 skill_data = {
                     "id": skill.id,
                     "name": skill.name,
@@ -348,8 +368,9 @@ class GigJobRepository:
                     "is_deleted": skill.is_deleted
                 }
                 
-                if gig_job_skill:
-                    skill_data["gig_job_skill_id"] = gig_job_skill.id
+                gig_job_skill_id = skill_link_ids.get((gig_job.id, skill.id))
+                if gig_job_skill_id:
+                    skill_data["gig_job_skill_id"] = gig_job_skill_id
                 
                 skills_data.append(skill_data)
         
@@ -413,77 +434,59 @@ class GigJobRepository:
         
         return response_data
 
-    def _calculate_relevance_score(self, gig_job: GigJob, current_user_id: int) -> float:
-        """Calculate relevance score based on user skills and job requirements"""
-        from ..models.user_skill import UserSkill
-        from ..models.user import User
-        
-        user_skills = self.db.query(UserSkill).filter(
-            UserSkill.user_id == current_user_id,
-            UserSkill.is_deleted == False
-        ).all()
-        
-        if not user_skills:
-            return 0.0
-        
-        user_skill_ids = {skill.skill_id for skill in user_skills}
-        job_skill_ids = {skill.id for skill in gig_job.skills if not skill.is_deleted}
-        
-        if not job_skill_ids:
-            return 0.0
-        
-        matching_skills = user_skill_ids.intersection(job_skill_ids)
-        skill_match_percentage = (len(matching_skills) / len(job_skill_ids)) * 100
-        
-        user = self.db.query(User).filter(User.id == current_user_id).first()
-        if not user:
-            return round(skill_match_percentage, 2)
-        
-        bonus_score = 0.0
-        
-        if hasattr(gig_job, 'experience_level') and hasattr(user, 'experience_level'):
-            if gig_job.experience_level == user.experience_level:
-                bonus_score += 10.0
-        
-        if hasattr(gig_job, 'location_id') and gig_job.location_id and hasattr(user, 'location_id'):
-            if gig_job.location_id == user.location_id:
-                bonus_score += 5.0
-        
-        if hasattr(user, 'expected_salary') and user.expected_salary:
-            if gig_job.min_salary <= user.expected_salary <= gig_job.max_salary:
-                bonus_score += 15.0
-            elif user.expected_salary < gig_job.min_salary:
-                bonus_score += 5.0
-        
-        final_score = min(skill_match_percentage + bonus_score, 100.0)
-        
-        return round(final_score, 2)
+    def _relevance_bonus(self, viewer: JobViewerContext):
+        """SQL bonus added to the skill match: +5 when the job is in the viewer's location"""
+        if viewer.user is None or not viewer.user.location_id:
+            return None
+        return case((GigJob.location_id == viewer.user.location_id, 5.0), else_=0.0)
+
+    def _relevance_scores(self, gig_job_ids: List[int], viewer: JobViewerContext) -> dict:
+        """Relevance score of each gig job for the viewer, in one query"""
+        if not viewer.skill_ids:
+            return {gig_job_id: 0.0 for gig_job_id in gig_job_ids}
+        match = skill_match_subquery(self.db, GigJobSkill.gig_job_id, GigJobSkill.skill_id, viewer, gig_job_ids)
+        return dict(
+            self.db.query(GigJob.id, relevance_score(match, self._relevance_bonus(viewer)))
+            .outerjoin(match, match.c.job_id == GigJob.id)
+            .filter(GigJob.id.in_(gig_job_ids))
+            .all()
+        )
 
-    def search_gig_jobs(self, search_term: str, pagination: PaginationParams, current_user_id: Optional[int] = None) -> Tuple[List[dict], int]:
-        """Search gig jobs by title, description, or skills"""
+    def _apply_sort(self, query, sort_by: Optional[str], viewer: Optional[JobViewerContext]):
+        """Order a gig job query; most_relevant sorts the whole result set by the viewer's relevance score"""
+        if sort_by == "most_relevant" and viewer is not None and viewer.skill_ids:
+            match = skill_match_subquery(self.db, GigJobSkill.gig_job_id, GigJobSkill.skill_id, viewer)
+            score = relevance_score(match, self._relevance_bonus(viewer))
+            query = query.outerjoin(match, match.c.job_id == GigJob.id).order_by(desc(score))
+        return query.order_by(desc(GigJob.created_at), desc(GigJob.id))
+
+    def search_gig_jobs(self, search_term: str, pagination: PaginationParams, current_user_id: Optional[int] = None) -> Page:
+        """Search gig jobs by title and description, best matches first; the total follows pagination.total_mode"""
         query = self.db.query(GigJob).options(
             joinedload(GigJob.category),
             joinedload(GigJob.subcategory),
             joinedload(GigJob.location),
             joinedload(GigJob.skills),
             joinedload(GigJob.author)
-        ).filter(
-            GigJob.is_deleted == False,
-            or_(
-                GigJob.title.ilike(f"%{search_term}%"),
-                GigJob.description.ilike(f"%{search_term}%")
+        ).filter(GigJob.is_deleted == False)
+
+        tsquery = prefix_tsquery(search_term)
+        if tsquery:
+            query = query.filter(search_matches(GigJob.search_vector, tsquery)).order_by(
+                desc(search_rank(GigJob.search_vector, tsquery)),
+                GigJob.created_at.desc()
             )
-        ).order_by(GigJob.created_at.desc())
-        
-        total = query.count()
-        
-        gig_jobs = query.offset(pagination.offset).limit(pagination.limit).all()
+        else:
+            query = query.filter(
+                or_(
+                    GigJob.title.ilike(f"%{search_term}%"),
+                    GigJob.description.ilike(f"%{search_term}%")
+                )
+            ).order_by(GigJob.created_at.desc())
         
-        prepared_gig_jobs = []
-        for gig_job in gig_jobs:
-            prepared_gig_jobs.append(self._prepare_gig_job_response(gig_job, current_user_id))
+        page = fetch_pagination(query, pagination)
         
-        return prepared_gig_jobs, total
+        return page._replace(items=self._prepare_gig_job_responses(page.items, current_user_id))
     
     def remove_gig_job_skill(self, gig_job_id: int, gig_job_skill_id: int, user_id: int) -> dict:
         """Remove GigJobSkill relationship from a gig job"""
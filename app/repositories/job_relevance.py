@@ -0,0 +1,41 @@
+from typing import Iterable, Optional
+from sqlalchemy import Float, Numeric, case, cast, func
+from sqlalchemy.orm import Session
+from ..models.skill import Skill
+from .job_viewer_context import JobViewerContext
+
+
+def skill_match_subquery(
+    db: Session,
+    job_id_column,
+    skill_id_column,
+    viewer: JobViewerContext,
+    job_ids: Optional[Iterable[int]] = None
+):
+    """Per-job count of non-deleted skills and of those the viewer has (columns job_id, skill_count, matched_count)"""
+    skill_count = func.count(func.distinct(skill_id_column))
+    query = db.query(
+        job_id_column.label("job_id"),
+        skill_count.label("skill_count"),
+        skill_count.filter(skill_id_column.in_(viewer.skill_ids)).label("matched_count")
+    ).join(Skill, Skill.id == skill_id_column).filter(Skill.is_deleted == False)
+    if job_ids is not None:
+        query = query.filter(job_id_column.in_(list(job_ids)))
+    return query.group_by(job_id_column).subquery()
+
+
+def relevance_score(match, bonus=None):
+    """Relevance in SQL: percentage of the job's skills the viewer has plus bonus, capped at 100, 0 for jobs without skills
+
+    match must be outer-joined to the job table; bonus is an optional SQL expression evaluated per job.
+    """
+    score = 100.0 * match.c.matched_count / match.c.skill_count
+    if bonus is not None:
+        score = score + bonus
+    return cast(
+        case(
+            (match.c.skill_count > 0, func.round(cast(func.least(score, 100.0), Numeric), 2)),
+            else_=0.0
+        ),
+        Float
+    )
@@ -0,0 +1,84 @@
+from typing import Iterable, Optional, Set
+from sqlalchemy.orm import Session
+from ..models.user import User
+from ..models.user_skill import UserSkill
+from ..models.saved_job import SavedJob
+from ..models.proposal import Proposal
+
+
+class JobViewerContext:
+    """Per-request data about the user viewing job listings.
+
+    Loaded once per request and shared by the gig and full-time job
+    response builders so that saved/proposal flags and relevance scoring
+    do not re-query the viewer for every row on a page. The viewer's skills
+    are loaded up front (they drive relevance sorting); saved/proposal flags
+    are loaded per page with load_job_flags, restricted to that page's jobs.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        user: Optional[User] = None,
+        skill_ids: Optional[Set[int]] = None,
+        saved_gig_job_ids: Optional[Set[int]] = None,
+        saved_full_time_job_ids: Optional[Set[int]] = None,
+        proposal_gig_job_ids: Optional[Set[int]] = None,
+        proposal_full_time_job_ids: Optional[Set[int]] = None
+    ):
+        self.user_id = user_id
+        self.user = user
+        self.skill_ids = skill_ids or set()
+        self.saved_gig_job_ids = saved_gig_job_ids or set()
+        self.saved_full_time_job_ids = saved_full_time_job_ids or set()
+        self.proposal_gig_job_ids = proposal_gig_job_ids or set()
+        self.proposal_full_time_job_ids = proposal_full_time_job_ids or set()
+
+    @classmethod
+    def load(cls, db: Session, user_id: Optional[int]) -> Optional["JobViewerContext"]:
+        """Load viewer context for a user, or None for anonymous requests"""
+        if not user_id:
+            return None
+
+        skill_ids = {
+            row.skill_id for row in db.query(UserSkill.skill_id).filter(
+                UserSkill.user_id == user_id,
+                UserSkill.is_deleted == False
+            ).all()
+        }
+
+        user = None
+        if skill_ids:
+            user = db.query(User).filter(User.id == user_id).first()
+
+        return cls(user_id=user_id, user=user, skill_ids=skill_ids)
+
+    def load_job_flags(
+        self,
+        db: Session,
+        gig_job_ids: Iterable[int] = (),
+        full_time_job_ids: Iterable[int] = ()
+    ):
+        """Load which of a page's jobs the viewer saved or sent a proposal to"""
+        gig_job_ids = list(gig_job_ids)
+        full_time_job_ids = list(full_time_job_ids)
+        if gig_job_ids:
+            self.saved_gig_job_ids.update(row.gig_job_id for row in db.query(SavedJob.gig_job_id).filter(
+                SavedJob.user_id == self.user_id,
+                SavedJob.gig_job_id.in_(gig_job_ids)
+            ).all())
+            self.proposal_gig_job_ids.update(row.gig_job_id for row in db.query(Proposal.gig_job_id).filter(
+                Proposal.user_id == self.user_id,
+                Proposal.gig_job_id.in_(gig_job_ids),
+                Proposal.is_deleted == False
+            ).all())
+        if full_time_job_ids:
+            self.saved_full_time_job_ids.update(row.full_time_job_id for row in db.query(SavedJob.full_time_job_id).filter(
+                SavedJob.user_id == self.user_id,
+                SavedJob.full_time_job_id.in_(full_time_job_ids)
+            ).all())
+            self.proposal_full_time_job_ids.update(row.full_time_job_id for row in db.query(Proposal.full_time_job_id).filter(
+                Proposal.user_id == self.user_id,
+                Proposal.full_time_job_id.in_(full_time_job_ids),
+                Proposal.is_deleted == False
+            ).all())
@@ -1,13 +1,16 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc
-from typing import List, Optional
-from app.models.notification import Notification, NotificationType
+from sqlalchemy import String, and_, cast, or_, desc, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.models.notification import Notification, NotificationType, NotificationUnreadCounter, NotificationOutbox
 from app.models.user import User
 from app.models.proposal import Proposal
 from app.models.gig_job import GigJob
 from app.models.full_time_job import FullTimeJob
 from app.models.chat import ChatRoom, ChatMessage
 from app.pagination import PaginationParams
+from app.repositories.paged_query import fetch_pagination
 
 
 class NotificationRepository:
@@ -29,6 +32,38 @@ class NotificationRepository:
         sender_id: Optional[int] = None
     ) -> Notification:
         """Create a new notification"""
+        notification = self.add(
+            type=type,
+            title=title,
+            body=body,
+            recipient_user_id=recipient_user_id,
+            proposal_id=proposal_id,
+            job_id=job_id,
+            job_type=job_type,
+            applicant_id=applicant_id,
+            room_id=room_id,
+            message_id=message_id,
+            sender_id=sender_id
+        )
+        self.db.commit()
+        self.db.refresh(notification)
+        return notification
+
+    def add(
+        self,
+        type: NotificationType,
+        title: str,
+        body: str,
+        recipient_user_id: int,
+        proposal_id: Optional[int] = None,
+        job_id: Optional[int] = None,
+        job_type: Optional[str] = None,
+        applicant_id: Optional[int] = None,
+        room_id: Optional[int] = None,
+        message_id: Optional[int] = None,
+        sender_id: Optional[int] = None
+    ) -> Notification:
+        """Add a notification inside the caller's transaction without committing"""
         notification = Notification(
             type=type,
             title=title,
@@ -44,10 +79,49 @@ class NotificationRepository:
             is_read=False
         )
         self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
+        self._adjust_unread_counter(recipient_user_id, type, 1)
+        self.db.flush()
         return notification
 
+    def add_push(
+        self,
+        recipient_user_id: int,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+        notification_id: Optional[int] = None
+    ) -> NotificationOutbox:
+        """Add a push notification to the outbox inside the caller's transaction without committing"""
+        entry = NotificationOutbox(
+            notification_id=notification_id,
+            recipient_user_id=recipient_user_id,
+            title=title,
+            body=body,
+            data=data
+        )
+        self.db.add(entry)
+        return entry
+
+    def claim_pending_pushes(self, limit: int) -> List[NotificationOutbox]:
+        """Lock the oldest unsent outbox entries, skipping rows another relay already holds"""
+        return self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.processed_at.is_(None)
+        ).order_by(NotificationOutbox.id).limit(limit).with_for_update(skip_locked=True).all()
+
+    def complete_push(self, entry: NotificationOutbox, error: Optional[str] = None, max_attempts: int = 1):
+        """
+        Record a relay attempt inside the caller's transaction.
+        Sent entries are deleted; failed ones stay pending until max_attempts,
+        then are kept with processed_at and last_error set for inspection.
+        """
+        if error is None:
+            self.db.delete(entry)
+            return
+        entry.attempts += 1
+        entry.last_error = error
+        if entry.attempts >= max_attempts:
+            entry.processed_at = datetime.now(timezone.utc)
+
     def get_by_id(self, notification_id: int) -> Optional[Notification]:
         """Get notification by ID"""
         return self.db.query(Notification).options(
@@ -91,15 +165,8 @@ class NotificationRepository:
         if is_read is not None:
             query = query.filter(Notification.is_read == is_read)
 
-        total = query.count()
-
-        if pagination:
-            query = query.order_by(desc(Notification.created_at)).offset(pagination.offset).limit(pagination.limit)
-        else:
-            query = query.order_by(desc(Notification.created_at))
-
-        notifications = query.all()
-        return notifications, total
+        page = fetch_pagination(query.order_by(desc(Notification.created_at)), pagination)
+        return page.items, page.total
 
     def get_applications(
         self,
@@ -140,51 +207,139 @@ class NotificationRepository:
             pagination=pagination
         )
 
-    def mark_as_read(self, notification_id: int, user_id: int) -> bool:
-        """Mark notification as read"""
-        notification = self.db.query(Notification).filter(
-            and_(
+    def mark_as_read(self, notification_id: int, user_id: int) -> Optional[Dict[str, int]]:
+        """
+        Mark notification as read
+
+        Returns:
+            Unread notifications cleared per type ({} if it was already read),
+            or None when the notification does not exist
+        """
+        # only the request that flips is_read reports the change, so concurrent reads never count it twice
+        cleared_type = self.db.execute(
+            update(Notification).where(
                 Notification.id == notification_id,
-                Notification.recipient_user_id == user_id
-            )
-        ).first()
+                Notification.recipient_user_id == user_id,
+                Notification.is_read == False
+            ).values(is_read=True).returning(Notification.type)
+        ).scalar()
 
-        if not notification:
-            return False
+        if cleared_type is None:
+            exists = self.db.query(Notification.id).filter(
+                and_(
+                    Notification.id == notification_id,
+                    Notification.recipient_user_id == user_id
+                )
+            ).first()
+            return {} if exists else None
 
-        notification.is_read = True
+        self._adjust_unread_counter(user_id, cleared_type, -1)
         self.db.commit()
-        return True
+        return {self._counter_type(cleared_type): 1}
 
-    def mark_all_as_read(self, user_id: int, notification_type: Optional[NotificationType] = None) -> int:
-        """Mark all notifications as read for a user"""
-        query = self.db.query(Notification).filter(
-            and_(
-                Notification.recipient_user_id == user_id,
-                Notification.is_read == False
-            )
+    def mark_all_as_read(self, user_id: int, notification_type: Optional[NotificationType] = None) -> Dict[str, int]:
+        """Mark all notifications as read for a user. Returns the unread notifications cleared per type"""
+        statement = update(Notification).where(
+            Notification.recipient_user_id == user_id,
+            Notification.is_read == False
         )
 
         if notification_type:
-            query = query.filter(Notification.type == notification_type)
+            statement = statement.where(Notification.type == notification_type)
+
+        cleared: Dict[str, int] = {}
+        for type in self.db.execute(statement.values(is_read=True).returning(Notification.type)).scalars():
+            key = self._counter_type(type)
+            cleared[key] = cleared.get(key, 0) + 1
+
+        counters = self.db.query(NotificationUnreadCounter).filter(NotificationUnreadCounter.user_id == user_id)
+        if notification_type:
+            counters = counters.filter(NotificationUnreadCounter.type == self._counter_type(notification_type))
+        counters.update({"count": 0}, synchronize_session=False)
 
-        count = query.update({"is_read": True})
         self.db.commit()
-        return count
+        return cleared
 
     def get_unread_count(self, user_id: int, notification_type: Optional[NotificationType] = None) -> int:
         """Get count of unread notifications"""
-        query = self.db.query(Notification).filter(
+        query = self.db.query(func.coalesce(func.sum(NotificationUnreadCounter.count), 0)).filter(
+            NotificationUnreadCounter.user_id == user_id
+        )
+
+        if notification_type:
+            query = query.filter(NotificationUnreadCounter.type == self._counter_type(notification_type))
+
+        return query.scalar()
+
+    def get_unread_counts(self, user_id: int) -> Dict[str, int]:
+        """Get unread notification counts keyed by notification type"""
+        rows = self.db.query(NotificationUnreadCounter.type, NotificationUnreadCounter.count).filter(
+            NotificationUnreadCounter.user_id == user_id
+        ).all()
+        return {type: count for type, count in rows}
+
+    @staticmethod
+    def _counter_type(notification_type) -> str:
+        return notification_type.value if isinstance(notification_type, NotificationType) else str(notification_type)
+
+    def _adjust_unread_counter(self, user_id: int, notification_type, delta: int):
+        """Upsert a user's unread counter inside the caller's transaction"""
+        statement = insert(NotificationUnreadCounter).values(
+            user_id=user_id,
+            type=self._counter_type(notification_type),
+            count=max(delta, 0)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[NotificationUnreadCounter.user_id, NotificationUnreadCounter.type],
+            set_={"count": func.greatest(NotificationUnreadCounter.count + delta, 0)}
+        )
+        self.db.execute(statement)
+
+    def reconcile_unread_counters(self) -> int:
+        """
+        Rebuild unread counters from the notifications table in one transaction.
+        Returns the number of counter rows written.
+
+        The counters table is locked in SHARE ROW EXCLUSIVE mode first, which
+        waits for transactions that already adjusted a counter and holds back
+        new adjustments until commit, so notifications created or read while
+        the rebuild runs are neither lost nor counted twice.
+        """
+        self.db.execute(text("LOCK TABLE notification_unread_counters IN SHARE ROW EXCLUSIVE MODE"))
+
+        notification_type = cast(Notification.type, String)
+        actual = select(
+            Notification.recipient_user_id,
+            notification_type,
+            func.count(Notification.id)
+        ).where(Notification.is_read == False).group_by(
+            Notification.recipient_user_id, notification_type
+        )
+        statement = insert(NotificationUnreadCounter).from_select(
+            [NotificationUnreadCounter.user_id, NotificationUnreadCounter.type, NotificationUnreadCounter.count],
+            actual
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[NotificationUnreadCounter.user_id, NotificationUnreadCounter.type],
+            set_={"count": statement.excluded.count}
+        )
+        written = self.db.execute(statement).rowcount
+
+        unread = select(Notification.id).where(
             and_(
-                Notification.recipient_user_id == user_id,
+                Notification.recipient_user_id == NotificationUnreadCounter.user_id,
+                notification_type == NotificationUnreadCounter.type,
                 Notification.is_read == False
             )
+        ).exists()
+        self.db.execute(
+            update(NotificationUnreadCounter).where(
+                and_(NotificationUnreadCounter.count != 0, ~unread)
+            ).values(count=0)
         )
 
-        if notification_type:
-            query = query.filter(Notification.type == notification_type)
-
-        return query.count()
+        self.db.commit()
+        return written
 
     def delete(self, notification_id: int, user_id: int) -> bool:
         """Delete a notification"""
@@ -198,6 +353,8 @@ class NotificationRepository:
         if not notification:
             return False
 
+        if not notification.is_read:
+            self._adjust_unread_counter(user_id, notification.type, -1)
         self.db.delete(notification)
         self.db.commit()
         return True
@@ -0,0 +1,83 @@
+import json
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from ..core.constants import ESTIMATED_TOTAL_THRESHOLD
+from ..pagination import Page, PaginationParams, TotalMode
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, compiled with the statement's own bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_total(query: Query) -> int:
+    """Planner row estimate of a query's result set (no rows are read)"""
+    statement = query.enable_eagerloads(False).order_by(None).statement
+    plan = query.session.execute(_Explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def fetch_page(query: Query, offset: int, limit: int, total_mode: TotalMode = TotalMode.EXACT) -> Page:
+    """
+    Run one page of a listing query together with its total
+
+    EXACT adds COUNT(*) OVER () to the page query, so rows and total come from a
+    single statement (the window is evaluated before LIMIT, and inside the
+    subquery SQLAlchemy wraps around LIMIT for joined eager loads). ESTIMATED uses
+    the planner's row estimate when it is at least ESTIMATED_TOTAL_THRESHOLD and
+    falls back to EXACT below that. NONE skips counting and reads one extra row
+    to fill has_more. The query must select a single entity without DISTINCT.
+
+    Args:
+        query: Filtered and ordered query, without offset/limit
+        offset: Rows to skip
+        limit: Page size
+        total_mode: How to compute the total
+
+    Returns:
+        Page of entities
+    """
+    if total_mode == TotalMode.NONE:
+        rows = query.offset(offset).limit(limit + 1).all()
+        return Page(items=rows[:limit], total=None, has_more=len(rows) > limit)
+
+    if total_mode == TotalMode.ESTIMATED:
+        estimate = estimate_total(query)
+        if estimate >= ESTIMATED_TOTAL_THRESHOLD:
+            rows = query.offset(offset).limit(limit + 1).all()
+            return Page(
+                items=rows[:limit],
+                total=max(estimate, offset + len(rows)),
+                has_more=len(rows) > limit,
+                total_is_estimate=True
+            )
+
+    rows = query.add_columns(func.count().over().label("page_total")).offset(offset).limit(limit).all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0].page_total
+    else:
+        # an empty page carries no window value; only count when the page is past the end
+        total = query.order_by(None).count() if offset else 0
+    return Page(items=items, total=total, has_more=offset + len(items) < total)
+
+
+def fetch_pagination(query: Query, pagination: Optional[PaginationParams]) -> Page:
+    """fetch_page for PaginationParams; without pagination every row is returned"""
+    if pagination is None:
+        items = query.all()
+        return Page(items=items, total=len(items), has_more=False)
+    return fetch_page(query, pagination.offset, pagination.limit, pagination.total_mode)
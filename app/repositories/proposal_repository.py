@@ -7,6 +7,7 @@ from app.models.full_time_job import FullTimeJob
 from app.models.user import User
 from app.schemas.proposal import ProposalCreate, ProposalUpdate
 from app.pagination import PaginationParams
+from app.repositories.paged_query import fetch_pagination
 
 
 class ProposalRepository:
@@ -62,11 +63,9 @@ class ProposalRepository:
             joinedload(Proposal.full_time_job).joinedload(FullTimeJob.skills)
         ).filter(Proposal.user_id == user_id)
         
-        total = query.count()
+        page = fetch_pagination(query, pagination)
         
-        proposals = query.offset(pagination.offset).limit(pagination.limit).all()
-        
-        return proposals, total
+        return page.items, page.total
 
     def get_user_gig_job_proposals(self, user_id: int, pagination: PaginationParams) -> tuple[List[Proposal], int]:
         """Get paginated gig job proposals submitted by a specific user with relationships"""
@@ -83,11 +82,9 @@ class ProposalRepository:
             and_(Proposal.user_id == user_id, Proposal.gig_job_id.isnot(None))
         )
         
-        total = query.count()
-        
-        proposals = query.offset(pagination.offset).limit(pagination.limit).all()
+        page = fetch_pagination(query, pagination)
         
-        return proposals, total
+        return page.items, page.total
 
     def get_user_full_time_job_proposals(self, user_id: int, pagination: PaginationParams) -> tuple[List[Proposal], int]:
         """Get paginated full-time job proposals submitted by a specific user with relationships"""
@@ -106,11 +103,9 @@ class ProposalRepository:
             and_(Proposal.user_id == user_id, Proposal.full_time_job_id.isnot(None))
         )
         
-        total = query.count()
-        
-        proposals = query.offset(pagination.offset).limit(pagination.limit).all()
+        page = fetch_pagination(query, pagination)
         
-        return proposals, total
+        return page.items, page.total
 
     def get_gig_job_proposals(self, gig_job_id: int, pagination: PaginationParams) -> tuple[List[Proposal], int]:
         """Get paginated proposals for a specific gig job with relationships"""
@@ -131,11 +126,9 @@ class ProposalRepository:
             joinedload(Proposal.full_time_job).joinedload(FullTimeJob.skills)
         ).filter(Proposal.gig_job_id == gig_job_id)
         
-        total = query.count()
+        page = fetch_pagination(query, pagination)
         
-        proposals = query.offset(pagination.offset).limit(pagination.limit).all()
-        
-        return proposals, total
+        return page.items, page.total
 
     def get_all_proposals(self, pagination: PaginationParams) -> tuple[List[Proposal], int]:
         """Get all proposals with pagination (for admin)"""
@@ -156,10 +149,9 @@ class ProposalRepository:
             joinedload(Proposal.full_time_job).joinedload(FullTimeJob.skills)
         ).filter(Proposal.is_deleted == False)
         
-        total = query.count()
-        proposals = query.order_by(Proposal.created_at.desc()).offset(pagination.offset).limit(pagination.limit).all()
+        page = fetch_pagination(query.order_by(Proposal.created_at.desc()), pagination)
         
-        return proposals, total
+        return page.items, page.total
     
     def get_full_time_job_proposals(self, full_time_job_id: int, pagination: PaginationParams) -> tuple[List[Proposal], int]:
         """Get paginated proposals for a specific full-time job with relationships"""
@@ -180,11 +172,9 @@ class ProposalRepository:
             joinedload(Proposal.full_time_job).joinedload(FullTimeJob.skills)
         ).filter(Proposal.full_time_job_id == full_time_job_id)
         
-        total = query.count()
-        
-        proposals = query.offset(pagination.offset).limit(pagination.limit).all()
+        page = fetch_pagination(query, pagination)
         
-        return proposals, total
+        return page.items, page.total
 
     def update(self, proposal_id: int, proposal_data: ProposalUpdate, user_id: int) -> Optional[Proposal]:
         """Update proposal (only by author)"""
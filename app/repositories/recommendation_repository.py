@@ -0,0 +1,219 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, text, union_all
+from sqlalchemy.orm import Session
+from ..models.job_recommendation import JobRecommendation
+from ..models.gig_job import GigJob
+from ..models.gig_job_skill import GigJobSkill
+from ..models.full_time_job import FullTimeJob
+from ..models.full_time_job_skill import FullTimeJobSkill
+from ..models.corporate_profile import CorporateProfile
+from ..models.user import User
+from ..models.user_skill import UserSkill
+from ..models.skill import Skill
+
+GIG = "gig"
+FULL_TIME = "full_time"
+
+JobKey = Tuple[str, int]
+
+_TRIM_SQL = text("""
+    DELETE FROM job_recommendations
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY score DESC, id DESC) AS position
+            FROM job_recommendations
+            WHERE user_id = ANY(:user_ids)
+        ) ranked
+        WHERE position > :top_n
+    )
+""")
+
+
+class RecommendationRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _gig_job_skills(self):
+        """(kind, job_id, skill_id) rows of active gig jobs"""
+        return select(literal(GIG).label("kind"), GigJobSkill.gig_job_id.label("job_id"), GigJobSkill.skill_id).join(
+            GigJob, GigJob.id == GigJobSkill.gig_job_id
+        ).join(Skill, Skill.id == GigJobSkill.skill_id).where(
+            GigJob.is_deleted == False,
+            GigJob.status == "active",
+            Skill.is_deleted == False
+        )
+
+    def _full_time_job_skills(self):
+        """(kind, job_id, skill_id) rows of active full-time jobs from verified companies"""
+        return select(literal(FULL_TIME).label("kind"), FullTimeJobSkill.full_time_job_id.label("job_id"), FullTimeJobSkill.skill_id).join(
+            FullTimeJob, FullTimeJob.id == FullTimeJobSkill.full_time_job_id
+        ).join(CorporateProfile, CorporateProfile.id == FullTimeJob.company_id).join(
+            Skill, Skill.id == FullTimeJobSkill.skill_id
+        ).where(
+            FullTimeJob.status == "active",
+            CorporateProfile.is_verified == True,
+            CorporateProfile.is_deleted == False,
+            Skill.is_deleted == False
+        )
+
+    def _group_job_skills(self, statement) -> Dict[JobKey, List[int]]:
+        jobs: Dict[JobKey, List[int]] = {}
+        for kind, job_id, skill_id in self.db.execute(statement.order_by(text("kind"), text("job_id"))):
+            jobs.setdefault((kind, job_id), []).append(skill_id)
+        return jobs
+
+    def get_active_job_skills(self) -> Dict[JobKey, List[int]]:
+        """Skill IDs of every recommendable job, keyed by (kind, job_id) in id order"""
+        return self._group_job_skills(union_all(self._gig_job_skills(), self._full_time_job_skills()))
+
+    def get_job_skills_sharing(self, skill_ids: Iterable[int]) -> Dict[JobKey, List[int]]:
+        """Full skill lists of recommendable jobs that require at least one of the given skills"""
+        skill_ids = list(skill_ids)
+        gig_ids = select(GigJobSkill.gig_job_id).where(GigJobSkill.skill_id.in_(skill_ids))
+        full_time_ids = select(FullTimeJobSkill.full_time_job_id).where(FullTimeJobSkill.skill_id.in_(skill_ids))
+        return self._group_job_skills(union_all(
+            self._gig_job_skills().where(GigJobSkill.gig_job_id.in_(gig_ids)),
+            self._full_time_job_skills().where(FullTimeJobSkill.full_time_job_id.in_(full_time_ids))
+        ))
+
+    def get_job_skill_ids(self, kind: str, job_id: int) -> List[int]:
+        """Skill IDs of one job, or an empty list if it is not recommendable"""
+        if kind == GIG:
+            statement = self._gig_job_skills().where(GigJobSkill.gig_job_id == job_id)
+        else:
+            statement = self._full_time_job_skills().where(FullTimeJobSkill.full_time_job_id == job_id)
+        return sorted({row.skill_id for row in self.db.execute(statement)})
+
+    def _user_skills(self):
+        return select(UserSkill.user_id, UserSkill.skill_id).join(
+            User, User.id == UserSkill.user_id
+        ).join(Skill, Skill.id == UserSkill.skill_id).where(
+            UserSkill.is_deleted == False,
+            Skill.is_deleted == False,
+            User.is_deleted == False
+        )
+
+    def _group_user_skills(self, statement) -> Dict[int, List[int]]:
+        users: Dict[int, List[int]] = {}
+        for user_id, skill_id in self.db.execute(statement):
+            skills = users.setdefault(user_id, [])
+            if skill_id not in skills:
+                skills.append(skill_id)
+        return users
+
+    def get_user_skill_ids(self, user_id: int) -> List[int]:
+        """Skill IDs of one user"""
+        return self._group_user_skills(self._user_skills().where(UserSkill.user_id == user_id)).get(user_id, [])
+
+    def get_user_skills_sharing(self, skill_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Full skill lists of users that have at least one of the given skills"""
+        user_ids = select(UserSkill.user_id).where(UserSkill.skill_id.in_(list(skill_ids)), UserSkill.is_deleted == False)
+        return self._group_user_skills(self._user_skills().where(UserSkill.user_id.in_(user_ids)))
+
+    def iter_user_skill_batches(self, batch_size: int) -> Iterator[Dict[int, List[int]]]:
+        """Skill lists of all users with skills, batch_size users at a time in user_id order"""
+        last_user_id = 0
+        while True:
+            user_ids = self.db.execute(
+                select(UserSkill.user_id).where(
+                    UserSkill.user_id > last_user_id,
+                    UserSkill.is_deleted == False
+                ).group_by(UserSkill.user_id).order_by(UserSkill.user_id).limit(batch_size)
+            ).scalars().all()
+            if not user_ids:
+                return
+            last_user_id = user_ids[-1]
+            batch = self._group_user_skills(self._user_skills().where(UserSkill.user_id.in_(user_ids)))
+            if batch:
+                yield batch
+
+    def _rows(self, user_id: int, matches: Iterable[Tuple[JobKey, float]]) -> List[dict]:
+        return [
+            {
+                "user_id": user_id,
+                "gig_job_id": job_id if kind == GIG else None,
+                "full_time_job_id": job_id if kind == FULL_TIME else None,
+                "score": score
+            }
+            for (kind, job_id), score in matches
+        ]
+
+    def replace_for_users(self, matches_by_user: Dict[int, List[Tuple[JobKey, float]]]):
+        """Replace the recommendation lists of the given users"""
+        self.db.execute(delete(JobRecommendation).where(JobRecommendation.user_id.in_(list(matches_by_user))))
+        rows = [row for user_id, matches in matches_by_user.items() for row in self._rows(user_id, matches)]
+        if rows:
+            self.db.execute(insert(JobRecommendation), rows)
+        self.db.commit()
+
+    def _job_filter(self, kind: str, job_id: int):
+        if kind == GIG:
+            return JobRecommendation.gig_job_id == job_id
+        return JobRecommendation.full_time_job_id == job_id
+
+    def replace_for_job(self, kind: str, job_id: int, scores_by_user: Dict[int, float], top_n: int):
+        """Put one job into the lists of the given users, keeping each list at top_n entries"""
+        self.db.execute(delete(JobRecommendation).where(self._job_filter(kind, job_id)))
+        rows = [row for user_id, score in scores_by_user.items() for row in self._rows(user_id, [((kind, job_id), score)])]
+        if rows:
+            self.db.execute(insert(JobRecommendation), rows)
+            self.db.execute(_TRIM_SQL, {"user_ids": list(scores_by_user), "top_n": top_n})
+        self.db.commit()
+
+    def remove_job(self, kind: str, job_id: int):
+        """Drop a job from every recommendation list"""
+        self.db.execute(delete(JobRecommendation).where(self._job_filter(kind, job_id)))
+        self.db.commit()
+
+    def current_timestamp(self):
+        """Database time, used to find rows a full rebuild did not rewrite"""
+        now = self.db.execute(select(func.now())).scalar()
+        self.db.commit()
+        return now
+
+    def delete_computed_before(self, timestamp) -> int:
+        """Delete rows older than a rebuild (users who lost all their skills, jobs that closed)"""
+        result = self.db.execute(delete(JobRecommendation).where(JobRecommendation.computed_at < timestamp))
+        self.db.commit()
+        return result.rowcount
+
+    def get_for_user(self, user_id: int, limit: int, offset: int = 0) -> List[dict]:
+        """Recommended jobs of a user that are still open, best first, in one query on (user_id, score)"""
+        rows = self.db.query(
+            JobRecommendation.score,
+            JobRecommendation.gig_job_id,
+            JobRecommendation.full_time_job_id,
+            GigJob.title.label("gig_title"),
+            GigJob.min_salary.label("gig_min_salary"),
+            GigJob.max_salary.label("gig_max_salary"),
+            GigJob.created_at.label("gig_created_at"),
+            FullTimeJob.title.label("full_time_title"),
+            FullTimeJob.min_salary.label("full_time_min_salary"),
+            FullTimeJob.max_salary.label("full_time_max_salary"),
+            FullTimeJob.created_at.label("full_time_created_at")
+        ).outerjoin(GigJob, and_(
+            GigJob.id == JobRecommendation.gig_job_id,
+            GigJob.is_deleted == False,
+            GigJob.status == "active",
+            GigJob.author_id != user_id
+        )).outerjoin(FullTimeJob, and_(
+            FullTimeJob.id == JobRecommendation.full_time_job_id,
+            FullTimeJob.status == "active",
+            FullTimeJob.created_by_user_id != user_id
+        )).filter(
+            JobRecommendation.user_id == user_id,
+            or_(GigJob.id.isnot(None), FullTimeJob.id.isnot(None))
+        ).order_by(JobRecommendation.score.desc(), JobRecommendation.id.desc()).offset(offset).limit(limit).all()
+
+        return [
+            {
+                "job_type": GIG if row.gig_job_id else FULL_TIME,
+                "job_id": row.gig_job_id or row.full_time_job_id,
+                "title": row.gig_title if row.gig_job_id else row.full_time_title,
+                "min_salary": row.gig_min_salary if row.gig_job_id else row.full_time_min_salary,
+                "max_salary": row.gig_max_salary if row.gig_job_id else row.full_time_max_salary,
+                "created_at": row.gig_created_at if row.gig_job_id else row.full_time_created_at,
+                "score": row.score
+            }
+            for row in rows
+        ]
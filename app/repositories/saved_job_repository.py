@@ -7,6 +7,7 @@ from app.models.full_time_job import FullTimeJob
 from app.models.user import User
 from app.schemas.saved_job import SavedJobCreate
 from app.pagination import PaginationParams
+from app.repositories.paged_query import fetch_pagination
 
 
 class SavedJobRepository:
@@ -86,11 +87,9 @@ class SavedJobRepository:
             joinedload(SavedJob.full_time_job).joinedload(FullTimeJob.skills)
         ).filter(SavedJob.user_id == user_id)
         
-        total = query.count()
+        page = fetch_pagination(query, pagination)
         
-        saved_jobs = query.offset(pagination.offset).limit(pagination.limit).all()
-        
-        return saved_jobs, total
+        return page.items, page.total
 
     def get_user_saved_gig_jobs(self, user_id: int, pagination: PaginationParams) -> tuple[List[SavedJob], int]:
         """Get paginated saved gig jobs for a specific user with relationships"""
@@ -107,11 +106,9 @@ class SavedJobRepository:
             and_(SavedJob.user_id == user_id, SavedJob.gig_job_id.isnot(None))
         )
         
-        total = query.count()
-        
-        saved_jobs = query.offset(pagination.offset).limit(pagination.limit).all()
+        page = fetch_pagination(query, pagination)
         
-        return saved_jobs, total
+        return page.items, page.total
 
     def get_user_saved_full_time_jobs(self, user_id: int, pagination: PaginationParams) -> tuple[List[SavedJob], int]:
         """Get paginated saved full-time jobs for a specific user with relationships"""
@@ -127,11 +124,9 @@ class SavedJobRepository:
             and_(SavedJob.user_id == user_id, SavedJob.full_time_job_id.isnot(None))
         )
         
-        total = query.count()
-        
-        saved_jobs = query.offset(pagination.offset).limit(pagination.limit).all()
+        page = fetch_pagination(query, pagination)
         
-        return saved_jobs, total
+        return page.items, page.total
 
     def delete(self, saved_job_id: int, user_id: int) -> bool:
         """Delete saved job (only by owner)"""
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from ..models.role import Role
 from ..models.user_role import UserRole
 from sqlalchemy.orm import joinedload, selectinload, subqueryload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, text
 from ..models.project import Project
 from ..models.company import Company
 from ..models.education_facility import EducationFacility
@@ -15,6 +15,60 @@ from ..models.education import Education
 from ..models.experience import Experience
 from ..models.certification import Certification
 from .role_repository import RoleRepository
+from .paged_query import fetch_page
+from ..utils.auth_cache import invalidate_auth_user
+from ..utils.profile_cache import invalidate_profile
+
+FULL_PROFILE_SQL = text("""
+    SELECT (to_jsonb(u) - 'password_hash') || jsonb_build_object(
+        'is_social_user', (
+            NULLIF(u.google_id, '') IS NOT NULL
+            OR NULLIF(u.facebook_id, '') IS NOT NULL
+            OR NULLIF(u.apple_id, '') IS NOT NULL
+        ),
+        'roles', COALESCE((
+            SELECT jsonb_agg(to_jsonb(r) ORDER BY r.id)
+            FROM user_roles ur JOIN roles r ON r.id = ur.role_id
+            WHERE ur.user_id = u.id
+        ), '[]'::jsonb),
+        'skills', COALESCE((
+            SELECT jsonb_agg(to_jsonb(s) ORDER BY s.id)
+            FROM user_skills us JOIN skills s ON s.id = us.skill_id
+            WHERE us.user_id = u.id
+        ), '[]'::jsonb),
+        'location', (SELECT to_jsonb(l) FROM locations l WHERE l.id = u.location_id),
+        'language', (SELECT to_jsonb(lang) FROM languages lang WHERE lang.id = u.language_id),
+        'main_category', (SELECT to_jsonb(c) FROM categories c WHERE c.id = u.main_category_id),
+        'sub_category', (SELECT to_jsonb(c) FROM categories c WHERE c.id = u.sub_category_id),
+        'educations', COALESCE((
+            SELECT jsonb_agg(to_jsonb(e) || jsonb_build_object('education_facility', to_jsonb(f)) ORDER BY e.id)
+            FROM educations e LEFT JOIN education_facilities f ON f.id = e.education_facility_id
+            WHERE e.user_id = u.id AND e.is_deleted = false
+        ), '[]'::jsonb),
+        'experiences', COALESCE((
+            SELECT jsonb_agg(to_jsonb(x) || jsonb_build_object('company_ref', to_jsonb(co)) ORDER BY x.id)
+            FROM experiences x LEFT JOIN companies co ON co.id = x.company_id
+            WHERE x.user_id = u.id AND x.is_deleted = false
+        ), '[]'::jsonb),
+        'certifications', COALESCE((
+            SELECT jsonb_agg(to_jsonb(ce) || jsonb_build_object('certification_center', to_jsonb(cc)) ORDER BY ce.id)
+            FROM certifications ce LEFT JOIN certification_centers cc ON cc.id = ce.certification_center_id
+            WHERE ce.user_id = u.id AND ce.is_deleted = false
+        ), '[]'::jsonb),
+        'projects', COALESCE((
+            SELECT jsonb_agg(to_jsonb(p) || jsonb_build_object('images', COALESCE((
+                SELECT jsonb_agg(to_jsonb(pi) ORDER BY pi.id)
+                FROM project_images pi
+                WHERE pi.project_id = p.id
+            ), '[]'::jsonb)) ORDER BY p.id)
+            FROM projects p
+            WHERE p.user_id = u.id AND p.is_deleted = false
+        ), '[]'::jsonb)
+    )
+    FROM users u
+    WHERE u.id = :user_id AND u.is_deleted = false
+""")
+
 
 class UserRepository:
     """Repository for user database operations with optimized queries"""
@@ -22,6 +76,12 @@ class UserRepository:
     def __init__(self, db: Session):
         self.db = db
     
+    @staticmethod
+    def _user_changed(user_id: int):
+        """Drop the cached auth principal and profile of a user after a write"""
+        invalidate_auth_user(user_id)
+        invalidate_profile(user_id)
+    
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email with optimized loading"""
         return self.db.query(User).options(
@@ -64,6 +124,10 @@ class UserRepository:
         
         return user
     
+    def get_auth_user(self, user_id: int) -> Optional[User]:
+        """Get a non-deleted user by ID without loading any relationships (for authentication)"""
+        return self.db.query(User).filter(and_(User.id == user_id, User.is_deleted == False)).first()
+    
     def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID with all related data (alias for get_user_by_id)"""
         return self.get_user_by_id(user_id)
@@ -126,6 +190,7 @@ class UserRepository:
             User.last_login: datetime.now(timezone.utc)
         })
         self.db.commit()
+        self._user_changed(user_id)
     
     def update_user_password(self, user_id: int, new_password: str):
         """Update user password with optimized query"""
@@ -146,6 +211,7 @@ class UserRepository:
                     setattr(user, key, value)
             
             self.db.commit()
+            self._user_changed(user_id)
             self.db.refresh(user)
             return user
         except Exception as e:
@@ -175,6 +241,7 @@ class UserRepository:
             user.sub_category_id = sub_category_id
         
         self.db.commit()
+        self._user_changed(user_id)
         self.db.refresh(user)
         return user
 
@@ -184,6 +251,7 @@ class UserRepository:
             User.is_deleted: True
         })
         self.db.commit()
+        self._user_changed(user_id)
         return result > 0
 
     def restore_user_by_email(self, email: str) -> bool:
@@ -201,6 +269,7 @@ class UserRepository:
         if user and role:
             user.roles.append(role)
             self.db.commit()
+            self._user_changed(user_id)
             return True
         return False
 
@@ -220,6 +289,7 @@ class UserRepository:
         if roles:
             user.roles.extend(roles)
             self.db.commit()
+            self._user_changed(user_id)
             return True
         return False
 
@@ -252,6 +322,18 @@ class UserRepository:
         
         return user
     
+    def get_user_full_profile_data(self, user_id: int) -> Optional[dict]:
+        """
+        Get user full profile as a dict in a single statement.
+
+        The user, its roles, skills, location, language, categories and the
+        non-deleted educations, experiences, certifications and projects
+        (with their facility/company/center/images) are aggregated to JSON
+        by PostgreSQL, so the whole profile costs one round trip. The dict
+        has the shape of UserFullResponse.
+        """
+        return self.db.execute(FULL_PROFILE_SQL, {"user_id": user_id}).scalar()
+    
     def get_users_batch(self, user_ids: List[int]) -> List[User]:
         """Get multiple users in batch to avoid N+1 queries"""
         return self.db.query(User).options(
@@ -279,6 +361,7 @@ class UserRepository:
             user.block_reason = block_reason
         
         self.db.commit()
+        self._user_changed(user_id)
         self.db.refresh(user)
         return True
     
@@ -294,6 +377,7 @@ class UserRepository:
         user.block_reason = None
         
         self.db.commit()
+        self._user_changed(user_id)
         self.db.refresh(user)
         return True
     
@@ -359,11 +443,9 @@ class UserRepository:
         if role:
             query = query.join(UserRole).join(Role).filter(Role.name.ilike(f"%{role}%"))
         
-        total = query.count()
-        
-        users = query.order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+        page = fetch_page(query.order_by(User.created_at.desc()), skip, limit)
         
-        return users, total
+        return page.items, page.total
 
 class OTPRepository:
     """Repository for OTP database operations with optimized queries"""
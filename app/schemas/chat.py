@@ -141,14 +141,16 @@ class UserPresenceUpdate(BaseModel):
 class ChatRoomListResponse(BaseModel):
     rooms: List[ChatRoomResponse]
     total: int
+    next_cursor: Optional[str] = None
 
 class MessageListResponse(BaseModel):
     messages: List[ChatMessageResponse]
-    total: int
+    total: Optional[int] = None
     has_more: bool
     page: int = 1
     per_page: int = 50
-    total_pages: int = 1
+    total_pages: Optional[int] = 1
+    next_before_id: Optional[int] = None
 
 class UserSearchListResponse(BaseModel):
     users: List[UserSearchResponse]
@@ -228,4 +230,24 @@ class MessageLikeResponse(BaseModel):
 class RoomCheckResponse(BaseModel):
     status: str
     msg: str
-    data: List[ChatRoomResponse]
\ No newline at end of file
+    data: List[ChatRoomResponse]
+
+class ChatUploadCreate(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255)
+    file_size: int = Field(..., gt=0, description="Total size of the file in bytes")
+    mime_type: Optional[str] = None
+    message_type: MessageType = Field(..., description="image, voice or file")
+    
+    @validator('message_type')
+    def validate_message_type(cls, v):
+        if v == MessageType.TEXT:
+            raise ValueError('Uploads are only allowed for image, voice or file messages')
+        return v
+
+class ChatUploadResponse(BaseModel):
+    upload_id: str
+    file_name: str
+    file_size: int
+    received: int
+    chunk_size: int
+    completed: bool
@@ -117,9 +117,11 @@ class FullTimeJobResponse(BaseModel):
 
 class FullTimeJobListResponse(BaseModel):
     jobs: List[FullTimeJobResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
+    has_more: bool = False
+    total_is_estimate: bool = False
 
 
 class UserFullTimeJobsResponse(BaseModel):
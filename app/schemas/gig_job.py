@@ -113,7 +113,9 @@ class GigJobSkillRemove(BaseModel):
 
 class GigJobListResponse(BaseModel):
     items: List[GigJobResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
-    pages: int
+    pages: Optional[int]
+    has_more: bool = False
+    total_is_estimate: bool = False
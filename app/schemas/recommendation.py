@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class JobRecommendationResponse(BaseModel):
+    job_type: str = Field(..., description="gig or full_time")
+    job_id: int
+    title: str
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    created_at: Optional[datetime] = None
+    score: float = Field(..., description="Skill similarity between 0 and 1")
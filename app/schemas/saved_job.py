@@ -80,8 +80,13 @@ class SavedJobDetailedResponse(BaseModel):
         }
     
     @classmethod
-    def from_orm(cls, obj, db_session=None, current_user_id=None):
-        """Custom from_orm method to include relationships"""
+    def from_orm(cls, obj, db_session=None, current_user_id=None, viewer=None,
+                 gig_job_data=None, full_time_job_data=None):
+        """Custom from_orm method to include relationships
+
+        gig_job_data/full_time_job_data are job responses already prepared for
+        the whole page; when given, the job is not prepared again here.
+        """
         data = {
             "id": obj.id,
             "user_id": obj.user_id,
@@ -96,16 +101,20 @@ class SavedJobDetailedResponse(BaseModel):
         if hasattr(obj, 'user') and obj.user:
             data["user"] = UserShortDetails.model_validate(obj.user)
         
-        if hasattr(obj, 'gig_job') and obj.gig_job and db_session:
+        if gig_job_data is not None:
+            data["gig_job"] = gig_job_data
+        elif hasattr(obj, 'gig_job') and obj.gig_job and db_session:
             from ..repositories.gig_job_repository import GigJobRepository
             gig_repo = GigJobRepository(db_session)
-            gig_data = gig_repo._prepare_gig_job_response(obj.gig_job, current_user_id)
+            gig_data = gig_repo._prepare_gig_job_response(obj.gig_job, current_user_id, viewer)
             data["gig_job"] = gig_data
         
-        if hasattr(obj, 'full_time_job') and obj.full_time_job and db_session:
+        if full_time_job_data is not None:
+            data["full_time_job"] = full_time_job_data
+        elif hasattr(obj, 'full_time_job') and obj.full_time_job and db_session:
             from ..repositories.full_time_job_repository import FullTimeJobRepository
             ft_repo = FullTimeJobRepository(db_session)
-            ft_data = ft_repo._prepare_full_time_job_response(obj.full_time_job, current_user_id)
+            ft_data = ft_repo._prepare_full_time_job_response(obj.full_time_job, current_user_id, viewer)
             data["full_time_job"] = ft_data
         
         return cls(**data)
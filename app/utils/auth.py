@@ -7,6 +7,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from ..core.config import settings
 from ..db.database import get_db
+from .auth_cache import AuthPrincipal, auth_principal_cache, token_claims_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token", auto_error=False)
 
@@ -37,12 +38,16 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
-    """Verify JWT token and return payload"""
+    """Verify JWT token and return payload (decoded claims are cached per token)"""
+    payload = token_claims_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    token_claims_cache.put(token, payload)
+    return payload
 
 def verify_refresh_token(token: str) -> Optional[dict]:
     """Verify refresh token and return payload"""
@@ -62,31 +67,40 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[dict]:
-    """Get current user from JWT token (OAuth2 compatible for Swagger UI)"""
+def get_auth_principal(db: Session, user_id: int) -> Optional[AuthPrincipal]:
+    """Slim principal of a non-deleted user, served from a short-lived cache"""
+    from ..repositories.user_repository import UserRepository
+    return auth_principal_cache.get_or_load(user_id, UserRepository(db).get_auth_user)
+
+def _user_id_from_token(token: Optional[str]) -> Optional[int]:
     if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authorization token required"
-        )
-    
+        return None
     payload = verify_token(token)
-    if not payload:
+    if not payload or not payload.get("sub"):
+        return None
+    return int(payload["sub"])
+
+def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> AuthPrincipal:
+    """
+    Get current user from JWT token (OAuth2 compatible for Swagger UI)
+    
+    Returns a slim AuthPrincipal (id, name, email, avatar_url, ...). Use
+    get_current_user_profile when the endpoint needs the full User.
+    """
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            detail="Authorization token required"
         )
     
-    user_id = payload.get("sub")
+    user_id = _user_id_from_token(token)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
         )
     
-    from ..repositories.user_repository import UserRepository
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_by_id(int(user_id))
+    user = get_auth_principal(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,20 +108,20 @@ def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session
         )
     return user
 
-def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[dict]:
+def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[AuthPrincipal]:
     """Get current user from JWT token if provided, otherwise return None (for public endpoints)"""
-    if not token:
-        return None
-    
-    payload = verify_token(token)
-    if not payload:
-        return None
-    
-    user_id = payload.get("sub")
+    user_id = _user_id_from_token(token)
     if not user_id:
         return None
-    
+    return get_auth_principal(db, user_id)
+
+def get_current_user_profile(current_user: AuthPrincipal = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Get the current user's full profile (relationships, educations, experiences, ...) as a User"""
     from ..repositories.user_repository import UserRepository
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_by_id(int(user_id))
-    return user 
\ No newline at end of file
+    user = UserRepository(db).get_user_full_profile(current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
@@ -0,0 +1,135 @@
+"""
+Caches behind request authentication.
+
+Decoded JWT claims are kept per token (bounded LRU, never past the token's
+own exp) so hot endpoints skip the python-jose decode, and the authenticated
+user is kept as a slim AuthPrincipal for AUTH_PRINCIPAL_TTL seconds so
+authenticating a request usually costs no query at all. Blocking, deleting
+or editing a user invalidates their principal; the TTL bounds staleness
+across worker processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from ..core.constants import AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL, AUTH_PRINCIPAL_TTL
+
+
+class AuthPrincipal:
+    """
+    Authenticated user as seen by request handlers
+
+    Carries only the user columns endpoints read from current_user. Handlers
+    that need relationships or want to modify the user load it explicitly
+    (e.g. UserRepository.get_user_full_profile).
+    """
+    __slots__ = ("id", "name", "email", "phone", "avatar_url", "language_id", "is_active", "is_verified")
+
+    def __init__(self, id: int, name: str, email: str, phone: Optional[str] = None,
+                 avatar_url: Optional[str] = None, language_id: Optional[int] = None,
+                 is_active: bool = True, is_verified: bool = False):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.avatar_url = avatar_url
+        self.language_id = language_id
+        self.is_active = is_active
+        self.is_verified = is_verified
+
+    @classmethod
+    def from_user(cls, user) -> "AuthPrincipal":
+        """Snapshot the principal fields of a User row"""
+        return cls(**{field: getattr(user, field) for field in cls.__slots__})
+
+    def __repr__(self):
+        return f"<AuthPrincipal(id={self.id}, email='{self.email}')>"
+
+
+class TokenClaimsCache:
+    def __init__(self, maxsize: int = AUTH_TOKEN_CACHE_SIZE, ttl_seconds: int = AUTH_TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Cached claims of a token, or None if not cached or expired"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[1]
+
+    def put(self, token: str, payload: dict):
+        """Cache verified claims until the TTL or the token's exp, whichever comes first"""
+        expires_at = time.monotonic() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, time.monotonic() + exp - time.time())
+        with self._lock:
+            self._entries[token] = (expires_at, payload)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class AuthPrincipalCache:
+    def __init__(self, ttl_seconds: int = AUTH_PRINCIPAL_TTL):
+        self.ttl = ttl_seconds
+        self._entries: Dict[int, Tuple[float, AuthPrincipal]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, user_id: int, loader) -> Optional[AuthPrincipal]:
+        """
+        Cached principal of a user, calling loader(user_id) on a miss
+
+        Args:
+            user_id: User to look up
+            loader: Returns the User row (or None for missing/deleted users)
+
+        Returns:
+            The principal, or None if the user does not exist
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            generation = self._generation
+
+        user = loader(user_id)
+        if user is None:
+            return None
+
+        principal = AuthPrincipal.from_user(user)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+        return principal
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's principal, or everything when user_id is None"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+token_claims_cache = TokenClaimsCache()
+auth_principal_cache = AuthPrincipalCache()
+
+
+def invalidate_auth_user(user_id: Optional[int] = None):
+    """Forget the cached principal of a user after it is blocked, deleted or edited"""
+    auth_principal_cache.invalidate(user_id)
@@ -0,0 +1,296 @@
+"""
+Resumable chunked uploads for chat attachments.
+
+Instead of inlining base64 into a WebSocket send_message frame, clients create
+an upload, PUT the raw bytes in chunks at the current offset and then reference
+the upload_id from send_message. Chunks are streamed to a .part file through a
+small threadpool with bounded buffering, so a large voice note never blocks the
+event loop. Upload state is kept next to the file on disk, so any worker can
+continue or claim an upload; an exclusive lock on the .part file serializes the
+offset check, the append and the claim across workers. Uploads left untouched
+for CHAT_UPLOAD_TTL are swept when new uploads are created.
+"""
+import asyncio
+import functools
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Optional, Set
+from fastapi import HTTPException
+
+try:
+    import fcntl
+except ImportError:  # Windows: uploads are then only serialized within one worker
+    fcntl = None
+
+# Kept outside static/ so partial uploads are never publicly served
+CHAT_UPLOAD_DIR = "tmp/chat_uploads"
+CHAT_UPLOAD_CHUNK_SIZE = 1024 * 1024
+CHAT_UPLOAD_TTL = 24 * 3600
+CHAT_UPLOAD_SWEEP_INTERVAL = 3600
+
+CHAT_UPLOAD_MAX_SIZES = {
+    "image": 10 * 1024 * 1024,
+    "voice": 50 * 1024 * 1024,
+    "file": 50 * 1024 * 1024
+}
+
+CHAT_UPLOAD_DIRS = {
+    "image": "static/chat_files/images",
+    "voice": "static/chat_files/voices",
+    "file": "static/chat_files/files"
+}
+
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat_upload")
+
+
+class ChunkedUploadManager:
+    def __init__(self, upload_dir: str = CHAT_UPLOAD_DIR, ttl: float = CHAT_UPLOAD_TTL,
+                 sweep_interval: float = CHAT_UPLOAD_SWEEP_INTERVAL):
+        self.upload_dir = upload_dir
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._held: Set[str] = set()
+        self._held_lock = threading.Lock()
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+    def _paths(self, upload_id: str):
+        if not _UPLOAD_ID_PATTERN.match(upload_id or ""):
+            return None, None
+        base = os.path.join(self.upload_dir, upload_id)
+        return f"{base}.json", f"{base}.part"
+
+    def _read_meta(self, upload_id: str, user_id: int) -> Optional[dict]:
+        meta_path, _ = self._paths(upload_id)
+        if not meta_path or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("user_id") != user_id:
+            return None
+        return meta
+
+    def _status(self, upload_id: str, meta: dict, received: int) -> dict:
+        return {
+            "upload_id": upload_id,
+            "file_name": meta["file_name"],
+            "file_size": meta["file_size"],
+            "received": received,
+            "chunk_size": CHAT_UPLOAD_CHUNK_SIZE,
+            "completed": received == meta["file_size"]
+        }
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(upload_executor, functools.partial(func, *args))
+
+    def _create_files(self, upload_id: str, meta: dict):
+        meta_path, part_path = self._paths(upload_id)
+        open(part_path, "wb").close()
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+    def _load_upload(self, upload_id: str, user_id: int):
+        meta = self._read_meta(upload_id, user_id)
+        if not meta:
+            return None, 0
+        _, part_path = self._paths(upload_id)
+        return meta, os.path.getsize(part_path)
+
+    def _open_locked(self, part_path: str):
+        """
+        Open an upload's .part file at its end under an exclusive lock (released by _close_locked)
+
+        Raises:
+            FileNotFoundError: If the upload was claimed or swept
+            BlockingIOError: If another request holds the lock
+        """
+        # r+b rather than ab: a claimed or swept upload must not be recreated empty
+        part_file = open(part_path, "r+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(part_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                with self._held_lock:
+                    if part_path in self._held:
+                        raise BlockingIOError(part_path)
+                    self._held.add(part_path)
+        except BaseException:
+            part_file.close()
+            raise
+        part_file.seek(0, os.SEEK_END)
+        return part_file
+
+    def _close_locked(self, part_file):
+        if fcntl is None:
+            with self._held_lock:
+                self._held.discard(part_file.name)
+        part_file.close()
+
+    def _lock_upload(self, upload_id: str, user_id: int):
+        """Lock an upload and load its metadata and received size under the lock; (None, None, 0) if it is unknown"""
+        _, part_path = self._paths(upload_id)
+        if not part_path:
+            return None, None, 0
+        try:
+            part_file = self._open_locked(part_path)
+        except FileNotFoundError:
+            return None, None, 0
+        meta = self._read_meta(upload_id, user_id)
+        if not meta:
+            self._close_locked(part_file)
+            return None, None, 0
+        return part_file, meta, part_file.tell()
+
+    def sweep_stale_uploads(self) -> int:
+        """Delete uploads nobody has touched for ttl seconds, skipping ones being written. Returns how many were removed"""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        upload_ids = {os.path.splitext(name)[0] for name in os.listdir(self.upload_dir)}
+        for upload_id in upload_ids:
+            meta_path, part_path = self._paths(upload_id)
+            if not meta_path:
+                continue
+            try:
+                last_touched = max(
+                    os.path.getmtime(path) for path in (meta_path, part_path) if os.path.exists(path)
+                )
+            except ValueError:
+                continue
+            if last_touched > cutoff:
+                continue
+            part_file = None
+            try:
+                if os.path.exists(part_path):
+                    part_file = self._open_locked(part_path)
+                for path in (meta_path, part_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed += 1
+            except (BlockingIOError, FileNotFoundError):
+                continue
+            finally:
+                if part_file is not None:
+                    self._close_locked(part_file)
+        return removed
+
+    async def create_upload(self, user_id: int, file_name: str, file_size: int,
+                            mime_type: Optional[str], message_type: str) -> dict:
+        """Register a new upload and return its initial status"""
+        max_size = CHAT_UPLOAD_MAX_SIZES[message_type]
+        if file_size > max_size:
+            size_mb = max_size / (1024 * 1024)
+            raise HTTPException(status_code=400, detail=f"File too large. Maximum size: {size_mb:.1f}MB")
+
+        upload_id = uuid.uuid4().hex
+        meta = {
+            "user_id": user_id,
+            "file_name": os.path.basename(file_name),
+            "file_size": file_size,
+            "mime_type": mime_type,
+            "message_type": message_type,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        await self._run(self._create_files, upload_id, meta)
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = time.monotonic()
+            await self._run(self.sweep_stale_uploads)
+        return self._status(upload_id, meta, 0)
+
+    async def get_upload(self, upload_id: str, user_id: int) -> dict:
+        """Get the progress of an upload so an interrupted client can resume"""
+        meta, received = await self._run(self._load_upload, upload_id, user_id)
+        if not meta:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        return self._status(upload_id, meta, received)
+
+    async def append_chunks(self, upload_id: str, user_id: int, offset: int,
+                            chunks: AsyncIterator[bytes]) -> dict:
+        """
+        Stream a request body onto the upload at offset, buffering at most one chunk
+
+        The upload stays locked from the offset check until the last write, so
+        a retried or duplicated chunk can never be appended twice.
+        """
+        try:
+            part_file, meta, received = await self._run(self._lock_upload, upload_id, user_id)
+        except BlockingIOError:
+            raise HTTPException(status_code=409, detail="Another chunk of this upload is still being received")
+        if not meta:
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+        buffer = bytearray()
+        try:
+            if offset != received:
+                raise HTTPException(status_code=409, detail=f"Upload offset mismatch, expected offset {received}")
+            async for chunk in chunks:
+                if received + len(buffer) + len(chunk) > meta["file_size"]:
+                    raise HTTPException(status_code=400, detail="Upload exceeds the declared file size")
+                buffer += chunk
+                if len(buffer) >= CHAT_UPLOAD_CHUNK_SIZE:
+                    await self._run(part_file.write, bytes(buffer))
+                    received += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await self._run(part_file.write, bytes(buffer))
+                received += len(buffer)
+        finally:
+            await self._run(self._close_locked, part_file)
+
+        return self._status(upload_id, meta, received)
+
+    def claim_upload(self, upload_id: str, user_id: int, message_type: str) -> dict:
+        """
+        Move a completed upload into its chat_files directory
+
+        Runs synchronously, on the caller's worker thread.
+
+        Returns:
+            File info in the shape stored in ChatMessage.files_data
+
+        Raises:
+            ValueError: If the upload is unknown, incomplete or of another message type
+        """
+        try:
+            part_file, meta, received = self._lock_upload(upload_id, user_id)
+        except BlockingIOError:
+            raise ValueError(f"Upload '{upload_id}' is still receiving data")
+        if not meta:
+            raise ValueError(f"Upload '{upload_id}' not found")
+
+        try:
+            if meta["message_type"] != message_type:
+                raise ValueError(f"Upload '{upload_id}' was created for {meta['message_type']} messages")
+            if received != meta["file_size"]:
+                raise ValueError(f"Upload '{upload_id}' is incomplete ({received}/{meta['file_size']} bytes)")
+
+            upload_dir = CHAT_UPLOAD_DIRS[message_type]
+            os.makedirs(upload_dir, exist_ok=True)
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            file_path = os.path.join(upload_dir, f"{user_id}_{timestamp}_{upload_id}_{meta['file_name']}")
+
+            meta_path, part_path = self._paths(upload_id)
+            shutil.move(part_path, file_path)
+            os.remove(meta_path)
+        finally:
+            self._close_locked(part_file)
+
+        return {
+            "file_name": meta["file_name"],
+            "file_path": file_path,
+            "file_size": received,
+            "mime_type": meta["mime_type"]
+        }
+
+
+chat_upload_manager = ChunkedUploadManager()
@@ -3,10 +3,11 @@ Device Token Logging Utility
 Handles creation of user device tokens with proper logging
 """
 import logging
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import cast, String
 from ..models.user_device_token import UserDeviceToken, DeviceType
+from .device_tokens import device_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,7 @@ def create_user_device_token(
             db.flush()
             db.commit()
             db.refresh(existing_token)
+            device_token_cache.invalidate(user_id)
             
             logger.info(f"Device token updated for user {user_id}, device_type: {device_type}")
             print(f"[DeviceToken] Device token updated successfully for user {user_id}, device_type: {device_type}, token_id: {existing_token.id}")
@@ -75,6 +77,7 @@ def create_user_device_token(
             db.flush()
             db.commit()
             db.refresh(device_token_obj)
+            device_token_cache.invalidate(user_id)
             
             logger.info(f"Device token created successfully for user {user_id}, device_type: {device_type}")
             print(f"[DeviceToken] Device token created successfully for user {user_id}, device_type: {device_type}, token_id: {device_token_obj.id}")
@@ -95,3 +98,36 @@ def create_user_device_token(
         db.rollback()
         return None
 
+
+
+def deactivate_device_tokens(db: Session, device_tokens: List[str]) -> int:
+    """
+    Deactivate device tokens (e.g. ones FCM reports as unregistered) with logging.
+    
+    Args:
+        db: Database session
+        device_tokens: Device token strings to deactivate
+    
+    Returns:
+        Number of device tokens deactivated
+    """
+    if not device_tokens:
+        return 0
+    
+    owners = [user_id for (user_id,) in db.query(UserDeviceToken.user_id).filter(
+        UserDeviceToken.device_token.in_(device_tokens),
+        UserDeviceToken.is_active == True
+    ).distinct().all()]
+    
+    count = db.query(UserDeviceToken).filter(
+        UserDeviceToken.device_token.in_(device_tokens),
+        UserDeviceToken.is_active == True
+    ).update({"is_active": False}, synchronize_session=False)
+    db.commit()
+    
+    for user_id in owners:
+        device_token_cache.invalidate(user_id)
+    
+    logger.info(f"Deactivated {count} device token(s) for {len(owners)} user(s)")
+    print(f"[DeviceToken] Deactivated {count} device token(s) for {len(owners)} user(s)")
+    return count
@@ -0,0 +1,94 @@
+"""
+Device token service for push notifications.
+
+Active FCM tokens are cached per user for DEVICE_TOKEN_CACHE_TTL seconds so
+chat messages and proposal events do not query user_device_tokens each time.
+Registering or deactivating a token invalidates the affected users; the TTL
+bounds staleness across worker processes.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import String, and_, cast
+from sqlalchemy.orm import Session
+from ..core.constants import DEVICE_TOKEN_CACHE_TTL
+from ..models.user_device_token import UserDeviceToken
+
+
+class DeviceTokenCache:
+    def __init__(self, ttl_seconds: int = DEVICE_TOKEN_CACHE_TTL):
+        self.ttl = ttl_seconds
+        self._entries: Dict[int, Tuple[float, List[str]]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_tokens(self, db: Session, user_id: int) -> List[str]:
+        """Active device tokens of one user"""
+        return self.get_tokens_for_users(db, [user_id]).get(user_id, [])
+
+    def get_tokens_for_users(self, db: Session, user_ids: Iterable[int]) -> Dict[int, List[str]]:
+        """
+        Active device tokens of several users, loading cache misses in one query
+
+        Args:
+            db: Database session used for misses
+            user_ids: Users to look up
+
+        Returns:
+            Dict of user ID to token list (empty list for users without tokens)
+        """
+        now = time.monotonic()
+        tokens: Dict[int, List[str]] = {}
+        missing = []
+        with self._lock:
+            generation = self._generation
+            for user_id in dict.fromkeys(user_ids):
+                entry = self._entries.get(user_id)
+                if entry and entry[0] > now:
+                    tokens[user_id] = list(entry[1])
+                else:
+                    missing.append(user_id)
+
+        if missing:
+            loaded: Dict[int, List[str]] = {user_id: [] for user_id in missing}
+            rows = db.query(UserDeviceToken.user_id, UserDeviceToken.device_token).filter(
+                and_(
+                    UserDeviceToken.user_id.in_(missing),
+                    UserDeviceToken.is_active == True,
+                    cast(UserDeviceToken.device_type, String).in_(["ios", "android"])
+                )
+            ).all()
+            for user_id, device_token in rows:
+                if device_token and user_id in loaded:
+                    loaded[user_id].append(device_token)
+
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                if generation == self._generation:
+                    for user_id, user_tokens in loaded.items():
+                        self._entries[user_id] = (expires_at, user_tokens)
+            tokens.update({user_id: list(user_tokens) for user_id, user_tokens in loaded.items()})
+
+        return tokens
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's cached tokens, or everything when user_id is None"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+device_token_cache = DeviceTokenCache()
+
+
+def get_user_device_tokens(db: Session, user_id: int) -> List[str]:
+    """Get all active device tokens for a user"""
+    return device_token_cache.get_tokens(db, user_id)
+
+
+def get_tokens_for_users(db: Session, user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Get active device tokens for several users, keyed by user ID"""
+    return device_token_cache.get_tokens_for_users(db, user_ids)
@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from ..core.constants import FCM_MULTICAST_LIMIT
 
 load_dotenv()
 
@@ -180,6 +181,86 @@ def send_push_notification(
         return False
 
 
+def _build_platform_configs(sound: str):
+    android_config = messaging.AndroidConfig(
+        priority="high",
+        notification=messaging.AndroidNotification(
+            sound=sound,
+            priority="high"
+        )
+    )
+    
+    apns_config = messaging.APNSConfig(
+        headers={"apns-priority": "10"},
+        payload=messaging.APNSPayload(
+            aps=messaging.Aps(
+                sound=sound,
+                badge=1
+            )
+        )
+    )
+    return android_config, apns_config
+
+
+def send_multicast(
+    device_tokens: List[str],
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None,
+    image_url: Optional[str] = None,
+    sound: str = "default"
+) -> "messaging.BatchResponse":
+    """
+    Send one notification to up to FCM_MULTICAST_LIMIT devices in a single FCM batch call
+    
+    Args:
+        device_tokens: FCM device tokens (at most FCM_MULTICAST_LIMIT)
+        title: Notification title
+        body: Notification body text
+        data: Optional dictionary of key-value pairs for notification data
+        image_url: Optional URL for notification image
+        sound: Notification sound (default: "default")
+    
+    Returns:
+        BatchResponse whose responses are in the same order as device_tokens
+    
+    Raises:
+        FileNotFoundError: If Firebase credentials are not configured
+    """
+    if _firebase_app is None:
+        initialize_firebase()
+    
+    android_config, apns_config = _build_platform_configs(sound)
+    message = messaging.MulticastMessage(
+        tokens=device_tokens,
+        notification=messaging.Notification(title=title, body=body, image=image_url),
+        data=data or {},
+        android=android_config,
+        apns=apns_config
+    )
+    return messaging.send_each_for_multicast(message)
+
+
+def classify_send_error(error: Exception) -> str:
+    """
+    Classify a per-token FCM error
+    
+    Returns:
+        "invalid" when the token should be pruned, "retry" for transient
+        errors worth retrying, "failed" otherwise
+    """
+    if isinstance(error, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+        return "invalid"
+    if isinstance(error, messaging.QuotaExceededError):
+        return "retry"
+    code = getattr(error, "code", None)
+    if code == "INVALID_ARGUMENT" and "registration token" in str(error).lower():
+        return "invalid"
+    if code in ("UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED"):
+        return "retry"
+    return "failed"
+
+
 def send_push_notification_multiple(
     device_tokens: List[str],
     title: str,
@@ -190,7 +271,7 @@ def send_push_notification_multiple(
 ) -> Dict[str, Any]:
     """
     Send push notifications to multiple devices
-    Uses individual sends (fallback from batch/multicast due to API issues)
+    Uses send_each_for_multicast in chunks of FCM_MULTICAST_LIMIT tokens
     
     Args:
         device_tokens: List of FCM device tokens
@@ -237,62 +318,30 @@ def send_push_notification_multiple(
         "results": []
     }
     
-    notification = messaging.Notification(
-        title=title,
-        body=body,
-        image=image_url
-    )
-    
-    android_config = messaging.AndroidConfig(
-        priority="high",
-        notification=messaging.AndroidNotification(
-            sound=sound,
-            priority="high"
-        )
-    )
-    
-    apns_config = messaging.APNSConfig(
-        headers={"apns-priority": "10"},
-        payload=messaging.APNSPayload(
-            aps=messaging.Aps(
-                sound=sound,
-                badge=1
-            )
-        )
-    )
-    
-    for token in device_tokens:
+    for start in range(0, len(device_tokens), FCM_MULTICAST_LIMIT):
+        chunk = device_tokens[start:start + FCM_MULTICAST_LIMIT]
         try:
-            message = messaging.Message(
-                notification=notification,
-                data=data or {},
-                token=token,
-                android=android_config,
-                apns=apns_config
-            )
-            
-            response = messaging.send(message)
-            results["success_count"] += 1
-            results["results"].append({
-                "token": token,
-                "success": True,
-                "message_id": response
-            })
-            
-        except messaging.UnregisteredError:
-            results["failure_count"] += 1
-            results["results"].append({
-                "token": token,
-                "success": False,
-                "error": "Device token is unregistered"
-            })
+            batch = send_multicast(chunk, title, body, data=data, image_url=image_url, sound=sound)
         except Exception as e:
-            results["failure_count"] += 1
-            results["results"].append({
-                "token": token,
-                "success": False,
-                "error": str(e)
-            })
+            results["failure_count"] += len(chunk)
+            results["results"].extend({"token": token, "success": False, "error": str(e)} for token in chunk)
+            continue
+        
+        for token, response in zip(chunk, batch.responses):
+            if response.success:
+                results["success_count"] += 1
+                results["results"].append({
+                    "token": token,
+                    "success": True,
+                    "message_id": response.message_id
+                })
+            else:
+                results["failure_count"] += 1
+                error = response.exception
+                results["results"].append({
+                    "token": token,
+                    "success": False,
+                    "error": "Device token is unregistered" if isinstance(error, messaging.UnregisteredError) else str(error)
+                })
     
     return results
-
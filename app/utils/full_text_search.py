@@ -0,0 +1,64 @@
+"""
+Full-text search over job postings.
+
+gig_jobs and full_time_jobs carry a generated search_vector column (title
+with weight A, description with weight B) backed by a GIN index, so Postgres
+keeps it current on every insert and update and searches no longer scan the
+whole table. User input is turned into a prefix tsquery ("reac dev" becomes
+'reac:* & dev:*'), which keeps the partial-word matching the old
+ilike('%term%') filters gave the search-as-you-type fields. Both sides use
+the unstemmed 'simple' configuration: with a stemming one, "management" is
+stored as 'manag' and a half-typed "managi:*" would never match it.
+"""
+import re
+from typing import Optional
+from sqlalchemy import func
+from ..core.constants import SEARCH_MAX_TERMS
+
+SEARCH_CONFIG = "simple"
+
+_TERM_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def job_search_vector_sql(title_column: str = "title", description_column: str = "description") -> str:
+    """
+    SQL expression of a job's search_vector column
+
+    Args:
+        title_column: Column weighted A
+        description_column: Column weighted B
+
+    Returns:
+        Expression shared by the model's Computed column and the migration
+    """
+    return (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({title_column}, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({description_column}, '')), 'B')"
+    )
+
+
+def prefix_tsquery(search_term: str, weights: str = "") -> Optional[str]:
+    """
+    Build a to_tsquery() string matching every word of a search term as a prefix
+
+    Args:
+        search_term: Raw user input
+        weights: Restrict matches to these weight labels (e.g. "A" for titles only)
+
+    Returns:
+        The tsquery text, or None if the term has no searchable words
+    """
+    terms = _TERM_PATTERN.findall(search_term.lower())[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*{weights}" for term in terms)
+
+
+def search_matches(search_vector, tsquery: str):
+    """Filter condition: search_vector @@ to_tsquery(tsquery)"""
+    return search_vector.op("@@")(func.to_tsquery(SEARCH_CONFIG, tsquery))
+
+
+def search_rank(search_vector, tsquery: str):
+    """Relevance of a row for a tsquery (title hits outrank description hits)"""
+    return func.ts_rank_cd(search_vector, func.to_tsquery(SEARCH_CONFIG, tsquery))
@@ -0,0 +1,236 @@
+"""
+Precomputed "best jobs for me" feed.
+
+Users and jobs are binary skill vectors and a job's score for a user is
+their cosine similarity: shared skills / sqrt(user skills * job skills).
+job_recommendations keeps each user's RECOMMENDATIONS_PER_USER best jobs so
+GET /recommendations is a single read on (user_id, score).
+
+The table is rebuilt in bulk by utils/rebuild_job_recommendations.py
+(NumPy, RECOMMENDATION_USER_BATCH users per matrix product) and kept
+current incrementally: posting or editing a job scores it against the
+users sharing one of its skills, editing skills re-ranks that user against
+the jobs sharing one of theirs. Incremental updates run on a background
+thread so request handlers only enqueue them.
+"""
+import queue
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..core.constants import RECOMMENDATIONS_PER_USER, RECOMMENDATION_USER_BATCH
+from ..core.logging_config import logger
+
+
+def rank_jobs(
+    user_skills: Sequence[Sequence[int]],
+    job_skills: Sequence[Sequence[int]],
+    top_n: int,
+    batch_size: int = RECOMMENDATION_USER_BATCH
+) -> List[List[Tuple[int, float]]]:
+    """
+    Best jobs for each user by cosine similarity of skill sets
+
+    Jobs are held as sparse skill index arrays; each batch of
+    users is a dense 0/1 skills x users matrix, and the per-job dot products
+    are row gathers summed per group of jobs with the same skill count.
+
+    Args:
+        user_skills: Skill IDs of each user
+        job_skills: Skill IDs of each job; later jobs win ties
+        top_n: Jobs to keep per user
+        batch_size: Users per matrix product (bounds memory to batch_size x job-skill links)
+
+    Returns:
+        For each user, up to top_n (job index, score) pairs with score > 0, best first
+    """
+    results: List[List[Tuple[int, float]]] = [[] for _ in user_skills]
+    job_sets = [np.unique(np.asarray(skills, dtype=np.int64)) for skills in job_skills]
+    job_positions = np.array([index for index, skills in enumerate(job_sets) if skills.size], dtype=np.int64)
+    if not job_positions.size or top_n <= 0:
+        return results
+
+    vocabulary = np.unique(np.concatenate([job_sets[index] for index in job_positions]))
+    lengths = np.array([job_sets[index].size for index in job_positions], dtype=np.int64)
+    # jobs grouped by skill count: (job columns, jobs x count matrix of vocabulary indices)
+    buckets = []
+    for length in np.unique(lengths):
+        columns = np.flatnonzero(lengths == length)
+        skill_rows = np.searchsorted(vocabulary, np.stack([job_sets[job_positions[column]] for column in columns]))
+        buckets.append((columns, skill_rows))
+    job_norms = np.sqrt(lengths)
+    keep = min(top_n, job_positions.size)
+
+    for begin in range(0, len(user_skills), batch_size):
+        batch = user_skills[begin:begin + batch_size]
+        # skills x users, so a job's skill rows are gathered as contiguous memory
+        vectors = np.zeros((vocabulary.size, len(batch)), dtype=np.float32)
+        user_norms = np.zeros(len(batch), dtype=np.float64)
+        for row, skills in enumerate(batch):
+            skills = np.unique(np.asarray(skills, dtype=np.int64))
+            user_norms[row] = np.sqrt(skills.size)
+            known = skills[np.isin(skills, vocabulary, assume_unique=True)]
+            vectors[np.searchsorted(vocabulary, known), row] = 1.0
+
+        shared = np.empty((job_positions.size, len(batch)), dtype=np.float32)
+        for columns, skill_rows in buckets:
+            shared[columns] = vectors[skill_rows].sum(axis=1)
+        shared = shared.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = shared / (user_norms[:, None] * job_norms[None, :])
+        scores = np.nan_to_num(scores, nan=0.0, posinf=0.0)
+
+        # keep-th best score per user; everything tied with it stays a candidate so ties resolve deterministically
+        thresholds = -np.partition(-scores, keep - 1, axis=1)[:, keep - 1]
+        for row in range(len(batch)):
+            columns = np.flatnonzero((scores[row] >= thresholds[row]) & (scores[row] > 0))
+            row_scores = scores[row, columns]
+            order = np.lexsort((-columns, -row_scores))[:keep]
+            results[begin + row] = [
+                (int(job_positions[columns[i]]), round(float(row_scores[i]), 4))
+                for i in order
+            ]
+    return results
+
+
+def score_users(user_skills: Sequence[Sequence[int]], job_skills: Sequence[int]) -> np.ndarray:
+    """Cosine similarity of one job's skill set with each user's (same formula as rank_jobs)"""
+    job_set = np.unique(np.asarray(job_skills, dtype=np.int64))
+    scores = np.zeros(len(user_skills), dtype=np.float64)
+    if not job_set.size or not len(user_skills):
+        return scores
+
+    user_sets = [np.unique(np.asarray(skills, dtype=np.int64)) for skills in user_skills]
+    lengths = np.array([skills.size for skills in user_sets], dtype=np.int64)
+    flat = np.concatenate(user_sets) if lengths.sum() else np.zeros(0, dtype=np.int64)
+    hits = np.isin(flat, job_set).astype(np.float64)
+    boundaries = np.concatenate(([0], np.cumsum(lengths)))
+    shared = np.add.reduceat(np.append(hits, 0.0), boundaries[:-1])
+    shared[lengths == 0] = 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = shared / np.sqrt(lengths * job_set.size)
+    return np.round(np.nan_to_num(scores, nan=0.0, posinf=0.0), 4)
+
+
+def refresh_user(db, user_id: int, top_n: int = RECOMMENDATIONS_PER_USER):
+    """Re-rank one user against the jobs that share one of their skills"""
+    from ..repositories.recommendation_repository import RecommendationRepository
+
+    repository = RecommendationRepository(db)
+    skill_ids = repository.get_user_skill_ids(user_id)
+    if not skill_ids:
+        repository.replace_for_users({user_id: []})
+        return
+    jobs = repository.get_job_skills_sharing(skill_ids)
+    job_keys = list(jobs)
+    ranked = rank_jobs([skill_ids], [jobs[key] for key in job_keys], top_n)[0]
+    repository.replace_for_users({user_id: [(job_keys[index], score) for index, score in ranked]})
+
+
+def refresh_job(db, kind: str, job_id: int, top_n: int = RECOMMENDATIONS_PER_USER):
+    """Score a posted or edited job for the users sharing one of its skills; drop it if no longer open"""
+    from ..repositories.recommendation_repository import RecommendationRepository
+
+    repository = RecommendationRepository(db)
+    skill_ids = repository.get_job_skill_ids(kind, job_id)
+    if not skill_ids:
+        repository.remove_job(kind, job_id)
+        return
+    users = repository.get_user_skills_sharing(skill_ids)
+    user_ids = list(users)
+    scores = score_users([users[user_id] for user_id in user_ids], skill_ids)
+    repository.replace_for_job(
+        kind,
+        job_id,
+        {user_id: float(score) for user_id, score in zip(user_ids, scores) if score > 0},
+        top_n
+    )
+
+
+def rebuild_all(db, top_n: int = RECOMMENDATIONS_PER_USER, batch_size: int = RECOMMENDATION_USER_BATCH) -> int:
+    """
+    Recompute every user's recommendations
+
+    Args:
+        db: Database session
+        top_n: Jobs to keep per user
+        batch_size: Users ranked and written per transaction
+
+    Returns:
+        Number of users ranked
+    """
+    from ..repositories.recommendation_repository import RecommendationRepository
+
+    repository = RecommendationRepository(db)
+    started_at = repository.current_timestamp()
+    jobs = repository.get_active_job_skills()
+    job_keys = list(jobs)
+    job_skills = [jobs[key] for key in job_keys]
+
+    users_ranked = 0
+    for batch in repository.iter_user_skill_batches(batch_size):
+        user_ids = list(batch)
+        ranked = rank_jobs([batch[user_id] for user_id in user_ids], job_skills, top_n, batch_size)
+        repository.replace_for_users({
+            user_id: [(job_keys[index], score) for index, score in matches]
+            for user_id, matches in zip(user_ids, ranked)
+        })
+        users_ranked += len(user_ids)
+
+    removed = repository.delete_computed_before(started_at)
+    logger.info(f"Rebuilt job recommendations for {users_ranked} user(s) over {len(job_keys)} job(s), removed {removed} stale row(s)")
+    return users_ranked
+
+
+class RecommendationUpdater:
+    """Background worker applying incremental recommendation updates; duplicate requests are coalesced"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread (called lazily)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="recommendation-updater", daemon=True)
+                self._thread.start()
+
+    def job_changed(self, kind: str, job_id: int):
+        """Queue a refresh after a job is posted, edited, closed or deleted"""
+        self._submit(("job", kind, job_id))
+
+    def user_changed(self, user_id: int):
+        """Queue a refresh after a user edits their skills"""
+        self._submit(("user", user_id))
+
+    def _submit(self, task: Tuple):
+        with self._lock:
+            if task in self._pending:
+                return
+            self._pending.add(task)
+        self.start()
+        self._queue.put(task)
+
+    def _work(self):
+        from ..db.database import SessionLocal
+
+        while True:
+            task = self._queue.get()
+            with self._lock:
+                self._pending.discard(task)
+            db = SessionLocal()
+            try:
+                if task[0] == "job":
+                    refresh_job(db, task[1], task[2])
+                else:
+                    refresh_user(db, task[1])
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to update job recommendations for {task}: {e}", exc_info=True)
+            finally:
+                db.close()
+
+
+recommendation_updater = RecommendationUpdater()
@@ -0,0 +1,78 @@
+"""
+Lenient JSON parsing for WebSocket frames.
+
+Some chat clients send frames with // or /* */ comments and trailing commas.
+Frames are parsed strictly first (with orjson when it is installed) and only
+repaired when that fails, so well-formed frames pay for a single parse.
+"""
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<string>"(?:[^"\\]|\\.)*"?)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?(?:\*/|\Z))
+  | (?P<comma>,)
+  | (?P<close>[}\]])
+  | (?P<space>\s+)
+  | (?P<other>[^"/,}\]\s]+|/)
+''', re.VERBOSE | re.DOTALL)
+
+
+def _strict_loads(data: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def repair_json(data: str) -> str:
+    """
+    Strip comments and trailing commas from a JSON document in one linear pass
+
+    Args:
+        data: JSON text that may contain // or /* */ comments and trailing commas
+
+    Returns:
+        JSON text with comments and trailing commas removed; string literals are kept as-is
+    """
+    parts = []
+    pending_comma = None
+
+    for match in _TOKEN_PATTERN.finditer(data):
+        kind = match.lastgroup
+        if kind == "line_comment" or kind == "block_comment":
+            continue
+        if kind == "space":
+            parts.append(match.group())
+            continue
+        if kind == "close" and pending_comma is not None:
+            parts[pending_comma] = ""
+        pending_comma = len(parts) if kind == "comma" else None
+        parts.append(match.group())
+
+    return "".join(parts)
+
+
+def loads_lenient(data: str) -> Any:
+    """
+    Parse a JSON frame, repairing comments and trailing commas only when needed
+
+    Args:
+        data: Raw frame text
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the frame is not valid JSON even after repair
+    """
+    try:
+        return _strict_loads(data)
+    except ValueError:
+        return json.loads(repair_json(data))
@@ -0,0 +1,145 @@
+"""
+Relay for the transactional notification outbox.
+
+Chat messages write their Notification row and a notification_outbox entry
+in the same transaction as the message, so the request path never opens a
+second session or waits on FCM. This relay claims pending entries in
+batches (FOR UPDATE SKIP LOCKED, so several app nodes can run it), looks up
+the recipients' device tokens in one query and hands the pushes to the
+background push dispatcher. An entry is only deleted once the dispatcher
+reports its outcome; if nothing was delivered, or the outcome does not
+arrive within NOTIFICATION_OUTBOX_SEND_TIMEOUT (e.g. at shutdown), it stays
+pending and is retried, so delivery is at-least-once.
+
+The relay is started and stopped with the application (see app.main), is
+woken right after a message is stored and also polls every
+NOTIFICATION_OUTBOX_POLL_INTERVAL seconds to pick up entries left behind by
+a restart.
+"""
+import asyncio
+from typing import Callable, Optional
+from ..core.constants import (
+    NOTIFICATION_OUTBOX_BATCH_SIZE,
+    NOTIFICATION_OUTBOX_POLL_INTERVAL,
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+    NOTIFICATION_OUTBOX_SEND_TIMEOUT
+)
+from ..core.logging_config import logger
+from ..db.offload import run_db
+
+
+def _relay_batch(limit: int) -> int:
+    """
+    Send one batch of pending outbox entries (runs on the DB threadpool)
+
+    Args:
+        limit: Maximum number of entries to claim
+
+    Returns:
+        Number of entries claimed
+    """
+    from ..db.database import SessionLocal
+    from ..repositories.notification_repository import NotificationRepository
+    from .device_tokens import get_tokens_for_users
+    from .push_dispatcher import PushDelivery, push_dispatcher
+
+    db = SessionLocal()
+    try:
+        repository = NotificationRepository(db)
+        entries = repository.claim_pending_pushes(limit)
+        if not entries:
+            db.rollback()
+            return 0
+
+        tokens = get_tokens_for_users(db, {entry.recipient_user_id for entry in entries})
+        deliveries = []
+        for entry in entries:
+            try:
+                delivery = PushDelivery()
+                push_dispatcher.enqueue(
+                    tokens.get(entry.recipient_user_id) or [],
+                    title=entry.title, body=entry.body, data=entry.data or {}, delivery=delivery
+                )
+                deliveries.append((entry, delivery))
+            except Exception as e:
+                logger.warning(f"Notification outbox entry {entry.id} failed: {e}")
+                repository.complete_push(entry, error=str(e), max_attempts=NOTIFICATION_OUTBOX_MAX_ATTEMPTS)
+
+        for entry, delivery in deliveries:
+            if not delivery.wait(NOTIFICATION_OUTBOX_SEND_TIMEOUT):
+                error = "push delivery did not finish in time"
+            elif delivery.failed and not delivery.sent:
+                error = f"push delivery failed for {delivery.failed} device(s)"
+            else:
+                repository.complete_push(entry)
+                continue
+            logger.warning(f"Notification outbox entry {entry.id} failed: {error}")
+            repository.complete_push(entry, error=error, max_attempts=NOTIFICATION_OUTBOX_MAX_ATTEMPTS)
+
+        db.commit()
+        return len(entries)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class NotificationOutboxRelay:
+    def __init__(
+        self,
+        relay_batch: Callable[[int], int] = _relay_batch,
+        batch_size: int = NOTIFICATION_OUTBOX_BATCH_SIZE,
+        poll_interval: float = NOTIFICATION_OUTBOX_POLL_INTERVAL
+    ):
+        self.relay_batch = relay_batch
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the relay task on the running event loop (no-op if already running)"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    def wake(self):
+        """Ask the relay to send pending entries now instead of at the next poll"""
+        self.start()
+        self._wakeup.set()
+
+    async def stop(self):
+        """Cancel the relay task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def relay_pending(self) -> int:
+        """Send pending entries batch by batch until the outbox is empty; returns how many were claimed"""
+        total = 0
+        while True:
+            claimed = await run_db(self.relay_batch, self.batch_size)
+            total += claimed
+            if claimed < self.batch_size:
+                return total
+
+    async def run(self):
+        """Relay loop; runs until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.relay_pending()
+            except Exception as e:
+                logger.error(f"Error relaying notification outbox: {e}", exc_info=True)
+
+
+notification_relay = NotificationOutboxRelay()
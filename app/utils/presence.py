@@ -0,0 +1,150 @@
+"""
+In-process presence registry with write-behind persistence.
+
+"Who is online" is answered from memory. Entries are refreshed by WebSocket
+activity (every inbound frame, including heartbeat pongs) and expire after
+PRESENCE_TTL_SECONDS without one. Changes are collected and written to
+user_presence in one batched upsert every PRESENCE_FLUSH_INTERVAL seconds,
+so connects, disconnects and heartbeats never wait on the database.
+
+Users connected to other nodes are tracked per node from their presence
+heartbeats, so a user whose last device leaves this node is only written
+offline when no other node still holds them. Entries that expire without
+an explicit disconnect (a node that died) are written offline as well.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..core.constants import PRESENCE_FLUSH_INTERVAL, PRESENCE_TTL_SECONDS
+from ..core.logging_config import logger
+from ..db.offload import run_db
+
+
+def _flush_presence(rows: List[dict]):
+    """Upsert a batch of presence rows (runs on the DB threadpool)"""
+    from ..db.database import SessionLocal
+    from ..repositories.chat_repository import ChatRepository
+
+    db = SessionLocal()
+    try:
+        ChatRepository(db).upsert_user_presence_batch(rows)
+    finally:
+        db.close()
+
+
+class PresenceRegistry:
+    def __init__(self, ttl_seconds: int = PRESENCE_TTL_SECONDS):
+        self.last_seen: Dict[int, datetime] = {}
+        self.pending: Dict[int, Tuple[bool, datetime]] = {}
+        self.remote: Dict[int, Dict[str, datetime]] = {}
+        self.ttl = timedelta(seconds=ttl_seconds)
+
+    def touch(self, user_id: int, persist: bool = True):
+        """
+        Record activity for a user, marking them online
+
+        Args:
+            user_id: User that was seen
+            persist: Queue the new last_seen for the next flush; False for
+                presence learned from another node, which persists it itself
+        """
+        now = datetime.now(timezone.utc)
+        self.last_seen[user_id] = now
+        if persist:
+            self.pending[user_id] = (True, now)
+
+    def touch_remote(self, user_id: int, node_id: str):
+        """Record that another node holds a connection of the user (not persisted here)"""
+        self.touch(user_id, persist=False)
+        self.remote.setdefault(user_id, {})[node_id] = self.last_seen[user_id]
+
+    def forget_remote(self, user_id: int, node_id: str):
+        """Record that another node no longer holds any connection of the user"""
+        nodes = self.remote.get(user_id)
+        if nodes is not None:
+            nodes.pop(node_id, None)
+            if not nodes:
+                del self.remote[user_id]
+
+    def held_elsewhere(self, user_id: int) -> bool:
+        """Whether another node reported a connection of the user within the TTL"""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        return any(seen_at >= cutoff for seen_at in self.remote.get(user_id, {}).values())
+
+    def mark_offline(self, user_id: int, persist: bool = True):
+        """Forget a user and queue an offline row for the next flush"""
+        self.last_seen.pop(user_id, None)
+        if persist:
+            self.pending[user_id] = (False, datetime.now(timezone.utc))
+
+    def is_online(self, user_id: int) -> bool:
+        """Check whether a user has been seen within the TTL"""
+        seen_at = self.last_seen.get(user_id)
+        return seen_at is not None and datetime.now(timezone.utc) - seen_at <= self.ttl
+
+    def online_status(self, user_ids: Iterable[int]) -> Dict[int, bool]:
+        """Online status for several users"""
+        return {user_id: self.is_online(user_id) for user_id in user_ids}
+
+    def get_last_seen(self, user_id: int) -> Optional[datetime]:
+        """Last activity time of an online user, or None if not in the registry"""
+        return self.last_seen.get(user_id)
+
+    def online_user_ids(self) -> List[int]:
+        """IDs of every user currently considered online"""
+        return [user_id for user_id in list(self.last_seen) if self.is_online(user_id)]
+
+    def expire(self):
+        """Drop users whose last activity is older than the TTL and queue them as offline"""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        for user_id, seen_at in list(self.last_seen.items()):
+            if seen_at < cutoff:
+                del self.last_seen[user_id]
+                self.remote.pop(user_id, None)
+                self.pending[user_id] = (False, seen_at)
+        for user_id, nodes in list(self.remote.items()):
+            for node_id, seen_at in list(nodes.items()):
+                if seen_at < cutoff:
+                    del nodes[node_id]
+            if not nodes:
+                del self.remote[user_id]
+
+    async def flush(self):
+        """Write queued presence changes to user_presence in one batch"""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        rows = [
+            {"user_id": user_id, "is_online": is_online, "last_seen": seen_at}
+            for user_id, (is_online, seen_at) in pending.items()
+        ]
+        try:
+            await run_db(_flush_presence, rows)
+        except Exception as e:
+            logger.error(f"Error flushing {len(rows)} presence rows: {e}", exc_info=True)
+            for user_id, change in pending.items():
+                self.pending.setdefault(user_id, change)
+
+    async def run(self, on_flush=None, interval: int = PRESENCE_FLUSH_INTERVAL):
+        """
+        Flush loop; runs until cancelled
+
+        Args:
+            on_flush: Optional coroutine function awaited after every flush
+            interval: Seconds between flushes
+        """
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.expire()
+                await self.flush()
+                if on_flush is not None:
+                    try:
+                        await on_flush()
+                    except Exception as e:
+                        logger.error(f"Error in presence flush callback: {e}", exc_info=True)
+        finally:
+            await self.flush()
+
+
+presence_registry = PresenceRegistry()
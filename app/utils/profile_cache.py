@@ -0,0 +1,77 @@
+"""
+Versioned per-user cache of full profiles.
+
+Profile pages are served from UserFullResponse objects built by
+UserRepository.get_user_full_profile_data (one statement for the user and
+all sub-collections) and kept for PROFILE_CACHE_TTL seconds. Every profile
+write bumps the user's version, which drops the cached entry and stops a
+load that started before the write from storing a stale profile. The TTL
+bounds staleness across worker processes and for edits to shared reference
+rows (companies, facilities, ...).
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..core.constants import PROFILE_CACHE_TTL
+from ..schemas.profile import UserFullResponse
+
+
+class ProfileCache:
+    def __init__(self, ttl_seconds: int = PROFILE_CACHE_TTL):
+        self.ttl = ttl_seconds
+        self._entries: Dict[int, Tuple[int, float, UserFullResponse]] = {}
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, user_id: int) -> int:
+        """Current profile version of a user"""
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def get_or_load(self, user_id: int, loader: Callable[[int], Optional[dict]]) -> Optional[UserFullResponse]:
+        """
+        Cached profile of a user, calling loader(user_id) on a miss
+
+        Args:
+            user_id: User whose profile to return
+            loader: Returns the profile as a dict, or None for missing/deleted users
+
+        Returns:
+            The profile, or None if the user does not exist
+        """
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+            entry = self._entries.get(user_id)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                return entry[2]
+
+        data = loader(user_id)
+        if data is None:
+            return None
+
+        profile = UserFullResponse.model_validate(data)
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                self._entries[user_id] = (version, time.monotonic() + self.ttl, profile)
+        return profile
+
+    def invalidate(self, user_id: int):
+        """Bump a user's profile version and drop the cached profile"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+
+profile_cache = ProfileCache()
+
+
+def get_full_profile(db: Session, user_id: int) -> Optional[UserFullResponse]:
+    """Full profile of a non-deleted user, served from the profile cache"""
+    from ..repositories.user_repository import UserRepository
+    return profile_cache.get_or_load(user_id, UserRepository(db).get_user_full_profile_data)
+
+
+def invalidate_profile(user_id: int):
+    """Forget a user's cached profile after any profile write"""
+    profile_cache.invalidate(user_id)
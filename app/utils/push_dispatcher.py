@@ -0,0 +1,292 @@
+"""
+Background push notification dispatcher.
+
+Request and WebSocket handlers enqueue a notification and return at once. A
+pool of worker threads sends it with FCM multicast (up to FCM_MULTICAST_LIMIT
+tokens per call), retries transient failures with exponential backoff and
+deactivates tokens FCM reports as unregistered. Callers that must know the
+outcome (the notification outbox relay) pass a PushDelivery, which resolves
+once every multicast and retry for that notification has finished.
+
+The transport is pluggable: FirebasePushTransport talks to FCM,
+FakePushTransport records sends in memory for tests.
+"""
+import queue
+import random
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from ..core.config import settings
+from ..core.constants import FCM_MULTICAST_LIMIT
+from ..core.logging_config import logger
+
+
+def _deactivate_device_tokens(tokens: List[str]):
+    """Mark device tokens FCM rejected as inactive so they are not sent to again"""
+    from ..db.database import SessionLocal
+    from .device_token_logger import deactivate_device_tokens
+
+    db = SessionLocal()
+    try:
+        deactivate_device_tokens(db, tokens)
+    finally:
+        db.close()
+
+
+class FirebasePushTransport:
+    """Sends multicasts through the Firebase Admin SDK"""
+
+    def send(self, tokens: List[str], title: str, body: str, data: Dict[str, str], sound: str) -> List[dict]:
+        """
+        Send one multicast
+
+        Returns:
+            One {"token", "success", "outcome", "error"} dict per token, where
+            outcome is "sent", "invalid", "retry" or "failed"
+        """
+        from .firebase_notifications import send_multicast, classify_send_error
+
+        batch = send_multicast(tokens, title, body, data=data, sound=sound)
+        results = []
+        for token, response in zip(tokens, batch.responses):
+            if response.success:
+                results.append({"token": token, "success": True, "outcome": "sent", "error": None})
+            else:
+                results.append({
+                    "token": token,
+                    "success": False,
+                    "outcome": classify_send_error(response.exception),
+                    "error": str(response.exception)
+                })
+        return results
+
+
+class FakePushTransport:
+    """
+    In-memory transport for tests
+
+    Tokens in invalid_tokens fail as unregistered; tokens in transient_failures
+    fail with a retryable error the given number of times before succeeding.
+    """
+
+    def __init__(self, invalid_tokens: Iterable[str] = (), transient_failures: Optional[Dict[str, int]] = None):
+        self.invalid_tokens = set(invalid_tokens)
+        self.transient_failures = dict(transient_failures or {})
+        self.multicasts: List[dict] = []
+        self._lock = threading.Lock()
+
+    def send(self, tokens: List[str], title: str, body: str, data: Dict[str, str], sound: str) -> List[dict]:
+        with self._lock:
+            self.multicasts.append({"tokens": list(tokens), "title": title, "body": body, "data": data})
+            results = []
+            for token in tokens:
+                if token in self.invalid_tokens:
+                    results.append({"token": token, "success": False, "outcome": "invalid", "error": "unregistered"})
+                elif self.transient_failures.get(token, 0) > 0:
+                    self.transient_failures[token] -= 1
+                    results.append({"token": token, "success": False, "outcome": "retry", "error": "unavailable"})
+                else:
+                    results.append({"token": token, "success": True, "outcome": "sent", "error": None})
+            return results
+
+
+class PushDelivery:
+    """Outcome of one enqueued notification, complete when all of its multicasts and retries are done"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the delivery is complete; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def _add_job(self):
+        with self._lock:
+            self._pending += 1
+
+    def _record(self, sent: int, failed: int):
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+
+    def _job_finished(self):
+        with self._lock:
+            self._pending -= 1
+            if self._pending <= 0:
+                self._done.set()
+
+
+class PushJob:
+    def __init__(self, tokens: List[str], title: str, body: str, data: Dict[str, str], sound: str,
+                 attempt: int = 0, delivery: Optional[PushDelivery] = None):
+        self.tokens = tokens
+        self.title = title
+        self.body = body
+        self.data = data
+        self.sound = sound
+        self.attempt = attempt
+        self.delivery = delivery
+
+
+class PushDispatcher:
+    def __init__(
+        self,
+        transport=None,
+        workers: int = settings.PUSH_WORKERS,
+        max_retries: int = settings.PUSH_MAX_RETRIES,
+        backoff_seconds: float = settings.PUSH_RETRY_BACKOFF_SECONDS,
+        prune_tokens: Optional[Callable[[List[str]], None]] = None
+    ):
+        self.transport = transport or FirebasePushTransport()
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.prune_tokens = prune_tokens or _deactivate_device_tokens
+        self.stats = {"sent": 0, "failed": 0, "retried": 0, "pruned": 0}
+        self._queue: "queue.Queue[Optional[PushJob]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+
+    def start(self):
+        """Start the worker threads (called lazily by enqueue)"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"push-dispatcher-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, tokens: List[str], title: str, body: str,
+                data: Optional[Dict[str, str]] = None, sound: str = "default",
+                delivery: Optional[PushDelivery] = None) -> int:
+        """
+        Queue a notification for a set of device tokens without waiting for FCM
+
+        Args:
+            tokens: FCM device tokens; duplicates are sent once
+            title: Notification title
+            body: Notification body text
+            data: Optional data payload; values are converted to strings
+            sound: Notification sound
+            delivery: Optional PushDelivery to report the final outcome to
+
+        Returns:
+            Number of multicast jobs queued
+        """
+        tokens = list(dict.fromkeys(token for token in tokens if token))
+        if not tokens:
+            if delivery is not None:
+                delivery._done.set()
+            return 0
+        self.start()
+
+        data = {str(key): str(value) for key, value in (data or {}).items()}
+        jobs = [
+            PushJob(tokens[start:start + FCM_MULTICAST_LIMIT], title, body, data, sound, delivery=delivery)
+            for start in range(0, len(tokens), FCM_MULTICAST_LIMIT)
+        ]
+        if delivery is not None:
+            for _ in jobs:
+                delivery._add_job()
+        for job in jobs:
+            self._submit(job)
+        return len(jobs)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued job and scheduled retry has finished; returns False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Let the workers finish queued jobs, then stop them"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _submit(self, job: PushJob):
+        with self._lock:
+            self._outstanding += 1
+        self._queue.put(job)
+
+    def _finish(self):
+        with self._idle:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._process(job)
+            except Exception as e:
+                logger.error(f"Push dispatcher failed to process a job: {e}", exc_info=True)
+                if job.delivery is not None:
+                    job.delivery._record(0, len(job.tokens))
+            finally:
+                if job.delivery is not None:
+                    job.delivery._job_finished()
+                self._finish()
+
+    def _process(self, job: PushJob):
+        try:
+            results = self.transport.send(job.tokens, job.title, job.body, job.data, job.sound)
+        except FileNotFoundError as e:
+            logger.warning(f"Push notification skipped, Firebase is not configured: {e}")
+            if job.delivery is not None:
+                job.delivery._record(0, len(job.tokens))
+            return
+        except Exception as e:
+            logger.warning(f"Push multicast to {len(job.tokens)} device(s) failed: {e}")
+            results = [{"token": token, "success": False, "outcome": "retry", "error": str(e)} for token in job.tokens]
+
+        invalid = [result["token"] for result in results if result["outcome"] == "invalid"]
+        retry = [result["token"] for result in results if result["outcome"] == "retry"]
+        sent = sum(1 for result in results if result["success"])
+        failed = sum(1 for result in results if result["outcome"] == "failed")
+        with self._lock:
+            self.stats["sent"] += sent
+            self.stats["failed"] += failed
+        if job.delivery is not None:
+            job.delivery._record(sent, failed)
+
+        if invalid:
+            try:
+                self.prune_tokens(invalid)
+                with self._lock:
+                    self.stats["pruned"] += len(invalid)
+            except Exception as e:
+                logger.error(f"Failed to prune {len(invalid)} invalid device token(s): {e}", exc_info=True)
+
+        if retry:
+            if job.attempt >= self.max_retries:
+                logger.warning(f"Giving up on {len(retry)} device(s) after {job.attempt + 1} attempts")
+                with self._lock:
+                    self.stats["failed"] += len(retry)
+                if job.delivery is not None:
+                    job.delivery._record(0, len(retry))
+                return
+            delay = self.backoff_seconds * (2 ** job.attempt) * (1 + random.random() / 2)
+            retry_job = PushJob(retry, job.title, job.body, job.data, job.sound, job.attempt + 1, job.delivery)
+            if job.delivery is not None:
+                job.delivery._add_job()
+            with self._lock:
+                self.stats["retried"] += len(retry)
+                self._outstanding += 1
+            timer = threading.Timer(delay, self._queue.put, args=(retry_job,))
+            timer.daemon = True
+            timer.start()
+
+
+push_dispatcher = PushDispatcher()
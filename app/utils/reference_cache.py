@@ -0,0 +1,121 @@
+"""
+Process-wide cache of reference data responses.
+
+Skills, locations, languages, roles and categories change only through
+admin routes, but the mobile app fetches all of them on every cold start.
+Their list responses are serialized once and kept as JSON bytes with a
+strong ETag, so repeated requests skip the query and the per-row
+validation, and clients sending If-None-Match get a bodyless 304.
+
+Entries are keyed by a tuple whose first element is the namespace
+("skills", "locations", ...); the create/update/delete routes call
+invalidate_reference_data with the namespaces they touch, which drops them
+here and on every other worker through the chat backplane. Entries also
+expire after REFERENCE_CACHE_TTL, so a node that missed an invalidation
+(pub/sub is fire-and-forget) converges anyway, and the least recently used
+ones are evicted beyond REFERENCE_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from ..core.constants import REFERENCE_CACHE_MAX_ENTRIES, REFERENCE_CACHE_TTL
+from ..db.offload import run_db
+
+REFERENCE_NAMESPACES = ("skills", "locations", "languages", "roles", "categories")
+
+
+class CachedPayload:
+    def __init__(self, body: bytes, expires_at: float = float("inf")):
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.expires_at = expires_at
+
+
+class ReferenceDataCache:
+    def __init__(self, ttl: float = REFERENCE_CACHE_TTL, max_entries: int = REFERENCE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, ...], CachedPayload]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Tuple[Hashable, ...]) -> Tuple[Optional[CachedPayload], int]:
+        """Cached payload for a key (None if missing or expired) and the namespace generation to pass to store()"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at <= time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+            return entry, self._generations.get(key[0], 0)
+
+    def store(self, key: Tuple[Hashable, ...], body: bytes, generation: int) -> CachedPayload:
+        """
+        Cache a freshly built body
+
+        Args:
+            key: Cache key; key[0] is the namespace used for invalidation
+            body: Serialized response body
+            generation: Generation returned by lookup() before the body was built;
+                the body is not cached if the namespace was invalidated since
+
+        Returns:
+            The payload with its ETag
+        """
+        entry = CachedPayload(body, time.monotonic() + self.ttl)
+        with self._lock:
+            if self._generations.get(key[0], 0) == generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *namespaces: str):
+        """Drop every entry in the given namespaces (all namespaces when none are given)"""
+        namespaces = namespaces or REFERENCE_NAMESPACES
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key in self._entries if key[0] in namespaces]:
+                del self._entries[key]
+
+
+reference_cache = ReferenceDataCache()
+
+
+def invalidate_reference_data(*namespaces: str):
+    """Forget cached reference responses after an admin change, on this worker and every other node"""
+    from .websocket_manager import manager
+    reference_cache.invalidate(*namespaces)
+    manager.publish_reference_invalidation(namespaces or REFERENCE_NAMESPACES)
+
+
+async def cached_reference_response(request: Request, key: Tuple[Hashable, ...], build: Callable[[], bytes]) -> Response:
+    """
+    Serve a reference data response from the cache with ETag support
+
+    Args:
+        request: Incoming request, checked for If-None-Match
+        key: Cache key; key[0] is the namespace
+        build: Synchronous callable returning the response body as bytes;
+            run on the DB threadpool on a cache miss
+
+    Returns:
+        304 when the client's ETag matches, otherwise the cached JSON body
+    """
+    entry, generation = reference_cache.lookup(key)
+    if entry is None:
+        body = await run_db(build)
+        entry = reference_cache.store(key, body, generation)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,150 @@
+"""
+Pub/sub backplane for chat WebSocket fan-out.
+
+A ConnectionManager only owns the sockets accepted by its own process. Every
+outgoing event is wrapped in an envelope naming its target users and published
+to the backplane; each node delivers the envelope to the sockets it owns and
+ignores the rest. With a single worker the in-memory backend is enough, with
+several workers or hosts point CHAT_BACKPLANE_URL at a Redis server.
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, List, Optional
+from ..core.config import settings
+from ..core.constants import BACKPLANE_RECONNECT_MAX_DELAY, BACKPLANE_RECONNECT_MIN_DELAY
+from ..core.logging_config import logger
+
+EnvelopeHandler = Callable[[dict], Awaitable[None]]
+
+
+class InMemoryBackplane:
+    """
+    Backplane that fans envelopes out inside the current process
+
+    Several managers subscribed to the same instance behave like separate
+    nodes sharing a Redis channel, which keeps multi-node delivery testable.
+    """
+
+    def __init__(self):
+        self._handlers: List[EnvelopeHandler] = []
+
+    async def start(self, handler: EnvelopeHandler):
+        """Subscribe a node's envelope handler"""
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    async def publish(self, envelope: dict):
+        """Hand an envelope to every subscribed node"""
+        for handler in list(self._handlers):
+            try:
+                await handler(envelope)
+            except Exception as e:
+                logger.error(f"Backplane handler failed: {e}", exc_info=True)
+
+    async def stop(self):
+        """Drop all subscriptions"""
+        self._handlers.clear()
+
+
+class RedisBackplane:
+    """
+    Backplane that fans envelopes out through a Redis pub/sub channel
+
+    Works with any server speaking the Redis protocol. The client is created
+    lazily from the URL with redis.asyncio unless one is passed in.
+    """
+
+    def __init__(self, url: str, channel: str, client: Any = None):
+        self.url = url
+        self.channel = channel
+        self._client = client
+        self._listener: Optional[asyncio.Task] = None
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                raise RuntimeError("CHAT_BACKPLANE_URL is set but the 'redis' package is not installed")
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def start(self, handler: EnvelopeHandler):
+        """Subscribe to the channel and dispatch incoming envelopes to handler"""
+        if self._listener is not None:
+            return
+        pubsub = await self._subscribe()
+        self._listener = asyncio.create_task(self._listen(pubsub, handler))
+
+    async def _subscribe(self) -> Any:
+        pubsub = self._get_client().pubsub()
+        await pubsub.subscribe(self.channel)
+        return pubsub
+
+    @staticmethod
+    async def _close_quietly(pubsub: Any):
+        close = getattr(pubsub, "aclose", None) or getattr(pubsub, "close", None)
+        if close is None:
+            return
+        try:
+            await close()
+        except Exception:
+            pass
+
+    async def _listen(self, pubsub: Any, handler: EnvelopeHandler):
+        """
+        Dispatch envelopes until cancelled
+
+        A dropped Redis connection is logged and the channel resubscribed,
+        backing off from BACKPLANE_RECONNECT_MIN_DELAY up to
+        BACKPLANE_RECONNECT_MAX_DELAY seconds, so the node keeps receiving
+        the other nodes' events instead of silently going deaf.
+        """
+        delay = BACKPLANE_RECONNECT_MIN_DELAY
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = await self._subscribe()
+                    logger.info(f"Backplane resubscribed to {self.channel}")
+                async for item in pubsub.listen():
+                    delay = BACKPLANE_RECONNECT_MIN_DELAY
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        await handler(json.loads(item["data"]))
+                    except Exception as e:
+                        logger.error(f"Backplane handler failed: {e}", exc_info=True)
+                raise ConnectionError("subscription stream ended")
+            except asyncio.CancelledError:
+                if pubsub is not None:
+                    await self._close_quietly(pubsub)
+                raise
+            except Exception as e:
+                logger.error(f"Backplane subscription to {self.channel} failed, retrying in {delay}s: {e}")
+                if pubsub is not None:
+                    await self._close_quietly(pubsub)
+                pubsub = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, BACKPLANE_RECONNECT_MAX_DELAY)
+
+    async def publish(self, envelope: dict):
+        """Publish an envelope to every node subscribed to the channel"""
+        await self._get_client().publish(self.channel, json.dumps(envelope))
+
+    async def stop(self):
+        """Stop listening for envelopes"""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+
+def create_backplane():
+    """
+    Create the backplane configured for this deployment
+
+    Returns:
+        RedisBackplane when CHAT_BACKPLANE_URL is set, otherwise InMemoryBackplane
+    """
+    if settings.CHAT_BACKPLANE_URL:
+        return RedisBackplane(settings.CHAT_BACKPLANE_URL, settings.CHAT_BACKPLANE_CHANNEL)
+    return InMemoryBackplane()
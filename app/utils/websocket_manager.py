@@ -1,76 +1,412 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set
 import json
 import asyncio
+import uuid
+import time
 from datetime import datetime
 from ..db.database import SessionLocal
+from ..db.offload import run_db
 from ..repositories.chat_repository import ChatRepository
+from ..core.constants import WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT, VIDEO_CALL_REGISTRY_TTL
 from ..core.logging_config import logger
+from .websocket_backplane import create_backplane
+from .presence import presence_registry
+from .reference_cache import reference_cache
+from .websocket_outbound import OutboundQueue, coalesce_key
+
+
+def _get_room_participants(room_id: int) -> List[int]:
+    """Load participant IDs of a room (runs on the DB threadpool)"""
+    db = SessionLocal()
+    try:
+        return ChatRepository(db).get_room_participants(room_id)
+    finally:
+        db.close()
+
+
+def _get_user_memberships(user_id: int) -> Dict[int, List[int]]:
+    """Load participant IDs of every room user_id is in (runs on the DB threadpool)"""
+    db = SessionLocal()
+    try:
+        return ChatRepository(db).get_user_room_memberships(user_id)
+    finally:
+        db.close()
+
+
+def _get_call_participants(call_id: str) -> List[int]:
+    """Load participant IDs of the room a call belongs to (runs on the DB threadpool)"""
+    db = SessionLocal()
+    try:
+        return ChatRepository(db).get_call_participants(call_id)
+    finally:
+        db.close()
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, WebSocket] = {}
+    def __init__(self, backplane=None, presence=None):
+        self.active_connections: Dict[int, Dict[str, WebSocket]] = {}
+        self.outbound: Dict[str, OutboundQueue] = {}
+        self.last_activity: Dict[str, float] = {}
         self.user_rooms: Dict[int, int] = {}
         self.typing_users: Dict[int, Set[int]] = {}
+        self.room_members: Dict[int, Set[int]] = {}
+        self.user_memberships: Dict[int, Set[int]] = {}
+        self.call_participants: Dict[str, Set[int]] = {}
+        self.call_registered_at: Dict[str, float] = {}
+        self.node_id = uuid.uuid4().hex
+        self.backplane = backplane or create_backplane()
+        self.presence = presence or presence_registry
+        self._backplane_started = False
+        self._presence_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _ensure_backplane(self):
+        """Subscribe this node to the backplane and start presence flushing once an event loop is running"""
+        self._loop = asyncio.get_running_loop()
+        if not self._backplane_started:
+            self._backplane_started = True
+            await self.backplane.start(self._handle_envelope)
+        if self._presence_task is None:
+            self._presence_task = asyncio.create_task(self.presence.run(on_flush=self._announce_presence))
+
+    async def start(self):
+        """
+        Subscribe to the backplane and start the presence loop at application startup
+
+        Every worker must receive presence_alive and room invalidations, not only
+        the ones that have accepted a WebSocket, or REST presence answers go stale.
+        """
+        await self._ensure_backplane()
 
-    async def connect(self, websocket: WebSocket, user_id: int):
-        """Store a WebSocket connection (websocket should already be accepted)"""
-        self.active_connections[user_id] = websocket
-        print(f"User {user_id} connected")
+    async def stop(self):
+        """Stop the presence loop (flushing pending changes) and leave the backplane at shutdown"""
+        if self._presence_task is not None:
+            self._presence_task.cancel()
+            try:
+                await self._presence_task
+            except asyncio.CancelledError:
+                pass
+            self._presence_task = None
+        if self._backplane_started:
+            await self.backplane.stop()
+            self._backplane_started = False
+
+    async def _announce_presence(self):
+        """Tell the other nodes which users are still connected here so their presence entries do not expire"""
+        if not self.active_connections:
+            return
+        await self.backplane.publish({
+            "origin": self.node_id,
+            "presence_alive": list(self.active_connections.keys())
+        })
+
+    def _announce_left(self, user_id: int):
+        """Tell the other nodes this one no longer holds the user, so the last node to lose them writes them offline"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        async def publish():
+            try:
+                await self.backplane.publish({"origin": self.node_id, "presence_left": [user_id]})
+            except Exception as e:
+                logger.error(f"Error publishing presence of user {user_id} to backplane: {e}", exc_info=True)
+
+        asyncio.run_coroutine_threadsafe(publish(), loop)
+
+    async def _handle_envelope(self, envelope: dict):
+        """Deliver an envelope published by another node to the sockets this node owns"""
+        if envelope.get("origin") == self.node_id:
+            return
+        if "invalidate_room" in envelope:
+            self._drop_room(envelope["invalidate_room"], envelope.get("user_ids") or [])
+            return
+        if "invalidate_reference" in envelope:
+            reference_cache.invalidate(*envelope["invalidate_reference"])
+            return
+        if "presence_alive" in envelope:
+            for user_id in envelope["presence_alive"]:
+                self.presence.touch_remote(user_id, envelope.get("origin"))
+            return
+        if "presence_left" in envelope:
+            for user_id in envelope["presence_left"]:
+                self.presence.forget_remote(user_id, envelope.get("origin"))
+            return
+        message = envelope["message"]
+        if message.get("type") in ("video_call_end", "video_call_reject"):
+            self.forget_call(message.get("data", {}).get("call_id"))
+        elif message.get("type") == "presence":
+            data = message.get("data", {})
+            if data.get("is_online"):
+                self.presence.touch_remote(data["user_id"], envelope.get("origin"))
+            else:
+                self.presence.forget_remote(data["user_id"], envelope.get("origin"))
+                if data.get("user_id") not in self.active_connections and not self.presence.held_elsewhere(data["user_id"]):
+                    self.presence.mark_offline(data["user_id"], persist=False)
+        await self._deliver_local(message, envelope.get("user_ids"))
 
-    def disconnect(self, user_id: int):
-        """Remove a WebSocket connection"""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
+    async def _deliver_local(self, message: dict, user_ids: Optional[Iterable[int]] = None):
+        """Queue a message for every device of the targeted users connected to this process (all users when user_ids is None)"""
+        if user_ids is None:
+            targets = list(self.active_connections.values())
+        else:
+            targets = [self.active_connections[uid] for uid in user_ids if uid in self.active_connections]
+        if not targets:
+            return
+        
+        payload = json.dumps(message)
+        key = coalesce_key(message)
+        for connections in targets:
+            for connection_id in list(connections):
+                queue = self.outbound.get(connection_id)
+                if queue is not None:
+                    queue.put(payload, key)
+
+    def _drop_slow_connection(self, queue: OutboundQueue, reason: str):
+        """Disconnect a device whose outbound queue overflowed or whose socket failed"""
+        if self.disconnect(queue.user_id, queue.connection_id):
+            asyncio.create_task(self.broadcast_presence(queue.user_id, False))
+        asyncio.create_task(self._close_quietly(queue.websocket, reason))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, reason: str):
+        try:
+            await websocket.close(code=1013, reason=reason[:120])
+        except Exception:
+            pass
+
+    def get_queue_metrics(self) -> Dict[str, dict]:
+        """Outbound queue depth and delivery counters per connection"""
+        return {connection_id: queue.metrics() for connection_id, queue in self.outbound.items()}
+
+    async def drain(self):
+        """Wait until every outbound queue on this node has been written out"""
+        await asyncio.gather(*(queue.drain() for queue in list(self.outbound.values())))
+
+    async def _publish(self, message: dict, user_ids: Optional[Iterable[int]] = None):
+        """Deliver a message locally and fan it out to the other nodes through the backplane"""
+        if user_ids is not None:
+            user_ids = list(user_ids)
+        await self._deliver_local(message, user_ids)
+        
+        try:
+            await self.backplane.publish({
+                "origin": self.node_id,
+                "user_ids": user_ids,
+                "message": message
+            })
+        except Exception as e:
+            logger.error(f"Error publishing {message.get('type')} to backplane: {e}", exc_info=True)
+
+    async def connect(self, websocket: WebSocket, user_id: int) -> str:
+        """
+        Register a device connection (websocket should already be accepted)
+        and return its connection ID. A user may hold several connections.
+        """
+        await self._ensure_backplane()
+        connection_id = uuid.uuid4().hex
+        self.active_connections.setdefault(user_id, {})[connection_id] = websocket
+        self.outbound[connection_id] = OutboundQueue(
+            websocket, user_id, connection_id, on_failure=self._drop_slow_connection
+        )
+        self.outbound[connection_id].start()
+        self.touch(user_id, connection_id)
+        await self.load_user_memberships(user_id)
+        print(f"User {user_id} connected ({self.device_count(user_id)} device(s))")
+        return connection_id
+
+    def disconnect(self, user_id: int, connection_id: Optional[str] = None) -> bool:
+        """
+        Remove one device connection, or all of the user's connections when
+        connection_id is None. Returns True when the user's last device left,
+        here and on every other node this one has heard from; only then is the
+        user written offline.
+        """
+        connections = self.active_connections.get(user_id)
+        if not connections:
+            return False
+        
+        removed = list(connections) if connection_id is None else [connection_id]
+        for cid in removed:
+            if connections.pop(cid, None) is None:
+                continue
+            self.last_activity.pop(cid, None)
+            queue = self.outbound.pop(cid, None)
+            if queue is not None:
+                queue.close()
+        
+        if connections:
+            logger.info(f"User {user_id} disconnected a device, {len(connections)} still connected")
+            return False
+        
+        del self.active_connections[user_id]
         if user_id in self.user_rooms:
             del self.user_rooms[user_id]
         for room_id, typing_set in self.typing_users.items():
             typing_set.discard(user_id)
+        if self.presence.held_elsewhere(user_id):
+            logger.info(f"User {user_id} disconnected from this node, still connected to another")
+            self._announce_left(user_id)
+            return False
+        self.presence.mark_offline(user_id)
         logger.info(f"User {user_id} disconnected from WebSocket")
+        return True
+
+    def touch(self, user_id: int, connection_id: str):
+        """Record inbound activity on a connection"""
+        self.last_activity[connection_id] = time.monotonic()
+        self.presence.touch(user_id)
+
+    def device_count(self, user_id: int) -> int:
+        """Number of this node's connections held by a user"""
+        return len(self.active_connections.get(user_id, {}))
+
+    def send_to_connection(self, connection_id: str, message: dict) -> bool:
+        """Queue a message for one device connection (replies such as pong and error frames); False if it is gone or full"""
+        queue = self.outbound.get(connection_id)
+        if queue is None:
+            return False
+        return queue.put(json.dumps(message), coalesce_key(message))
+
+    async def heartbeat(self, connection_id: str, user_id: int):
+        """
+        Ping a connection every WEBSOCKET_PING_INTERVAL seconds and close it
+        when nothing (pong or any other frame) arrived within the interval
+        plus WEBSOCKET_PING_TIMEOUT. Runs until cancelled or the socket closes.
+        """
+        while True:
+            await asyncio.sleep(WEBSOCKET_PING_INTERVAL)
+            queue = self.outbound.get(connection_id)
+            if queue is None:
+                return
+            idle = time.monotonic() - self.last_activity.get(connection_id, 0)
+            if idle > WEBSOCKET_PING_INTERVAL + WEBSOCKET_PING_TIMEOUT:
+                logger.info(f"Closing WebSocket {connection_id} of user {user_id}: no heartbeat")
+                try:
+                    await queue.websocket.close(code=1001, reason="Heartbeat timeout")
+                except Exception:
+                    pass
+                return
+            if not queue.put(json.dumps({"type": "ping"})):
+                return
+
+    async def load_user_memberships(self, user_id: int) -> Set[int]:
+        """Cache every room the user is in together with its participants"""
+        memberships = await run_db(_get_user_memberships, user_id)
+        for room_id, participant_ids in memberships.items():
+            self.room_members[room_id] = set(participant_ids)
+        self.user_memberships[user_id] = set(memberships.keys())
+        return self.user_memberships[user_id]
+
+    async def get_room_members(self, room_id: int) -> Set[int]:
+        """Get participant IDs of a room, loading them only on a cache miss"""
+        members = self.room_members.get(room_id)
+        if members is None:
+            members = set(await run_db(_get_room_participants, room_id))
+            self.room_members[room_id] = members
+        return members
+
+    async def invalidate_room(self, room_id: int, user_ids: Optional[Iterable[int]] = None):
+        """Drop cached membership of a room on every node after its participants change"""
+        user_ids = list(user_ids or [])
+        self._drop_room(room_id, user_ids)
+        
+        try:
+            await self.backplane.publish({
+                "origin": self.node_id,
+                "invalidate_room": room_id,
+                "user_ids": user_ids
+            })
+        except Exception as e:
+            logger.error(f"Error publishing room {room_id} invalidation to backplane: {e}", exc_info=True)
+
+    async def broadcast_reference_invalidation(self, namespaces: Iterable[str]):
+        """Make the other nodes drop their cached reference data responses"""
+        try:
+            await self.backplane.publish({
+                "origin": self.node_id,
+                "invalidate_reference": list(namespaces)
+            })
+        except Exception as e:
+            logger.error(f"Error publishing reference data invalidation to backplane: {e}", exc_info=True)
+
+    def publish_reference_invalidation(self, namespaces: Iterable[str]):
+        """
+        broadcast_reference_invalidation for the admin routes, which run on the
+        threadpool; safe to call from any thread. Does nothing before the
+        manager has started on an event loop (the TTL still bounds staleness).
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.broadcast_reference_invalidation(list(namespaces)), loop)
+
+    def register_call(self, call_id: str, participant_ids: Iterable[int]):
+        """Remember who takes part in a call so its events are only sent to them"""
+        self._expire_calls()
+        self.call_participants[call_id] = set(participant_ids)
+        self.call_registered_at[call_id] = time.monotonic()
+
+    def forget_call(self, call_id: Optional[str]):
+        """Drop a call that ended or was rejected"""
+        self.call_participants.pop(call_id, None)
+        self.call_registered_at.pop(call_id, None)
+
+    def _expire_calls(self):
+        """Drop calls registered longer than VIDEO_CALL_REGISTRY_TTL ago (unanswered or abandoned calls never send an end event)"""
+        cutoff = time.monotonic() - VIDEO_CALL_REGISTRY_TTL
+        for call_id, registered_at in list(self.call_registered_at.items()):
+            if registered_at < cutoff:
+                self.forget_call(call_id)
+
+    async def get_call_participants(self, call_id: str) -> Set[int]:
+        """Participants of a call, loaded from its Agora channel when this node did not start it or the entry expired"""
+        participants = self.call_participants.get(call_id)
+        if participants is None:
+            participants = set(await run_db(_get_call_participants, call_id))
+            if participants:
+                self.register_call(call_id, participants)
+        return participants
+
+    async def _send_call_event(self, message: dict, call_id: str):
+        """Publish a call event to the call's participants only"""
+        participants = await self.get_call_participants(call_id)
+        if not participants:
+            logger.warning(f"Dropping {message['type']} for unknown call {call_id}")
+            return
+        await self._publish(message, participants)
+
+    def _drop_room(self, room_id: int, user_ids: Iterable[int]):
+        self.room_members.pop(room_id, None)
+        for room_ids in self.user_memberships.values():
+            room_ids.discard(room_id)
+        for uid in user_ids:
+            self.user_memberships.pop(uid, None)
+
+    def _forget_user(self, user_id: int):
+        """Evict a departed user's memberships and rooms no local socket still needs"""
+        for room_id in self.user_memberships.pop(user_id, set()):
+            members = self.room_members.get(room_id, set())
+            if not any(uid in self.active_connections for uid in members):
+                self.room_members.pop(room_id, None)
 
     async def send_personal_message(self, message: dict, user_id: int):
         """Send a message to a specific user"""
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to user {user_id}: {e}", exc_info=True)
-                self.disconnect(user_id)
+        await self._publish(message, [user_id])
 
     async def send_to_room_participants(self, message: dict, room_id: int, exclude_user: int = None):
         """Send a message to all users in a specific room"""
-        db = SessionLocal()
-        try:
-            chat_repo = ChatRepository(db)
-            room_participants = chat_repo.get_room_participants(room_id)
-            
-            for user_id in room_participants:
-                if user_id in self.active_connections:
-                    if exclude_user and user_id == exclude_user:
-                        continue
-                    try:
-                        await self.active_connections[user_id].send_text(json.dumps(message))
-                    except Exception as e:
-                        print(f"Error sending room message to user {user_id}: {e}")
-                        self.disconnect(user_id)
-        finally:
-            db.close()
+        room_participants = await self.get_room_members(room_id)
+        
+        await self._publish(
+            message,
+            [user_id for user_id in room_participants if not (exclude_user and user_id == exclude_user)]
+        )
 
     async def send_direct_message(self, message: dict, sender_id: int, receiver_id: int):
         """Send a direct message to a specific receiver"""
-        if receiver_id in self.active_connections:
-            try:
-                await self.active_connections[receiver_id].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending direct message to user {receiver_id}: {e}", exc_info=True)
-                self.disconnect(receiver_id)
-        
-        if sender_id in self.active_connections:
-            try:
-                await self.active_connections[sender_id].send_text(json.dumps(message))
-            except Exception as e:
-                print(f"Error sending confirmation to sender {sender_id}: {e}")
-                self.disconnect(sender_id)
+        await self._publish(message, [receiver_id, sender_id])
 
     async def broadcast_typing(self, room_id: int, user_id: int, is_typing: bool, user_name: str):
         """Broadcast typing indicator to room participants"""
@@ -107,22 +443,19 @@ class ConnectionManager:
             }
         }
         
-        db = SessionLocal()
-        try:
-            chat_repo = ChatRepository(db)
-            user_rooms = chat_repo.get_user_rooms(user_id)
-            
-            for room in user_rooms:
-                room_participants = chat_repo.get_room_participants(room.id)
-                for participant_id in room_participants:
-                    if participant_id != user_id and participant_id in self.active_connections:
-                        try:
-                            await self.active_connections[participant_id].send_text(json.dumps(presence_message))
-                        except Exception as e:
-                            logger.error(f"Error broadcasting presence to user {participant_id}: {e}", exc_info=True)
-                            self.disconnect(participant_id)
-        finally:
-            db.close()
+        room_ids = self.user_memberships.get(user_id)
+        if room_ids is None:
+            room_ids = await self.load_user_memberships(user_id)
+        
+        recipients = set()
+        for room_id in list(room_ids):
+            recipients.update(await self.get_room_members(room_id))
+        recipients.discard(user_id)
+        
+        await self._publish(presence_message, recipients)
+        
+        if not is_online and user_id not in self.active_connections:
+            self._forget_user(user_id)
 
     async def broadcast_new_message(self, message_data: dict, room_id: int, sender_id: int, receiver_id: int):
         """Broadcast new message to room participants"""
@@ -136,19 +469,8 @@ class ConnectionManager:
             "data": {**message_data, "is_sender": False}
         }
         
-        if sender_id in self.active_connections:
-            try:
-                await self.active_connections[sender_id].send_text(json.dumps(sender_message))
-            except Exception as e:
-                print(f"Error sending message to sender {sender_id}: {e}")
-                self.disconnect(sender_id)
-        
-        if receiver_id in self.active_connections:
-            try:
-                await self.active_connections[receiver_id].send_text(json.dumps(receiver_message))
-            except Exception as e:
-                logger.error(f"Error sending message to receiver {receiver_id}: {e}", exc_info=True)
-                self.disconnect(receiver_id)
+        await self._publish(sender_message, [sender_id])
+        await self._publish(receiver_message, [receiver_id])
 
     async def broadcast_message_read(self, room_id: int, user_id: int, user_name: str):
         """Broadcast message read status"""
@@ -164,6 +486,21 @@ class ConnectionManager:
         
         await self.send_to_room_participants(read_message, room_id, exclude_user=user_id)
 
+    async def send_unread_update(self, user_id: int, **data):
+        """Push an unread counter change (room_id or notification_type, delta, unread_count) to one user"""
+        await self._publish({"type": "unread_count", "data": data}, [user_id])
+
+    def push_unread_update(self, user_id: int, **data):
+        """
+        send_unread_update for synchronous code such as plain def routes and
+        repositories on the DB threadpool; safe to call from any thread.
+        Does nothing before the manager has started on an event loop.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.send_unread_update(user_id, **data), loop)
+
     async def broadcast_message_update(self, message_data: dict, room_id: int, sender_id: int, receiver_id: int):
         """Broadcast message update to room participants"""
         message = {
@@ -211,7 +548,7 @@ class ConnectionManager:
         await self.send_to_room_participants(video_call_message, room_id, exclude_user=caller_id)
 
     async def broadcast_video_call_answer(self, call_id: str, receiver_id: int, receiver_name: str):
-        """Broadcast video call answer notification"""
+        """Send video call answer notification to the call participants"""
         answer_message = {
             "type": "video_call_answer",
             "data": {
@@ -221,15 +558,10 @@ class ConnectionManager:
             }
         }
         
-        for user_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(json.dumps(answer_message))
-            except Exception as e:
-                print(f"Error broadcasting video call answer to user {user_id}: {e}")
-                self.disconnect(user_id)
+        await self._send_call_event(answer_message, call_id)
 
     async def broadcast_video_call_reject(self, call_id: str, receiver_id: int, receiver_name: str):
-        """Broadcast video call reject notification"""
+        """Send video call reject notification to the call participants"""
         reject_message = {
             "type": "video_call_reject",
             "data": {
@@ -239,15 +571,11 @@ class ConnectionManager:
             }
         }
         
-        for user_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(json.dumps(reject_message))
-            except Exception as e:
-                logger.error(f"Error broadcasting video call reject to user {user_id}: {e}", exc_info=True)
-                self.disconnect(user_id)
+        await self._send_call_event(reject_message, call_id)
+        self.forget_call(call_id)
 
     async def broadcast_video_call_end(self, call_id: str, user_id: int, user_name: str):
-        """Broadcast video call end notification"""
+        """Send video call end notification to the call participants"""
         end_message = {
             "type": "video_call_end",
             "data": {
@@ -257,12 +585,8 @@ class ConnectionManager:
             }
         }
         
-        for uid, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(json.dumps(end_message))
-            except Exception as e:
-                logger.error(f"Error broadcasting video call end to user {uid}: {e}", exc_info=True)
-                self.disconnect(uid)
+        await self._send_call_event(end_message, call_id)
+        self.forget_call(call_id)
 
     async def broadcast_room_deleted(self, room_id: int, deleted_by_user_id: int, deleted_by_user_name: str, recipient_user_id: int):
         """Broadcast room deleted notification to a specific user"""
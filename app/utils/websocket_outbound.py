@@ -0,0 +1,154 @@
+"""
+Per-connection outbound queues for WebSocket delivery.
+
+Broadcasts serialize a message once and hand the same payload to each
+recipient's queue without awaiting the socket. A writer task per connection
+drains its queue, so a slow client only delays itself. When a queue is full,
+ephemeral events (typing, presence) are coalesced or dropped, and a client
+that cannot keep up with regular events is disconnected.
+"""
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, List, Optional
+from fastapi import WebSocket
+from ..core.constants import WEBSOCKET_SEND_QUEUE_SIZE
+from ..core.logging_config import logger
+
+
+def coalesce_key(message: dict) -> Optional[Hashable]:
+    """
+    Key under which a newer event replaces a queued older one
+
+    Args:
+        message: Outbound message
+
+    Returns:
+        A key for typing/presence events, None for events that must all be delivered
+    """
+    message_type = message.get("type")
+    data = message.get("data") or {}
+    if message_type == "typing":
+        return ("typing", data.get("room_id"), data.get("user_id"))
+    if message_type == "presence":
+        return ("presence", data.get("user_id"))
+    return None
+
+
+class OutboundQueue:
+    def __init__(self, websocket: WebSocket, user_id: int, connection_id: str,
+                 maxsize: int = WEBSOCKET_SEND_QUEUE_SIZE,
+                 on_failure: Optional[Callable[["OutboundQueue", str], None]] = None):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.connection_id = connection_id
+        self.maxsize = maxsize
+        self.on_failure = on_failure
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._pending: Deque[List] = deque()
+        self._latest: Dict[Hashable, List] = {}
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start the writer task"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    def put(self, payload: str, key: Optional[Hashable] = None) -> bool:
+        """
+        Queue a serialized payload without waiting for the socket
+
+        Args:
+            payload: Serialized message, shared between recipients
+            key: Coalescing key from coalesce_key(); a queued payload with the same key is replaced
+
+        Returns:
+            True if the payload was queued or merged, False if it was dropped
+        """
+        if self.closed:
+            return False
+
+        if key is not None and key in self._latest:
+            self._latest[key][1] = payload
+            self.coalesced += 1
+            return True
+
+        if len(self._pending) >= self.maxsize:
+            self.dropped += 1
+            if key is None:
+                self._fail("outbound queue full")
+            return False
+
+        entry = [key, payload]
+        self._pending.append(entry)
+        if key is not None:
+            self._latest[key] = entry
+        self.max_depth = max(self.max_depth, len(self._pending))
+        self._idle.clear()
+        self._wakeup.set()
+        return True
+
+    async def drain(self):
+        """Wait until every queued payload has been written"""
+        await self._idle.wait()
+
+    def close(self):
+        """Stop the writer and discard anything still queued"""
+        self.closed = True
+        self._pending.clear()
+        self._latest.clear()
+        self._idle.set()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    def metrics(self) -> dict:
+        """Queue depth and delivery counters for this connection"""
+        return {
+            "user_id": self.user_id,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped
+        }
+
+    def _fail(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        self._latest.clear()
+        self._idle.set()
+        logger.warning(f"Dropping WebSocket {self.connection_id} of user {self.user_id}: {reason}")
+        if self.on_failure is not None:
+            self.on_failure(self, reason)
+
+    async def _run(self):
+        while not self.closed:
+            if not self._pending:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            entry = self._pending.popleft()
+            key, payload = entry
+            if key is not None and self._latest.get(key) is entry:
+                del self._latest[key]
+            try:
+                await self.websocket.send_text(payload)
+                self.sent += 1
+            except Exception as e:
+                self._fail(f"send failed: {e}")
+        self._idle.set()
@@ -0,0 +1,103 @@
+"""
+Benchmark for job search: ilike('%term%') vs the search_vector GIN index.
+
+Builds an unlogged scratch table shaped like gig_jobs (title, description and
+the same generated search_vector column and GIN index), fills it with
+synthetic postings, then times the old ilike search and the full-text
+search, each with its count query, for a few terms.
+
+Needs a Postgres database the configured user can create tables in; the
+scratch table is dropped afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... PYTHONPATH=. python test/benchmark_job_search.py [rows]
+"""
+import os
+import sys
+import time
+from sqlalchemy import create_engine, text
+from app.utils.full_text_search import SEARCH_CONFIG, job_search_vector_sql, prefix_tsquery
+
+TABLE = "benchmark_job_search"
+DEFAULT_ROWS = 1_000_000
+REPEAT = 5
+
+WORDS = [
+    "python", "react", "backend", "frontend", "developer", "engineer", "designer", "mobile",
+    "flutter", "django", "fastapi", "postgres", "kubernetes", "devops", "data", "analyst",
+    "marketing", "content", "writer", "senior", "junior", "remote", "contract", "startup",
+    "ecommerce", "payments", "security", "cloud", "machine", "learning", "product", "manager"
+]
+
+TERMS = ["react developer", "kubernetes", "senior python backend", "payments security"]
+
+
+def create_table(connection, rows: int):
+    """Create and fill the scratch table with generate_series (one statement, server side)"""
+    words = "ARRAY[" + ", ".join(f"'{word}'" for word in WORDS) + "]"
+    connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    connection.execute(text(
+        f"CREATE UNLOGGED TABLE {TABLE} ("
+        f" id serial PRIMARY KEY, title varchar(255) NOT NULL, description text NOT NULL,"
+        f" created_at timestamptz NOT NULL DEFAULT now(),"
+        f" search_vector tsvector GENERATED ALWAYS AS ({job_search_vector_sql()}) STORED)"
+    ))
+    connection.execute(text(
+        f"INSERT INTO {TABLE} (title, description, created_at) "
+        f"SELECT "
+        f" initcap(({words})[1 + (g * 7) % {len(WORDS)}] || ' ' || ({words})[1 + (g * 13) % {len(WORDS)}]"
+        f"   || ' ' || ({words})[1 + (g * 31) % {len(WORDS)}]),"
+        f" repeat(({words})[1 + (g * 17) % {len(WORDS)}] || ' ' || ({words})[1 + (g * 23) % {len(WORDS)}]"
+        f"   || ' role with a growing team. ', 8),"
+        f" now() - (g % 10000) * interval '1 minute' "
+        f"FROM generate_series(1, :rows) AS g"
+    ), {"rows": rows})
+    connection.execute(text(f"CREATE INDEX ON {TABLE} USING gin (search_vector)"))
+    connection.execute(text(f"CREATE INDEX ON {TABLE} (created_at)"))
+    connection.execute(text(f"ANALYZE {TABLE}"))
+
+
+def timed(connection, sql: str, params: dict) -> float:
+    """Best wall time in milliseconds of a statement over REPEAT runs"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        connection.execute(text(sql), params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    engine = create_engine(os.environ["DATABASE_URL"])
+    with engine.connect() as connection:
+        print(f"Building {rows:,} synthetic jobs...")
+        create_table(connection, rows)
+        connection.commit()
+
+        ilike_page = (
+            f"SELECT id FROM {TABLE} WHERE title ILIKE :like OR description ILIKE :like "
+            f"ORDER BY created_at DESC LIMIT 20"
+        )
+        ilike_count = f"SELECT count(*) FROM {TABLE} WHERE title ILIKE :like OR description ILIKE :like"
+        fts_page = (
+            f"SELECT id FROM {TABLE} WHERE search_vector @@ to_tsquery('{SEARCH_CONFIG}', :query) "
+            f"ORDER BY ts_rank_cd(search_vector, to_tsquery('{SEARCH_CONFIG}', :query)) DESC, created_at DESC LIMIT 20"
+        )
+        fts_count = f"SELECT count(*) FROM {TABLE} WHERE search_vector @@ to_tsquery('{SEARCH_CONFIG}', :query)"
+
+        print(f"{'term':<26}{'ilike ms':>12}{'fts ms':>12}{'speedup':>10}")
+        try:
+            for term in TERMS:
+                like = {"like": f"%{term}%"}
+                query = {"query": prefix_tsquery(term)}
+                ilike_ms = timed(connection, ilike_page, like) + timed(connection, ilike_count, like)
+                fts_ms = timed(connection, fts_page, query) + timed(connection, fts_count, query)
+                print(f"{term:<26}{ilike_ms:>12.1f}{fts_ms:>12.1f}{ilike_ms / fts_ms:>9.1f}x")
+        finally:
+            connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            connection.commit()
+
+
+if __name__ == "__main__":
+    main()
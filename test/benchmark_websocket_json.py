@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for WebSocket frame parsing.
+
+Compares the previous comment-stripping parser with loads_lenient on typical
+typing and send_message frames.
+
+Usage:
+    PYTHONPATH=. python test/benchmark_websocket_json.py
+"""
+import base64
+import json
+import re
+import timeit
+from app.utils.lenient_json import loads_lenient, orjson
+
+
+def legacy_loads(data: str):
+    """Frame parser previously inlined in the chat WebSocket handler"""
+    data = re.sub(r'/\*.*?\*/', '', data, flags=re.DOTALL)
+
+    lines = data.split('\n')
+    cleaned_lines = []
+    in_string = False
+    escape_next = False
+
+    for line in lines:
+        cleaned_line = ""
+        i = 0
+        while i < len(line):
+            char = line[i]
+
+            if escape_next:
+                cleaned_line += char
+                escape_next = False
+                i += 1
+                continue
+
+            if char == '\\':
+                cleaned_line += char
+                escape_next = True
+                i += 1
+                continue
+
+            if char == '"' and not escape_next:
+                in_string = not in_string
+                cleaned_line += char
+                i += 1
+                continue
+
+            if not in_string and i < len(line) - 1 and line[i:i+2] == '//':
+                break
+
+            cleaned_line += char
+            i += 1
+
+        cleaned_lines.append(cleaned_line)
+
+    data = '\n'.join(cleaned_lines)
+    data = re.sub(r',(\s*[}\]])', r'\1', data)
+    data = re.sub(r'\s+([}\]])', r'\1', data)
+
+    return json.loads(data)
+
+
+FRAMES = {
+    "typing": json.dumps({"type": "typing", "data": {"room_id": 42, "is_typing": True}}),
+    "send_message text": json.dumps({
+        "type": "send_message",
+        "data": {
+            "room_id": 42,
+            "receiver_id": 7,
+            "message_type": "text",
+            "content": "Hey, are we still on for the interview tomorrow at 10? " * 4,
+            "local_temp_id": "tmp-1731412345-abc"
+        }
+    }),
+    "send_message 256KB base64": json.dumps({
+        "type": "send_message",
+        "data": {
+            "room_id": 42,
+            "receiver_id": 7,
+            "message_type": "image",
+            "files_data": [{
+                "file_name": "photo.jpg",
+                "mime_type": "image/jpeg",
+                "file_data": base64.b64encode(b"\xff\xd8" * 128 * 1024).decode()
+            }]
+        }
+    }),
+    "typing with comments": '{\n  "type": "typing", // indicator\n  "data": {"room_id": 42, "is_typing": true,},\n}',
+}
+
+
+def main():
+    print(f"orjson fast path: {'yes' if orjson is not None else 'no (json module)'}")
+    print(f"{'frame':<28}{'bytes':>10}{'legacy us':>14}{'lenient us':>14}{'speedup':>10}")
+    for name, frame in FRAMES.items():
+        assert legacy_loads(frame) == loads_lenient(frame)
+        number = 20 if len(frame) > 100_000 else 5000
+        legacy = min(timeit.repeat(lambda: legacy_loads(frame), number=number, repeat=3)) / number * 1e6
+        lenient = min(timeit.repeat(lambda: loads_lenient(frame), number=number, repeat=3)) / number * 1e6
+        print(f"{name:<28}{len(frame):>10}{legacy:>14.1f}{lenient:>14.1f}{legacy / lenient:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
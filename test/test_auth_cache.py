@@ -0,0 +1,73 @@
+import time
+
+from app.utils.auth_cache import AuthPrincipalCache, TokenClaimsCache
+
+
+class FakeUser:
+    def __init__(self, id, name="Test User", is_active=True):
+        self.id = id
+        self.name = name
+        self.email = f"user{id}@example.com"
+        self.phone = None
+        self.avatar_url = None
+        self.language_id = None
+        self.is_active = is_active
+        self.is_verified = True
+
+
+def test_token_claims_are_cached_until_exp():
+    """Test claims are served from the cache and dropped once the token expires"""
+    cache = TokenClaimsCache(maxsize=10, ttl_seconds=60)
+    cache.put("live", {"sub": "1", "exp": time.time() + 30})
+    cache.put("expired", {"sub": "2", "exp": time.time() - 1})
+
+    assert cache.get("live")["sub"] == "1"
+    assert cache.get("expired") is None
+    assert cache.get("unknown") is None
+
+
+def test_token_claims_cache_is_bounded():
+    """Test the least recently used token is evicted when the cache is full"""
+    cache = TokenClaimsCache(maxsize=2, ttl_seconds=60)
+    cache.put("a", {"sub": "1"})
+    cache.put("b", {"sub": "2"})
+    cache.get("a")
+    cache.put("c", {"sub": "3"})
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_principal_is_loaded_once_until_invalidated():
+    """Test the user row is loaded on the first request only and reloaded after invalidation"""
+    users = {1: FakeUser(1)}
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return users.get(user_id)
+
+    cache = AuthPrincipalCache(ttl_seconds=60)
+    assert cache.get_or_load(1, loader).name == "Test User"
+    assert cache.get_or_load(1, loader).id == 1
+    assert loads == [1]
+
+    users[1] = FakeUser(1, is_active=False)
+    cache.invalidate(1)
+    assert cache.get_or_load(1, loader).is_active is False
+    assert loads == [1, 1]
+
+
+def test_missing_users_are_not_cached():
+    """Test a deleted or unknown user is looked up again on the next request"""
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return None
+
+    cache = AuthPrincipalCache(ttl_seconds=60)
+    assert cache.get_or_load(7, loader) is None
+    assert cache.get_or_load(7, loader) is None
+    assert loads == [7, 7]
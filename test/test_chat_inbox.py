@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+from app.repositories.chat_repository import ChatRepository
+
+
+def test_inbox_limits_rooms_and_reads_one_last_message_per_room(monkeypatch):
+    """Test the page limit applies to rooms and the last message comes from a per-room LIMIT 1, not a window over all messages"""
+    statements = []
+
+    def compile_instead_of_running(query):
+        statements.append(str(query.statement.compile(dialect=postgresql.dialect())))
+        return [(SimpleNamespace(id=5), None, 2)] if len(statements) == 1 else []
+
+    monkeypatch.setattr(Query, "all", compile_instead_of_running)
+
+    summaries = ChatRepository(Session()).get_user_room_summaries(1, limit=20)
+
+    rooms_sql, last_messages_sql = statements
+    assert "LEFT OUTER JOIN users ON users.id = (SELECT" in rooms_sql
+    assert "JOIN LATERAL (SELECT" in last_messages_sql
+    assert "ORDER BY chat_messages.created_at DESC, chat_messages.id DESC" in last_messages_sql
+    assert "row_number" not in last_messages_sql
+    assert [summary["unread_count"] for summary in summaries] == [2]
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+from app.api import chat
+from app.repositories.chat_repository import ChatRepository
+
+
+@pytest.fixture
+def repository_calls(monkeypatch):
+    """Record which repository queries a message page runs, serving one message per page"""
+    calls = []
+    pages = {"messages": [SimpleNamespace(id=9)]}
+
+    def get_room_messages_page(self, room_id, **kwargs):
+        calls.append(("page", kwargs.get("user_id")))
+        return pages["messages"]
+
+    monkeypatch.setattr(ChatRepository, "get_room_messages_page", get_room_messages_page)
+    monkeypatch.setattr(ChatRepository, "get_room", lambda self, room_id, user_id: calls.append(("room", user_id)))
+    monkeypatch.setattr(ChatRepository, "count_room_messages", lambda self, room_id: calls.append(("count", room_id)) or 1)
+    monkeypatch.setattr(chat, "_build_message_responses", lambda chat_repo, messages, user_id: [])
+    return calls, pages
+
+
+def test_scrollback_pages_skip_the_count_and_the_room_lookup(repository_calls):
+    """Test cursor pages run only the membership-checked page query, page-number requests still get a total"""
+    calls, pages = repository_calls
+
+    response = chat._build_room_messages(Session(), 5, 1, 1, 50, before_id=100)
+    assert calls == [("page", 1)]
+    assert response.total is None
+
+    calls.clear()
+    response = chat._build_room_messages(Session(), 5, 1, 1, 50)
+    assert calls == [("page", 1), ("count", 5)]
+    assert response.total == 1
+
+    calls.clear()
+    pages["messages"] = []
+    with pytest.raises(HTTPException) as error:
+        chat._build_room_messages(Session(), 5, 1, 1, 50, before_id=100)
+    assert error.value.status_code == 404
+
+
+def test_page_query_checks_membership(monkeypatch):
+    """Test the keyset page query itself requires an active participant row for the user"""
+    statements = []
+    monkeypatch.setattr(Query, "all", lambda query: statements.append(str(query.statement.compile(dialect=postgresql.dialect()))) or [])
+
+    ChatRepository(Session()).get_room_messages_page(5, limit=51, before_id=100, user_id=1)
+
+    assert "EXISTS (SELECT 1 \nFROM chat_participants JOIN chat_rooms" in statements[0]
+    assert "chat_participants.user_id = %(user_id_1)s AND chat_participants.is_active = true" in statements[0]
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import time
+import pytest
+from fastapi import HTTPException
+from app.utils.chat_uploads import ChunkedUploadManager
+
+
+async def _body(*chunks, pause=0.0):
+    for chunk in chunks:
+        await asyncio.sleep(pause)
+        yield chunk
+
+
+def test_duplicate_chunk_at_the_same_offset_is_appended_once(tmp_path):
+    """Test a chunk sent twice concurrently is written once and the second request is rejected"""
+    manager = ChunkedUploadManager(str(tmp_path))
+
+    async def scenario():
+        upload = await manager.create_upload(1, "note.ogg", 6, "audio/ogg", "voice")
+        results = await asyncio.gather(
+            manager.append_chunks(upload["upload_id"], 1, 0, _body(b"abc", pause=0.05)),
+            manager.append_chunks(upload["upload_id"], 1, 0, _body(b"abc", pause=0.05)),
+            return_exceptions=True
+        )
+        status = await manager.get_upload(upload["upload_id"], 1)
+        return results, status
+
+    results, status = asyncio.run(scenario())
+
+    errors = [result for result in results if isinstance(result, HTTPException)]
+    assert len(errors) == 1 and errors[0].status_code == 409
+    assert status["received"] == 3
+
+
+def test_stale_uploads_are_swept(tmp_path):
+    """Test uploads untouched for the TTL are removed and cannot be claimed, while fresh ones stay"""
+    manager = ChunkedUploadManager(str(tmp_path), ttl=60)
+
+    async def scenario():
+        stale = await manager.create_upload(1, "old.ogg", 3, "audio/ogg", "voice")
+        await manager.append_chunks(stale["upload_id"], 1, 0, _body(b"abc"))
+        fresh = await manager.create_upload(1, "new.ogg", 3, "audio/ogg", "voice")
+        return stale["upload_id"], fresh["upload_id"]
+
+    stale_id, fresh_id = asyncio.run(scenario())
+    long_ago = time.time() - 120
+    for suffix in (".json", ".part"):
+        os.utime(tmp_path / f"{stale_id}{suffix}", (long_ago, long_ago))
+
+    assert manager.sweep_stale_uploads() == 1
+    assert sorted(os.listdir(tmp_path)) == [f"{fresh_id}.json", f"{fresh_id}.part"]
+    with pytest.raises(ValueError, match="not found"):
+        manager.claim_upload(stale_id, 1, "voice")
@@ -0,0 +1,65 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from app.api import chat
+from app.utils import auth, presence, websocket_manager
+from app.utils.presence import PresenceRegistry
+from app.utils.websocket_backplane import InMemoryBackplane
+from app.utils.websocket_manager import ConnectionManager
+
+
+class FailingWebSocket:
+    """Socket that delivers the given frames, then fails the way a broken connection does"""
+
+    def __init__(self, frames, error):
+        self.query_params = {"token": "token"}
+        self.url = SimpleNamespace(query="token=token")
+        self.frames = list(frames)
+        self.error = error
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+    async def receive_text(self):
+        if self.frames:
+            return self.frames.pop(0)
+        await asyncio.sleep(0.01)
+        raise self.error
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+@pytest.fixture
+def chat_manager(monkeypatch):
+    """Run the chat handler against a fresh manager and a fake authenticated user"""
+    manager = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+    monkeypatch.setattr(chat, "manager", manager)
+    monkeypatch.setattr(chat, "notification_relay", SimpleNamespace(start=lambda: None, wake=lambda: None))
+    monkeypatch.setattr(chat, "_load_websocket_user", lambda user_id: SimpleNamespace(id=user_id, name="Alice", is_active=True))
+    monkeypatch.setattr(auth, "verify_token", lambda token: {"sub": 1, "type": "access"})
+    monkeypatch.setattr(websocket_manager, "_get_user_memberships", lambda user_id: {})
+    monkeypatch.setattr(presence, "_flush_presence", lambda rows: None)
+    return manager
+
+
+@pytest.mark.parametrize("error", [RuntimeError("socket closed"), ValueError("bad frame")])
+def test_connection_is_released_when_the_loop_fails(chat_manager, error):
+    """Test errors other than WebSocketDisconnect still disconnect the device and mark the user offline"""
+    websocket = FailingWebSocket(['{"type": "ping"}'], error)
+
+    async def scenario():
+        await chat._websocket_endpoint_handler(websocket)
+        await chat_manager.drain()
+
+    asyncio.run(scenario())
+
+    assert {"type": "pong"} in websocket.sent
+    assert not chat_manager.is_user_connected(1)
+    assert chat_manager.outbound == {}
+    assert not chat_manager.presence.is_online(1)
@@ -0,0 +1,60 @@
+from app.utils.device_tokens import DeviceTokenCache
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def query(self, *columns):
+        self.queries += 1
+        return FakeQuery(self.rows)
+
+
+def test_tokens_are_served_from_cache_until_invalidated():
+    """Test repeated lookups hit the cache and invalidation forces a reload"""
+    db = FakeSession([(1, "phone"), (1, "tablet")])
+    cache = DeviceTokenCache(ttl_seconds=60)
+
+    assert cache.get_tokens(db, 1) == ["phone", "tablet"]
+    assert cache.get_tokens(db, 1) == ["phone", "tablet"]
+    assert db.queries == 1
+
+    db.rows = [(1, "phone")]
+    cache.invalidate(1)
+    assert cache.get_tokens(db, 1) == ["phone"]
+    assert db.queries == 2
+
+
+def test_bulk_lookup_loads_misses_in_one_query():
+    """Test get_tokens_for_users loads every uncached user with a single query"""
+    db = FakeSession([(1, "a"), (2, "b"), (2, "c")])
+    cache = DeviceTokenCache(ttl_seconds=60)
+    cache.get_tokens(db, 1)
+
+    tokens = cache.get_tokens_for_users(db, [1, 2, 3])
+
+    assert tokens == {1: ["a"], 2: ["b", "c"], 3: []}
+    assert db.queries == 2
+
+
+def test_expired_entries_are_reloaded():
+    """Test entries older than the TTL are loaded again"""
+    db = FakeSession([(1, "phone")])
+    cache = DeviceTokenCache(ttl_seconds=0)
+
+    cache.get_tokens(db, 1)
+    cache.get_tokens(db, 1)
+
+    assert db.queries == 2
@@ -0,0 +1,46 @@
+from sqlalchemy import column
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.models.full_time_job import FullTimeJob
+from app.models.gig_job import GigJob
+from app.utils.full_text_search import prefix_tsquery, job_search_vector_sql, search_matches
+
+
+def test_prefix_tsquery_matches_every_word_as_prefix():
+    """Test search terms become AND-ed prefix lexemes"""
+    assert prefix_tsquery("React Dev") == "react:* & dev:*"
+    assert prefix_tsquery("senior python", weights="A") == "senior:*A & python:*A"
+
+
+def test_prefix_tsquery_drops_tsquery_syntax():
+    """Test operators and punctuation in user input cannot break to_tsquery"""
+    assert prefix_tsquery("c++ & (node.js) | !go") == "c:* & node:* & js:* & go:*"
+    assert prefix_tsquery("_ & | !") is None
+    assert prefix_tsquery("") is None
+
+
+def test_search_vector_weights_title_above_description():
+    """Test the generated column expression weights title A and description B"""
+    sql = job_search_vector_sql()
+    assert "coalesce(title, '')), 'A')" in sql
+    assert "coalesce(description, '')), 'B')" in sql
+
+
+def test_mid_word_prefix_is_not_stemmed():
+    """Test a half-typed word stays a literal prefix and both sides use the unstemmed config"""
+    assert prefix_tsquery("managi") == "managi:*"
+    assert "to_tsvector('simple'," in job_search_vector_sql()
+    assert "to_tsvector('english'," not in job_search_vector_sql()
+
+    condition = search_matches(column("search_vector"), prefix_tsquery("managi"))
+    compiled = condition.compile(dialect=postgresql.dialect())
+    assert sorted(compiled.params.values()) == ["managi:*", "simple"]
+
+
+def test_listing_queries_do_not_load_the_search_vector():
+    """Test job queries skip the deferred tsvector column while search can still filter on it"""
+    for model in (GigJob, FullTimeJob):
+        listing = Session().query(model)
+        assert "search_vector" not in str(listing.statement.compile(dialect=postgresql.dialect()))
+        search = listing.filter(search_matches(model.search_vector, "dev:*"))
+        assert ".search_vector @@ to_tsquery(" in str(search.statement.compile(dialect=postgresql.dialect()))
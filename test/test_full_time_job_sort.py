@@ -0,0 +1,22 @@
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.models.full_time_job import FullTimeJob
+from app.repositories.full_time_job_repository import FullTimeJobRepository
+
+
+def _order_by(sort_by, title):
+    repository = FullTimeJobRepository(Session())
+    query = repository._apply_sort(repository.db.query(FullTimeJob), sort_by, title, None)
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    return sql.split("ORDER BY", 1)[1].strip() if "ORDER BY" in sql else ""
+
+
+def test_every_listing_order_ends_with_a_unique_tiebreaker():
+    """Test OFFSET pages are deterministic whatever sort and title filter is requested"""
+    tiebreaker = "full_time_jobs.created_at DESC, full_time_jobs.id DESC"
+    for sort_by in (None, "most_recent", "most_relevant"):
+        for title in (None, "python dev"):
+            assert _order_by(sort_by, title).endswith(tiebreaker)
+
+    assert _order_by(None, None) == tiebreaker
+    assert _order_by(None, "python dev").startswith("ts_rank_cd(")
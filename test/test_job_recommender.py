@@ -0,0 +1,43 @@
+import math
+from app.utils.job_recommender import rank_jobs, score_users
+
+
+def test_rank_jobs_orders_by_cosine_similarity():
+    """Test jobs are ranked by shared skills / sqrt(user skills * job skills)"""
+    users = [[1, 2, 3], [9], []]
+    jobs = [[1], [1, 2], [4, 5], [1, 2, 3, 4], []]
+
+    ranked = rank_jobs(users, jobs, top_n=10)
+
+    assert [index for index, _ in ranked[0]] == [3, 1, 0]
+    assert ranked[0][0][1] == round(3 / math.sqrt(3 * 4), 4)
+    assert ranked[0][1][1] == round(2 / math.sqrt(3 * 2), 4)
+    assert ranked[1] == []
+    assert ranked[2] == []
+
+
+def test_rank_jobs_keeps_top_n_across_batches():
+    """Test batching does not change the result and ties go to later jobs"""
+    users = [[1, 2], [2, 3], [1], [3]] * 5
+    jobs = [[1], [2], [3], [1, 2], [2, 3]]
+
+    unbatched = rank_jobs(users, jobs, top_n=2, batch_size=100)
+    batched = rank_jobs(users, jobs, top_n=2, batch_size=3)
+
+    assert batched == unbatched
+    assert all(len(matches) <= 2 for matches in batched)
+    assert [index for index, _ in batched[2]] == [0, 3]
+    assert [index for index, _ in batched[1]] == [4, 2]
+
+
+def test_score_users_matches_rank_jobs():
+    """Test the incremental per-job score uses the same formula as the bulk ranking"""
+    users = [[1, 2, 3], [4], [], [2, 2, 5]]
+    job = [2, 3]
+
+    scores = score_users(users, job)
+    bulk = rank_jobs(users, [job], top_n=1)
+
+    for user_index, score in enumerate(scores):
+        expected = bulk[user_index][0][1] if bulk[user_index] else 0.0
+        assert score == expected
@@ -0,0 +1,26 @@
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+from app.repositories.job_viewer_context import JobViewerContext
+
+
+def test_saved_and_proposal_flags_are_loaded_for_the_page_only(monkeypatch):
+    """Test the viewer's saved jobs and proposals are read with the page's job ids, not in full"""
+    statements = []
+
+    def compile_instead_of_running(query):
+        statements.append(str(query.statement.compile(dialect=postgresql.dialect())))
+        return []
+
+    monkeypatch.setattr(Query, "all", compile_instead_of_running)
+    db = Session()
+
+    viewer = JobViewerContext.load(db, 1)
+    assert len(statements) == 1 and "user_skills" in statements[0]
+
+    viewer.load_job_flags(db, gig_job_ids=[3, 4])
+    saved_sql, proposals_sql = statements[1:]
+    assert "FROM saved_jobs" in saved_sql and "saved_jobs.gig_job_id IN" in saved_sql
+    assert "FROM proposals" in proposals_sql and "proposals.gig_job_id IN" in proposals_sql
+
+    viewer.load_job_flags(db)
+    assert len(statements) == 3
@@ -0,0 +1,28 @@
+import json
+import pytest
+from app.utils.lenient_json import loads_lenient, repair_json
+
+
+def test_strict_frame():
+    """Test well-formed frames parse unchanged"""
+    frame = '{"type": "typing", "data": {"room_id": 1, "is_typing": true}}'
+    assert loads_lenient(frame) == json.loads(frame)
+
+
+def test_comments_and_trailing_commas():
+    """Test comments and trailing commas are repaired"""
+    frame = '{\n  "type": "send_message", // frame type\n  /* payload */ "data": {"ids": [1, 2,],},\n}'
+    assert loads_lenient(frame) == {"type": "send_message", "data": {"ids": [1, 2]}}
+
+
+def test_string_contents_are_preserved():
+    """Test comment markers and commas inside strings are left alone"""
+    frame = '{"content": "see http://example.com /* not a comment */ a,}", // trailing\n}'
+    assert loads_lenient(frame) == {"content": "see http://example.com /* not a comment */ a,}"}
+    assert repair_json('"a\\"//b"') == '"a\\"//b"'
+
+
+def test_invalid_frame_raises_decode_error():
+    """Test frames that cannot be repaired raise JSONDecodeError"""
+    with pytest.raises(json.JSONDecodeError):
+        loads_lenient('{"type": ')
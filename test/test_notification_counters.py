@@ -0,0 +1,29 @@
+from sqlalchemy.dialects import postgresql
+from app.repositories.notification_repository import NotificationRepository
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return type("Result", (), {"rowcount": 3})()
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_reconcile_rebuilds_counters_in_one_locked_transaction():
+    """Test the rebuild is a locked set-based upsert plus a zeroing update, committed once"""
+    db = RecordingSession()
+
+    assert NotificationRepository(db).reconcile_unread_counters() == 3
+
+    lock, upsert, zero = db.statements
+    assert lock.startswith("LOCK TABLE notification_unread_counters IN SHARE ROW EXCLUSIVE MODE")
+    assert upsert.startswith("INSERT INTO notification_unread_counters (user_id, type, count) SELECT")
+    assert "GROUP BY" in upsert and "ON CONFLICT (user_id, type) DO UPDATE SET count = excluded.count" in upsert
+    assert zero.startswith("UPDATE notification_unread_counters SET count=") and "NOT (EXISTS (SELECT" in zero
+    assert db.commits == 1
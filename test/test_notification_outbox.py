@@ -0,0 +1,42 @@
+import asyncio
+
+from app.utils.notification_outbox import NotificationOutboxRelay
+
+
+class FakeOutbox:
+    def __init__(self, pending):
+        self.pending = pending
+        self.claims = []
+
+    def relay_batch(self, limit):
+        claimed = min(limit, self.pending)
+        self.pending -= claimed
+        self.claims.append(claimed)
+        return claimed
+
+
+def test_relay_drains_outbox_in_batches():
+    """Test relay_pending keeps claiming batches until a short one empties the outbox"""
+    outbox = FakeOutbox(pending=250)
+    relay = NotificationOutboxRelay(relay_batch=outbox.relay_batch, batch_size=100)
+
+    assert asyncio.run(relay.relay_pending()) == 250
+    assert outbox.claims == [100, 100, 50]
+
+
+def test_wake_relays_without_waiting_for_poll():
+    """Test wake() sends pending entries right away rather than at the next poll"""
+    outbox = FakeOutbox(pending=3)
+    relay = NotificationOutboxRelay(relay_batch=outbox.relay_batch, batch_size=10, poll_interval=60)
+
+    async def scenario():
+        relay.wake()
+        for _ in range(100):
+            if outbox.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        await relay.stop()
+
+    asyncio.run(scenario())
+
+    assert outbox.pending == 0
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, ForeignKey, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base, joinedload, relationship
+from app.pagination import PaginationParams, TotalMode, create_pagination_response
+from app.repositories.paged_query import fetch_page, fetch_pagination
+
+Base = declarative_base()
+
+
+class Author(Base):
+    __tablename__ = "paged_query_authors"
+    id = Column(Integer, primary_key=True)
+    books = relationship("Book")
+
+
+class Book(Base):
+    __tablename__ = "paged_query_books"
+    id = Column(Integer, primary_key=True)
+    author_id = Column(Integer, ForeignKey("paged_query_authors.id"))
+
+
+def _authors_query():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all([Author(id=author_id, books=[Book(), Book(), Book()]) for author_id in range(1, 8)])
+    session.commit()
+    return session.query(Author).options(joinedload(Author.books)).order_by(Author.id)
+
+
+def test_exact_total_comes_from_the_page_query():
+    """Test the window total counts authors, not author x book rows, alongside a joined eager collection"""
+    page = fetch_page(_authors_query(), offset=2, limit=3)
+    assert [author.id for author in page.items] == [3, 4, 5]
+    assert all(len(author.books) == 3 for author in page.items)
+    assert page.total == 7
+    assert page.has_more is True
+    assert page.total_is_estimate is False
+
+
+def test_exact_total_past_the_last_page():
+    """Test an empty page still reports the total"""
+    query = _authors_query()
+    last_page = fetch_page(query, offset=6, limit=3)
+    assert [author.id for author in last_page.items] == [7]
+    assert (last_page.total, last_page.has_more) == (7, False)
+    past_end = fetch_page(query, offset=9, limit=3)
+    assert (past_end.items, past_end.total, past_end.has_more) == ([], 7, False)
+
+
+def test_none_mode_reports_has_more_without_total():
+    """Test TotalMode.NONE reads one extra row instead of counting"""
+    query = _authors_query()
+    page = fetch_page(query, offset=3, limit=3, total_mode=TotalMode.NONE)
+    assert [author.id for author in page.items] == [4, 5, 6]
+    assert page.total is None
+    assert page.has_more is True
+    assert fetch_page(query, offset=4, limit=3, total_mode=TotalMode.NONE).has_more is False
+
+
+def test_without_pagination_every_row_is_returned():
+    """Test fetch_pagination with no PaginationParams returns the whole result"""
+    page = fetch_pagination(_authors_query(), None)
+    assert len(page.items) == 7
+    assert page.total == 7
+
+
+def test_has_next_follows_has_more_without_a_total():
+    """Test PaginatedResponse.has_next works when TotalMode.NONE leaves pages unset"""
+    pagination = PaginationParams(page=2, size=3, total_mode=TotalMode.NONE)
+    assert create_pagination_response([4, 5, 6], None, pagination, has_more=True).has_next is True
+    assert create_pagination_response([7], None, pagination, has_more=False).has_next is False
+    assert create_pagination_response([7], 7, pagination).has_next is True
@@ -0,0 +1,60 @@
+from app.utils.profile_cache import ProfileCache
+
+
+def _profile(user_id, name="Test User"):
+    return {
+        "id": user_id,
+        "name": name,
+        "email": f"user{user_id}@example.com",
+        "is_active": True,
+        "is_verified": True,
+        "is_social_user": False,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "educations": [{
+            "id": 1,
+            "user_id": user_id,
+            "degree": "BSc",
+            "education_facility_id": 3,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "education_facility": None
+        }]
+    }
+
+
+def test_profile_is_loaded_once_until_invalidated():
+    """Test cached profiles are reused and a write bumps the version"""
+    names = {1: "Before"}
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return _profile(user_id, names[user_id])
+
+    cache = ProfileCache(ttl_seconds=60)
+    assert cache.get_or_load(1, loader).name == "Before"
+    assert cache.get_or_load(1, loader).educations[0].degree == "BSc"
+    assert loads == [1]
+
+    names[1] = "After"
+    cache.invalidate(1)
+    assert cache.version(1) == 1
+    assert cache.get_or_load(1, loader).name == "After"
+    assert loads == [1, 1]
+
+
+def test_write_during_load_is_not_overwritten():
+    """Test a profile loaded before a write is not stored over the invalidation"""
+    cache = ProfileCache(ttl_seconds=60)
+
+    def stale_loader(user_id):
+        cache.invalidate(user_id)
+        return _profile(user_id, "Stale")
+
+    assert cache.get_or_load(1, stale_loader).name == "Stale"
+    assert cache.get_or_load(1, lambda user_id: _profile(user_id, "Fresh")).name == "Fresh"
+
+
+def test_missing_user_returns_none():
+    """Test deleted or unknown users are not cached"""
+    cache = ProfileCache(ttl_seconds=60)
+    assert cache.get_or_load(5, lambda user_id: None) is None
@@ -0,0 +1,64 @@
+from app.utils.push_dispatcher import FakePushTransport, PushDelivery, PushDispatcher
+
+
+def _dispatcher(transport, pruned):
+    return PushDispatcher(
+        transport=transport,
+        workers=2,
+        max_retries=2,
+        backoff_seconds=0.01,
+        prune_tokens=pruned.extend
+    )
+
+
+def test_tokens_are_sent_in_multicast_chunks():
+    """Test 1200 tokens are sent as three multicasts of at most 500"""
+    transport = FakePushTransport()
+    dispatcher = _dispatcher(transport, [])
+    tokens = [f"token-{i}" for i in range(1200)]
+
+    assert dispatcher.enqueue(tokens + tokens[:10], "Title", "Body", data={"room_id": 5}) == 3
+    assert dispatcher.wait_idle(timeout=5)
+    dispatcher.stop()
+
+    assert sorted(len(multicast["tokens"]) for multicast in transport.multicasts) == [200, 500, 500]
+    assert transport.multicasts[0]["data"] == {"room_id": "5"}
+    assert dispatcher.stats["sent"] == 1200
+
+
+def test_invalid_tokens_are_pruned_and_transient_failures_retried():
+    """Test unregistered tokens are pruned and retryable failures are resent with backoff"""
+    transport = FakePushTransport(invalid_tokens={"gone"}, transient_failures={"flaky": 1, "down": 5})
+    pruned = []
+    dispatcher = _dispatcher(transport, pruned)
+
+    dispatcher.enqueue(["ok", "gone", "flaky", "down"], "Title", "Body")
+    assert dispatcher.wait_idle(timeout=5)
+    dispatcher.stop()
+
+    assert pruned == ["gone"]
+    assert [sorted(multicast["tokens"]) for multicast in transport.multicasts] == [
+        ["down", "flaky", "gone", "ok"],
+        ["down", "flaky"],
+        ["down"]
+    ]
+    assert dispatcher.stats["sent"] == 2
+    assert dispatcher.stats["failed"] == 1
+
+
+def test_delivery_resolves_after_retries_with_the_final_outcome():
+    """Test a PushDelivery completes only once its retries finish and reports what was delivered"""
+    transport = FakePushTransport(invalid_tokens={"gone"}, transient_failures={"flaky": 1, "down": 5})
+    dispatcher = _dispatcher(transport, [])
+
+    delivered, undelivered, no_devices = PushDelivery(), PushDelivery(), PushDelivery()
+    dispatcher.enqueue(["ok", "gone", "flaky"], "Title", "Body", delivery=delivered)
+    dispatcher.enqueue(["down"], "Title", "Body", delivery=undelivered)
+    dispatcher.enqueue([], "Title", "Body", delivery=no_devices)
+
+    assert delivered.wait(timeout=5) and undelivered.wait(timeout=5) and no_devices.wait(timeout=0)
+    dispatcher.stop()
+
+    assert (delivered.sent, delivered.failed) == (2, 0)
+    assert (undelivered.sent, undelivered.failed) == (0, 1)
+    assert len([m for m in transport.multicasts if m["tokens"] == ["down"]]) == 3
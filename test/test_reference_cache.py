@@ -0,0 +1,58 @@
+from app.utils.reference_cache import ReferenceDataCache
+
+
+def test_store_and_lookup_share_one_etag():
+    """Test a stored body is returned with a stable quoted ETag"""
+    cache = ReferenceDataCache()
+    entry, generation = cache.lookup(("skills",))
+    assert entry is None
+
+    stored = cache.store(("skills",), b'{"status":"success"}', generation)
+    cached, _ = cache.lookup(("skills",))
+    assert cached is stored
+    assert cached.etag.startswith('"') and cached.etag.endswith('"')
+    assert cache.store(("skills",), b'{"status":"success"}', generation).etag == stored.etag
+
+
+def test_invalidate_drops_only_the_given_namespace():
+    """Test invalidating one namespace keeps the others cached"""
+    cache = ReferenceDataCache()
+    cache.store(("skills",), b"[1]", 0)
+    cache.store(("categories", "/categories/", ()), b"[2]", 0)
+    cache.store(("categories", "/categories/main", ()), b"[3]", 0)
+
+    cache.invalidate("categories")
+    assert cache.lookup(("categories", "/categories/", ()))[0] is None
+    assert cache.lookup(("categories", "/categories/main", ()))[0] is None
+    assert cache.lookup(("skills",))[0].body == b"[1]"
+
+    cache.invalidate()
+    assert cache.lookup(("skills",))[0] is None
+
+
+def test_body_built_before_an_invalidation_is_not_cached():
+    """Test a build racing with an admin write does not store the stale body"""
+    cache = ReferenceDataCache()
+    _, generation = cache.lookup(("roles",))
+    cache.invalidate("roles")
+
+    entry = cache.store(("roles",), b"stale", generation)
+    assert entry.body == b"stale"
+    assert cache.lookup(("roles",))[0] is None
+
+
+def test_entries_expire_and_the_least_recently_used_are_evicted():
+    """Test a TTL bounds staleness and the cache never grows past max_entries"""
+    cache = ReferenceDataCache(ttl=0)
+    cache.store(("skills",), b"[1]", 0)
+    assert cache.lookup(("skills",))[0] is None
+
+    cache = ReferenceDataCache(max_entries=2)
+    cache.store(("categories", "all", 0), b"[1]", 0)
+    cache.store(("categories", "all", 100), b"[2]", 0)
+    cache.lookup(("categories", "all", 0))
+    cache.store(("categories", "all", 200), b"[3]", 0)
+
+    assert cache.lookup(("categories", "all", 100))[0] is None
+    assert cache.lookup(("categories", "all", 0))[0].body == b"[1]"
+    assert cache.lookup(("categories", "all", 200))[0].body == b"[3]"
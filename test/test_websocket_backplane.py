@@ -0,0 +1,509 @@
+import asyncio
+from datetime import timedelta
+import json
+import pytest
+from app.utils import presence, websocket_manager
+from app.utils.presence import PresenceRegistry
+from app.utils.reference_cache import ReferenceDataCache
+from app.utils.websocket_backplane import InMemoryBackplane, RedisBackplane
+from app.utils.websocket_manager import ConnectionManager
+
+
+@pytest.fixture(autouse=True)
+def room_memberships(monkeypatch):
+    """Serve room 5 with users 1 and 2 without touching the database"""
+    db_calls = []
+
+    def get_user_memberships(user_id):
+        db_calls.append(("memberships", user_id))
+        return {5: [1, 2]}
+
+    def get_room_participants(room_id):
+        db_calls.append(("participants", room_id))
+        return [1, 2]
+
+    monkeypatch.setattr(websocket_manager, "_get_user_memberships", get_user_memberships)
+    monkeypatch.setattr(websocket_manager, "_get_room_participants", get_room_participants)
+    return db_calls
+
+
+@pytest.fixture(autouse=True)
+def presence_flushes(monkeypatch):
+    """Capture write-behind presence batches instead of upserting them"""
+    batches = []
+    monkeypatch.setattr(presence, "_flush_presence", lambda rows: batches.append(rows))
+    return batches
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class LocalRedisStandIn:
+    """Minimal Redis pub/sub stand-in shared by several backplanes"""
+
+    def __init__(self):
+        self.queues = []
+
+    def pubsub(self):
+        stand_in = self
+
+        class PubSub:
+            def __init__(self):
+                self.queue = asyncio.Queue()
+
+            async def subscribe(self, channel):
+                stand_in.queues.append(self.queue)
+
+            async def listen(self):
+                while True:
+                    yield await self.queue.get()
+
+        return PubSub()
+
+    async def publish(self, channel, data):
+        for queue in self.queues:
+            queue.put_nowait({"type": "message", "data": data})
+
+
+def _two_nodes(backplane_a, backplane_b):
+    async def scenario():
+        node_a = ConnectionManager(backplane_a)
+        node_b = ConnectionManager(backplane_b)
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await node_a.connect(alice, 1)
+        await node_b.connect(bob, 2)
+
+        node_b.register_call("call-1", [1, 2])
+
+        await node_a.broadcast_new_message({"id": 10, "content": "hi"}, room_id=5, sender_id=1, receiver_id=2)
+        await node_b.broadcast_video_call_end("call-1", 2, "Bob")
+        await asyncio.sleep(0.05)
+        await node_a.drain()
+        await node_b.drain()
+        return alice, bob
+
+    return asyncio.run(scenario())
+
+
+def test_in_memory_backplane_delivers_across_nodes():
+    """Test a message sent on one node reaches a socket owned by another"""
+    backplane = InMemoryBackplane()
+    alice, bob = _two_nodes(backplane, backplane)
+
+    assert [m["type"] for m in alice.sent] == ["new_message", "video_call_end"]
+    assert alice.sent[0]["data"]["is_sender"] is True
+    assert [m["type"] for m in bob.sent] == ["new_message", "video_call_end"]
+    assert bob.sent[0]["data"]["is_sender"] is False
+
+
+def test_redis_backplane_delivers_each_message_once():
+    """Test the Redis backend fans out without echoing back to the publishing node"""
+    redis = LocalRedisStandIn()
+    alice, bob = _two_nodes(
+        RedisBackplane("redis://local", "chat:events", client=redis),
+        RedisBackplane("redis://local", "chat:events", client=redis)
+    )
+
+    assert len(alice.sent) == 2
+    assert len(bob.sent) == 2
+
+
+def test_typing_and_presence_use_cached_membership(room_memberships):
+    """Test steady-state typing and presence fan-out does not query the database"""
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane())
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(alice, 1)
+        await manager.connect(bob, 2)
+        calls_after_connect = len(room_memberships)
+
+        for _ in range(5):
+            await manager.broadcast_typing(5, 1, True, "Alice")
+        await manager.broadcast_presence(1, True, "Alice")
+        await manager.drain()
+        return bob, calls_after_connect
+
+    bob, calls_after_connect = asyncio.run(scenario())
+
+    assert len(room_memberships) == calls_after_connect
+    assert [m["type"] for m in bob.sent] == ["typing", "presence"]
+
+
+def test_invalidate_room_reloads_participants(room_memberships):
+    """Test room invalidation drops the cached participants on every node"""
+    async def scenario():
+        backplane = InMemoryBackplane()
+        node_a = ConnectionManager(backplane)
+        node_b = ConnectionManager(backplane)
+        await node_a.connect(FakeWebSocket(), 1)
+        await node_b.connect(FakeWebSocket(), 2)
+
+        await node_a.invalidate_room(5, [1, 2])
+        return node_a, node_b
+
+    node_a, node_b = asyncio.run(scenario())
+
+    assert 5 not in node_a.room_members
+    assert 5 not in node_b.room_members
+    assert 1 not in node_a.user_memberships
+    assert 2 not in node_b.user_memberships
+
+
+def test_presence_is_shared_through_the_backplane():
+    """Test a user connected to one node is online on the other without a database lookup"""
+    async def scenario():
+        backplane = InMemoryBackplane()
+        node_a = ConnectionManager(backplane, PresenceRegistry())
+        node_b = ConnectionManager(backplane, PresenceRegistry())
+        await node_a.connect(FakeWebSocket(), 1)
+        await node_b.connect(FakeWebSocket(), 2)
+
+        await node_a.broadcast_presence(1, True, "Alice")
+        online_before = node_b.presence.is_online(1)
+        node_a.disconnect(1)
+        await node_a.broadcast_presence(1, False, "Alice")
+        return online_before, node_b.presence.is_online(1)
+
+    online_before, online_after = asyncio.run(scenario())
+
+    assert online_before is True
+    assert online_after is False
+
+
+def test_started_node_without_sockets_tracks_remote_presence():
+    """Test a worker started at app startup receives presence_alive before it accepts any WebSocket"""
+    async def scenario():
+        backplane = InMemoryBackplane()
+        rest_only = ConnectionManager(backplane, PresenceRegistry())
+        await rest_only.start()
+        chat_node = ConnectionManager(backplane, PresenceRegistry())
+        await chat_node.connect(FakeWebSocket(), 1)
+
+        await chat_node._announce_presence()
+        online = rest_only.presence.is_online(1)
+        await rest_only.stop()
+        await chat_node.stop()
+        return online, rest_only
+
+    online, rest_only = asyncio.run(scenario())
+
+    assert online is True
+    assert rest_only._presence_task is None
+
+
+def test_presence_changes_are_flushed_in_one_batch(presence_flushes):
+    """Test queued presence changes are written as a single batch with the latest state per user"""
+    registry = PresenceRegistry()
+    registry.touch(1)
+    registry.touch(2)
+    registry.touch(1)
+    registry.mark_offline(2)
+    registry.touch(3, persist=False)
+
+    asyncio.run(registry.flush())
+
+    assert len(presence_flushes) == 1
+    rows = {row["user_id"]: row["is_online"] for row in presence_flushes[0]}
+    assert rows == {1: True, 2: False}
+    assert registry.online_user_ids() == [1, 3]
+
+
+def test_call_events_reach_only_call_participants(monkeypatch):
+    """Test answer/end go to the call's participants, loading them on nodes that did not start the call"""
+    monkeypatch.setattr(websocket_manager, "_get_call_participants", lambda call_id: [1, 2])
+
+    async def scenario():
+        backplane = InMemoryBackplane()
+        node_a = ConnectionManager(backplane, PresenceRegistry())
+        node_b = ConnectionManager(backplane, PresenceRegistry())
+        alice, bob, carol = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await node_a.connect(alice, 1)
+        await node_b.connect(bob, 2)
+        await node_b.connect(carol, 3)
+        node_a.register_call("call-1", [1, 2])
+
+        await node_b.broadcast_video_call_answer("call-1", 2, "Bob")
+        await node_a.broadcast_video_call_end("call-1", 1, "Alice")
+        await node_a.drain()
+        await node_b.drain()
+        return node_a, node_b, alice, bob, carol
+
+    node_a, node_b, alice, bob, carol = asyncio.run(scenario())
+
+    assert [m["type"] for m in alice.sent] == ["video_call_answer", "video_call_end"]
+    assert [m["type"] for m in bob.sent] == ["video_call_answer", "video_call_end"]
+    assert carol.sent == []
+    assert "call-1" not in node_a.call_participants
+    assert "call-1" not in node_b.call_participants
+
+
+def test_rejected_and_abandoned_calls_leave_the_registry(monkeypatch):
+    """Test a reject drops the call on every node and stale unanswered calls expire"""
+    monkeypatch.setattr(websocket_manager, "_get_call_participants", lambda call_id: [1, 2])
+
+    async def scenario():
+        backplane = InMemoryBackplane()
+        node_a = ConnectionManager(backplane, PresenceRegistry())
+        node_b = ConnectionManager(backplane, PresenceRegistry())
+        await node_a.connect(FakeWebSocket(), 1)
+        await node_b.connect(FakeWebSocket(), 2)
+        node_a.register_call("call-1", [1, 2])
+        await node_a.get_call_participants("call-1")
+        await node_b.get_call_participants("call-1")
+
+        await node_b.broadcast_video_call_reject("call-1", 2, "Bob")
+        return node_a, node_b
+
+    node_a, node_b = asyncio.run(scenario())
+
+    assert "call-1" not in node_a.call_participants
+    assert "call-1" not in node_b.call_participants
+
+    node_a.register_call("abandoned", [1, 2])
+    node_a.call_registered_at["abandoned"] -= websocket_manager.VIDEO_CALL_REGISTRY_TTL + 1
+    node_a.register_call("call-2", [1, 2])
+    assert set(node_a.call_participants) == {"call-2"}
+    assert set(node_a.call_registered_at) == {"call-2"}
+
+
+class SlowWebSocket(FakeWebSocket):
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+        self.closed_with = None
+
+    async def send_text(self, text):
+        await self.release.wait()
+        await super().send_text(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+def test_slow_client_does_not_delay_others_and_typing_is_coalesced():
+    """Test a stalled socket only backs up its own queue and repeated typing events collapse to the latest"""
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+        alice, slow_bob = FakeWebSocket(), SlowWebSocket()
+        alice_id = await manager.connect(alice, 1)
+        bob_id = await manager.connect(slow_bob, 2)
+
+        await manager.broadcast_new_message({"id": 1}, room_id=5, sender_id=1, receiver_id=2)
+        await asyncio.sleep(0)
+        for is_typing in (True, False, True):
+            await manager.broadcast_typing(5, 1, is_typing, "Alice")
+        await manager.outbound[alice_id].drain()
+        alice_received = [m["type"] for m in alice.sent]
+        depth = manager.get_queue_metrics()[bob_id]["depth"]
+
+        slow_bob.release.set()
+        await manager.drain()
+        return alice_received, depth, slow_bob, manager.get_queue_metrics()[bob_id]
+
+    alice_received, depth, slow_bob, bob_metrics = asyncio.run(scenario())
+
+    assert alice_received == ["new_message"]
+    assert depth == 1
+    assert [m["type"] for m in slow_bob.sent] == ["new_message", "typing"]
+    assert slow_bob.sent[1]["data"]["is_typing"] is True
+    assert bob_metrics["coalesced"] == 2
+
+
+def test_overflowing_queue_drops_the_slow_client():
+    """Test a client that cannot keep up with regular events is disconnected"""
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+        slow_bob = SlowWebSocket()
+        bob_id = await manager.connect(slow_bob, 2)
+        manager.outbound[bob_id].maxsize = 2
+
+        for message_id in range(4):
+            await manager.send_personal_message({"type": "new_message", "data": {"id": message_id}}, 2)
+        await asyncio.sleep(0.01)
+        return manager, slow_bob, bob_id
+
+    manager, slow_bob, bob_id = asyncio.run(scenario())
+
+    assert not manager.is_user_connected(2)
+    assert bob_id not in manager.outbound
+    assert slow_bob.closed_with == 1013
+
+
+def test_every_device_receives_messages_and_presence_waits_for_the_last():
+    """Test a second device does not replace the first and the user stays online until both leave"""
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+        phone, web = FakeWebSocket(), FakeWebSocket()
+        phone_id = await manager.connect(phone, 2)
+        web_id = await manager.connect(web, 2)
+
+        await manager.send_personal_message({"type": "new_message", "data": {"id": 1}}, 2)
+        await manager.drain()
+
+        last_after_phone = manager.disconnect(2, phone_id)
+        online_after_phone = manager.presence.is_online(2)
+        last_after_web = manager.disconnect(2, web_id)
+        return phone, web, last_after_phone, online_after_phone, last_after_web, manager
+
+    phone, web, last_after_phone, online_after_phone, last_after_web, manager = asyncio.run(scenario())
+
+    assert [m["type"] for m in phone.sent] == ["new_message"]
+    assert [m["type"] for m in web.sent] == ["new_message"]
+    assert last_after_phone is False
+    assert online_after_phone is True
+    assert last_after_web is True
+    assert not manager.is_user_connected(2)
+    assert not manager.presence.is_online(2)
+
+
+def test_replies_to_one_device_go_through_its_outbound_queue():
+    """Test pong and error replies are queued behind earlier frames instead of written to the socket directly"""
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+        phone, web = FakeWebSocket(), FakeWebSocket()
+        phone_id = await manager.connect(phone, 2)
+        await manager.connect(web, 2)
+
+        await manager.send_personal_message({"type": "new_message", "data": {"id": 1}}, 2)
+        queued = manager.send_to_connection(phone_id, {"type": "pong"})
+        await manager.drain()
+        manager.disconnect(2, phone_id)
+        return phone, web, queued, manager.send_to_connection(phone_id, {"type": "pong"})
+
+    phone, web, queued, queued_after_disconnect = asyncio.run(scenario())
+
+    assert [m["type"] for m in phone.sent] == ["new_message", "pong"]
+    assert [m["type"] for m in web.sent] == ["new_message"]
+    assert queued is True
+    assert queued_after_disconnect is False
+
+
+def test_unread_updates_can_be_pushed_from_worker_threads():
+    """Test sync code on a threadpool (plain def routes, DB workers) can push unread deltas to the user's devices"""
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+        idle = ConnectionManager(InMemoryBackplane(), PresenceRegistry())
+        phone = FakeWebSocket()
+        await manager.connect(phone, 2)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: manager.push_unread_update(2, notification_type="proposal_received", delta=1))
+        await loop.run_in_executor(None, lambda: idle.push_unread_update(2, notification_type="proposal_received", delta=1))
+        await asyncio.sleep(0.01)
+        await manager.drain()
+        return phone
+
+    phone = asyncio.run(scenario())
+
+    assert phone.sent == [{"type": "unread_count", "data": {"notification_type": "proposal_received", "delta": 1}}]
+
+
+def test_reference_data_invalidation_reaches_other_nodes(monkeypatch):
+    """Test an admin change on one worker drops the cached reference responses of the others"""
+    other_node_cache = ReferenceDataCache()
+    monkeypatch.setattr(websocket_manager, "reference_cache", other_node_cache)
+    other_node_cache.store(("skills",), b"[1]", 0)
+    other_node_cache.store(("roles",), b"[2]", 0)
+
+    async def scenario():
+        backplane = InMemoryBackplane()
+        admin_node = ConnectionManager(backplane, PresenceRegistry())
+        other_node = ConnectionManager(backplane, PresenceRegistry())
+        await admin_node.start()
+        await other_node.start()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: admin_node.publish_reference_invalidation(["skills"]))
+        await asyncio.sleep(0.01)
+        await admin_node.stop()
+        await other_node.stop()
+
+    asyncio.run(scenario())
+
+    assert other_node_cache.lookup(("skills",))[0] is None
+    assert other_node_cache.lookup(("roles",))[0].body == b"[2]"
+
+
+class DroppingRedisStandIn(LocalRedisStandIn):
+    """Stand-in whose first subscription loses its connection"""
+
+    def __init__(self):
+        super().__init__()
+        self.subscriptions = 0
+
+    def pubsub(self):
+        pubsub = super().pubsub()
+        self.subscriptions += 1
+        if self.subscriptions == 1:
+            async def listen():
+                raise ConnectionError("connection reset by peer")
+                yield
+            pubsub.listen = listen
+        return pubsub
+
+
+def test_redis_backplane_resubscribes_after_a_dropped_connection(monkeypatch):
+    """Test a lost Redis connection is retried with backoff and later envelopes still arrive"""
+    monkeypatch.setattr("app.utils.websocket_backplane.BACKPLANE_RECONNECT_MIN_DELAY", 0.01)
+    redis = DroppingRedisStandIn()
+    received = []
+
+    async def handler(envelope):
+        received.append(envelope)
+
+    async def scenario():
+        backplane = RedisBackplane("redis://local", "chat:events", client=redis)
+        await backplane.start(handler)
+        await asyncio.sleep(0.05)
+        await redis.publish("chat:events", json.dumps({"origin": "other", "presence_alive": [1]}))
+        await asyncio.sleep(0.01)
+        await backplane.stop()
+
+    asyncio.run(scenario())
+
+    assert redis.subscriptions == 2
+    assert received == [{"origin": "other", "presence_alive": [1]}]
+
+
+def test_user_is_written_offline_only_when_no_node_holds_them(presence_flushes):
+    """Test leaving one node keeps a user online while another node still holds a device, then the last node writes them offline"""
+    async def scenario():
+        backplane = InMemoryBackplane()
+        node_a = ConnectionManager(backplane, PresenceRegistry())
+        node_b = ConnectionManager(backplane, PresenceRegistry())
+        phone_id = await node_a.connect(FakeWebSocket(), 1)
+        web_id = await node_b.connect(FakeWebSocket(), 1)
+        await node_a._announce_presence()
+        await node_b._announce_presence()
+
+        left_a = node_a.disconnect(1, phone_id)
+        await asyncio.sleep(0.01)
+        pending_a = dict(node_a.presence.pending)
+        left_b = node_b.disconnect(1, web_id)
+        return left_a, pending_a, left_b, node_b.presence.pending[1][0]
+
+    left_a, pending_a, left_b, written_b = asyncio.run(scenario())
+
+    assert left_a is False
+    assert pending_a[1][0] is True
+    assert left_b is True
+    assert written_b is False
+
+
+def test_expired_users_are_queued_offline():
+    """Test a user whose node stopped sending heartbeats is written offline on expiry"""
+    registry = PresenceRegistry(ttl_seconds=60)
+    registry.touch_remote(7, "dead-node")
+    registry.last_seen[7] -= timedelta(seconds=61)
+    registry.remote[7]["dead-node"] -= timedelta(seconds=61)
+
+    registry.expire()
+
+    assert not registry.is_online(7)
+    assert registry.pending[7][0] is False
+    assert 7 not in registry.remote
@@ -0,0 +1,33 @@
+"""
+Rebuild the precomputed job recommendations from scratch.
+
+Posting, editing or closing a job and editing skills update
+job_recommendations incrementally, but a closed job leaves a gap in the
+lists it was part of until those users are re-ranked. Run this nightly
+(e.g. from cron) to recompute every user's list with NumPy and drop rows
+for users without skills and jobs that are no longer open.
+
+Usage:
+    PYTHONPATH=. python utils/rebuild_job_recommendations.py
+"""
+import logging
+
+from app.db.database import SessionLocal
+from app.utils.job_recommender import rebuild_all
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rebuild():
+    """Recompute every user's job recommendations"""
+    db = SessionLocal()
+    try:
+        users_ranked = rebuild_all(db)
+        logger.info(f"Job recommendations rebuilt for {users_ranked} user(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
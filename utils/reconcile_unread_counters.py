@@ -0,0 +1,36 @@
+"""
+Repair drift in the incrementally maintained unread counters.
+
+Chat counters (chat_participants.unread_count) and notification counters
+(notification_unread_counters) are updated in the same transaction as the
+rows they count, so drift should only come from manual SQL or bulk fixes.
+Run this periodically (e.g. nightly from cron) to recompute them.
+
+Usage:
+    PYTHONPATH=. python utils/reconcile_unread_counters.py
+"""
+import logging
+
+from app.db.database import SessionLocal
+from app.repositories.chat_repository import ChatRepository
+from app.repositories.notification_repository import NotificationRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def reconcile():
+    """Recompute chat and notification unread counters"""
+    db = SessionLocal()
+    try:
+        fixed = ChatRepository(db).reconcile_unread_counters()
+        logger.info(f"Chat unread counters fixed: {fixed}")
+        
+        written = NotificationRepository(db).reconcile_unread_counters()
+        logger.info(f"Notification unread counters rebuilt: {written}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    reconcile()